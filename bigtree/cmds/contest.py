@@ -14,6 +14,7 @@ try:
 except Exception:
     bigtree = None
 from bigtree.modules.permissions import is_elfministrator
+from bigtree.modules import runtime_config
 
 DEFAULT_RULES = (
     "1) One entry per person\n"
@@ -79,6 +80,7 @@ def _set_channel_enabled(channel_id: int, enabled: bool) -> None:
         lst.append(channel_id)
     if not enabled and channel_id in lst:
         lst.remove(channel_id)
+    runtime_config.invalidate()
 
 def _resolve_vote_emoji(guild: Optional[discord.Guild]):
     desired = _settings_get("CONTEST", "VOTE_EMOJI", ":TreeCone:") or ":TreeCone:"
@@ -14,6 +14,7 @@ from discord import app_commands
 from discord.ext import commands
 
 import bigtree
+from bigtree.inc.discord_fetch import get_fetch_scheduler
 from bigtree.modules.permissions import is_bigtree_operator
 from bigtree.modules.content_requests import (
     create_request,
@@ -371,7 +372,10 @@ class ReviewCog(commands.Cog):
         if not review_ch:
             return
 
-        async for msg in review_ch.history(limit=100):
+        scheduler = get_fetch_scheduler()
+        async with scheduler.scan("review_views"):
+            messages = await scheduler.history(review_ch, limit=100)
+        for msg in messages:
             if msg.author.id != self.bot.user.id:
                 continue
             if not msg.embeds:
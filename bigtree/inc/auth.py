@@ -8,11 +8,14 @@
 #   - JWT: if claim "scopes" exists (list or comma-string), enforce it; otherwise allow if route has no scopes
 
 from __future__ import annotations
+import asyncio
+import time
 from dataclasses import dataclass
-from typing import Optional, Set, Dict, Any, Callable
+from typing import Optional, Set, Dict, Any, Callable, FrozenSet
 from aiohttp import web
 import bigtree
 from bigtree.inc import web_tokens
+from bigtree.inc.cache import TTLCache
 from bigtree.inc.logging import auth_logger
 
 try:
@@ -32,6 +35,8 @@ class _Cfg:
     jwt_algorithms: tuple[str, ...] = ("HS256",)
 
 _AUTH_CFG: Optional[_Cfg] = None
+# token -> granted scopes (None = not a valid JWT); entries never outlive the token's exp claim
+_JWT_CACHE = TTLCache(maxsize=4096, ttl=300.0)
 
 
 def _cfg() -> _Cfg:
@@ -128,8 +133,9 @@ def _verify_dynamic_token(token: str, needed: Set[str]) -> bool:
     except Exception:
         return False
 
-def _dynamic_token_scopes(token: str) -> Optional[Set[str]]:
-    doc = web_tokens.find_token(token)
+def _dynamic_token_scopes(token: str, doc: Optional[Dict[str, Any]] = None) -> Optional[Set[str]]:
+    if doc is None:
+        doc = web_tokens.find_token(token)
     if not doc:
         return None
     if "scopes" not in doc:
@@ -159,19 +165,39 @@ def _verify_jwt(token: str, cfg: _Cfg, needed: Set[str]) -> bool:
         granted = set()
     return _scopes_ok(needed, granted) if needed else True
 
-def _jwt_scopes(token: str, cfg: _Cfg) -> Optional[Set[str]]:
+def _jwt_scopes(token: str, cfg: _Cfg) -> Optional[FrozenSet[str]]:
     if not cfg.jwt_secret or jwt is None:
         return None
+    hit, cached = _JWT_CACHE.get(token)
+    if hit:
+        return cached
     try:
         claims = jwt.decode(token, cfg.jwt_secret, algorithms=list(cfg.jwt_algorithms), options={"verify_aud": False})
     except InvalidTokenError:
+        _JWT_CACHE.set(token, None, ttl=30.0)
         return None
     raw = claims.get("scopes")
     if isinstance(raw, list):
-        return {str(x) for x in raw}
-    if isinstance(raw, str):
-        return _split_scopes(raw)
-    return set()
+        scopes = {str(x) for x in raw}
+    elif isinstance(raw, str):
+        scopes = _split_scopes(raw)
+    else:
+        scopes = set()
+    ttl = None
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(300.0, float(exp) - time.time())
+    # frozen on both paths: the cached value is shared between requests
+    granted = frozenset(scopes)
+    _JWT_CACHE.set(token, granted, ttl=ttl)
+    return granted
+
+async def _resolve_dynamic_scopes(token: str) -> Optional[Set[str]]:
+    # Cache hits stay in memory; only a miss goes to the token store, off the event loop.
+    hit, doc = web_tokens.cached_token(token)
+    if not hit:
+        doc = await asyncio.to_thread(web_tokens.find_token, token)
+    return _dynamic_token_scopes(token, doc) if doc else None
 
 def auth_middleware() -> Callable:
     """
@@ -220,7 +246,7 @@ def auth_middleware() -> Callable:
                 else:
                     scope_ok = _scopes_ok(needed_scopes, _split_scopes(cfg.scopes_map.get(token)))
             if not scope_ok:
-                dyn_scopes = _dynamic_token_scopes(token)
+                dyn_scopes = await _resolve_dynamic_scopes(token)
                 if dyn_scopes is not None:
                     valid = True
                     scope_ok = _scopes_ok(needed_scopes, dyn_scopes)
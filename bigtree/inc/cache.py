@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe LRU cache with per-entry expiry.
+
+    ``get`` returns ``(hit, value)`` so cached ``None`` values (negative
+    caching) can be told apart from a miss.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self._maxsize = max(1, int(maxsize))
+        self._ttl = float(ttl)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return False, None
+            expires, value = entry
+            if expires <= now:
+                del self._data[key]
+                self._misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self._ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            self.pop(key)
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "max": self._maxsize, "hits": self._hits, "misses": self._misses}
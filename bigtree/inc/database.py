@@ -1,22 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import os
 import secrets
 import string
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, date
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import psycopg2
 from psycopg2.extras import Json, RealDictCursor
 from tinydb import TinyDB
 
 import bigtree
+from bigtree.inc.db_pool import ConnectionPool
 from bigtree.inc.logging import logger
+from bigtree.inc.wallet import WalletLedger
 
 _DB_INSTANCE: Optional["Database"] = None
+_CHANGE_LISTENERS: List[Callable[[str, int, Dict[str, Any]], None]] = []
 
 
 def ensure_database() -> "Database":
@@ -31,6 +38,16 @@ def get_database() -> "Database":
     return ensure_database()
 
 
+def add_change_listener(fn: Callable[[str, int, Dict[str, Any]], None]) -> None:
+    """Register ``fn(kind, event_id, data)`` for event-scoped changes made through this process.
+
+    Kinds: ``player_joined``, ``game`` and ``wallet``. Listeners run on the
+    writing thread, after the change is committed.
+    """
+    if fn not in _CHANGE_LISTENERS:
+        _CHANGE_LISTENERS.append(fn)
+
+
 class Database:
     def __init__(self):
         self._settings = getattr(bigtree, "settings", None)
@@ -38,9 +55,19 @@ class Database:
         self._conn_info = conn_info
         self._connect_retries = retries
         self._connect_delay = delay
+        self._pool = self._build_pool()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wallet: Optional[WalletLedger] = None
+        self._query_timeout = (
+            self._settings.get("DATABASE.query_timeout", 15.0, cast=float)
+            if self._settings
+            else 15.0
+        )
 
         # internal state
         self._lock = threading.RLock()
+        # per executor thread: statement_timeout of the run_async call being served
+        self._call_limits = threading.local()
         self._initialized = False
         self._json_imported = False
         self._decks_synced = False
@@ -68,13 +95,17 @@ class Database:
         with self._lock:
             if self._initialized:
                 return
+            self._pool.prefill()
             self._ensure_tables()
             self._import_ini_configs()
             self._sync_tarot_decks()
             self._migrate_media_items()
             self._migrate_json_backups()
+            self._migrate_bingo_store()
             self._migrate_legacy_state_files()
+            self._migrate_tarot_session_store()
             self._migrate_legacy_contests()
+            self._migrate_event_house_totals()
             self._report_legacy_import_sources()
             self._initialized = True
 
@@ -113,6 +144,51 @@ class Database:
         )
         return data, int(retries), float(delay)
 
+    def _build_pool(self) -> ConnectionPool:
+        def opt(key: str, default, cast):
+            if not self._settings:
+                return default
+            val = self._settings.get(f"DATABASE.{key}", default, cast=cast)
+            return default if val is None else val
+
+        return ConnectionPool(
+            self._connect,
+            minconn=int(opt("pool_min", 1, int)),
+            maxconn=int(opt("pool_max", 10, int)),
+            max_lifetime=float(opt("pool_max_lifetime", 1800.0, float)),
+            health_check_interval=float(opt("pool_health_check_interval", 30.0, float)),
+            acquire_timeout=float(opt("pool_acquire_timeout", 10.0, float)),
+        )
+
+    def _connection(self):
+        """Borrow a pooled connection (commits on success, rolls back on error).
+
+        Inside :meth:`run_async` each transaction carries the call's
+        ``statement_timeout``, so Postgres cancels and rolls back overruns.
+        """
+        limit = getattr(self._call_limits, "timeout", None)
+        if not limit:
+            return self._pool.connection()
+        return self._bounded_connection(limit)
+
+    @contextmanager
+    def _bounded_connection(self, limit: float):
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = %s", (max(1, int(limit * 1000)),))
+            yield conn
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._pool.stats()
+
+    def close(self) -> None:
+        if self._wallet is not None:
+            self._wallet.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._pool.closeall()
+
     def _connect(self):
         attempts = getattr(self, "_connect_retries", 5)
         delay = getattr(self, "_connect_delay", 1.0)
@@ -126,7 +202,7 @@ class Database:
                 time.sleep(delay)
 
     def _execute(self, sql: str, params: Optional[Sequence] = None, fetch: bool = False):
-        with self._connect() as conn:
+        with self._connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(sql, params or ())
                 if fetch:
@@ -140,6 +216,63 @@ class Database:
     def _fetchall(self, sql: str, params: Optional[Sequence] = None) -> List[Dict[str, Any]]:
         return self._execute(sql, params, fetch=True) or []
 
+    # ---------------- change listeners ----------------
+    def _emit_change(self, kind: str, event_id: Any, data: Dict[str, Any]) -> None:
+        try:
+            event_id = int(event_id or 0)
+        except Exception:
+            return
+        if event_id <= 0:
+            return
+        for fn in list(_CHANGE_LISTENERS):
+            try:
+                fn(kind, event_id, data)
+            except Exception as exc:
+                logger.debug("[database] change listener failed: %s", exc)
+
+    # ---------------- async access ----------------
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Sized to the pool so queued calls wait in the executor, not on a pool checkout.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._pool.stats()["max"],
+                        thread_name_prefix="bigtree-db",
+                    )
+        return self._executor
+
+    async def run_async(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """Run a blocking DB callable on the bounded DB executor without stalling the event loop.
+
+        Pass the bound method, e.g. ``await db.run_async(db.get_event_by_code, code)``.
+        ``timeout`` (defaults to DATABASE.query_timeout; 0 disables) is enforced by
+        Postgres as ``statement_timeout`` on every statement the call runs: an overrun
+        raises ``QueryCanceledError`` after its transaction was rolled back, so a
+        failed call never commits behind the caller's back.
+        """
+        loop = asyncio.get_running_loop()
+        limit = self._query_timeout if timeout is None else timeout
+        call = functools.partial(self._run_bounded, limit, fn, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def _run_bounded(self, limit: Optional[float], fn, *args, **kwargs):
+        previous = getattr(self._call_limits, "timeout", None)
+        self._call_limits.timeout = limit
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._call_limits.timeout = previous
+
+    async def _aexecute(self, sql: str, params: Optional[Sequence] = None, fetch: bool = False, *, timeout: Optional[float] = None):
+        return await self.run_async(self._execute, sql, params, fetch, timeout=timeout)
+
+    async def _afetchone(self, sql: str, params: Optional[Sequence] = None, *, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return await self.run_async(self._fetchone, sql, params, timeout=timeout)
+
+    async def _afetchall(self, sql: str, params: Optional[Sequence] = None, *, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await self.run_async(self._fetchall, sql, params, timeout=timeout)
+
     def _with_retry(self, fn):
         """Run a function with a single DB retry on connection failure."""
         try:
@@ -227,6 +360,7 @@ class Database:
                 winnings BIGINT NOT NULL DEFAULT 0,
                 state JSONB DEFAULT '{}'::jsonb,
                 is_single_player BOOLEAN DEFAULT FALSE,
+                version BIGINT NOT NULL DEFAULT 0,
                 created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
             )
@@ -245,6 +379,106 @@ class Database:
             "CREATE INDEX IF NOT EXISTS idx_cardgame_sessions_status ON cardgame_sessions(status)",
             "CREATE INDEX IF NOT EXISTS idx_cardgame_events_session ON cardgame_events(session_id, id)",
             """
+            CREATE TABLE IF NOT EXISTS bingo_games (
+                game_id TEXT PRIMARY KEY,
+                channel_id BIGINT,
+                title TEXT NOT NULL DEFAULT 'Bingo',
+                header TEXT,
+                header_text TEXT,
+                price BIGINT NOT NULL DEFAULT 0,
+                currency TEXT,
+                max_cards_per_player INTEGER NOT NULL DEFAULT 10,
+                created_by BIGINT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                ended_at TIMESTAMPTZ,
+                pot BIGINT NOT NULL DEFAULT 0,
+                called INTEGER[] NOT NULL DEFAULT '{}',
+                last_called INTEGER,
+                last_winners TEXT[] NOT NULL DEFAULT '{}',
+                started BOOLEAN NOT NULL DEFAULT FALSE,
+                stage TEXT NOT NULL DEFAULT 'single',
+                active BOOLEAN NOT NULL DEFAULT TRUE,
+                event_id INTEGER,
+                event_code TEXT,
+                background_path TEXT,
+                theme_color TEXT,
+                announce_calls BOOLEAN NOT NULL DEFAULT FALSE,
+                card_count INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS bingo_cards (
+                card_id TEXT PRIMARY KEY,
+                game_id TEXT NOT NULL REFERENCES bingo_games(game_id) ON DELETE CASCADE,
+                owner_name TEXT NOT NULL DEFAULT '',
+                owner_user_id BIGINT,
+                cells SMALLINT[] NOT NULL,
+                mask INTEGER NOT NULL DEFAULT 0,
+                claimed BOOLEAN NOT NULL DEFAULT FALSE,
+                purchased_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS bingo_claims (
+                id BIGSERIAL PRIMARY KEY,
+                game_id TEXT NOT NULL REFERENCES bingo_games(game_id) ON DELETE CASCADE,
+                card_id TEXT NOT NULL,
+                owner_name TEXT,
+                stage TEXT,
+                pending BOOLEAN NOT NULL DEFAULT FALSE,
+                denied BOOLEAN NOT NULL DEFAULT FALSE,
+                source TEXT NOT NULL DEFAULT 'admin',
+                ts TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                approved_at TIMESTAMPTZ
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS bingo_owner_tokens (
+                token TEXT PRIMARY KEY,
+                game_id TEXT NOT NULL REFERENCES bingo_games(game_id) ON DELETE CASCADE,
+                owner_name TEXT NOT NULL,
+                UNIQUE (game_id, owner_name)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS bingo_channels (
+                channel_id BIGINT PRIMARY KEY,
+                game_id TEXT NOT NULL REFERENCES bingo_games(game_id) ON DELETE CASCADE
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_bingo_games_created ON bingo_games(created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_bingo_cards_owner ON bingo_cards(game_id, owner_name)",
+            "CREATE INDEX IF NOT EXISTS idx_bingo_cards_user ON bingo_cards(game_id, owner_user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_bingo_claims_game ON bingo_claims(game_id, id)",
+            "CREATE INDEX IF NOT EXISTS idx_bingo_claims_card ON bingo_claims(game_id, card_id)",
+            """
+            CREATE TABLE IF NOT EXISTS tarot_sessions (
+                session_id TEXT PRIMARY KEY,
+                join_code TEXT UNIQUE NOT NULL,
+                priestess_id BIGINT,
+                priestess_token TEXT,
+                deck_id TEXT,
+                spread_id TEXT,
+                status TEXT NOT NULL DEFAULT 'created',
+                state JSONB DEFAULT '{}'::jsonb,
+                event_seq INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tarot_session_events (
+                id BIGSERIAL PRIMARY KEY,
+                session_id TEXT NOT NULL REFERENCES tarot_sessions(session_id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                ts TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                type TEXT NOT NULL,
+                data JSONB DEFAULT '{}'::jsonb
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_tarot_session_events_seq ON tarot_session_events(session_id, seq)",
+            "CREATE INDEX IF NOT EXISTS idx_tarot_sessions_created ON tarot_sessions(created_at DESC)",
+            """
             CREATE TABLE IF NOT EXISTS venues (
                 id SERIAL PRIMARY KEY,
                 name TEXT UNIQUE NOT NULL,
@@ -307,6 +541,18 @@ class Database:
             )
             """,
             """
+            CREATE TABLE IF NOT EXISTS event_house_totals (
+                event_id INTEGER NOT NULL,
+                module TEXT NOT NULL,
+                currency TEXT NOT NULL DEFAULT '',
+                games INTEGER NOT NULL DEFAULT 0,
+                total_pot BIGINT NOT NULL DEFAULT 0,
+                total_winnings BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (event_id, module, currency)
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS venue_members (
                 id SERIAL PRIMARY KEY,
                 venue_id INTEGER NOT NULL REFERENCES venues(id) ON DELETE CASCADE,
@@ -482,10 +728,40 @@ class Database:
                 updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
             )
             """,
+            """
+            CREATE TABLE IF NOT EXISTS discord_messages (
+                message_id BIGINT PRIMARY KEY,
+                guild_id BIGINT,
+                channel_id BIGINT NOT NULL,
+                author_id BIGINT NOT NULL,
+                author_name TEXT,
+                content TEXT NOT NULL DEFAULT '',
+                attachments JSONB NOT NULL DEFAULT '[]'::jsonb,
+                created_at TIMESTAMPTZ NOT NULL,
+                edited_at TIMESTAMPTZ,
+                tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_discord_messages_tsv ON discord_messages USING GIN (tsv)",
+            "CREATE INDEX IF NOT EXISTS idx_discord_messages_channel ON discord_messages(channel_id, message_id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_discord_messages_author ON discord_messages(author_id, message_id DESC)",
+            """
+            CREATE TABLE IF NOT EXISTS treeheart_scores (
+                message_id BIGINT PRIMARY KEY,
+                channel_id BIGINT NOT NULL,
+                author_id BIGINT NOT NULL,
+                author_name TEXT,
+                image_url TEXT,
+                score INTEGER NOT NULL DEFAULT 0,
+                posted_at TIMESTAMPTZ,
+                reconciled_at TIMESTAMPTZ
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_treeheart_scores_channel ON treeheart_scores(channel_id, message_id DESC)",
         ]
         for stmt in statements:
             self._execute(stmt)
-        with self._connect() as conn:
+        with self._connection() as conn:
             self._ensure_column(conn, "discord_users", "name", "TEXT")
             self._ensure_column(conn, "discord_users", "display_name", "TEXT")
             self._ensure_column(conn, "discord_users", "global_name", "TEXT")
@@ -499,6 +775,7 @@ class Database:
             self._ensure_column(conn, "games", "event_id", "INTEGER")
             self._ensure_column(conn, "venues", "deck_id", "TEXT")
             self._ensure_column(conn, "cardgame_sessions", "is_single_player", "BOOLEAN DEFAULT FALSE")
+            self._ensure_column(conn, "cardgame_sessions", "version", "BIGINT NOT NULL DEFAULT 0")
         logger.debug("[database] schema ready")
 
     def _count_rows(self, table: str) -> int:
@@ -1156,7 +1433,7 @@ class Database:
     def join_event(self, event_id: int, user_id: int) -> bool:
         if not event_id or not user_id:
             return False
-        self._execute(
+        inserted = self._execute(
             """
             INSERT INTO event_players (event_id, user_id, role)
             VALUES (%s, %s, 'player')
@@ -1178,6 +1455,8 @@ class Database:
                 )
         except Exception:
             pass
+        if inserted:
+            self._emit_change("player_joined", event_id, {"user_id": int(user_id)})
         return True
 
     def get_event_players(self, event_id: int, limit: int = 5000) -> List[Dict[str, Any]]:
@@ -1205,6 +1484,44 @@ class Database:
         ) or []
         return [self._json_safe_dict(dict(r)) for r in rows]
 
+    def get_event_dashboard_counts(self, event_id: int) -> Dict[str, int]:
+        """Players, active games and total wallet balance for an event dashboard, in one round trip."""
+        event_id = int(event_id)
+        self.wallet.flush()
+        row = self._fetchone(
+            """
+            SELECT (SELECT COUNT(*) FROM event_players WHERE event_id = %s) AS players_count,
+                   (SELECT COUNT(*) FROM games WHERE event_id = %s AND active = TRUE) AS games_count,
+                   (SELECT COALESCE(SUM(balance), 0) FROM event_wallets WHERE event_id = %s) AS wallet_total
+            """,
+            (event_id, event_id, event_id),
+        ) or {}
+        return {key: int(row.get(key) or 0) for key in ("players_count", "games_count", "wallet_total")}
+
+    @property
+    def wallet(self) -> WalletLedger:
+        """Cached event wallet balances with batched history writes (see ``bigtree.inc.wallet``)."""
+        if self._wallet is None:
+            with self._lock:
+                if self._wallet is None:
+                    def opt(key: str, default, cast):
+                        if not self._settings:
+                            return default
+                        val = self._settings.get(f"WALLET.{key}", default, cast=cast)
+                        return default if val is None else val
+
+                    self._wallet = WalletLedger(
+                        self,
+                        flush_interval=int(opt("flush_ms", 50, int)) / 1000.0,
+                        refresh_interval=float(opt("refresh_seconds", 60.0, float)),
+                        max_batch=int(opt("max_batch", 1000, int)),
+                        max_queue=int(opt("max_queue", 10000, int)),
+                    )
+        return self._wallet
+
+    def wallet_stats(self) -> Dict[str, Any]:
+        return self.wallet.stats()
+
     def set_event_wallet_balance(self, event_id: int, user_id: int, balance: int) -> bool:
         try:
             event_id = int(event_id)
@@ -1214,27 +1531,14 @@ class Database:
             return False
         if event_id <= 0 or user_id <= 0:
             return False
-        prev = self.get_event_wallet_balance(event_id, user_id)
-        # Ensure wallet row exists.
-        self._execute(
-            """
-            INSERT INTO event_wallets (event_id, user_id, balance)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (event_id, user_id) DO UPDATE
-              SET balance = EXCLUDED.balance,
-                  updated_at = CURRENT_TIMESTAMP
-            """,
-            (event_id, user_id, balance),
-        )
-        delta = balance - int(prev or 0)
-        self._record_event_wallet_history(
-            event_id=event_id,
-            user_id=user_id,
-            delta=delta,
-            balance=balance,
-            reason="admin_set",
-            metadata={"source": "admin", "previous": int(prev or 0)},
-            created_by=None,
+        try:
+            previous = self.wallet.set_balance(event_id, user_id, balance, metadata={"source": "admin"})
+        except RuntimeError:
+            return False
+        self._emit_change(
+            "wallet",
+            event_id,
+            {"user_id": user_id, "delta": balance - previous, "balance": balance, "reason": "admin_set"},
         )
         return True
 
@@ -1273,41 +1577,7 @@ class Database:
             return 0
         if event_id <= 0 or user_id <= 0:
             return 0
-        row = self._fetchone(
-            "SELECT balance FROM event_wallets WHERE event_id = %s AND user_id = %s",
-            (event_id, user_id),
-        )
-        try:
-            return int(row.get("balance") or 0) if row else 0
-        except Exception:
-            return 0
-
-    def _record_event_wallet_history(
-        self,
-        *,
-        event_id: int,
-        user_id: int,
-        delta: int,
-        balance: int,
-        reason: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None,
-        created_by: Optional[int] = None,
-    ) -> None:
-        self._execute(
-            """
-            INSERT INTO event_wallet_history (event_id, user_id, delta, balance, reason, metadata, created_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                int(event_id),
-                int(user_id),
-                int(delta),
-                int(balance),
-                reason,
-                Json(metadata or {}),
-                created_by,
-            ),
-        )
+        return self.wallet.balance(event_id, user_id)
 
     def list_event_wallet_history(self, event_id: int, user_id: int, limit: int = 200) -> List[Dict[str, Any]]:
         try:
@@ -1322,6 +1592,7 @@ class Database:
             limit = 1
         if limit > 1000:
             limit = 1000
+        self.wallet.flush()
         rows = self._execute(
             """
             SELECT delta, balance, reason, metadata, created_by, created_at
@@ -1409,40 +1680,20 @@ class Database:
             return False, 0, "invalid"
         if event_id <= 0 or user_id <= 0:
             return False, 0, "invalid"
-        with self._connect() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT balance
-                    FROM event_wallets
-                    WHERE event_id = %s AND user_id = %s
-                    FOR UPDATE
-                    """,
-                    (event_id, user_id),
-                )
-                row = cur.fetchone()
-                balance = int(row.get("balance") or 0) if row else 0
-                next_balance = balance + delta
-                if not allow_negative and next_balance < 0:
-                    return False, balance, "insufficient"
-                cur.execute(
-                    """
-                    INSERT INTO event_wallets (event_id, user_id, balance)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (event_id, user_id) DO UPDATE
-                      SET balance = EXCLUDED.balance,
-                          updated_at = CURRENT_TIMESTAMP
-                    """,
-                    (event_id, user_id, next_balance),
-                )
-                cur.execute(
-                    """
-                    INSERT INTO event_wallet_history (event_id, user_id, delta, balance, reason, metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (event_id, user_id, delta, next_balance, reason, Json(metadata or {})),
-                )
-                return True, next_balance, "ok"
+        ok, balance, status = self.wallet.apply(
+            event_id,
+            user_id,
+            delta,
+            reason=reason,
+            metadata=metadata,
+            allow_negative=allow_negative,
+        )
+        if status == "unavailable":
+            # credits are only refused with a full queue; payout paths ignore the result
+            logger.error("[database] wallet delta %s for %s/%s (%s) refused: ledger unavailable", delta, event_id, user_id, reason)
+        if ok and delta:
+            self._emit_change("wallet", event_id, {"user_id": user_id, "delta": delta, "balance": balance, "reason": reason})
+        return ok, balance, status
 
     def has_wallet_history_entry(self, *, event_id: int, user_id: int, reason: str, game_id: Optional[str]) -> bool:
         try:
@@ -1452,21 +1703,87 @@ class Database:
             return False
         if not event_id or not user_id or not reason or not game_id:
             return False
-        row = self._fetchone(
+        return self.wallet.has_entry(event_id, user_id, reason, str(game_id))
+
+    def _game_house_amounts(self, payload: Any, metadata: Any) -> Tuple[str, int, int]:
+        """(currency, pot, winnings) a games row contributes to its event's house totals."""
+        if not isinstance(payload, dict):
+            payload = {}
+        metadata = metadata or {}
+        currency = metadata.get("currency") or payload.get("currency")
+        pot = metadata.get("pot") or payload.get("pot") or 0
+        winnings = payload.get("winnings") or payload.get("payout") or payload.get("result") or 0
+        try:
+            pot_val = int(float(pot or 0))
+        except Exception:
+            pot_val = 0
+        try:
+            winnings_val = int(float(winnings or 0))
+        except Exception:
+            winnings_val = 0
+        return self._normalize_currency(currency), pot_val, winnings_val
+
+    def _apply_house_total_delta(self, cur, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Move a games row's contribution in event_house_totals from ``before`` to ``after``."""
+        deltas: Dict[Tuple[int, str, str], List[int]] = {}
+        for row, sign in ((before, -1), (after, 1)):
+            if not row or not row.get("event_id"):
+                continue
+            currency, pot, winnings = self._game_house_amounts(row.get("payload"), row.get("metadata"))
+            key = (int(row["event_id"]), str(row.get("module") or ""), currency)
+            acc = deltas.setdefault(key, [0, 0, 0])
+            acc[0] += sign
+            acc[1] += sign * pot
+            acc[2] += sign * winnings
+        changed = [(k, v) for k, v in deltas.items() if any(v)]
+        if not changed:
+            return
+        cur.execute(
             """
-            SELECT 1 AS ok
-            FROM event_wallet_history
-            WHERE event_id = %s
-              AND user_id = %s
-              AND reason = %s
-              AND metadata->>'game_id' = %s
-            LIMIT 1
+            INSERT INTO event_house_totals (event_id, module, currency, games, total_pot, total_winnings)
+            SELECT * FROM unnest(%s::int[], %s::text[], %s::text[], %s::int[], %s::bigint[], %s::bigint[])
+            ON CONFLICT (event_id, module, currency) DO UPDATE
+              SET games = event_house_totals.games + EXCLUDED.games,
+                  total_pot = event_house_totals.total_pot + EXCLUDED.total_pot,
+                  total_winnings = event_house_totals.total_winnings + EXCLUDED.total_winnings,
+                  updated_at = CURRENT_TIMESTAMP
             """,
-            (event_id, user_id, reason, str(game_id)),
+            (
+                [k[0] for k, _v in changed],
+                [k[1] for k, _v in changed],
+                [k[2] for k, _v in changed],
+                [v[0] for _k, v in changed],
+                [v[1] for _k, v in changed],
+                [v[2] for _k, v in changed],
+            ),
         )
-        return bool(row)
 
-    def get_event_house_total(self, event_id: int) -> Dict[str, int]:
+    def rebuild_event_house_totals(self, event_id: Optional[int] = None) -> int:
+        """Recompute event_house_totals from the games table (all events, or one); returns games counted."""
+        where = "WHERE event_id IS NOT NULL" if event_id is None else "WHERE event_id = %s"
+        params: Tuple[Any, ...] = () if event_id is None else (int(event_id),)
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("LOCK TABLE event_house_totals IN EXCLUSIVE MODE")
+                cur.execute(f"SELECT event_id, module, payload, metadata FROM games {where}", params)
+                rows = cur.fetchall()
+                cur.execute(
+                    "DELETE FROM event_house_totals" + ("" if event_id is None else " WHERE event_id = %s"),
+                    params,
+                )
+                for row in rows:
+                    self._apply_house_total_delta(cur, None, row)
+        return len(rows)
+
+    def _migrate_event_house_totals(self) -> None:
+        if self.is_legacy_imported("event_house_totals"):
+            return
+        counted = self.rebuild_event_house_totals()
+        self.mark_legacy_imported("event_house_totals")
+        if counted:
+            logger.info("[database] built event house totals from %s games", counted)
+
+    def get_event_house_total(self, event_id: int) -> Dict[str, Any]:
         try:
             event_id = int(event_id)
         except Exception:
@@ -1474,33 +1791,40 @@ class Database:
         if event_id <= 0:
             return {"total_pot": 0, "total_winnings": 0, "net": 0}
         rows = self._execute(
-            "SELECT payload, metadata FROM games WHERE event_id = %s",
+            """
+            SELECT module, currency, games, total_pot, total_winnings
+            FROM event_house_totals
+            WHERE event_id = %s
+            """,
             (event_id,),
             fetch=True,
         ) or []
         total_pot = 0
         total_winnings = 0
+        by_module: Dict[str, Dict[str, int]] = {}
+        by_currency: Dict[str, Dict[str, int]] = {}
         for r in rows:
-            payload = r.get("payload") or {}
-            if not isinstance(payload, dict):
-                payload = {}
-            metadata = r.get("metadata") or {}
-            currency = metadata.get("currency") or payload.get("currency")
-            if self._normalize_currency(currency) == "gil":
+            pot_val = int(r.get("total_pot") or 0)
+            winnings_val = int(r.get("total_winnings") or 0)
+            currency = r.get("currency") or ""
+            for bucket, name in ((by_currency, currency), (by_module, r.get("module") or "")):
+                entry = bucket.setdefault(name, {"games": 0, "total_pot": 0, "total_winnings": 0, "net": 0})
+                entry["games"] += int(r.get("games") or 0)
+                entry["total_pot"] += pot_val
+                entry["total_winnings"] += winnings_val
+                entry["net"] += pot_val - winnings_val
+            # gil games are settled outside the event wallet and stay out of the headline totals
+            if currency == "gil":
                 continue
-            pot = metadata.get("pot") or payload.get("pot") or 0
-            winnings = payload.get("winnings") or payload.get("payout") or payload.get("result") or 0
-            try:
-                pot_val = int(float(pot or 0))
-            except Exception:
-                pot_val = 0
-            try:
-                winnings_val = int(float(winnings or 0))
-            except Exception:
-                winnings_val = 0
             total_pot += pot_val
             total_winnings += winnings_val
-        return {"total_pot": total_pot, "total_winnings": total_winnings, "net": total_pot - total_winnings}
+        return {
+            "total_pot": total_pot,
+            "total_winnings": total_winnings,
+            "net": total_pot - total_winnings,
+            "by_module": by_module,
+            "by_currency": by_currency,
+        }
 
     def _find_active_event_id_for_venue(self, venue_id: int) -> Optional[int]:
         if not venue_id:
@@ -1634,15 +1958,7 @@ class Database:
 
         wallet_balance = None
         if ev.get("wallet_enabled"):
-            w = self._fetchone(
-                "SELECT balance FROM event_wallets WHERE event_id = %s AND user_id = %s",
-                (int(ev["id"]), int(user_id)),
-            )
-            if w:
-                try:
-                    wallet_balance = int(w.get("balance") or 0)
-                except Exception:
-                    wallet_balance = 0
+            wallet_balance = self.get_event_wallet_balance(int(ev["id"]), int(user_id))
 
         # Games played in this event by the user (claimed, or named in players list).
         rows = self._execute(
@@ -2213,6 +2529,16 @@ class Database:
         rows = self._execute(sql, tuple(params), fetch=True) or []
         return [self._json_safe_dict(r) for r in rows]
 
+    def get_media_item(self, media_id: str) -> Optional[Dict[str, Any]]:
+        media_id = (media_id or "").strip()
+        if not media_id:
+            return None
+        row = self._fetchone(
+            "SELECT * FROM media_items WHERE media_id = %s OR filename = %s ORDER BY (media_id = %s) DESC LIMIT 1",
+            (media_id, media_id, media_id),
+        )
+        return self._json_safe_dict(row) if row else None
+
     def count_media_items(self, include_hidden: bool = False) -> int:
         if include_hidden:
             row = self._fetchone("SELECT COUNT(*) AS value FROM media_items")
@@ -2295,9 +2621,9 @@ class Database:
             meta = {"legacy": True}
             if entry.get("artist_id"):
                 meta["artist_id"] = entry.get("artist_id")
-            # Ensure thumbs exist for disk-backed images.
+            # Queue thumbs for disk-backed images.
             try:
-                _ = media_mod.ensure_thumb(filename)
+                media_mod.queue_thumbs(filename)
             except Exception:
                 pass
             self.upsert_media_item(
@@ -2336,7 +2662,7 @@ class Database:
             item_id = f"media:{name}"
             hidden = item_id in hidden_set
             try:
-                _ = media_mod.ensure_thumb(name)
+                media_mod.queue_thumbs(name)
             except Exception:
                 pass
             self.upsert_media_item(
@@ -2530,6 +2856,240 @@ class Database:
             return
         self._execute("DELETE FROM gallery_calendar WHERE month = %s", (month,))
 
+    # ---------------- discord message archive ----------------
+    def write_discord_messages(
+        self,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        edits: Optional[List[Dict[str, Any]]] = None,
+        deletes: Optional[Iterable[int]] = None,
+    ) -> int:
+        """Apply one ingest batch (upserts, then edits, then deletes) in a single transaction."""
+        messages = messages or []
+        edits = edits or []
+        deletes = [int(d) for d in (deletes or [])]
+        if not messages and not edits and not deletes:
+            return 0
+        written = 0
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                if messages:
+                    cur.execute(
+                        """
+                        INSERT INTO discord_messages
+                            (message_id, guild_id, channel_id, author_id, author_name, content, attachments, created_at, edited_at)
+                        SELECT m.message_id, m.guild_id, m.channel_id, m.author_id, m.author_name,
+                               m.content, m.attachments::jsonb, m.created_at, m.edited_at
+                        FROM unnest(%s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[], %s::text[],
+                                    %s::text[], %s::text[], %s::timestamptz[], %s::timestamptz[])
+                             AS m(message_id, guild_id, channel_id, author_id, author_name, content, attachments, created_at, edited_at)
+                        ON CONFLICT (message_id) DO UPDATE
+                          SET author_name = EXCLUDED.author_name,
+                              content = EXCLUDED.content,
+                              attachments = EXCLUDED.attachments,
+                              edited_at = COALESCE(EXCLUDED.edited_at, discord_messages.edited_at)
+                        """,
+                        (
+                            [int(m["message_id"]) for m in messages],
+                            [m.get("guild_id") for m in messages],
+                            [int(m["channel_id"]) for m in messages],
+                            [int(m["author_id"]) for m in messages],
+                            [m.get("author_name") for m in messages],
+                            [m.get("content") or "" for m in messages],
+                            [json.dumps(m.get("attachments") or []) for m in messages],
+                            [m["created_at"] for m in messages],
+                            [m.get("edited_at") for m in messages],
+                        ),
+                    )
+                    written += cur.rowcount
+                if edits:
+                    cur.execute(
+                        """
+                        UPDATE discord_messages AS d
+                           SET content = e.content,
+                               edited_at = COALESCE(e.edited_at, CURRENT_TIMESTAMP)
+                        FROM unnest(%s::bigint[], %s::text[], %s::timestamptz[]) AS e(message_id, content, edited_at)
+                        WHERE d.message_id = e.message_id
+                        """,
+                        (
+                            [int(e["message_id"]) for e in edits],
+                            [e.get("content") or "" for e in edits],
+                            [e.get("edited_at") for e in edits],
+                        ),
+                    )
+                    written += cur.rowcount
+                if deletes:
+                    cur.execute("DELETE FROM discord_messages WHERE message_id = ANY(%s::bigint[])", (deletes,))
+                    written += cur.rowcount
+        return written
+
+    def get_discord_channel_heads(self, channel_ids: Iterable[int]) -> Dict[int, int]:
+        """Newest archived message id per channel; channels with nothing archived are omitted."""
+        ids = [int(c) for c in channel_ids or []]
+        if not ids:
+            return {}
+        rows = self._fetchall(
+            """
+            SELECT c.channel_id,
+                   (SELECT d.message_id FROM discord_messages d
+                     WHERE d.channel_id = c.channel_id
+                     ORDER BY d.message_id DESC LIMIT 1) AS head
+            FROM unnest(%s::bigint[]) AS c(channel_id)
+            """,
+            (ids,),
+        )
+        return {int(r["channel_id"]): int(r["head"]) for r in rows if r.get("head") is not None}
+
+    def search_discord_messages(
+        self,
+        query: Optional[str] = None,
+        channel_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first archive search; page with ``before`` set to the last message_id returned."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        text = str(query or "").strip()
+        if text:
+            clauses.append("tsv @@ websearch_to_tsquery('simple', %s)")
+            params.append(text)
+        if channel_id:
+            clauses.append("channel_id = %s")
+            params.append(int(channel_id))
+        if author_id:
+            clauses.append("author_id = %s")
+            params.append(int(author_id))
+        if before:
+            clauses.append("message_id < %s")
+            params.append(int(before))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, int(limit or 50)))
+        return self._fetchall(
+            f"""
+            SELECT message_id, guild_id, channel_id, author_id, author_name, content, attachments, created_at, edited_at
+            FROM discord_messages
+            {where}
+            ORDER BY message_id DESC
+            LIMIT %s
+            """,
+            params,
+        )
+
+    # ---------------- treeheart scores ----------------
+    def track_treeheart_message(self, row: Dict[str, Any]) -> bool:
+        """Start tracking a submission at score 0; returns False when it was already tracked."""
+        count = self._execute(
+            """
+            INSERT INTO treeheart_scores (message_id, channel_id, author_id, author_name, image_url, score, posted_at)
+            VALUES (%s, %s, %s, %s, %s, 0, %s)
+            ON CONFLICT (message_id) DO NOTHING
+            """,
+            (
+                int(row["message_id"]),
+                int(row["channel_id"]),
+                int(row["author_id"]),
+                row.get("author_name"),
+                row.get("image_url"),
+                row.get("posted_at"),
+            ),
+        )
+        return bool(count)
+
+    def adjust_treeheart_score(self, message_id: int, delta: int) -> bool:
+        """Apply one reaction add/remove; returns False when the message is not tracked."""
+        count = self._execute(
+            "UPDATE treeheart_scores SET score = GREATEST(0, score + %s) WHERE message_id = %s",
+            (int(delta), int(message_id)),
+        )
+        return bool(count)
+
+    def reset_treeheart_score(self, message_id: int) -> bool:
+        return bool(self._execute("UPDATE treeheart_scores SET score = 0 WHERE message_id = %s", (int(message_id),)))
+
+    def delete_treeheart_messages(self, message_ids: Iterable[int]) -> int:
+        ids = [int(m) for m in message_ids or []]
+        if not ids:
+            return 0
+        return int(self._execute("DELETE FROM treeheart_scores WHERE message_id = ANY(%s::bigint[])", (ids,)) or 0)
+
+    def reconcile_treeheart_scores(self, rows: List[Dict[str, Any]]) -> int:
+        """Overwrite tracked scores with counts read back from Discord."""
+        if not rows:
+            return 0
+        changed = self._execute(
+            """
+            INSERT INTO treeheart_scores
+                (message_id, channel_id, author_id, author_name, image_url, score, posted_at, reconciled_at)
+            SELECT r.message_id, r.channel_id, r.author_id, r.author_name, r.image_url, r.score, r.posted_at, CURRENT_TIMESTAMP
+            FROM unnest(%s::bigint[], %s::bigint[], %s::bigint[], %s::text[], %s::text[], %s::int[], %s::timestamptz[])
+                 AS r(message_id, channel_id, author_id, author_name, image_url, score, posted_at)
+            ON CONFLICT (message_id) DO UPDATE
+              SET author_name = EXCLUDED.author_name,
+                  image_url = EXCLUDED.image_url,
+                  score = EXCLUDED.score,
+                  reconciled_at = CURRENT_TIMESTAMP
+            WHERE treeheart_scores.score IS DISTINCT FROM EXCLUDED.score
+               OR treeheart_scores.author_name IS DISTINCT FROM EXCLUDED.author_name
+            """,
+            (
+                [int(r["message_id"]) for r in rows],
+                [int(r["channel_id"]) for r in rows],
+                [int(r["author_id"]) for r in rows],
+                [r.get("author_name") for r in rows],
+                [r.get("image_url") for r in rows],
+                [int(r.get("score") or 0) for r in rows],
+                [r.get("posted_at") for r in rows],
+            ),
+        )
+        return int(changed or 0)
+
+    def prune_treeheart_channel(self, channel_id: int, since_message_id: int, keep_ids: Iterable[int]) -> int:
+        """Drop tracked submissions at or after ``since_message_id`` that a full scan no longer saw."""
+        return int(self._execute(
+            """
+            DELETE FROM treeheart_scores
+            WHERE channel_id = %s AND message_id >= %s AND NOT (message_id = ANY(%s::bigint[]))
+            """,
+            (int(channel_id), int(since_message_id), [int(k) for k in keep_ids or []]),
+        ) or 0)
+
+    def get_treeheart_leaderboard(self, channel_ids: Iterable[int], window: int = 200) -> List[Dict[str, Any]]:
+        """Per-author totals over the newest ``window`` tracked submissions of each channel.
+
+        The window counts submissions, not channel messages: non-submission posts are never tracked.
+        """
+        ids = [int(c) for c in channel_ids or []]
+        if not ids:
+            return []
+        rows = self._fetchall(
+            """
+            SELECT author_id,
+                   (ARRAY_AGG(author_name ORDER BY message_id DESC))[1] AS author_name,
+                   SUM(score)::int AS score,
+                   COUNT(*)::int AS entries
+            FROM (
+                SELECT message_id, author_id, author_name, score,
+                       ROW_NUMBER() OVER (PARTITION BY channel_id ORDER BY message_id DESC) AS rn
+                FROM treeheart_scores
+                WHERE channel_id = ANY(%s::bigint[])
+            ) recent
+            WHERE rn <= %s
+            GROUP BY author_id
+            ORDER BY SUM(score) DESC, MIN(message_id) ASC
+            """,
+            (ids, max(1, int(window or 200))),
+        )
+        return [
+            {
+                "author_id": int(r["author_id"]),
+                "author_name": r.get("author_name"),
+                "score": int(r.get("score") or 0),
+                "entries": int(r.get("entries") or 0),
+            }
+            for r in rows
+        ]
+
     # ---------------- temp links ----------------
     def issue_temp_link(
         self,
@@ -2929,7 +3489,7 @@ class Database:
                 try:
                     from bigtree.modules import media as _mm
                     try:
-                        _ = _mm.ensure_thumb(new_name)
+                        _mm.queue_thumbs(new_name)
                     except Exception:
                         pass
                 except Exception:
@@ -3207,6 +3767,161 @@ class Database:
             for owner_name, (name_val, owner_id) in owners.items():
                 self._store_game_player(game_id, owner_name, metadata={"owner_user_id": owner_id}, role="player")
 
+    def _migrate_bingo_store(self) -> None:
+        """One-shot import of the per-game TinyDB files and index.json into the bingo_* tables.
+
+        Files stay on disk; each one is recorded in legacy_imports so it is only read once.
+        """
+        bingo_dir = self._resolve_bingo_dir()
+        db_dir = os.path.join(bingo_dir, "db")
+        imported = 0
+        if os.path.isdir(db_dir):
+            for name in sorted(os.listdir(db_dir)):
+                if not name.endswith(".json"):
+                    continue
+                key = f"bingo:{name}"
+                if self.is_legacy_imported(key):
+                    continue
+                try:
+                    with open(os.path.join(db_dir, name), "r", encoding="utf-8") as fh:
+                        data = json.load(fh)
+                    docs = list((data.get("_default") or {}).values())
+                    games = [d for d in docs if d.get("_type") == "game"]
+                    if games:
+                        cards = [d for d in docs if d.get("_type") == "card"]
+                        self._import_bingo_game(games[-1], cards)
+                        imported += 1
+                except Exception as exc:
+                    logger.warning("[database] bingo import failed for %s: %s", name, exc)
+                    continue
+                self.mark_legacy_imported(key)
+        index_path = os.path.join(bingo_dir, "index.json")
+        if os.path.exists(index_path) and not self.is_legacy_imported("bingo:index.json"):
+            try:
+                with open(index_path, "r", encoding="utf-8") as fh:
+                    idx = json.load(fh) or {}
+                with self._connection() as conn:
+                    with conn.cursor() as cur:
+                        for channel_id, game_id in (idx.get("active_by_channel") or {}).items():
+                            cur.execute(
+                                """
+                                INSERT INTO bingo_channels (channel_id, game_id)
+                                SELECT %s, game_id FROM bingo_games WHERE game_id = %s
+                                ON CONFLICT (channel_id) DO NOTHING
+                                """,
+                                (int(channel_id), str(game_id)),
+                            )
+                        for token, info in (idx.get("owner_tokens") or {}).items():
+                            cur.execute(
+                                """
+                                INSERT INTO bingo_owner_tokens (token, game_id, owner_name)
+                                SELECT %s, game_id, %s FROM bingo_games WHERE game_id = %s
+                                ON CONFLICT DO NOTHING
+                                """,
+                                (str(token), str(info.get("owner_name") or ""), str(info.get("game_id") or "")),
+                            )
+                self.mark_legacy_imported("bingo:index.json")
+            except Exception as exc:
+                logger.warning("[database] bingo index import failed: %s", exc)
+        if imported:
+            logger.info("[database] imported %s bingo game(s) into the bingo store", imported)
+
+    def _import_bingo_game(self, game: Dict[str, Any], cards: List[Dict[str, Any]]) -> None:
+        game_id = str(game.get("game_id") or "")
+        if not game_id:
+            return
+        header_text = (game.get("header_text") or "").strip() or None
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO bingo_games (
+                        game_id, channel_id, title, header, header_text, price, currency,
+                        max_cards_per_player, created_by, created_at, ended_at, pot, called,
+                        last_called, started, stage, active, event_id, event_code,
+                        background_path, theme_color, announce_calls, card_count
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s,
+                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (game_id) DO NOTHING
+                    """,
+                    (
+                        game_id,
+                        self._force_int(game.get("channel_id")),
+                        game.get("title") or "Bingo",
+                        game.get("header") or (header_text or "BING").upper()[:4].ljust(4),
+                        header_text,
+                        self._force_int(game.get("price")) or 0,
+                        game.get("currency") or "gil",
+                        self._force_int(game.get("max_cards_per_player")) or 10,
+                        self._force_int(game.get("created_by")),
+                        self._as_datetime(game.get("created_at")),
+                        self._as_datetime(game.get("ended_at")),
+                        self._force_int(game.get("pot")) or 0,
+                        sorted({int(n) for n in (game.get("called") or [])}),
+                        self._force_int(game.get("last_called")),
+                        bool(game.get("started")),
+                        game.get("stage") or "single",
+                        bool(game.get("active", True)),
+                        self._force_int(game.get("event_id")),
+                        game.get("event_code"),
+                        game.get("background_path"),
+                        game.get("theme_color"),
+                        bool(game.get("announce_calls")),
+                        len(cards),
+                    ),
+                )
+                if not cur.rowcount:
+                    return
+                for card in cards:
+                    numbers = card.get("numbers") or []
+                    marks = card.get("marks") or []
+                    cells = [int(n) for row in numbers for n in row]
+                    mask = 0
+                    for r, row in enumerate(marks):
+                        for c, marked in enumerate(row):
+                            if marked:
+                                mask |= 1 << (r * len(row) + c)
+                    cur.execute(
+                        """
+                        INSERT INTO bingo_cards (card_id, game_id, owner_name, owner_user_id, cells, mask, claimed, purchased_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))
+                        ON CONFLICT (card_id) DO NOTHING
+                        """,
+                        (
+                            str(card.get("card_id")),
+                            game_id,
+                            str(card.get("owner_name") or ""),
+                            self._force_int(card.get("owner_user_id")),
+                            card.get("cells") or cells,
+                            int(card.get("mask") or mask),
+                            bool(card.get("claimed")),
+                            self._as_datetime(card.get("purchased_at")),
+                        ),
+                    )
+                cur.execute(
+                    "UPDATE bingo_games SET card_count = (SELECT COUNT(*) FROM bingo_cards WHERE game_id = %s) WHERE game_id = %s",
+                    (game_id, game_id),
+                )
+                for claim in game.get("claims") or []:
+                    cur.execute(
+                        """
+                        INSERT INTO bingo_claims (game_id, card_id, owner_name, stage, pending, denied, source, ts, approved_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s)
+                        """,
+                        (
+                            game_id,
+                            str(claim.get("card_id") or ""),
+                            claim.get("owner_name"),
+                            claim.get("stage"),
+                            bool(claim.get("pending")),
+                            bool(claim.get("denied")),
+                            claim.get("source") or "admin",
+                            self._as_datetime(claim.get("ts")),
+                            self._as_datetime(claim.get("approved_at")),
+                        ),
+                    )
+
     def _migrate_tarot_sessions(self):
         tarot_dir = self._resolve_tarot_dir()
         path = os.path.join(tarot_dir, "tarot_sessions.json")
@@ -3247,6 +3962,73 @@ class Database:
             for player in self._extract_tarot_players(entry):
                 self._store_game_player(session_id, player, role="player")
 
+    def _migrate_tarot_session_store(self) -> None:
+        """One-shot import of tarot_sessions.json into tarot_sessions / tarot_session_events."""
+        key = "tarot/tarot_sessions.json"
+        path = os.path.join(self._resolve_tarot_dir(), "tarot_sessions.json")
+        if not os.path.exists(path) or self.is_legacy_imported(key):
+            return
+        try:
+            entries = TinyDB(path).all()
+        except Exception as exc:
+            logger.warning("[database] tarot session store import failed to read %s: %s", path, exc)
+            return
+        imported = 0
+        for entry in entries:
+            if entry.get("_type") != "session" or not entry.get("session_id") or not entry.get("join_code"):
+                continue
+            events = [e for e in (entry.get("events") or []) if isinstance(e, dict)]
+            state = {
+                "spread_positions": entry.get("spread_positions") or [],
+                "participants": entry.get("participants") or [],
+                "draw": entry.get("draw") or [],
+                "narration": entry.get("narration") or [],
+            }
+            event_seq = max([int(entry.get("event_seq") or 0)] + [int(e.get("seq") or 0) for e in events])
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO tarot_sessions (session_id, join_code, priestess_id, priestess_token, deck_id, spread_id,
+                                                    status, state, event_seq, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, to_timestamp(%s), to_timestamp(%s))
+                        ON CONFLICT DO NOTHING
+                        """,
+                        (
+                            entry.get("session_id"),
+                            entry.get("join_code"),
+                            self._force_int(entry.get("priestess_id")),
+                            entry.get("priestess_token"),
+                            entry.get("deck_id"),
+                            entry.get("spread_id"),
+                            entry.get("status") or "created",
+                            Json(state),
+                            event_seq,
+                            float(entry.get("created_at") or time.time()),
+                            float(entry.get("created_at") or time.time()),
+                        ),
+                    )
+                    if not cur.rowcount:
+                        continue
+                    for ev in events:
+                        cur.execute(
+                            """
+                            INSERT INTO tarot_session_events (session_id, seq, ts, type, data)
+                            VALUES (%s, %s, to_timestamp(%s), %s, %s)
+                            ON CONFLICT DO NOTHING
+                            """,
+                            (
+                                entry.get("session_id"),
+                                int(ev.get("seq") or 0),
+                                float(ev.get("ts") or 0),
+                                ev.get("type") or "EVENT",
+                                Json(ev.get("data") or {}),
+                            ),
+                        )
+            imported += 1
+        self.mark_legacy_imported(key)
+        logger.info("[database] tarot session store import complete (sessions=%s)", imported)
+
     def _migrate_cardgames(self):
         logger.info("[database] cardgames migration skipped (Postgres-only mode)")
 
@@ -3307,26 +4089,68 @@ class Database:
               payload = EXCLUDED.payload,
               metadata = games.metadata || EXCLUDED.metadata,
               run_source = COALESCE(EXCLUDED.run_source, games.run_source)
+        RETURNING game_id, event_id, module, status, active, created_at, payload, metadata
         """
-        self._execute(
-            sql,
-            (
-                game_id,
-                module,
-                title,
-                channel_id,
-                created_by,
-                venue_id,
-                event_id,
-                created_at,
-                ended_at,
-                status,
-                active,
-                Json(payload),
-                Json(metadata),
-                run_source,
-            ),
+        params = (
+            game_id,
+            module,
+            title,
+            channel_id,
+            created_by,
+            venue_id,
+            event_id,
+            created_at,
+            ended_at,
+            status,
+            active,
+            Json(payload),
+            Json(metadata),
+            run_source,
         )
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # Serialise writers of this game so the totals delta is taken against the row being replaced.
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext('games:' || %s))", (game_id,))
+                cur.execute("SELECT event_id, active, module, payload, metadata FROM games WHERE game_id = %s", (game_id,))
+                before = cur.fetchone()
+                cur.execute(sql, params)
+                after = cur.fetchone()
+                self._apply_house_total_delta(cur, before, after)
+        if _CHANGE_LISTENERS and after:
+            was_active = bool(before and before.get("active"))
+            if before and before.get("event_id") and before.get("event_id") != after.get("event_id"):
+                # Moved to another event: it leaves the old one.
+                self._emit_change("game", before["event_id"], {"game_id": game_id, "removed": True, "was_active": was_active})
+                was_active = False
+            self._emit_change(
+                "game",
+                after.get("event_id"),
+                {"game": self._dashboard_game(after), "was_active": was_active},
+            )
+
+    @staticmethod
+    def _dashboard_game(row: Dict[str, Any]) -> Dict[str, Any]:
+        """The fields the event dashboard shows for a games row."""
+        payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+        metadata = row.get("metadata") or {}
+        created_at = row.get("created_at")
+        if isinstance(created_at, (datetime, date)):
+            created_at = created_at.isoformat()
+        kind = payload.get("game_id") or row.get("module")
+        join_code = payload.get("join_code") or metadata.get("join_code")
+        return {
+            "game_id": row.get("game_id"),
+            "session_id": payload.get("session_id"),
+            "join_code": join_code,
+            "module": row.get("module"),
+            "type": kind,
+            "title": f"{kind or 'Game'} ({join_code or 'N/A'})",
+            "status": row.get("status"),
+            "active": bool(row.get("active")),
+            "created_at": created_at,
+            "pot": metadata.get("pot") or payload.get("pot"),
+            "currency": metadata.get("currency") or payload.get("currency"),
+        }
 
     def _find_venue_for_discord_admin(self, discord_id: int) -> Optional[int]:
         """Resolve a default venue for a Discord admin.
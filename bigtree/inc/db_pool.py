@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from bigtree.inc.logging import logger
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no pooled connection became available in time."""
+
+
+class _Slot:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Thread-safe Postgres connection pool.
+
+    Connections are opened lazily through ``connect_fn`` up to ``maxconn``.
+    Idle connections are health-checked before reuse once they have been idle
+    longer than ``health_check_interval`` and are recycled after
+    ``max_lifetime`` seconds.
+    """
+
+    def __init__(
+        self,
+        connect_fn: Callable[[], Any],
+        *,
+        minconn: int = 1,
+        maxconn: int = 10,
+        max_lifetime: float = 1800.0,
+        health_check_interval: float = 30.0,
+        acquire_timeout: float = 10.0,
+    ):
+        self._connect_fn = connect_fn
+        self._minconn = max(0, int(minconn))
+        self._maxconn = max(1, int(maxconn), self._minconn)
+        self._max_lifetime = float(max_lifetime or 0)
+        self._health_check_interval = float(health_check_interval or 0)
+        self._acquire_timeout = float(acquire_timeout or 0)
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: List[_Slot] = []
+        self._in_use: Dict[int, _Slot] = {}
+        self._opening = 0
+        self._closed = False
+
+        # checkout metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._opened = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._health_failures = 0
+
+    # ---------------- internals ----------------
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _expired(self, slot: _Slot, now: float) -> bool:
+        return bool(self._max_lifetime) and (now - slot.created_at) >= self._max_lifetime
+
+    def _close_quietly(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, slot: _Slot, now: float) -> bool:
+        conn = slot.conn
+        if conn.closed:
+            return False
+        if not self._health_check_interval or (now - slot.last_used) < self._health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            conn.rollback()
+            return True
+        except Exception as exc:
+            logger.debug("[database] pooled connection failed health check: %s", exc)
+            return False
+
+    def _open(self) -> _Slot:
+        try:
+            conn = self._connect_fn()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opening -= 1
+            self._opened += 1
+        return _Slot(conn)
+
+    # ---------------- public api ----------------
+    def getconn(self):
+        started = time.monotonic()
+        deadline = started + self._acquire_timeout if self._acquire_timeout else None
+        waited = False
+        while True:
+            slot: Optional[_Slot] = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise psycopg2.InterfaceError("connection pool is closed")
+                    if self._idle:
+                        slot = self._idle.pop()
+                        break
+                    if self._size() < self._maxconn:
+                        self._opening += 1
+                        break
+                    waited = True
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"timed out after {self._acquire_timeout:.1f}s waiting for a database connection")
+                    self._cond.wait(remaining)
+            if slot is None:
+                slot = self._open()
+            else:
+                now = time.monotonic()
+                if self._expired(slot, now):
+                    self._close_quietly(slot.conn)
+                    with self._cond:
+                        self._recycled += 1
+                        self._cond.notify()
+                    continue
+                if not self._healthy(slot, now):
+                    self._close_quietly(slot.conn)
+                    with self._cond:
+                        self._health_failures += 1
+                        self._cond.notify()
+                    continue
+            with self._cond:
+                self._in_use[id(slot.conn)] = slot
+                self._checkouts += 1
+                if waited:
+                    elapsed = time.monotonic() - started
+                    self._waits += 1
+                    self._wait_total += elapsed
+                    self._wait_max = max(self._wait_max, elapsed)
+            return slot.conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        with self._cond:
+            slot = self._in_use.pop(id(conn), None)
+        if slot is None:
+            self._close_quietly(conn)
+            return
+        if not discard and not conn.closed:
+            try:
+                status = conn.get_transaction_status()
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        if discard or conn.closed or self._closed or self._expired(slot, now):
+            self._close_quietly(conn)
+            with self._cond:
+                self._discarded += 1
+                self._cond.notify()
+            return
+        slot.last_used = now
+        with self._cond:
+            self._idle.append(slot)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error."""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as exc:
+            # a statement_timeout cancel leaves a healthy session; putconn rolls it back
+            discard = not isinstance(exc, psycopg2.extensions.QueryCanceledError)
+            raise
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def prefill(self) -> None:
+        for _ in range(self._minconn):
+            with self._cond:
+                if self._size() >= self._minconn:
+                    return
+                self._opening += 1
+            slot = self._open()
+            with self._cond:
+                self._idle.append(slot)
+                self._cond.notify()
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for slot in idle:
+            self._close_quietly(slot.conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self._size(),
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min": self._minconn,
+                "max": self._maxconn,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_avg_ms": round((self._wait_total / self._waits) * 1000, 2) if self._waits else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 2),
+                "timeouts": self._timeouts,
+                "opened": self._opened,
+                "recycled": self._recycled,
+                "discarded": self._discarded,
+                "health_failures": self._health_failures,
+            }
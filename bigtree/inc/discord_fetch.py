@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+import discord
+
+try:
+    import bigtree
+except Exception:
+    bigtree = None
+
+try:
+    from bigtree.inc.logging import logger
+except Exception:
+    import logging
+    logger = logging.getLogger("bigtree")
+
+from bigtree.inc.cache import TTLCache
+
+_CURRENT_SCAN: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("bigtree_discord_scan", default=None)
+
+
+def _setting(key: str, default):
+    try:
+        if getattr(bigtree, "settings", None):
+            return type(default)(bigtree.settings.get(f"DISCORD_FETCH.{key}", default, cast=type(default)))
+    except Exception:
+        pass
+    return default
+
+
+class DiscordFetchScheduler:
+    """Shared scheduler for the REST reads done by channel scans.
+
+    At most ``max_concurrency`` requests are in flight overall and
+    ``per_route`` per rate-limit bucket. Discord buckets message reads per
+    channel, so scans of different channels run side by side while one
+    channel is never hammered. A rate limit that discord.py hands back to us
+    parks its bucket for ``retry_after``. Identical fetches in flight share
+    one request, and fetched messages are cached for ``cache_seconds``.
+    ``forget`` wins over reads already in flight: their result is returned
+    but not cached.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_route: Optional[int] = None,
+        cache_seconds: Optional[float] = None,
+    ):
+        self._max = max(1, max_concurrency or _setting("max_concurrency", 4))
+        self._per_route = max(1, per_route or _setting("per_route", 3))
+        self._global = asyncio.Semaphore(self._max)
+        self._buckets: Dict[Hashable, asyncio.Semaphore] = {}
+        self._cooldown: Dict[Hashable, float] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._cache = TTLCache(4096, cache_seconds if cache_seconds is not None else _setting("cache_seconds", 30.0))
+        # message id -> _forget_seq at its last forget(); only needs to outlive the reads in flight.
+        self._forgotten = TTLCache(4096, 300.0)
+        self._forget_seq = 0
+        self._scans: Dict[str, Dict[str, Any]] = {}
+        self._active = 0
+        self._requests = 0
+        self._deduped = 0
+        self._cache_hits = 0
+        self._rate_limited = 0
+        self._errors = 0
+
+    # ---------------- permits ----------------
+    @contextlib.asynccontextmanager
+    async def slot(self, bucket: Hashable):
+        """Hold one request permit for ``bucket`` for the duration of a single request."""
+        sem = self._buckets.get(bucket)
+        if sem is None:
+            sem = self._buckets[bucket] = asyncio.Semaphore(self._per_route)
+        async with sem:
+            wait = self._cooldown.get(bucket, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._global:
+                self._active += 1
+                self._count("requests")
+                try:
+                    yield
+                finally:
+                    self._active -= 1
+
+    def _count(self, field: str, amount: int = 1) -> None:
+        setattr(self, f"_{field}", getattr(self, f"_{field}") + amount)
+        name = _CURRENT_SCAN.get()
+        if name:
+            scan = self._scans.setdefault(name, {})
+            scan[field] = scan.get(field, 0) + amount
+
+    async def _run(self, bucket: Hashable, factory: Callable[[], Awaitable[Any]], attempts: int = 3):
+        for attempt in range(1, attempts + 1):
+            async with self.slot(bucket):
+                try:
+                    return await factory()
+                except Exception as exc:
+                    status = getattr(exc, "status", None)
+                    if not (isinstance(exc, getattr(discord, "RateLimited", ())) or status == 429) or attempt == attempts:
+                        self._count("errors")
+                        raise
+                    retry_after = float(getattr(exc, "retry_after", None) or 1.0)
+                    self._count("rate_limited")
+                    self._cooldown[bucket] = time.monotonic() + retry_after
+                    logger.info("[discord-fetch] bucket %s rate limited, retrying in %.1fs", bucket, retry_after)
+
+    async def _dedup(self, bucket: Hashable, key: Hashable, factory: Callable[[], Awaitable[Any]]):
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count("deduped")
+        else:
+            task = asyncio.get_running_loop().create_task(self._run(bucket, factory))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._inflight.pop(k, None) if self._inflight.get(k) is t else None)
+        # shield: one caller giving up must not cancel a fetch others wait on.
+        return await asyncio.shield(task)
+
+    # ---------------- fetches ----------------
+    async def fetch_message(self, channel: Any, message_id: int) -> discord.Message:
+        mid = int(message_id)
+        hit, msg = self._cache.get(("message", mid))
+        if hit:
+            self._count("cache_hits")
+            return msg
+        started = self._forget_seq
+        msg = await self._dedup(int(channel.id), ("message", mid), lambda: channel.fetch_message(mid))
+        self._remember(msg, started)
+        return msg
+
+    async def fetch_messages(self, channel: Any, message_ids: Iterable[int]) -> Dict[int, Optional[discord.Message]]:
+        """Fetch many messages of one channel concurrently; failures map to None."""
+        ids = list(dict.fromkeys(int(m) for m in message_ids))
+        results = await asyncio.gather(*(self.fetch_message(channel, m) for m in ids), return_exceptions=True)
+        out: Dict[int, Optional[discord.Message]] = {}
+        for mid, res in zip(ids, results):
+            if isinstance(res, BaseException):
+                logger.warning("[discord-fetch] fetch_message failed for %s: %s", mid, res)
+                out[mid] = None
+            else:
+                out[mid] = res
+        return out
+
+    async def history(self, channel: Any, limit: Optional[int] = 100, *, remember: bool = True, **kwargs) -> List[discord.Message]:
+        """Collect ``channel.history(...)``; identical reads in flight are shared.
+
+        Keep ``limit`` to a page or so: the bucket's permit is held until the
+        read completes. ``remember=False`` keeps bulk walks out of the message cache.
+        """
+        args = tuple(sorted((k, getattr(v, "id", v)) for k, v in kwargs.items()))
+        key = ("history", int(channel.id), limit, args)
+
+        async def _collect():
+            return [m async for m in channel.history(limit=limit, **kwargs)]
+
+        started = self._forget_seq
+        messages = await self._dedup(int(channel.id), key, _collect)
+        if remember:
+            for msg in messages:
+                self._remember(msg, started)
+        return list(messages)
+
+    def _remember(self, msg: Any, started: int) -> None:
+        mid = int(msg.id)
+        hit, seq = self._forgotten.get(mid)
+        if hit and seq > started:
+            # forget() ran while this read was in flight; the snapshot may predate the change.
+            return
+        self._cache.set(("message", mid), msg)
+
+    def forget(self, message_id: int) -> None:
+        """Drop a cached snapshot; the raw reaction and edit listeners call this so counts are re-read."""
+        mid = int(message_id)
+        self._forget_seq += 1
+        self._forgotten.set(mid, self._forget_seq)
+        self._cache.pop(("message", mid))
+        # Later callers start a fresh read instead of joining the stale one.
+        self._inflight.pop(("message", mid), None)
+
+    # ---------------- scans ----------------
+    @contextlib.asynccontextmanager
+    async def scan(self, name: str):
+        """Attribute the requests made inside the block to ``name`` and time it."""
+        token = _CURRENT_SCAN.set(name)
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            _CURRENT_SCAN.reset(token)
+            scan = self._scans.setdefault(name, {})
+            scan["runs"] = scan.get("runs", 0) + 1
+            scan["failed_runs"] = scan.get("failed_runs", 0) + (0 if ok else 1)
+            scan["last_ms"] = round(elapsed, 1)
+            scan["max_ms"] = round(max(scan.get("max_ms", 0.0), elapsed), 1)
+            scan["total_ms"] = round(scan.get("total_ms", 0.0) + elapsed, 1)
+            logger.debug("[discord-fetch] scan %s took %.0fms", name, elapsed)
+
+    async def map(self, name: str, items: Iterable[Any], fn: Callable[[Any], Awaitable[Any]]) -> List[Any]:
+        """Run ``fn`` over ``items`` concurrently as one timed scan; exceptions are returned, not raised."""
+        async with self.scan(name):
+            return await asyncio.gather(*(fn(item) for item in items), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        scans = {}
+        for name, scan in self._scans.items():
+            runs = scan.get("runs", 0)
+            scans[name] = dict(scan, avg_ms=round(scan.get("total_ms", 0.0) / runs, 1) if runs else None)
+        return {
+            "max_concurrency": self._max,
+            "per_route": self._per_route,
+            "active": self._active,
+            "in_flight": len(self._inflight),
+            "requests": self._requests,
+            "deduped": self._deduped,
+            "cache_hits": self._cache_hits,
+            "rate_limited": self._rate_limited,
+            "errors": self._errors,
+            "scans": scans,
+        }
+
+
+_SCHEDULER: Optional[DiscordFetchScheduler] = None
+
+
+def get_fetch_scheduler() -> DiscordFetchScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = DiscordFetchScheduler()
+    return _SCHEDULER
@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+import psycopg2.extensions
+
+from bigtree.inc.logging import logger
+
+# Queue marker telling a subscriber it fell behind and must re-read from its cursor.
+RESYNC = {"resync": True}
+# Queue marker telling a subscriber the session no longer exists.
+GONE = {"gone": True}
+
+
+class NotifyListener:
+    """One dedicated Postgres LISTEN connection per process.
+
+    The connection is registered as a reader on the running asyncio loop, so
+    notifications are dispatched without polling and without a thread.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add_handler(self, channel: str, fn: Callable[[str], None]) -> None:
+        handlers = self._handlers.setdefault(channel, [])
+        if fn not in handlers:
+            handlers.append(fn)
+        if self._conn is not None:
+            try:
+                with self._conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{channel}"')
+            except Exception:
+                self._reset()
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.closed
+
+    async def ensure_started(self) -> bool:
+        loop = asyncio.get_running_loop()
+        if self.listening and self._loop is loop:
+            return True
+        # One lock per loop, created before anything can fail, so concurrent
+        # subscribers wait for a single start instead of each opening a connection.
+        if self._start_lock is None or self._lock_loop is not loop:
+            self._start_lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._start_lock:
+            if self.listening and self._loop is loop:
+                return True
+            self._reset()
+            conn = None
+            try:
+                from bigtree.inc.database import get_database
+
+                db = get_database()
+                conn = await db.run_async(db._connect)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    for channel in self._handlers:
+                        cur.execute(f'LISTEN "{channel}"')
+                if self.listening and self._loop is loop:
+                    # lost a race with another start; keep the registered connection
+                    self._close_conn(conn, None)
+                    return True
+                loop.add_reader(conn.fileno(), self._on_readable)
+            except Exception as exc:
+                if conn is not None:
+                    self._close_conn(conn, None)
+                logger.warning("[event_hub] LISTEN connection unavailable: %s", exc)
+                return False
+            self._conn = conn
+            self._loop = loop
+            logger.debug("[event_hub] listening on %s", ", ".join(self._handlers) or "-")
+            return True
+
+    def _reset(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._close_conn(conn, self._loop)
+
+    @staticmethod
+    def _close_conn(conn, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        try:
+            if loop is not None:
+                loop.remove_reader(conn.fileno())
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _on_readable(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            conn.poll()
+        except Exception as exc:
+            logger.warning("[event_hub] LISTEN connection lost: %s", exc)
+            self._reset()
+            return
+        while conn.notifies:
+            note = conn.notifies.pop(0)
+            for fn in self._handlers.get(note.channel, []):
+                try:
+                    fn(note.payload)
+                except Exception as exc:
+                    logger.debug("[event_hub] handler for %s failed: %s", note.channel, exc)
+
+
+_LISTENER = NotifyListener()
+
+
+def get_listener() -> NotifyListener:
+    return _LISTENER
+
+
+class SessionEventHub:
+    """Fan out per-session events to every subscribed stream in this process.
+
+    Events arrive either from Postgres NOTIFY on ``channel`` (payload
+    ``{"session_id": ..., "seq": ...}`` or ``{"session_id": ..., "gone": true}``),
+    in which case new rows are read once through ``fetch_events(session_id, since_seq)``
+    and shared by all subscribers, or directly from in-process ``publish`` calls.
+
+    With ``fetch_events`` the hub also re-reads every subscribed session once
+    per ``resync_seconds``, the safety net for a dropped LISTEN connection or a
+    change made by another process; ``exists(session_id)`` lets that sweep
+    tell subscribers a deleted session is gone.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_events: Optional[Callable[[str, int], List[Dict[str, Any]]]] = None,
+        *,
+        channel: Optional[str] = None,
+        exists: Optional[Callable[[str], Any]] = None,
+        queue_size: int = 500,
+        resync_seconds: float = 15.0,
+    ):
+        self.name = name
+        self._fetch_events = fetch_events
+        self._channel = channel
+        self._exists = exists
+        self._queue_size = queue_size
+        self._resync_seconds = resync_seconds
+        self._sweeper: Optional[asyncio.Task] = None
+        self._subs: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cursor: Dict[str, int] = {}
+        self._fetching: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._published = 0
+        self._fetches = 0
+        self._sweeps = 0
+        self._overflows = 0
+        if channel:
+            _LISTENER.add_handler(channel, self._on_notify)
+
+    # ---------------- subscription ----------------
+    async def subscribe(self, session_key: str, since: Optional[int] = None) -> asyncio.Queue:
+        """Register a queue for ``session_key``.
+
+        ``since`` is the subscriber's cursor; the first one seeds the shared
+        cursor, later subscribers cover the gap with their own replay.
+        """
+        if self._channel:
+            await _LISTENER.ensure_started()
+        self._loop = asyncio.get_running_loop()
+        key = str(session_key)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subs.setdefault(key, set()).add(queue)
+        if since is not None:
+            self._cursor.setdefault(key, int(since))
+        if self._fetch_events and (self._sweeper is None or self._sweeper.done()):
+            self._sweeper = self._loop.create_task(self._sweep())
+        return queue
+
+    def caught_up(self, session_key: str, queue: asyncio.Queue, since: int) -> None:
+        """A subscriber replayed up to ``since``; a sole subscriber moves the shared cursor along."""
+        key = str(session_key)
+        if self._subs.get(key) == {queue} and since > self._cursor.get(key, 0):
+            self._cursor[key] = since
+
+    def unsubscribe(self, session_key: str, queue: asyncio.Queue) -> None:
+        key = str(session_key)
+        subs = self._subs.get(key)
+        if not subs:
+            return
+        subs.discard(queue)
+        if not subs:
+            self._subs.pop(key, None)
+            self._cursor.pop(key, None)
+            self._dirty.discard(key)
+
+    async def ensure_listening(self) -> bool:
+        if not self._channel:
+            return True
+        return await _LISTENER.ensure_started()
+
+    def subscriber_count(self, session_key: Optional[str] = None) -> int:
+        if session_key is not None:
+            return len(self._subs.get(str(session_key), ()))
+        return sum(len(v) for v in self._subs.values())
+
+    # ---------------- delivery ----------------
+    def _put(self, queue: asyncio.Queue, item: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._overflows += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    def publish(self, session_key: str, events: List[Dict[str, Any]]) -> None:
+        """Deliver already-built events to local subscribers (must run on the loop)."""
+        key = str(session_key)
+        subs = self._subs.get(key)
+        if not subs:
+            return
+        for ev in events:
+            self._published += 1
+            for queue in list(subs):
+                self._put(queue, ev)
+
+    def publish_gone(self, session_key: str) -> None:
+        for queue in list(self._subs.get(str(session_key), ())):
+            self._put(queue, GONE)
+
+    def publish_threadsafe(self, loop: asyncio.AbstractEventLoop, session_key: str, events: List[Dict[str, Any]]) -> None:
+        loop.call_soon_threadsafe(self.publish, session_key, events)
+
+    def dispatch(self, session_key: str, events: Optional[List[Dict[str, Any]]]) -> None:
+        """Publish from any thread; ``events=None`` marks the session as gone.
+
+        Used as an in-process hook by modules that write events themselves, so
+        callers do not need to know whether they run on the loop or in a worker.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or str(session_key) not in self._subs:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if events is None:
+            fn, args = self.publish_gone, (session_key,)
+        else:
+            fn, args = self.publish, (session_key, events)
+        if running is loop:
+            fn(*args)
+        else:
+            loop.call_soon_threadsafe(fn, *args)
+
+    def _on_notify(self, raw: str) -> None:
+        try:
+            payload = json.loads(raw or "{}")
+        except Exception:
+            return
+        key = str(payload.get("session_id") or "")
+        if not key or key not in self._subs:
+            return
+        if payload.get("gone"):
+            self.publish_gone(key)
+            return
+        if key not in self._cursor:
+            try:
+                self._cursor[key] = max(0, int(payload.get("seq") or 0) - 1)
+            except Exception:
+                self._cursor[key] = 0
+        self._refresh(key)
+
+    def _refresh(self, key: str) -> None:
+        self._dirty.add(key)
+        if key not in self._fetching:
+            self._fetching.add(key)
+            asyncio.get_running_loop().create_task(self._drain(key))
+
+    async def _sweep(self) -> None:
+        """One backlog read per subscribed session per ``resync_seconds``, shared by its subscribers."""
+        from bigtree.inc.database import get_database
+
+        while self._subs:
+            await asyncio.sleep(self._resync_seconds)
+            await self.ensure_listening()
+            self._sweeps += 1
+            for key in list(self._subs):
+                if self._exists is not None:
+                    try:
+                        alive = await get_database().run_async(self._exists, key)
+                    except Exception as exc:
+                        logger.debug("[event_hub] %s exists check failed for %s: %s", self.name, key, exc)
+                        alive = True
+                    if not alive:
+                        self.publish_gone(key)
+                        continue
+                if key in self._subs:
+                    self._refresh(key)
+
+    async def _drain(self, key: str) -> None:
+        from bigtree.inc.database import get_database
+
+        try:
+            while key in self._dirty and key in self._subs and self._fetch_events:
+                self._dirty.discard(key)
+                since = self._cursor.get(key, 0)
+                self._fetches += 1
+                try:
+                    events = await get_database().run_async(self._fetch_events, key, since)
+                except Exception as exc:
+                    logger.debug("[event_hub] %s fetch failed for %s: %s", self.name, key, exc)
+                    for queue in list(self._subs.get(key, ())):
+                        self._put(queue, RESYNC)
+                    continue
+                if events:
+                    self._cursor[key] = int(events[-1].get("seq") or since)
+                    self.publish(key, events)
+        finally:
+            self._fetching.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "sessions": len(self._subs),
+            "subscribers": self.subscriber_count(),
+            "listening": _LISTENER.listening if self._channel else None,
+            "published": self._published,
+            "fetches": self._fetches,
+            "sweeps": self._sweeps,
+            "overflows": self._overflows,
+        }
+
+
+def _seq_payload(ev: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": ev.get("type"), "data": ev.get("data"), "seq": ev.get("seq")}
+
+
+async def sse_feed(
+    hub: SessionEventHub,
+    key: str,
+    *,
+    keepalive: float = 15.0,
+    gone: Optional[Dict[str, Any]] = None,
+    backlog: Optional[Callable[[int], Awaitable[Optional[List[Dict[str, Any]]]]]] = None,
+    since: int = 0,
+    resync: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None,
+    on_idle: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None,
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield stream payloads for ``key`` on ``hub``; None marks a keep-alive.
+
+    With ``backlog`` the feed follows a session's event log: ``backlog(since)``
+    returns the stored events after ``since`` (None once the session is gone)
+    and is replayed on start and after an overflow, while live events at or
+    below the cursor are skipped; periodic catch-up is the hub's sweep, not
+    a per-subscriber replay. Without it an
+    overflow is answered with the payload from ``resync()``. ``on_event`` may
+    rewrite live events and ``on_idle`` may replace a keep-alive with a payload.
+    ``gone`` is yielded once when the session ends.
+    """
+    queue = await hub.subscribe(key, since if backlog is not None else None)
+    try:
+        replay = backlog is not None
+        while True:
+            if replay:
+                replay = False
+                events = await backlog(since)
+                if events is None:
+                    if gone is not None:
+                        yield gone
+                    return
+                for ev in events:
+                    since = int(ev.get("seq", since))
+                    yield _seq_payload(ev)
+                hub.caught_up(key, queue, since)
+            try:
+                ev = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield await on_idle() if on_idle else None
+                continue
+            if ev is GONE:
+                if gone is not None:
+                    yield gone
+                return
+            if ev is RESYNC:
+                if backlog is not None:
+                    replay = True
+                elif resync is not None:
+                    yield await resync()
+                continue
+            if backlog is not None:
+                seq = int(ev.get("seq") or 0)
+                if seq <= since:
+                    continue
+                since = seq
+                ev = _seq_payload(ev)
+            yield await on_event(ev) if on_event else ev
+    finally:
+        hub.unsubscribe(key, queue)
+
+
+async def write_sse(resp, feed: AsyncIterator[Optional[Dict[str, Any]]], *, dumps: Callable[[Any], str] = json.dumps) -> None:
+    """Write ``feed`` to a prepared text/event-stream response until it ends or the client goes away."""
+    async with aclosing(feed) as payloads:
+        async for payload in payloads:
+            if payload is None:
+                # keep-alive comment; also surfaces a disconnected client
+                await resp.write(b": ping\n\n")
+                continue
+            await resp.write(f"data: {dumps(payload)}\n\n".encode("utf-8"))
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Hashable, Optional
+
+from aiohttp import web
+
+from bigtree.inc.cache import TTLCache
+
+# Bodies smaller than this are not worth a gzip variant.
+_GZIP_MIN_BYTES = 1024
+
+
+class _Entry:
+    __slots__ = ("version", "etag", "gzip_etag", "body", "gzipped")
+
+    def __init__(self, version: Hashable, body: bytes):
+        self.version = version
+        self.body = body
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        # A strong ETag names one exact byte sequence, so the gzip variant gets its own.
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= _GZIP_MIN_BYTES else None
+
+
+def _etag_matches(req: web.Request, *etags: str) -> bool:
+    header = req.headers.get("If-None-Match") or ""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Pre-serialised JSON bodies keyed by request shape and content version.
+
+    ``version`` is any hashable the caller bumps when the underlying data
+    changes; while it matches, the stored body (and its gzip variant and
+    strong ETag) is reused. ``ttl`` bounds how long an entry is trusted for
+    data that can change without a version bump (other processes, joins).
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key)
+
+    def stats(self):
+        return self._cache.stats()
+
+    async def respond(
+        self,
+        req: web.Request,
+        key: Hashable,
+        version: Hashable,
+        build: Callable[[], Any],
+        *,
+        cache_control: str = "no-cache",
+        store: bool = True,
+    ) -> web.Response:
+        """Serve ``build()`` (plain or awaitable result) as JSON with ETag / 304 handling.
+
+        ``store=False`` still answers with an ETag but does not keep the body,
+        for one-off request shapes that would only churn the cache.
+        """
+        entry = None
+        if store:
+            hit, cached = self._cache.get(key)
+            if hit and cached.version == version:
+                entry = cached
+        if entry is None:
+            data = build()
+            if inspect.isawaitable(data):
+                data = await data
+            entry = _Entry(version, json.dumps(data, default=str).encode("utf-8"))
+            if store:
+                self._cache.set(key, entry)
+        return conditional_response(req, entry, cache_control)
+
+
+def conditional_response(req: web.Request, entry: _Entry, cache_control: str) -> web.Response:
+    gzipped = entry.gzipped is not None and "gzip" in (req.headers.get("Accept-Encoding") or "")
+    headers = {
+        "ETag": entry.gzip_etag if gzipped else entry.etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    # Either variant's tag proves the client holds the current content.
+    if _etag_matches(req, entry.etag, entry.gzip_etag):
+        return web.Response(status=304, headers=headers)
+    if not gzipped:
+        return web.Response(body=entry.body, content_type="application/json", headers=headers)
+    headers["Content-Encoding"] = "gzip"
+    return web.Response(body=entry.gzipped, content_type="application/json", headers=headers)
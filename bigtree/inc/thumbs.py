@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import bigtree
+except Exception:
+    bigtree = None
+
+try:
+    from bigtree.inc.logging import logger
+except Exception:
+    import logging
+    logger = logging.getLogger("bigtree")
+
+_IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
+_FORMATS = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".gif": "GIF",
+    ".bmp": "BMP",
+    ".webp": "WEBP",
+}
+THUMB_DIR = "thumbs"
+DEFAULT_SIZE = (480, 672)
+# variant -> (size, format); format None keeps the source format and file name,
+# which is the historical "<dir>/thumbs/<filename>" thumb.
+VARIANTS: Dict[str, Tuple[Tuple[int, int], Optional[str]]] = {
+    "": (DEFAULT_SIZE, None),
+    "webp": (DEFAULT_SIZE, "WEBP"),
+    "sm": ((240, 336), "WEBP"),
+}
+
+
+def thumb_path(source_dir: str, filename: str, variant: str = "") -> str:
+    """Where the ``variant`` thumb of ``source_dir/filename`` lives."""
+    if not variant:
+        return os.path.join(source_dir, THUMB_DIR, filename)
+    # Keep the source extension: x.png and x.jpg must not share a thumb.
+    return os.path.join(source_dir, THUMB_DIR, variant, f"{filename}.webp")
+
+
+def is_fresh(source: str, dest: str) -> bool:
+    """True when ``dest`` exists and is not older than ``source``.
+
+    Sources are replaced in place (a re-uploaded tarot card keeps its name),
+    so existence alone would keep serving the old thumb.
+    """
+    try:
+        dest_mtime = os.stat(dest).st_mtime_ns
+    except OSError:
+        return False
+    try:
+        return dest_mtime >= os.stat(source).st_mtime_ns
+    except OSError:
+        return True
+
+
+def render_thumb(source: str, dest: str, size: Tuple[int, int], fmt: Optional[str] = None) -> bool:
+    """Decode ``source`` and write a thumbnail to ``dest``. Runs in a worker process."""
+    if is_fresh(source, dest):
+        return True
+    if not os.path.exists(source):
+        return False
+    try:
+        from PIL import Image
+    except Exception:
+        return False
+    fmt = fmt or _FORMATS.get(os.path.splitext(source)[1].lower(), "PNG")
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with Image.open(source) as img:
+            try:
+                img.seek(0)
+            except Exception:
+                pass
+            img.draft("RGB", size)
+            img.thumbnail(size)
+            save_kwargs: Dict[str, Any] = {}
+            if fmt == "JPEG":
+                if img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+                save_kwargs = {"quality": 82, "optimize": True, "progressive": True}
+            elif fmt == "WEBP":
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                save_kwargs = {"quality": 80, "method": 4}
+            img.save(tmp, fmt, **save_kwargs)
+        # Readers only ever see a complete file.
+        os.replace(tmp, dest)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        return False
+    return True
+
+
+def _default_workers() -> int:
+    workers = 0
+    try:
+        if getattr(bigtree, "settings", None):
+            workers = int(bigtree.settings.get("THUMBS.workers", 0, cast=int) or 0)
+    except Exception:
+        workers = 0
+    if workers <= 0:
+        workers = min(4, max(1, (os.cpu_count() or 2) - 1))
+    return workers
+
+
+class ThumbnailPool:
+    """Process pool for thumbnail rendering.
+
+    Jobs are keyed by destination path: asking for a thumb that is already
+    queued returns the pending future instead of decoding the image twice.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = workers or _default_workers()
+        self._executor: Optional[Executor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._deduped = 0
+        self._failed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            try:
+                # spawn, not fork: the parent runs the bot, the web server and DB pool threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except Exception as exc:
+                logger.warning("[thumbs] process pool unavailable, using threads: %s", exc)
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="bigtree-thumbs")
+        return self._executor
+
+    def submit(self, source: str, dest: str, size: Tuple[int, int] = DEFAULT_SIZE, fmt: Optional[str] = None) -> Future:
+        with self._lock:
+            pending = self._pending.get(dest)
+            if pending is not None:
+                self._deduped += 1
+                return pending
+            if is_fresh(source, dest):
+                done: Future = Future()
+                done.set_result(True)
+                return done
+            fut = self._get_executor().submit(render_thumb, source, dest, size, fmt)
+            self._pending[dest] = fut
+            self._submitted += 1
+        fut.add_done_callback(lambda f, key=dest: self._finished(key, f))
+        return fut
+
+    def _finished(self, dest: str, fut: Future) -> None:
+        with self._lock:
+            if self._pending.get(dest) is fut:
+                del self._pending[dest]
+        try:
+            ok = fut.result()
+        except Exception as exc:
+            logger.debug("[thumbs] render failed for %s: %s", dest, exc)
+            ok = False
+        if not ok:
+            with self._lock:
+                self._failed += 1
+
+    def submit_variant(self, source_dir: str, filename: str, variant: str = "") -> Optional[Future]:
+        if variant not in VARIANTS or os.path.splitext(filename)[1].lower() not in _IMG_EXTS:
+            return None
+        size, fmt = VARIANTS[variant]
+        return self.submit(os.path.join(source_dir, filename), thumb_path(source_dir, filename, variant), size, fmt)
+
+    def enqueue(self, source_dir: str, filename: str, variants: Optional[Iterable[str]] = None) -> None:
+        """Queue every thumb variant for a freshly stored image; never blocks."""
+        for variant in (VARIANTS if variants is None else variants):
+            try:
+                self.submit_variant(source_dir, filename, variant)
+            except Exception as exc:
+                logger.debug("[thumbs] could not queue %s: %s", filename, exc)
+                return
+
+    def ensure(self, source_dir: str, filename: str, variant: str = "", timeout: float = 30.0) -> bool:
+        """Blocking wait for one thumb; for callers already off the event loop."""
+        if is_fresh(os.path.join(source_dir, filename), thumb_path(source_dir, filename, variant)):
+            return True
+        fut = self.submit_variant(source_dir, filename, variant)
+        if fut is None:
+            return False
+        try:
+            return bool(fut.result(timeout=timeout))
+        except Exception:
+            return False
+
+    async def aensure(self, source_dir: str, filename: str, variant: str = "", timeout: float = 10.0) -> bool:
+        if is_fresh(os.path.join(source_dir, filename), thumb_path(source_dir, filename, variant)):
+            return True
+        fut = self.submit_variant(source_dir, filename, variant)
+        if fut is None:
+            return False
+        try:
+            # shield: a client giving up must not cancel the shared job.
+            return bool(await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout))
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "pending": len(self._pending),
+                "submitted": self._submitted,
+                "deduped": self._deduped,
+                "failed": self._failed,
+            }
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_POOL: Optional[ThumbnailPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_thumbnail_pool() -> ThumbnailPool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThumbnailPool()
+    return _POOL
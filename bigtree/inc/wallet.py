@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from bigtree.inc.cache import TTLCache
+from bigtree.inc.logging import logger
+
+_Key = Tuple[int, int]
+# (event_id, user_id, reason, game_id) of a history row, for idempotency checks
+_EntryKey = Tuple[int, int, str, Optional[str]]
+# Errors caused by the rows themselves; anything else is treated as Postgres being unavailable.
+_ROW_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+
+class _Account:
+    __slots__ = ("confirmed", "inflight", "pending", "synced")
+
+    def __init__(self, confirmed: int = 0):
+        self.confirmed = confirmed  # balance last read from / returned by Postgres
+        self.inflight = 0  # deltas in a flush that has not committed yet
+        self.pending = 0  # deltas queued for the next flush
+        self.synced = 0  # flush sequence that last set ``confirmed``
+
+    @property
+    def balance(self) -> int:
+        return self.confirmed + self.inflight + self.pending
+
+
+class WalletLedger:
+    """Event wallet balances with write-behind history.
+
+    Balances are kept per ``(event_id, user_id)``; an event's wallets are read
+    with one query the first time any of them is needed and refreshed in the
+    background after ``refresh_interval`` seconds, so balance checks are
+    served from memory. A delta is checked and applied in memory under one
+    lock and its history row is queued; a flusher thread writes everything
+    queued in a ``flush_interval`` window as one multi-row history INSERT and
+    one balance upsert. Balances are written as increments and re-read from
+    ``RETURNING``, so changes made by other processes are folded in rather
+    than overwritten. ``flush_interval=0`` writes through on every delta.
+
+    Once ``max_queue`` rows are waiting, writes are refused with status
+    ``"unavailable"`` instead of piling up in memory. While Postgres is
+    unreachable, debits that must be checked against the balance are refused
+    the same way; credits (and ``allow_negative`` changes) are still queued,
+    so winnings for a bet that already went through are not lost. A batch failing on a data or integrity error is retried one row
+    at a time so a single bad row cannot hold back the rest; rows that
+    still fail are dropped, logged and their deltas taken back out of the
+    cached balances.
+    """
+
+    def __init__(
+        self,
+        db,
+        *,
+        flush_interval: float = 0.05,
+        refresh_interval: float = 60.0,
+        max_batch: int = 1000,
+        max_queue: int = 10000,
+    ):
+        self._db = db
+        self._flush_interval = max(0.0, float(flush_interval))
+        self._refresh_interval = max(1.0, float(refresh_interval))
+        self._max_batch = max(1, int(max_batch))
+        self._max_queue = max(1, int(max_queue))
+        self._cond = threading.Condition(threading.Lock())
+        # Flushes must commit in the order their RETURNING balances are applied.
+        self._flush_lock = threading.Lock()
+        self._accounts: Dict[_Key, _Account] = {}
+        self._loaded: Dict[int, float] = {}
+        self._refresh_due: Set[int] = set()
+        self._queue: List[Tuple[Any, ...]] = []
+        self._inflight_rows = 0
+        # Set while the last flush could not reach Postgres; cleared by the next one that commits.
+        self._degraded = False
+        # Rows left to flush one at a time after Postgres rejected a batch.
+        self._isolate = 0
+        self._queued_entries: Counter = Counter()
+        self._seen_entries = TTLCache(maxsize=8192, ttl=600.0)
+        self._flush_seq = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {
+            "applied": 0,
+            "rejected": 0,
+            "unavailable": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "max_batch": 0,
+            "flush_failures": 0,
+            "event_loads": 0,
+            "entry_lookups": 0,
+        }
+
+    # ---------------- reads ----------------
+    def balance(self, event_id: int, user_id: int) -> int:
+        self._ensure_loaded(event_id)
+        with self._cond:
+            acct = self._accounts.get((event_id, user_id))
+            return acct.balance if acct else 0
+
+    def has_entry(self, event_id: int, user_id: int, reason: str, game_id: Optional[str] = None) -> bool:
+        """Whether a history row with ``reason`` exists (for ``game_id`` if given), queued rows included."""
+        key = (event_id, user_id, reason, None if game_id is None else str(game_id))
+        with self._cond:
+            if game_id is None:
+                queued = any(k[:3] == key[:3] for k in self._queued_entries)
+            else:
+                queued = bool(self._queued_entries.get(key))
+        if queued:
+            return True
+        hit, _value = self._seen_entries.get(key)
+        if hit:
+            return True
+        with self._cond:
+            self._stats["entry_lookups"] += 1
+        sql = """
+            SELECT 1 AS ok
+            FROM event_wallet_history
+            WHERE event_id = %s
+              AND user_id = %s
+              AND reason = %s
+        """
+        params: Tuple[Any, ...] = (event_id, user_id, reason)
+        if game_id is not None:
+            sql += "  AND metadata->>'game_id' = %s\n"
+            params += (str(game_id),)
+        row = self._db._fetchone(sql + "LIMIT 1", params)
+        if row:
+            # History rows are append-only, so a positive answer stays true.
+            self._seen_entries.set(key, True)
+        return bool(row)
+
+    # ---------------- writes ----------------
+    def apply(
+        self,
+        event_id: int,
+        user_id: int,
+        delta: int,
+        *,
+        reason: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        allow_negative: bool = False,
+        created_by: Optional[int] = None,
+    ) -> Tuple[bool, int, str]:
+        self._ensure_loaded(event_id)
+        metadata = dict(metadata or {})
+        with self._cond:
+            acct = self._accounts.get((event_id, user_id))
+            if acct is None:
+                acct = self._accounts[(event_id, user_id)] = _Account()
+            if not self._accepting_locked(delta >= 0 or allow_negative):
+                self._stats["unavailable"] += 1
+                return False, acct.balance, "unavailable"
+            next_balance = acct.balance + delta
+            if not allow_negative and next_balance < 0:
+                self._stats["rejected"] += 1
+                return False, acct.balance, "insufficient"
+            self._queue_locked(acct, event_id, user_id, delta, next_balance, reason, metadata, created_by)
+        self._after_write()
+        return True, next_balance, "ok"
+
+    def set_balance(
+        self,
+        event_id: int,
+        user_id: int,
+        balance: int,
+        *,
+        reason: str = "admin_set",
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Set an absolute balance; recorded as the delta from the current one.
+
+        Raises ``RuntimeError`` while writes are refused (see :meth:`apply`).
+        """
+        self._ensure_loaded(event_id)
+        metadata = dict(metadata or {})
+        with self._cond:
+            if not self._accepting_locked(False):
+                self._stats["unavailable"] += 1
+                raise RuntimeError("wallet writes are unavailable")
+            acct = self._accounts.get((event_id, user_id))
+            if acct is None:
+                acct = self._accounts[(event_id, user_id)] = _Account()
+            previous = acct.balance
+            metadata.setdefault("previous", previous)
+            self._queue_locked(acct, event_id, user_id, balance - previous, balance, reason, metadata, None)
+        self._after_write()
+        return previous
+
+    def _accepting_locked(self, unchecked: bool) -> bool:
+        """Room in the queue, and either Postgres is reachable or the change needs no balance check."""
+        if len(self._queue) + self._inflight_rows >= self._max_queue:
+            return False
+        return unchecked or not self._degraded
+
+    def _queue_locked(self, acct, event_id, user_id, delta, balance, reason, metadata, created_by) -> None:
+        acct.pending += delta
+        self._queue.append((event_id, user_id, delta, balance, reason, metadata, created_by))
+        if reason:
+            self._queued_entries[self._entry_key(event_id, user_id, reason, metadata)] += 1
+        self._stats["applied"] += 1
+        self._cond.notify()
+
+    @staticmethod
+    def _entry_key(event_id: int, user_id: int, reason: str, metadata: Dict[str, Any]) -> _EntryKey:
+        game_id = metadata.get("game_id")
+        return (event_id, user_id, reason, None if game_id is None else str(game_id))
+
+    def _after_write(self) -> None:
+        if self._flush_interval <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def flush(self) -> int:
+        """Write all queued rows now; returns how many were written."""
+        with self._flush_lock:
+            written = self._drain()
+        if self._degraded:
+            # write-through mode has no flusher thread; someone has to retry
+            self._ensure_thread()
+        return written
+
+    def _drain(self) -> int:
+        """Flush batches until the queue is empty or Postgres is unreachable; caller holds ``_flush_lock``."""
+        written = 0
+        while True:
+            count = self._flush_batch()
+            if count is None or count < 0:
+                return written
+            written += count
+
+    def _flush_batch(self) -> Optional[int]:
+        """Write one batch: rows written, ``None`` if nothing was queued, -1 if Postgres is unreachable."""
+        with self._cond:
+            if not self._queue:
+                return None
+            limit = 1 if self._isolate else self._max_batch
+            rows = self._queue[:limit]
+            del self._queue[:limit]
+            self._inflight_rows += len(rows)
+            deltas: Dict[_Key, int] = {}
+            for event_id, user_id, delta, *_rest in rows:
+                deltas[(event_id, user_id)] = deltas.get((event_id, user_id), 0) + delta
+            for key, delta in deltas.items():
+                acct = self._accounts[key]
+                acct.pending -= delta
+                acct.inflight += delta
+        try:
+            with self._db._connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO event_wallets (event_id, user_id, balance)
+                        SELECT * FROM unnest(%s::int[], %s::int[], %s::bigint[])
+                        ON CONFLICT (event_id, user_id) DO UPDATE
+                          SET balance = event_wallets.balance + EXCLUDED.balance,
+                              updated_at = CURRENT_TIMESTAMP
+                        RETURNING event_id, user_id, balance
+                        """,
+                        (
+                            [key[0] for key in deltas],
+                            [key[1] for key in deltas],
+                            list(deltas.values()),
+                        ),
+                    )
+                    stored = cur.fetchall()
+                    cur.execute(
+                        """
+                        INSERT INTO event_wallet_history (event_id, user_id, delta, balance, reason, metadata, created_by)
+                        SELECT h.event_id, h.user_id, h.delta, h.balance, h.reason, h.metadata::jsonb, h.created_by
+                        FROM unnest(%s::int[], %s::int[], %s::bigint[], %s::bigint[], %s::text[], %s::text[], %s::bigint[])
+                             WITH ORDINALITY AS h(event_id, user_id, delta, balance, reason, metadata, created_by, ord)
+                        ORDER BY h.ord
+                        """,
+                        (
+                            [r[0] for r in rows],
+                            [r[1] for r in rows],
+                            [r[2] for r in rows],
+                            [r[3] for r in rows],
+                            [r[4] for r in rows],
+                            [json.dumps(r[5], default=str) for r in rows],
+                            [r[6] for r in rows],
+                        ),
+                    )
+        except Exception as exc:
+            outage = not isinstance(exc, _ROW_ERRORS)
+            with self._cond:
+                self._inflight_rows -= len(rows)
+                self._stats["flush_failures"] += 1
+                for key, delta in deltas.items():
+                    acct = self._accounts[key]
+                    acct.inflight -= delta
+                    if outage or len(rows) > 1:
+                        acct.pending += delta
+                if outage:
+                    self._degraded = True
+                    self._queue[:0] = rows
+                elif len(rows) > 1:
+                    self._isolate = len(rows)
+                    self._queue[:0] = rows
+                else:
+                    self._isolate = max(0, self._isolate - 1)
+                    self._stats["dropped"] += 1
+                    self._release_entries_locked(rows, persisted=False)
+            if outage:
+                logger.warning("[wallet] flush of %s rows failed, will retry: %s", len(rows), exc)
+                return -1
+            if len(rows) > 1:
+                logger.warning("[wallet] flush of %s rows rejected, retrying them one by one: %s", len(rows), exc)
+                return 0
+            logger.error("[wallet] dropping history row rejected by Postgres %r: %s", rows[0], exc)
+            return 0
+        with self._cond:
+            self._inflight_rows -= len(rows)
+            self._degraded = False
+            if self._isolate:
+                self._isolate = max(0, self._isolate - len(rows))
+            self._flush_seq += 1
+            for key, delta in deltas.items():
+                self._accounts[key].inflight -= delta
+            for row in stored:
+                acct = self._accounts.get((int(row["event_id"]), int(row["user_id"])))
+                if acct is not None:
+                    acct.confirmed = int(row["balance"] or 0) - acct.inflight
+                    acct.synced = self._flush_seq
+            self._release_entries_locked(rows, persisted=True)
+            self._stats["flushes"] += 1
+            self._stats["rows_flushed"] += len(rows)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(rows))
+        return len(rows)
+
+    def _release_entries_locked(self, rows: List[Tuple[Any, ...]], *, persisted: bool) -> None:
+        for event_id, user_id, _delta, _balance, reason, metadata, _created_by in rows:
+            if reason:
+                key = self._entry_key(event_id, user_id, reason, metadata)
+                self._queued_entries[key] -= 1
+                if self._queued_entries[key] <= 0:
+                    del self._queued_entries[key]
+                if persisted:
+                    self._seen_entries.set(key, True)
+                    self._seen_entries.set(key[:3] + (None,), True)
+
+    # ---------------- loading ----------------
+    def _ensure_loaded(self, event_id: int) -> None:
+        loaded_at = self._loaded.get(event_id)
+        if loaded_at is None:
+            self._load_event(event_id)
+        elif time.monotonic() - loaded_at > self._refresh_interval and event_id not in self._refresh_due:
+            with self._cond:
+                self._refresh_due.add(event_id)
+                self._cond.notify()
+            self._ensure_thread()
+
+    def _load_event(self, event_id: int) -> None:
+        with self._cond:
+            start_seq = self._flush_seq
+        rows = self._db._execute(
+            "SELECT user_id, balance FROM event_wallets WHERE event_id = %s",
+            (event_id,),
+            fetch=True,
+        ) or []
+        stored = {int(r["user_id"]): int(r["balance"] or 0) for r in rows}
+        with self._cond:
+            for (ev, user_id), acct in self._accounts.items():
+                if ev != event_id:
+                    continue
+                # Skip wallets a flush touched while we were reading; its RETURNING value is newer.
+                if acct.inflight or acct.synced > start_seq:
+                    stored.pop(user_id, None)
+                    continue
+                acct.confirmed = stored.pop(user_id, 0)
+            for user_id, balance in stored.items():
+                self._accounts[(event_id, user_id)] = _Account(balance)
+            self._loaded[event_id] = time.monotonic()
+            self._refresh_due.discard(event_id)
+            self._stats["event_loads"] += 1
+
+    def forget_event(self, event_id: int) -> None:
+        """Drop cached balances for an event (after bulk changes made outside the ledger)."""
+        self.flush()
+        with self._cond:
+            for key in [k for k, a in self._accounts.items() if k[0] == event_id and not (a.pending or a.inflight)]:
+                del self._accounts[key]
+            self._loaded.pop(event_id, None)
+
+    # ---------------- flusher ----------------
+    def _ensure_thread(self) -> None:
+        if self._thread is not None or self._closed:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bigtree-wallet", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue and not self._refresh_due:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                refresh = list(self._refresh_due)
+            # Let concurrent writes pile into the same commit.
+            if self._queue and not self._closed:
+                time.sleep(self._flush_interval)
+            with self._flush_lock:
+                self._drain()
+                failed = self._degraded
+            if failed and self._closed:
+                return
+            for event_id in refresh:
+                try:
+                    self._load_event(event_id)
+                except Exception as exc:
+                    with self._cond:
+                        self._refresh_due.discard(event_id)
+                    logger.warning("[wallet] refresh of event %s failed: %s", event_id, exc)
+            if failed:
+                time.sleep(1.0)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5.0)
+        self.flush()
+        with self._cond:
+            rows = list(self._queue)
+        if rows:
+            net: Dict[_Key, int] = {}
+            for event_id, user_id, delta, *_rest in rows:
+                net[(event_id, user_id)] = net.get((event_id, user_id), 0) + delta
+            logger.error(
+                "[wallet] closing with %s unpersisted history rows; lost net deltas per (event, user): %s",
+                len(rows),
+                net,
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._stats)
+            out["queued"] = len(self._queue)
+            out["max_queue"] = self._max_queue
+            out["degraded"] = self._degraded
+            out["accounts"] = len(self._accounts)
+            out["events_loaded"] = len(self._loaded)
+        out["flush_interval"] = self._flush_interval
+        return out
@@ -3,8 +3,11 @@ from __future__ import annotations
 import json
 import secrets
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bigtree.inc.cache import TTLCache
 
 try:
     import bigtree
@@ -18,6 +21,13 @@ except Exception:
 
 TOKEN_TTL_SECONDS = 90 * 24 * 60 * 60
 
+# Token lookups sit on every authenticated request. Known tokens are cached for
+# a short while (never past their own expiry), unknown ones for less so a token
+# issued by another process becomes usable quickly.
+_CACHE_TTL_SECONDS = 60.0
+_NEGATIVE_TTL_SECONDS = 10.0
+_TOKEN_CACHE = TTLCache(maxsize=4096, ttl=_CACHE_TTL_SECONDS)
+
 
 def _settings_get(section: str, key: str, default=None):
     try:
@@ -72,6 +82,49 @@ def save_tokens(tokens: List[Dict[str, Any]]) -> None:
     _save_json(_token_path(), {"tokens": tokens})
 
 
+def _expires_epoch(doc: Dict[str, Any]) -> Optional[float]:
+    raw = doc.get("expires_at")
+    if raw is None or raw == "":
+        return None
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    if isinstance(raw, datetime):
+        return raw.timestamp()
+    try:
+        return datetime.fromisoformat(str(raw)).timestamp()
+    except Exception:
+        return None
+
+
+def _cache_doc(token: str, doc: Optional[Dict[str, Any]]) -> None:
+    if doc is None:
+        _TOKEN_CACHE.set(token, None, ttl=_NEGATIVE_TTL_SECONDS)
+        return
+    ttl = _CACHE_TTL_SECONDS
+    expires = _expires_epoch(doc)
+    if expires is not None:
+        ttl = min(ttl, expires - time.time())
+    _TOKEN_CACHE.set(token, doc, ttl=ttl)
+
+
+def cached_token(token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Return (hit, doc) from the in-memory token cache without touching storage."""
+    if not token:
+        return True, None
+    return _TOKEN_CACHE.get(token)
+
+
+def invalidate_token_cache(token: Optional[str] = None) -> None:
+    if token is None:
+        _TOKEN_CACHE.clear()
+    else:
+        _TOKEN_CACHE.pop(token)
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    return _TOKEN_CACHE.stats()
+
+
 def _db_available() -> bool:
     if not get_database:
         return False
@@ -100,7 +153,7 @@ def issue_token(
     if _db_available():
         try:
             db = get_database()
-            return db.issue_web_token(
+            doc = db.issue_web_token(
                 user_id=int(user_id),
                 scopes=scopes,
                 ttl_seconds=int(ttl_seconds),
@@ -108,6 +161,9 @@ def issue_token(
                 user_icon=user_icon,
                 metadata=metadata,
             )
+            if doc and doc.get("token"):
+                invalidate_token_cache(doc["token"])
+            return doc
         except Exception:
             pass
 
@@ -128,6 +184,7 @@ def issue_token(
     tokens = load_tokens()
     tokens.append(doc)
     save_tokens(tokens)
+    invalidate_token_cache(token)
     return doc
 
 
@@ -135,12 +192,17 @@ def revoke_token(token: str) -> bool:
     """Revoke a token (mark as revoked). Works with DB first, then JSON fallback."""
     if not token:
         return False
+    # Invalidate only after the store records the revocation; doing it first
+    # lets a concurrent lookup re-cache the still-live token.
     if _db_available():
         try:
             db = get_database()
-            return db.revoke_web_token(token)
+            revoked = db.revoke_web_token(token)
         except Exception:
             pass
+        else:
+            invalidate_token_cache(token)
+            return revoked
     # JSON fallback: mark in file
     tokens = load_tokens()
     for t in tokens:
@@ -148,6 +210,7 @@ def revoke_token(token: str) -> bool:
             t["revoked"] = True
             t["revoked_at"] = int(time.time())
             save_tokens(tokens)
+            invalidate_token_cache(token)
             return True
     return False
 
@@ -169,39 +232,18 @@ def list_tokens(include_expired: bool = False) -> list[Dict[str, Any]]:
 
 
 def validate_token(token: str, needed_scopes: Set[str]) -> bool:
-    if not token:
+    doc = find_token(token)
+    if not doc or doc.get("revoked"):
         return False
-    if _db_available():
-        try:
-            db = get_database()
-            doc = db.find_web_token(token)
-            if doc:
-                scopes = set(doc.get("scopes") or [])
-                if "*" in scopes:
-                    return True
-                if not needed_scopes:
-                    return True
-                return any(scope in scopes for scope in needed_scopes)
-        except Exception:
-            pass
-
-    for t in load_tokens():
-        if t.get("token") != token:
-            continue
-        if t.get("revoked"):
-            continue
-        scopes = set(t.get("scopes") or [])
-        if "*" in scopes:
-            return True
-        if not needed_scopes:
-            return True
-        return any(scope in scopes for scope in needed_scopes)
-    return False
+    scopes = set(doc.get("scopes") or [])
+    if "*" in scopes:
+        return True
+    if not needed_scopes:
+        return True
+    return any(scope in scopes for scope in needed_scopes)
 
 
-def find_token(token: str) -> Optional[Dict[str, Any]]:
-    if not token:
-        return None
+def _lookup_token(token: str) -> Optional[Dict[str, Any]]:
     if _db_available():
         try:
             db = get_database()
@@ -214,3 +256,14 @@ def find_token(token: str) -> Optional[Dict[str, Any]]:
         if doc.get("token") == token:
             return doc
     return None
+
+
+def find_token(token: str) -> Optional[Dict[str, Any]]:
+    if not token:
+        return None
+    hit, doc = _TOKEN_CACHE.get(token)
+    if hit:
+        return doc
+    doc = _lookup_token(token)
+    _cache_doc(token, doc)
+    return doc
@@ -1,8 +1,8 @@
 # bigtree/inc/webserver.py
 from __future__ import annotations
-import asyncio, importlib, pkgutil, logging
+import asyncio, importlib, pkgutil, logging, os, re, string
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Any, List, Set, Optional
+from typing import Callable, Dict, Any, List, Set, Optional, Tuple
 from aiohttp import web, WSMsgType
 from aiohttp.http_exceptions import InvalidURLError
 from importlib.resources import files as pkg_files, as_file
@@ -97,6 +97,84 @@ def _cfg():
         "serve_frontend": True,
     }
 
+# ---------- Compiled templates ----------
+@dataclass
+class _Template:
+    """A template file read once and pre-split around its placeholders.
+
+    ``mode`` is decided at compile time from the file alone:
+      * "parts": valid ``str.format`` syntax with plain ``{NAME}`` fields; ``parts``
+        alternates literal text and field names (``[lit, name, lit, ..., lit]``);
+      * "format": valid syntax using specs/conversions/attribute access, left to ``str.format``;
+      * "replace": braces that are not format fields (inline CSS/JS, most templates),
+        rendered by ``{KEY}`` replacement, split once per set of mapping keys.
+    """
+    text: str
+    mtime: Optional[float]
+    mode: str
+    parts: Optional[List[str]] = None
+    replace_parts: Dict[Tuple[str, ...], List[str]] = field(default_factory=dict)
+    static: Optional[str] = None  # output for an empty mapping
+    warned: bool = False
+
+_FORMAT_FIELD = re.compile(r"[A-Za-z_]\w*(?:[.\[].*)?$", re.S)
+
+def _compile_template(text: str, mtime: Optional[float]) -> _Template:
+    lits, names = [""], []
+    try:
+        for literal, name, spec, conv in string.Formatter().parse(text):
+            lits[-1] += literal
+            if name is None:
+                continue
+            names.append((name, spec, conv))
+            lits.append("")
+    except ValueError:
+        return _Template(text, mtime, "replace")
+    if not all(_FORMAT_FIELD.match(name) for name, _, _ in names):
+        # e.g. "{ margin: 0 }": str.format can only fail on these
+        return _Template(text, mtime, "replace")
+    if any(spec or conv or not name.isidentifier() for name, spec, conv in names):
+        return _Template(text, mtime, "format")
+    parts = [lits[0]]
+    for (name, _, _), lit in zip(names, lits[1:]):
+        parts.extend((name, lit))
+    return _Template(text, mtime, "parts", parts)
+
+def _join_parts(parts: List[str], mapping: Dict[str, Any], fmt) -> str:
+    out = [parts[0]]
+    for i in range(1, len(parts), 2):
+        out.append(fmt(mapping[parts[i]]))
+        out.append(parts[i + 1])
+    return "".join(out)
+
+def _replace_render(tpl: _Template, mapping: Dict[str, Any]) -> str:
+    keys = tuple(str(k) for k in mapping)
+    parts = tpl.replace_parts.get(keys)
+    if parts is None:
+        if keys:
+            pattern = "|".join(re.escape("{" + k + "}") for k in sorted(keys, key=len, reverse=True))
+            parts = re.split(f"({pattern})", tpl.text)
+            for i in range(1, len(parts), 2):
+                parts[i] = parts[i][1:-1]
+        else:
+            parts = [tpl.text]
+        tpl.replace_parts[keys] = parts
+    return _join_parts(parts, {str(k): v for k, v in mapping.items()}, str)
+
+_TEMPLATES: Dict[str, _Template] = {}
+
+def _template_reload() -> bool:
+    st = getattr(bigtree, "settings", None)
+    if st is None:
+        return False
+    try:
+        return bool(st.get("WEB.template_reload", False, bool))
+    except Exception:
+        return False
+
+def clear_template_cache() -> None:
+    _TEMPLATES.clear()
+
 class DynamicWebServer:
     def __init__(self):
         self._runner: Optional[web.AppRunner] = None
@@ -130,11 +208,39 @@ class DynamicWebServer:
         """Check if frontend HTML/static serving is enabled."""
         return self._cfg.get("serve_frontend", True)
     # ---------- Template loader ----------
+    @staticmethod
+    def _load_template(relpath: str) -> Optional[_Template]:
+        pkg = "bigtree.web.templates"
+        tpl = _TEMPLATES.get(relpath)
+        if tpl is not None and not _template_reload():
+            return tpl
+        try:
+            p = pkg_files(pkg).joinpath(relpath)
+            with as_file(p) as fp:
+                mtime = os.stat(fp).st_mtime
+                if tpl is not None and tpl.mtime == mtime:
+                    return tpl
+                txt = fp.read_text(encoding="utf-8")
+        except FileNotFoundError as e:
+            log.error(f"[web] template not found: {pkg}/{relpath}")
+            return None
+        except (OSError, IOError) as e:
+            log.error(f"[web] template read error: {pkg}/{relpath}: {e}")
+            return None
+        if not txt:
+            return None
+        tpl = _compile_template(txt, mtime)
+        _TEMPLATES[relpath] = tpl
+        return tpl
+
     @staticmethod
     def render_template(relpath: str, mapping: Dict[str, str]) -> str:
         """
         Load and render a template file with variable substitution.
         
+        Templates are read and compiled once (re-read on mtime change when
+        WEB.template_reload is on); output for an empty mapping is cached.
+        
         Args:
             relpath: Relative path to template in bigtree.web.templates
             mapping: Dictionary of variables to substitute in template
@@ -142,35 +248,33 @@ class DynamicWebServer:
         Returns:
             Rendered template string, or empty string if template not found
         """
-        pkg = "bigtree.web.templates"
-        try:
-            p = pkg_files(pkg).joinpath(relpath)
-            with as_file(p) as fp:
-                txt = fp.read_text(encoding="utf-8")
-        except FileNotFoundError as e:
-            log.error(f"[web] template not found: {pkg}/{relpath}")
-            txt = ""
-        except (OSError, IOError) as e:
-            log.error(f"[web] template read error: {pkg}/{relpath}: {e}")
-            txt = ""
-        
-        if not txt:
-            return txt
-            
-        try:
-            return txt.format(**mapping)
-        except KeyError as e:
-            # Missing template variable - log and fallback
-            log.warning(f"[web] template missing variable {e}: {relpath}")
-            for key, val in (mapping or {}).items():
-                txt = txt.replace("{" + str(key) + "}", str(val))
-            return txt
-        except Exception as e:
-            # Other formatting errors - fallback to simple replacement
-            log.warning(f"[web] template format error: {relpath}: {e}")
-            for key, val in (mapping or {}).items():
-                txt = txt.replace("{" + str(key) + "}", str(val))
-            return txt
+        tpl = DynamicWebServer._load_template(relpath)
+        if tpl is None:
+            return ""
+        mapping = mapping or {}
+        if not mapping and tpl.static is not None:
+            return tpl.static
+
+        if tpl.mode == "parts" and all(name in mapping for name in tpl.parts[1::2]):
+            html = _join_parts(tpl.parts, mapping, lambda v: format(v, ""))
+        elif tpl.mode == "format":
+            try:
+                html = tpl.text.format(**mapping)
+            except Exception as e:
+                if not tpl.warned:
+                    log.warning(f"[web] template format error: {relpath}: {e}")
+                    tpl.warned = True
+                html = _replace_render(tpl, mapping)
+        else:
+            if tpl.mode == "parts" and not tpl.warned:
+                missing = [n for n in tpl.parts[1::2] if n not in mapping]
+                log.warning(f"[web] template missing variable {missing[0]!r}: {relpath}")
+                tpl.warned = True
+            html = _replace_render(tpl, mapping)
+
+        if not mapping:
+            tpl.static = html
+        return html
 
     # ---------- CORS ----------
     @web.middleware
@@ -1,13 +1,26 @@
 # bigtree/modules/bingo.py
-# Core Bingo logic & persistence using TinyDB (game_id-first, background support)
+# Core Bingo logic & persistence using Postgres (game_id-first, background support)
+#
+# Games, cards, claims, owner tokens and per-channel active games live in the
+# bingo_* tables (see Database._ensure_tables); the old per-game TinyDB files
+# and index.json are imported once by Database._migrate_bingo_store.
 
 import os
 import uuid
 import time
 import random
 import shutil
-from typing import Dict, Any, List, Optional, Tuple
-from tinydb import TinyDB, Query
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from psycopg2.extras import RealDictCursor
+
+try:
+    from bigtree.inc.database import get_database
+except Exception:
+    get_database = None
 
 # -------- logger (no circular import) --------
 try:
@@ -18,18 +31,58 @@ except Exception:  # fallback if early import
 
 # -------- lazy workdir resolution (avoid touching bigtree at import time) --------
 _BINGO_DIR: Optional[str] = None
-_DB_DIR: Optional[str] = None
 _ASSETS: Optional[str] = None
-_INDEX: Optional[str] = None
 
 # -------- stages --------
 STAGES = ("single", "double", "full")  # single line, double line, whole card
 STAGE_ORDER = {"single": 0, "double": 1, "full": 2}
 MAX_NUMBER = 40
+STAGE_LINES = {"single": 1, "double": 2}  # "full" needs every cell
+
+# -------- compact card layout --------
+# Cards are stored as 16 numbers in row-major order ("cells") plus an int
+# bitmask of marked cells ("mask", bit r*4+c); lines are masks over the same bits.
+GRID = 4
+_FULL_MASK = (1 << (GRID * GRID)) - 1
+_LINE_MASKS: Tuple[int, ...] = tuple(
+    [sum(1 << (r * GRID + c) for c in range(GRID)) for r in range(GRID)]
+    + [sum(1 << (r * GRID + c) for r in range(GRID)) for c in range(GRID)]
+    + [
+        sum(1 << (i * GRID + i) for i in range(GRID)),
+        sum(1 << (i * GRID + GRID - 1 - i) for i in range(GRID)),
+    ]
+)
+# bit position -> lines through that cell, so a daub only re-checks two or three lines
+_LINES_BY_BIT: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(m for m in _LINE_MASKS if m & (1 << b)) for b in range(GRID * GRID)
+)
+
+_GAME_COLUMNS = """
+    game_id, channel_id, title, header, header_text, price, currency, max_cards_per_player,
+    created_by, EXTRACT(EPOCH FROM created_at) AS created_at, EXTRACT(EPOCH FROM ended_at) AS ended_at,
+    pot, called, last_called, last_winners, started, stage, active, event_id, event_code,
+    background_path, theme_color, announce_calls, card_count
+"""
+_CARD_COLUMNS = """
+    card_id, game_id, owner_name, owner_user_id, cells, mask, claimed,
+    EXTRACT(EPOCH FROM purchased_at) AS purchased_at
+"""
 
 def _now() -> float:
     return time.time()
 
+def _db():
+    if not get_database:
+        raise RuntimeError("database unavailable")
+    return get_database()
+
+@contextmanager
+def _cursor():
+    """One transaction on a pooled connection (committed when the block exits cleanly)."""
+    with _db()._connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            yield cur
+
 def _get_workingdir() -> str:
     """Resolve BigTree working dir without importing bigtree at import time."""
     env_data = os.getenv("BIGTREE__BOT__DATA_DIR") or os.getenv("BIGTREE_DATA_DIR")
@@ -55,27 +108,15 @@ def _get_workingdir() -> str:
     return os.path.join(os.getcwd(), ".bigtree", "bingo")
 
 def _ensure_dirs():
-    """Initialize bingo directories the first time they're needed."""
-    global _BINGO_DIR, _DB_DIR, _ASSETS, _INDEX
+    """Initialize the bingo assets directory the first time it's needed."""
+    global _BINGO_DIR, _ASSETS
     if _BINGO_DIR is not None:
         return
     base = _get_workingdir()
-    db = os.path.join(base, "db")
     assets = os.path.join(base, "assets")
-    os.makedirs(db, exist_ok=True)
     os.makedirs(assets, exist_ok=True)
     _BINGO_DIR = base
-    _DB_DIR = db
     _ASSETS = assets
-    _INDEX = os.path.join(base, "index.json")
-
-def _db_path(game_id: str) -> str:
-    _ensure_dirs()
-    return os.path.join(_DB_DIR, f"{game_id}.json")
-
-def _open(game_id: str) -> TinyDB:
-    _ensure_dirs()
-    return TinyDB(_db_path(game_id))
 
 def _new_game_id() -> str:
     return uuid.uuid4().hex
@@ -104,40 +145,277 @@ def generate_card_numbers() -> List[List[int]]:
             grid[r][c] = picks[r]
     return grid
 
-# ------- indexing helpers (track active game per channel) -------
-def _read_index() -> Dict[str, Any]:
-    _ensure_dirs()
-    try:
-        import json
-        if os.path.exists(_INDEX):
-            with open(_INDEX, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    data.setdefault("active_by_channel", {})
-                    data.setdefault("owner_tokens", {})
-                    data.setdefault("owner_keys", {})
-                    return data
-    except Exception:
-        pass
+def _line_count(mask: int) -> int:
+    return sum(1 for m in _LINE_MASKS if mask & m == m)
+
+# -------- row conversion --------
+def _ts(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+def _claim_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    claim = {
+        "ts": _ts(row.get("ts")),
+        "card_id": row.get("card_id"),
+        "owner_name": row.get("owner_name"),
+        "stage": row.get("stage"),
+        "pending": bool(row.get("pending")),
+        "denied": bool(row.get("denied")),
+        "source": row.get("source") or "admin",
+    }
+    if row.get("approved_at") is not None:
+        claim["approved_at"] = _ts(row.get("approved_at"))
+    return claim
+
+def _game_from_row(row: Dict[str, Any], claims: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {
-        "active_by_channel": {},  # channel_id(str) -> game_id
-        "owner_tokens": {},       # token -> {game_id, owner_name}
-        "owner_keys": {},         # game_id -> {owner_name: token}
+        "game_id": row["game_id"],
+        "channel_id": int(row.get("channel_id") or 0),
+        "title": row.get("title") or "Bingo",
+        "header": row.get("header") or _normalize_header(None),
+        "header_text": row.get("header_text"),
+        "price": int(row.get("price") or 0),
+        "currency": row.get("currency") or "gil",
+        "max_cards_per_player": int(row.get("max_cards_per_player") or 0),
+        "created_by": int(row.get("created_by") or 0),
+        "created_at": _ts(row.get("created_at")),
+        "ended_at": _ts(row.get("ended_at")),
+        "pot": int(row.get("pot") or 0),
+        "called": [int(n) for n in (row.get("called") or [])],
+        "last_called": row.get("last_called"),
+        "last_winners": list(row.get("last_winners") or []),
+        "started": bool(row.get("started")),
+        "stage": row.get("stage") or "single",
+        "active": bool(row.get("active")),
+        "event_id": row.get("event_id"),
+        "event_code": row.get("event_code"),
+        "background_path": row.get("background_path"),
+        "theme_color": row.get("theme_color"),
+        "announce_calls": bool(row.get("announce_calls")),
+        "card_count": int(row.get("card_count") or 0),
+        "claims": [_claim_from_row(c) for c in claims],
     }
 
-def _write_index(idx: Dict[str, Any]):
-    _ensure_dirs()
-    import json
-    with open(_INDEX, "w", encoding="utf-8") as f:
-        json.dump(idx, f, indent=2)
+def _card_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Card as callers expect it: 4x4 ``numbers`` and ``marks`` grids."""
+    cells = [int(n) for n in (row.get("cells") or [])]
+    mask = int(row.get("mask") or 0)
+    return {
+        "game_id": row.get("game_id"),
+        "card_id": row.get("card_id"),
+        "owner_name": row.get("owner_name"),
+        "owner_user_id": row.get("owner_user_id"),
+        "numbers": [cells[r * GRID:(r + 1) * GRID] for r in range(GRID)],
+        "marks": [[bool(mask & (1 << (r * GRID + c))) for c in range(GRID)] for r in range(GRID)],
+        "claimed": bool(row.get("claimed")),
+        "purchased_at": _ts(row.get("purchased_at")),
+    }
+
+def _fetch_game(cur, game_id: str, lock: bool = False) -> Optional[Dict[str, Any]]:
+    """Load a game and its claims; ``lock`` holds the game row until the transaction ends."""
+    cur.execute(
+        f"SELECT {_GAME_COLUMNS} FROM bingo_games WHERE game_id = %s" + (" FOR UPDATE" if lock else ""),
+        (str(game_id),),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    cur.execute(
+        """
+        SELECT card_id, owner_name, stage, pending, denied, source,
+               EXTRACT(EPOCH FROM ts) AS ts, EXTRACT(EPOCH FROM approved_at) AS approved_at
+        FROM bingo_claims
+        WHERE game_id = %s
+        ORDER BY id ASC
+        """,
+        (str(game_id),),
+    )
+    return _game_from_row(row, cur.fetchall())
+
+def _fetch_card(cur, game_id: str, card_id: str, lock: bool = False) -> Optional[Dict[str, Any]]:
+    cur.execute(
+        f"SELECT {_CARD_COLUMNS} FROM bingo_cards WHERE game_id = %s AND card_id = %s" + (" FOR UPDATE" if lock else ""),
+        (str(game_id), str(card_id)),
+    )
+    return cur.fetchone()
+
+def _insert_claim(cur, game_id: str, claim: Dict[str, Any]) -> None:
+    cur.execute(
+        """
+        INSERT INTO bingo_claims (game_id, card_id, owner_name, stage, pending, denied, source, ts)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, to_timestamp(%s))
+        """,
+        (
+            game_id,
+            claim["card_id"],
+            claim.get("owner_name"),
+            claim.get("stage"),
+            bool(claim.get("pending")),
+            bool(claim.get("denied")),
+            claim.get("source") or "admin",
+            claim.get("ts") or _now(),
+        ),
+    )
+
+# -------- in-process card index --------
+class _CardIndex:
+    """Per-game number -> cards inverted index over the compact card layout.
+
+    ``hits`` holds, per card, the cells whose number has been called. It is
+    derived from ``cells`` and the game's called list, so it is rebuilt on
+    load rather than trusted from manual marks. ``calls`` and ``len()`` are
+    compared with the game row to notice writes from other processes.
+    """
+
+    __slots__ = ("card_ids", "owners", "hits", "lines", "by_number", "calls")
+
+    def __init__(self):
+        self.card_ids: List[str] = []
+        self.owners: List[str] = []
+        self.hits = array("H")
+        self.lines = array("B")
+        self.by_number: Dict[int, Tuple[array, array]] = {}  # number -> (card slots, cell bits)
+        self.calls = 0
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    def add(self, card: Dict[str, Any], called: set) -> None:
+        slot = len(self.card_ids)
+        self.card_ids.append(card["card_id"])
+        self.owners.append(card.get("owner_name") or "")
+        hits = 0
+        for b, n in enumerate(card["cells"]):
+            slots, bits = self.by_number.setdefault(int(n), (array("I"), array("H")))
+            slots.append(slot)
+            bits.append(1 << b)
+            if n in called:
+                hits |= 1 << b
+        self.hits.append(hits)
+        self.lines.append(_line_count(hits))
+
+    def qualifies(self, slot: int, stage: str) -> bool:
+        if stage == "full":
+            return self.hits[slot] == _FULL_MASK
+        return self.lines[slot] >= STAGE_LINES.get(stage, 1)
+
+    def qualifying(self, stage: str) -> List[int]:
+        if stage == "full":
+            return [i for i, h in enumerate(self.hits) if h == _FULL_MASK]
+        need = STAGE_LINES.get(stage, 1)
+        return [i for i, n in enumerate(self.lines) if n >= need]
+
+    def daub(self, number: int, stage: str) -> Tuple[Dict[str, int], List[int]]:
+        """Apply one call to every card holding ``number``.
+
+        Returns ``({card_id: cell bit}, [slots that just reached the stage])``.
+        """
+        self.calls += 1
+        entry = self.by_number.get(int(number))
+        if not entry:
+            return {}, []
+        hits, lines, card_ids = self.hits, self.lines, self.card_ids
+        touched: Dict[str, int] = {}
+        winners: List[int] = []
+        for slot, bit in zip(*entry):
+            before = hits[slot]
+            if before & bit:
+                continue
+            # stage check must see the card as it was before this call
+            was = self.qualifies(slot, stage)
+            after = before | bit
+            hits[slot] = after
+            lines[slot] += sum(1 for m in _LINES_BY_BIT[bit.bit_length() - 1] if after & m == m)
+            touched[card_ids[slot]] = bit
+            if not was and self.qualifies(slot, stage):
+                winners.append(slot)
+        return touched, winners
+
+_CARD_INDEXES: Dict[str, _CardIndex] = {}
+# Serialises calls, purchases and stage changes against the in-process card indexes;
+# the game row lock (SELECT ... FOR UPDATE) does the same across processes.
+_CARDS_LOCK = threading.RLock()
+
+def _card_index(cur, g: Dict[str, Any]) -> _CardIndex:
+    game_id = g["game_id"]
+    index = _CARD_INDEXES.get(game_id)
+    if index is not None and len(index) == g["card_count"] and index.calls == len(g["called"]):
+        return index
+    cur.execute(
+        "SELECT card_id, owner_name, cells FROM bingo_cards WHERE game_id = %s ORDER BY purchased_at, card_id",
+        (game_id,),
+    )
+    called = set(g["called"])
+    index = _CardIndex()
+    index.calls = len(called)
+    for row in cur.fetchall():
+        index.add(row, called)
+    _CARD_INDEXES[game_id] = index
+    return index
+
+def _auto_claims(cur, g: Dict[str, Any], index: _CardIndex, slots: List[int]) -> List[Dict[str, Any]]:
+    """Queue pending claims for cards that reached the current stage."""
+    stage = g.get("stage", "single")
+    seen = {
+        (c.get("card_id"), c.get("stage"))
+        for c in g.get("claims", [])
+        if not c.get("denied")
+    }
+    added: List[Dict[str, Any]] = []
+    for slot in slots:
+        card_id = index.card_ids[slot]
+        if (card_id, stage) in seen:
+            continue
+        claim = {
+            "ts": _now(),
+            "card_id": card_id,
+            "owner_name": index.owners[slot],
+            "stage": stage,
+            "pending": True,
+            "denied": False,
+            "source": "auto",
+        }
+        _insert_claim(cur, g["game_id"], claim)
+        g.setdefault("claims", []).append(claim)
+        seen.add((card_id, stage))
+        added.append(claim)
+    if added:
+        logger.info(
+            f"[bingo] {len(added)} card(s) reached stage {stage} in game {g['game_id']}: "
+            + ", ".join(f"{c['owner_name']}/{c['card_id']}" for c in added)
+        )
+    return added
+
+# -------- change listeners (live push) --------
+# Called after each committed mutation with (game_id, delta); delta None means the game is gone.
+_EVENT_LISTENERS: List[Callable[[str, Optional[Dict[str, Any]]], None]] = []
 
+def add_event_listener(fn: Callable[[str, Optional[Dict[str, Any]]], None]) -> None:
+    if fn not in _EVENT_LISTENERS:
+        _EVENT_LISTENERS.append(fn)
+
+def _emit_event(game_id: str, event: Optional[Dict[str, Any]]) -> None:
+    if event is not None:
+        event = {"game_id": str(game_id), "ts": _now(), **event}
+    for fn in list(_EVENT_LISTENERS):
+        try:
+            fn(str(game_id), event)
+        except Exception as exc:
+            logger.debug("[bingo] event listener failed: %s", exc)
+
+# ------- indexing helpers (track active game per channel) -------
 def set_active_for_channel(channel_id: int, game_id: str):
-    idx = _read_index()
-    idx["active_by_channel"][str(channel_id)] = game_id
-    _write_index(idx)
+    _db()._execute(
+        """
+        INSERT INTO bingo_channels (channel_id, game_id)
+        VALUES (%s, %s)
+        ON CONFLICT (channel_id) DO UPDATE SET game_id = EXCLUDED.game_id
+        """,
+        (int(channel_id), str(game_id)),
+    )
 
 def get_active_for_channel(channel_id: int) -> Optional[str]:
-    return _read_index()["active_by_channel"].get(str(channel_id))
+    row = _db()._fetchone("SELECT game_id FROM bingo_channels WHERE channel_id = %s", (int(channel_id),))
+    return row.get("game_id") if row else None
 
 # -------- owner tokens (public links) --------
 def get_owner_token(game_id: str, owner_name: str) -> str:
@@ -145,25 +423,40 @@ def get_owner_token(game_id: str, owner_name: str) -> str:
     owner_name = (owner_name or "").strip()
     if not owner_name:
         raise ValueError("Owner name required.")
-    idx = _read_index()
-    game_map = idx.setdefault("owner_keys", {}).setdefault(str(game_id), {})
-    token = game_map.get(owner_name)
-    if token and token in idx.get("owner_tokens", {}):
-        return token
-    token = secrets.token_urlsafe(10)
-    game_map[owner_name] = token
-    idx.setdefault("owner_tokens", {})[token] = {
-        "game_id": str(game_id),
-        "owner_name": owner_name,
-    }
-    _write_index(idx)
-    return token
+    db = _db()
+    row = db._fetchone(
+        "SELECT token FROM bingo_owner_tokens WHERE game_id = %s AND owner_name = %s",
+        (str(game_id), owner_name),
+    )
+    if row:
+        return row["token"]
+    # Racing admins both insert; the loser re-reads the winner's token.
+    db._execute(
+        """
+        INSERT INTO bingo_owner_tokens (token, game_id, owner_name)
+        SELECT %s, game_id, %s FROM bingo_games WHERE game_id = %s
+        ON CONFLICT (game_id, owner_name) DO NOTHING
+        """,
+        (secrets.token_urlsafe(10), owner_name, str(game_id)),
+    )
+    row = db._fetchone(
+        "SELECT token FROM bingo_owner_tokens WHERE game_id = %s AND owner_name = %s",
+        (str(game_id), owner_name),
+    )
+    if not row:
+        raise ValueError("Game not found.")
+    return row["token"]
 
 def resolve_owner_token(token: str) -> Optional[Dict[str, str]]:
     if not token:
         return None
-    idx = _read_index()
-    return idx.get("owner_tokens", {}).get(str(token))
+    row = _db()._fetchone(
+        "SELECT game_id, owner_name FROM bingo_owner_tokens WHERE token = %s",
+        (str(token),),
+    )
+    if not row:
+        return None
+    return {"game_id": row["game_id"], "owner_name": row["owner_name"]}
 
 # ----------------- Game lifecycle -----------------
 def create_game(
@@ -180,7 +473,6 @@ def create_game(
     event_id: Optional[int] = None,
     event_code: Optional[str] = None,
 ) -> Dict[str, Any]:
-    _ensure_dirs()
     game_id = _new_game_id()
     try:
         seed_value = int(seed_pot or 0)
@@ -188,214 +480,217 @@ def create_game(
         seed_value = 0
     if seed_value < 0:
         seed_value = 0
-    game = {
-        "_type": "game",
-        "game_id": game_id,
-        "channel_id": int(channel_id),
-        "title": (title or "").strip() or "Bingo",
-        "header": _normalize_header(header_text),
-        "header_text": (header_text or "").strip() or None,
-        "price": int(price),
-        "currency": (currency or "").strip() or "gil",
-        "max_cards_per_player": int(max_cards_per_player),
-        "created_by": int(created_by),
-        "created_at": _now(),
-        "pot": seed_value,
-        "called": [],
-        "started": False,
-        "stage": "single",  # NEW
-        "active": True,
-        "event_id": int(event_id) if event_id else None,
-        "event_code": (event_code or "").strip() or None,
-        "background_path": None,  # file path under assets
-        "theme_color": (theme_color or "").strip() or None,
-        "announce_calls": bool(announce_calls),
-        "claims": [],
-    }
-    db = _open(game_id)
-    db.insert(game)
-    set_active_for_channel(channel_id, game_id)
+    with _cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO bingo_games (
+                game_id, channel_id, title, header, header_text, price, currency,
+                max_cards_per_player, created_by, created_at, pot, stage, active,
+                event_id, event_code, theme_color, announce_calls
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, to_timestamp(%s), %s, 'single', TRUE, %s, %s, %s, %s)
+            """,
+            (
+                game_id,
+                int(channel_id),
+                (title or "").strip() or "Bingo",
+                _normalize_header(header_text),
+                (header_text or "").strip() or None,
+                int(price),
+                (currency or "").strip() or "gil",
+                int(max_cards_per_player),
+                int(created_by),
+                _now(),
+                seed_value,
+                int(event_id) if event_id else None,
+                (event_code or "").strip() or None,
+                (theme_color or "").strip() or None,
+                bool(announce_calls),
+            ),
+        )
+        cur.execute(
+            """
+            INSERT INTO bingo_channels (channel_id, game_id)
+            VALUES (%s, %s)
+            ON CONFLICT (channel_id) DO UPDATE SET game_id = EXCLUDED.game_id
+            """,
+            (int(channel_id), game_id),
+        )
+        game = _fetch_game(cur, game_id)
     logger.info(
         f"[bingo] Created game {game_id} (channel={channel_id}, price={price} {game['currency']}, header='{game['header']}', stage={game['stage']})"
     )
     return game
 
 def get_game(game_id: str) -> Optional[Dict[str, Any]]:
-    _ensure_dirs()
-    if not os.path.exists(_db_path(game_id)):
+    if not game_id:
         return None
-    db = _open(game_id)
-    rows = db.search(Query()._type == "game")
-    if not rows:
-        return None
-    g = rows[-1]
-    changed = False
-    if "pot" not in g:
-        g["pot"] = 0
-        changed = True
-    if "header_text" not in g:
-        g["header_text"] = (g.get("header") or "").strip() or None
-        changed = True
-    if "header" not in g:
-        g["header"] = _normalize_header(g.get("header_text"))
-        changed = True
-    if changed:
-        db.update(g, doc_ids=[g.doc_id])
-    return g
+    with _cursor() as cur:
+        return _fetch_game(cur, game_id)
 
 def end_game(game_id: str) -> bool:
-    g = get_game(game_id)
-    if not g:
+    updated = _db()._execute(
+        "UPDATE bingo_games SET active = FALSE, ended_at = COALESCE(ended_at, CURRENT_TIMESTAMP) WHERE game_id = %s",
+        (str(game_id),),
+    )
+    if not updated:
         return False
-    db = _open(game_id)
-    g["active"] = False
-    db.update(g, doc_ids=[g.doc_id])
     logger.info(f"[bingo] Ended game {game_id}")
+    _emit_event(game_id, {"type": "ENDED"})
     return True
 
 def set_stage(game_id: str, stage: str) -> Tuple[bool, str]:
     stage = (stage or "").lower().strip()
     if stage not in STAGES:
         return False, f"Stage must be one of: {', '.join(STAGES)}"
-    g = get_game(game_id)
-    if not g:
+    updated = _db()._execute("UPDATE bingo_games SET stage = %s WHERE game_id = %s", (stage, str(game_id)))
+    if not updated:
         return False, "Game not found."
-    db = _open(game_id)
-    g["stage"] = stage
-    db.update(g, doc_ids=[g.doc_id])
     logger.info(f"[bingo] Stage set to {stage} for game {game_id}")
+    _emit_event(game_id, {"type": "STAGE", "stage": stage, "claims": []})
     return True, "OK"
 
 def claim_bingo(game_id: str, card_id: str) -> Tuple[bool, str]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-    if not g.get("active"):
-        return False, "Game is not active."
-
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.card_id == card_id))
-    if not rows:
-        return False, "Card not found."
-    card = rows[-1]
-
-    if card.get("claimed"):
-        return True, "Already claimed."
-
-    # mark claimed
-    card["claimed"] = True
-    db.update(card, doc_ids=[card.doc_id])
+    with _cursor() as cur:
+        g = _fetch_game(cur, game_id, lock=True)
+        if not g:
+            return False, "Game not found."
+        if not g.get("active"):
+            return False, "Game is not active."
+        card = _fetch_card(cur, game_id, card_id, lock=True)
+        if not card:
+            return False, "Card not found."
+        if card.get("claimed"):
+            return True, "Already claimed."
 
-    # record claim entry on the game
-    claim = {
-        "ts": _now(),
-        "card_id": card_id,
-        "owner_name": card.get("owner_name"),
-        "stage": g.get("stage", "single"),
-    }
-    g.setdefault("claims", []).append(claim)
-    db.update(g, doc_ids=[g.doc_id])
+        cur.execute("UPDATE bingo_cards SET claimed = TRUE WHERE card_id = %s", (card_id,))
+        claim = {
+            "ts": _now(),
+            "card_id": card_id,
+            "owner_name": card.get("owner_name"),
+            "stage": g.get("stage", "single"),
+            "source": "admin",
+        }
+        _insert_claim(cur, g["game_id"], claim)
 
     logger.info(f"[bingo] Claim by {claim['owner_name']} on card {card_id} (stage={claim['stage']}) in game {game_id}")
+    _emit_event(game_id, {"type": "CLAIM", "claim": {**claim, "pending": False, "denied": False}})
     return True, "OK"
 
 def advance_stage(game_id: str) -> Tuple[bool, str, Optional[str], bool]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found.", None, False
-    current = str(g.get("stage") or "single")
-    idx = STAGE_ORDER.get(current, 0)
-    if idx < len(STAGES) - 1:
-        next_stage = STAGES[idx + 1]
-        ok, msg = set_stage(game_id, next_stage)
-        return ok, msg, next_stage if ok else None, False
-    # already at final stage; end the game
-    g["active"] = False
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
+    claims: List[Dict[str, Any]] = []
+    with _CARDS_LOCK, _cursor() as cur:
+        g = _fetch_game(cur, game_id, lock=True)
+        if not g:
+            return False, "Game not found.", None, False
+        current = str(g.get("stage") or "single")
+        idx = STAGE_ORDER.get(current, 0)
+        next_stage = STAGES[idx + 1] if idx < len(STAGES) - 1 else None
+        if next_stage:
+            cur.execute("UPDATE bingo_games SET stage = %s WHERE game_id = %s", (next_stage, g["game_id"]))
+            g["stage"] = next_stage
+            if g.get("active"):
+                # Cards may already satisfy the new stage from earlier calls.
+                index = _card_index(cur, g)
+                claims = _auto_claims(cur, g, index, index.qualifying(next_stage))
+        else:
+            # already at final stage; end the game
+            cur.execute(
+                "UPDATE bingo_games SET active = FALSE, ended_at = COALESCE(ended_at, CURRENT_TIMESTAMP) WHERE game_id = %s",
+                (g["game_id"],),
+            )
+    if next_stage:
+        logger.info(f"[bingo] Stage set to {next_stage} for game {game_id}")
+        _emit_event(game_id, {"type": "STAGE", "stage": next_stage, "claims": claims})
+        return True, "OK", next_stage, False
     logger.info(f"[bingo] Game {game_id} ended after final stage.")
+    _emit_event(game_id, {"type": "ENDED"})
     return True, "ended", current, True
 
 
 def public_claim(game_id: str, card_id: str, owner_name: Optional[str] = None) -> Tuple[bool, str]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-    if not g.get("active"):
-        return False, "Game is not active."
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.card_id == card_id))
-    if not rows:
-        return False, "Card not found."
-    card = rows[-1]
-    name = (owner_name or card.get("owner_name") or "").strip()
-    if not name:
-        return False, "Owner name required."
-    # Avoid duplicate public claims per card
-    for c in g.get("claims", []):
-        if c.get("card_id") == card_id and c.get("source") == "public":
-            return True, "Already claimed."
-    claim = {
-        "ts": _now(),
-        "card_id": card_id,
-        "owner_name": name,
-        "stage": g.get("stage", "single"),
-        "pending": True,
-        "denied": False,
-        "source": "public",
-    }
-    g.setdefault("claims", []).append(claim)
-    db.update(g, doc_ids=[g.doc_id])
+    with _cursor() as cur:
+        g = _fetch_game(cur, game_id, lock=True)
+        if not g:
+            return False, "Game not found."
+        if not g.get("active"):
+            return False, "Game is not active."
+        card = _fetch_card(cur, game_id, card_id)
+        if not card:
+            return False, "Card not found."
+        name = (owner_name or card.get("owner_name") or "").strip()
+        if not name:
+            return False, "Owner name required."
+        # Avoid duplicate public claims per card
+        for c in g.get("claims", []):
+            if c.get("card_id") == card_id and c.get("source") == "public":
+                return True, "Already claimed."
+        claim = {
+            "ts": _now(),
+            "card_id": card_id,
+            "owner_name": name,
+            "stage": g.get("stage", "single"),
+            "pending": True,
+            "denied": False,
+            "source": "public",
+        }
+        _insert_claim(cur, g["game_id"], claim)
     logger.info(f"[bingo] Public claim by {name} on card {card_id} (stage={claim['stage']}) in game {game_id}")
+    _emit_event(game_id, {"type": "CLAIM", "claim": claim})
     return True, "OK"
 
 def approve_public_claim(game_id: str, card_id: str) -> Tuple[bool, str]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.card_id == card_id))
-    if not rows:
-        return False, "Card not found."
-    card = rows[-1]
-    if card.get("claimed"):
-        return True, "Already claimed."
-    # mark claimed
-    card["claimed"] = True
-    db.update(card, doc_ids=[card.doc_id])
-    # update claim entry
-    updated = False
-    for c in g.get("claims", []):
-        if c.get("card_id") == card_id and c.get("pending"):
-            c["pending"] = False
-            c["denied"] = False
-            c["approved_at"] = _now()
-            updated = True
-            break
-    if updated:
-        db.update(g, doc_ids=[g.doc_id])
+    with _cursor() as cur:
+        cur.execute("SELECT 1 FROM bingo_games WHERE game_id = %s FOR UPDATE", (str(game_id),))
+        if not cur.fetchone():
+            return False, "Game not found."
+        card = _fetch_card(cur, game_id, card_id, lock=True)
+        if not card:
+            return False, "Card not found."
+        if card.get("claimed"):
+            return True, "Already claimed."
+        # mark claimed
+        cur.execute("UPDATE bingo_cards SET claimed = TRUE WHERE card_id = %s", (card_id,))
+        # update the oldest pending claim entry
+        cur.execute(
+            """
+            UPDATE bingo_claims
+            SET pending = FALSE, denied = FALSE, approved_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM bingo_claims
+                WHERE game_id = %s AND card_id = %s AND pending
+                ORDER BY id ASC
+                LIMIT 1
+            )
+            """,
+            (str(game_id), card_id),
+        )
     logger.info(f"[bingo] Approved public claim on card {card_id} in game {game_id}")
+    _emit_event(game_id, {"type": "CLAIM_APPROVED", "card_id": card_id})
     return True, "OK"
 
 def deny_public_claim(game_id: str, card_id: str) -> Tuple[bool, str]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-    updated = False
-    for c in g.get("claims", []):
-        if c.get("card_id") == card_id and c.get("pending"):
-            c["pending"] = False
-            c["denied"] = True
-            updated = True
-            break
-    if not updated:
-        return False, "Claim not found."
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
+    with _cursor() as cur:
+        cur.execute("SELECT 1 FROM bingo_games WHERE game_id = %s FOR UPDATE", (str(game_id),))
+        if not cur.fetchone():
+            return False, "Game not found."
+        cur.execute(
+            """
+            UPDATE bingo_claims
+            SET pending = FALSE, denied = TRUE
+            WHERE id = (
+                SELECT id FROM bingo_claims
+                WHERE game_id = %s AND card_id = %s AND pending
+                ORDER BY id ASC
+                LIMIT 1
+            )
+            """,
+            (str(game_id), card_id),
+        )
+        if not cur.rowcount:
+            return False, "Claim not found."
     logger.info(f"[bingo] Denied public claim on card {card_id} in game {game_id}")
+    _emit_event(game_id, {"type": "CLAIM_DENIED", "card_id": card_id})
     return True, "OK"
 
 def _payouts(pot: int) -> Dict[str, int]:
@@ -407,9 +702,12 @@ def _payouts(pot: int) -> Dict[str, int]:
     p3 = base * 5
     return {"single": p1, "double": p2, "full": p3, "remainder": remainder}
 
-def player_card_count(db: TinyDB, game_id: str, owner_name: str) -> int:
-    Card = Query()
-    return len(db.search((Card._type == "card") & (Card.game_id == game_id) & (Card.owner_name == owner_name)))
+def player_card_count(game_id: str, owner_name: str) -> int:
+    row = _db()._fetchone(
+        "SELECT COUNT(*) AS value FROM bingo_cards WHERE game_id = %s AND owner_name = %s",
+        (str(game_id), owner_name),
+    )
+    return int(row.get("value") or 0) if row else 0
 
 def buy_card(game_id: str, owner_name: str, owner_user_id: Optional[int]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """Backward-compatible single-card purchase."""
@@ -430,142 +728,199 @@ def buy_cards(
         count = max(1, min(int(count or 1), 10))
     except Exception:
         count = 1
-
-    g = get_game(game_id)
-    if not g:
-        return [], "Game not found."
-    if not g.get("active"):
-        return [], "Game is not active."
-    if g.get("started") or g.get("called"):
-        return [], "Game already started."
     owner_name = (owner_name or "").strip()
-    if not owner_name:
-        return [], "Owner name required."
-
-    db = _open(game_id)
-    have = player_card_count(db, game_id, owner_name)
-    allow = g["max_cards_per_player"] - have
-    if allow <= 0:
-        return [], f"Player already has {have} cards (max {g['max_cards_per_player']})."
-
-    to_buy = min(count, allow)
-    cards: List[Dict[str, Any]] = []
-    for _ in range(to_buy):
-        numbers = generate_card_numbers()
-        marks = [[False] * 4 for _ in range(4)]
-        card = {
-            "_type": "card",
-            "game_id": game_id,
-            "card_id": _new_card_id(),
-            "owner_name": owner_name,
-            "owner_user_id": int(owner_user_id) if owner_user_id else None,
-            "numbers": numbers,
-            "marks": marks,
-            "purchased_at": _now(),
-        }
-        db.insert(card)
-        cards.append(card)
 
-    if not gift:
-        g["pot"] = int(g.get("pot") or 0) + int(g["price"]) * len(cards)
-    db.update(g, doc_ids=[g.doc_id])
+    with _CARDS_LOCK, _cursor() as cur:
+        g = _fetch_game(cur, game_id, lock=True)
+        if not g:
+            return [], "Game not found."
+        if not g.get("active"):
+            return [], "Game is not active."
+        if g.get("started") or g.get("called"):
+            return [], "Game already started."
+        if not owner_name:
+            return [], "Owner name required."
+
+        cur.execute(
+            "SELECT COUNT(*) AS value FROM bingo_cards WHERE game_id = %s AND owner_name = %s",
+            (g["game_id"], owner_name),
+        )
+        have = int(cur.fetchone()["value"] or 0)
+        allow = g["max_cards_per_player"] - have
+        if allow <= 0:
+            return [], f"Player already has {have} cards (max {g['max_cards_per_player']})."
+
+        to_buy = min(count, allow)
+        now = _now()
+        cards: List[Dict[str, Any]] = []
+        for _ in range(to_buy):
+            numbers = generate_card_numbers()
+            cards.append({
+                "card_id": _new_card_id(),
+                "game_id": g["game_id"],
+                "owner_name": owner_name,
+                "owner_user_id": int(owner_user_id) if owner_user_id else None,
+                "cells": [n for row in numbers for n in row],
+                "mask": 0,
+                "purchased_at": now,
+            })
+        for card in cards:
+            cur.execute(
+                """
+                INSERT INTO bingo_cards (card_id, game_id, owner_name, owner_user_id, cells, mask, purchased_at)
+                VALUES (%s, %s, %s, %s, %s, 0, to_timestamp(%s))
+                """,
+                (card["card_id"], card["game_id"], owner_name, card["owner_user_id"], card["cells"], now),
+            )
+        added_pot = 0 if gift else int(g["price"]) * len(cards)
+        cur.execute(
+            "UPDATE bingo_games SET pot = pot + %s, card_count = card_count + %s WHERE game_id = %s RETURNING pot",
+            (added_pot, len(cards), g["game_id"]),
+        )
+        g["pot"] = int(cur.fetchone()["pot"] or 0)
+
+        index = _CARD_INDEXES.get(g["game_id"])
+        if index is not None and len(index) == g["card_count"]:
+            called = set(g["called"])
+            for card in cards:
+                index.add(card, called)
+
     if gift:
         delta = "gift"
     else:
-        delta = f"+{g['price'] * len(cards)} {g['currency']}, pot={g['pot']}"
+        delta = f"+{added_pot} {g['currency']}, pot={g['pot']}"
     logger.info(
         f"[bingo] {owner_name} bought {len(cards)} card(s) in game {game_id} ({delta})"
     )
-    return cards, None
+    _emit_event(game_id, {
+        "type": "POT",
+        "pot": g["pot"],
+        "payouts": _payouts(int(g["pot"] or 0)),
+        "cards": g["card_count"] + len(cards),
+    })
+    return [_card_from_row(c) for c in cards], None
 
 def seed_pot(game_id: str, amount: int) -> Tuple[bool, str]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-    if not g.get("active"):
-        return False, "Game is not active."
     try:
         amt = int(amount or 0)
     except Exception:
         amt = 0
-    if amt <= 0:
-        return False, "Seed amount must be positive."
-    g["pot"] = int(g.get("pot") or 0) + amt
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
-    logger.info(f"[bingo] Seeded {amt} {g.get('currency')} into game {game_id} (pot={g['pot']})")
+    with _cursor() as cur:
+        cur.execute("SELECT active, currency FROM bingo_games WHERE game_id = %s FOR UPDATE", (str(game_id),))
+        row = cur.fetchone()
+        if not row:
+            return False, "Game not found."
+        if not row.get("active"):
+            return False, "Game is not active."
+        if amt <= 0:
+            return False, "Seed amount must be positive."
+        cur.execute("UPDATE bingo_games SET pot = pot + %s WHERE game_id = %s RETURNING pot", (amt, str(game_id)))
+        pot = int(cur.fetchone()["pot"] or 0)
+    logger.info(f"[bingo] Seeded {amt} {row.get('currency')} into game {game_id} (pot={pot})")
+    _emit_event(game_id, {"type": "POT", "pot": pot, "payouts": _payouts(pot)})
     return True, "OK"
 
 def call_number(game_id: str, number: int) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     n = int(number)
     if n < 1 or n > MAX_NUMBER:
         return None, f"Number must be between 1 and {MAX_NUMBER}."
-    g = get_game(game_id)
-    if not g:
-        return None, "Game not found."
-
-    called = set(g.get("called", []))
-    if n in called:
-        return g, "Number already called."
-
-    called.add(n)
-    g["called"] = sorted(list(called))
-    g["last_called"] = n
-    g["started"] = True
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
-    logger.info(f"[bingo] Called number {n} in game {game_id}")
+    with _CARDS_LOCK:
+        try:
+            with _cursor() as cur:
+                g = _fetch_game(cur, game_id, lock=True)
+                if not g:
+                    return None, "Game not found."
+
+                called = set(g.get("called", []))
+                if n in called:
+                    return g, "Number already called."
+
+                # Built from the called list *before* this number, then advanced by it.
+                index = _card_index(cur, g)
+                touched, winners = index.daub(n, g.get("stage", "single"))
+                if touched:
+                    cur.execute(
+                        """
+                        UPDATE bingo_cards AS c
+                        SET mask = c.mask | v.bit
+                        FROM unnest(%s::text[], %s::int[]) AS v(card_id, bit)
+                        WHERE c.card_id = v.card_id
+                        """,
+                        (list(touched), list(touched.values())),
+                    )
+
+                called.add(n)
+                g["called"] = sorted(list(called))
+                g["last_called"] = n
+                g["started"] = True
+                claims = _auto_claims(cur, g, index, winners) if g.get("active") else []
+                g["last_winners"] = [c["card_id"] for c in claims]
+                cur.execute(
+                    """
+                    UPDATE bingo_games
+                    SET called = %s, last_called = %s, last_winners = %s, started = TRUE
+                    WHERE game_id = %s
+                    """,
+                    (g["called"], n, g["last_winners"], g["game_id"]),
+                )
+        except Exception:
+            # The index was advanced before the write failed.
+            _CARD_INDEXES.pop(str(game_id), None)
+            raise
+    logger.info(f"[bingo] Called number {n} in game {game_id} ({len(touched)} card(s) marked)")
+    _emit_event(game_id, {"type": "CALL", "number": n, "called": g["called"], "claims": claims})
     return g, None
 
 def start_game(game_id: str) -> Tuple[bool, str]:
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-    if not g.get("active"):
-        return False, "Game is not active."
-    if g.get("started"):
-        return True, "Already started."
-    g["started"] = True
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
+    with _cursor() as cur:
+        cur.execute("SELECT active, started FROM bingo_games WHERE game_id = %s FOR UPDATE", (str(game_id),))
+        row = cur.fetchone()
+        if not row:
+            return False, "Game not found."
+        if not row.get("active"):
+            return False, "Game is not active."
+        if row.get("started"):
+            return True, "Already started."
+        cur.execute("UPDATE bingo_games SET started = TRUE WHERE game_id = %s", (str(game_id),))
     logger.info(f"[bingo] Game {game_id} started.")
+    _emit_event(game_id, {"type": "STARTED"})
     return True, "OK"
 
 def call_random_number(game_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-    g = get_game(game_id)
-    if not g:
-        return None, "Game not found."
-    called = set(g.get("called", []))
-    remaining = [n for n in range(1, MAX_NUMBER + 1) if n not in called]
-    if not remaining:
-        return g, "All numbers already called."
-    n = random.choice(remaining)
-    return call_number(game_id, n)
+    with _CARDS_LOCK:
+        g = get_game(game_id)
+        if not g:
+            return None, "Game not found."
+        called = set(g.get("called", []))
+        remaining = [n for n in range(1, MAX_NUMBER + 1) if n not in called]
+        if not remaining:
+            return g, "All numbers already called."
+        n = random.choice(remaining)
+        return call_number(game_id, n)
 
 def mark_card(game_id: str, card_id: str, row: int, col: int) -> Tuple[bool, str]:
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.card_id == card_id))
-    if not rows:
-        return False, "Card not found."
-    card = rows[-1]
-    if not (0 <= row < 4 and 0 <= col < 4):
+    if not (0 <= row < GRID and 0 <= col < GRID):
         return False, "Row/col out of range."
-    card["marks"][row][col] = True
-    db.update(card, doc_ids=[card.doc_id])
+    updated = _db()._execute(
+        "UPDATE bingo_cards SET mask = mask | %s WHERE game_id = %s AND card_id = %s",
+        (1 << (row * GRID + col), str(game_id), str(card_id)),
+    )
+    if not updated:
+        return False, "Card not found."
+    _emit_event(game_id, {"type": "MARK", "card_id": str(card_id), "row": row, "col": col})
     return True, "Marked."
 
 def get_public_state(game_id: str) -> Dict[str, Any]:
-    g = get_game(game_id)
-    if not g:
-        return {"active": False}
-    db = _open(game_id)
-    Card = Query()
-    cards = db.search((Card._type == "card") & (Card.game_id == game_id))
-    if "pot" in g and g.get("pot") is not None:
-        pot = int(g.get("pot") or 0)
-    else:
-        pot = int(g.get("price", 0)) * len(cards)
+    with _cursor() as cur:
+        g = _fetch_game(cur, game_id)
+        if not g:
+            return {"active": False}
+        cur.execute(
+            "SELECT COUNT(DISTINCT owner_name) AS players FROM bingo_cards WHERE game_id = %s",
+            (g["game_id"],),
+        )
+        players = int(cur.fetchone()["players"] or 0)
+    pot = int(g.get("pot") or 0)
     pays = _payouts(pot)
     # minimal public claim info
     claims = []
@@ -602,35 +957,38 @@ def get_public_state(game_id: str) -> Dict[str, Any]:
             "claims": claims,                      # NEW
         },
         "stats": {
-            "cards": len(cards),
-            "players": len({c["owner_name"] for c in cards}),
+            "cards": g["card_count"],
+            "players": players,
         },
     }
 
 
 def get_card(game_id: str, card_id: str) -> Optional[Dict[str, Any]]:
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.card_id == card_id))
-    return rows[-1] if rows else None
+    with _cursor() as cur:
+        row = _fetch_card(cur, game_id, card_id)
+    return _card_from_row(row) if row else None
 
 def get_owner_cards(
     game_id: str,
     owner_name: Optional[str] = None,
     owner_user_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
-    db = _open(game_id)
-    Card = Query()
-    q = (Card._type == "card") & (Card.game_id == game_id)
     if owner_name:
-        q = q & (Card.owner_name == owner_name)
+        where, value = "owner_name = %s", owner_name
     elif owner_user_id is not None:
-        q = q & (Card.owner_user_id == int(owner_user_id))
+        where, value = "owner_user_id = %s", int(owner_user_id)
     else:
         return []
-    rows = db.search(q)
-    rows.sort(key=lambda c: c.get("purchased_at", 0))  # oldest first
-    return rows
+    rows = _db()._fetchall(
+        f"""
+        SELECT {_CARD_COLUMNS}
+        FROM bingo_cards
+        WHERE game_id = %s AND {where}
+        ORDER BY purchased_at ASC, card_id ASC
+        """,
+        (str(game_id), value),
+    )
+    return [_card_from_row(r) for r in rows]  # oldest first
 
 
 # -------- XIVAuth linking helpers --------
@@ -647,19 +1005,16 @@ def link_owner_to_user(game_id: str, owner_name: str, owner_user_id: int) -> Tup
     if owner_user_id <= 0:
         return False, "Valid owner_user_id required."
 
-    g = get_game(game_id)
-    if not g:
-        return False, "Game not found."
-
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.game_id == game_id) & (Card.owner_name == owner_name))
-    if not rows:
-        return False, "No cards found for owner."
-
-    for card in rows:
-        card["owner_user_id"] = int(owner_user_id)
-        db.update(card, doc_ids=[card.doc_id])
+    with _cursor() as cur:
+        cur.execute("SELECT 1 FROM bingo_games WHERE game_id = %s", (str(game_id),))
+        if not cur.fetchone():
+            return False, "Game not found."
+        cur.execute(
+            "UPDATE bingo_cards SET owner_user_id = %s WHERE game_id = %s AND owner_name = %s",
+            (owner_user_id, str(game_id), owner_name),
+        )
+        if not cur.rowcount:
+            return False, "No cards found for owner."
 
     return True, "OK"
 
@@ -673,25 +1028,20 @@ def get_owner_name_for_user(game_id: str, owner_user_id: int) -> Optional[str]:
     if owner_user_id <= 0:
         return None
 
-    g = get_game(game_id)
-    if not g:
-        return None
-
-    db = _open(game_id)
-    Card = Query()
-    rows = db.search((Card._type == "card") & (Card.game_id == game_id) & (Card.owner_user_id == owner_user_id))
-    if not rows:
-        return None
-
-    counts: Dict[str, int] = {}
-    for card in rows:
-        nm = (card.get("owner_name") or "").strip()
-        if not nm:
-            continue
-        counts[nm] = counts.get(nm, 0) + 1
-    if not counts:
+    row = _db()._fetchone(
+        """
+        SELECT owner_name, COUNT(*) AS cards
+        FROM bingo_cards
+        WHERE game_id = %s AND owner_user_id = %s AND btrim(owner_name) <> ''
+        GROUP BY owner_name
+        ORDER BY cards DESC, MIN(purchased_at) ASC
+        LIMIT 1
+        """,
+        (str(game_id), owner_user_id),
+    )
+    if not row:
         return None
-    return max(counts.items(), key=lambda kv: kv[1])[0]
+    return (row.get("owner_name") or "").strip() or None
 
 
 def get_owner_token_for_user(game_id: str, owner_user_id: int, fallback_owner_name: Optional[str] = None) -> str:
@@ -720,9 +1070,8 @@ def save_background(game_id: str, src_path: str) -> Tuple[bool, str]:
     except Exception as e:
         logger.error(f"[bingo] BG upload failed: {e}", exc_info=True)
         return False, "Failed to store background."
-    g["background_path"] = dest
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
+    _db()._execute("UPDATE bingo_games SET background_path = %s WHERE game_id = %s", (dest, str(game_id)))
+    _emit_event(game_id, {"type": "GAME"})
     return True, dest
 
 def delete_background(game_id: str) -> Tuple[bool, str]:
@@ -737,82 +1086,56 @@ def delete_background(game_id: str) -> Tuple[bool, str]:
             os.remove(path)
     except Exception:
         return False, "Failed to delete background."
-    g["background_path"] = None
-    db = _open(game_id)
-    db.update(g, doc_ids=[g.doc_id])
+    _db()._execute("UPDATE bingo_games SET background_path = NULL WHERE game_id = %s", (str(game_id),))
+    _emit_event(game_id, {"type": "GAME"})
     return True, "OK"
 
 # -------- admin helpers --------
 def list_games() -> List[Dict[str, Any]]:
-    _ensure_dirs()
-    games: List[Dict[str, Any]] = []
-    for name in os.listdir(_DB_DIR):
-        if not name.endswith(".json"):
-            continue
-        game_id = name[:-5]
-        g = get_game(game_id)
-        if not g:
-            continue
-        db = _open(game_id)
-        Card = Query()
-        cards = db.search((Card._type == "card") & (Card.game_id == game_id))
-        if "pot" in g and g.get("pot") is not None:
-            pot = int(g.get("pot") or 0)
-        else:
-            pot = int(g.get("price", 0)) * len(cards)
-        games.append({
-            "game_id": g.get("game_id"),
-            "title": g.get("title"),
-            "channel_id": g.get("channel_id"),
-            "created_at": g.get("created_at"),
-            "active": g.get("active", False),
-            "stage": g.get("stage", "single"),
-            "pot": pot,
-        })
-    games.sort(key=lambda x: x.get("created_at") or 0, reverse=True)
-    return games
+    rows = _db()._fetchall(
+        """
+        SELECT game_id, title, channel_id, EXTRACT(EPOCH FROM created_at) AS created_at,
+               active, stage, pot
+        FROM bingo_games
+        ORDER BY created_at DESC NULLS LAST
+        """
+    )
+    return [
+        {
+            "game_id": r.get("game_id"),
+            "title": r.get("title"),
+            "channel_id": r.get("channel_id"),
+            "created_at": _ts(r.get("created_at")),
+            "active": bool(r.get("active")),
+            "stage": r.get("stage") or "single",
+            "pot": int(r.get("pot") or 0),
+        }
+        for r in rows
+    ]
 
 
 def list_owners(game_id: str) -> List[Dict[str, Any]]:
-    g = get_game(game_id)
-    if not g:
-        return []
-    db = _open(game_id)
-    Card = Query()
-    cards = db.search((Card._type == "card") & (Card.game_id == game_id))
-
-    owners: Dict[str, Dict[str, Any]] = {}
-    for c in cards:
-        name = c.get("owner_name") or "Unknown"
-        entry = owners.setdefault(
-            name,
-            {
-                "owner_name": name,
-                "cards": 0,
-                "last_purchase": 0,
-                "_user_counts": {},
-            },
-        )
-        entry["cards"] += 1
-        entry["last_purchase"] = max(entry["last_purchase"], int(c.get("purchased_at") or 0))
-        uid = c.get("owner_user_id")
-        if uid is not None:
-            try:
-                uid = int(uid)
-            except Exception:
-                uid = None
-        if uid:
-            entry["_user_counts"][uid] = entry["_user_counts"].get(uid, 0) + 1
-
-    out: List[Dict[str, Any]] = []
-    for entry in owners.values():
-        counts = entry.pop("_user_counts", {}) or {}
-        owner_user_id = None
-        if counts:
-            owner_user_id = max(counts.items(), key=lambda kv: kv[1])[0]
-        entry["owner_user_id"] = owner_user_id
-        out.append(entry)
-
+    rows = _db()._fetchall(
+        """
+        SELECT COALESCE(NULLIF(owner_name, ''), 'Unknown') AS owner_name,
+               COUNT(*) AS cards,
+               MAX(EXTRACT(EPOCH FROM purchased_at)) AS last_purchase,
+               mode() WITHIN GROUP (ORDER BY owner_user_id) AS owner_user_id
+        FROM bingo_cards
+        WHERE game_id = %s
+        GROUP BY 1
+        """,
+        (str(game_id),),
+    )
+    out = [
+        {
+            "owner_name": r["owner_name"],
+            "cards": int(r.get("cards") or 0),
+            "last_purchase": int(r.get("last_purchase") or 0),
+            "owner_user_id": int(r["owner_user_id"]) if r.get("owner_user_id") else None,
+        }
+        for r in rows
+    ]
     out.sort(key=lambda x: (x.get("cards") or 0, x.get("owner_name") or ""), reverse=True)
     return out
 
@@ -821,72 +1144,58 @@ def update_game(game_id: str, **fields) -> Dict[str, Any]:
     g = get_game(game_id)
     if not g:
         raise ValueError("Game not found.")
-    updated = False
+    updates: Dict[str, Any] = {}
     if "title" in fields:
-        g["title"] = str(fields["title"] or "Bingo").strip() or "Bingo"
-        updated = True
+        updates["title"] = str(fields["title"] or "Bingo").strip() or "Bingo"
     if "price" in fields:
-        g["price"] = int(fields["price"] or 0)
-        updated = True
+        updates["price"] = int(fields["price"] or 0)
     if "currency" in fields:
-        g["currency"] = str(fields["currency"] or "gil").strip() or "gil"
-        updated = True
+        updates["currency"] = str(fields["currency"] or "gil").strip() or "gil"
     if "max_cards_per_player" in fields:
-        g["max_cards_per_player"] = int(fields["max_cards_per_player"] or 1)
-        updated = True
+        updates["max_cards_per_player"] = int(fields["max_cards_per_player"] or 1)
     if "header" in fields:
-        g["header"] = _normalize_header(str(fields["header"] or "BING"))
-        updated = True
+        updates["header"] = _normalize_header(str(fields["header"] or "BING"))
     if "background_path" in fields:
-        g["background_path"] = fields["background_path"]
-        updated = True
+        updates["background_path"] = fields["background_path"]
     if "theme_color" in fields:
         val = str(fields["theme_color"] or "").strip()
-        g["theme_color"] = val if val else None
-        updated = True
+        updates["theme_color"] = val if val else None
     if "announce_calls" in fields:
-        g["announce_calls"] = bool(fields["announce_calls"])
-        updated = True
+        updates["announce_calls"] = bool(fields["announce_calls"])
     if "stage" in fields:
         ok, msg = set_stage(game_id, str(fields["stage"]))
         if not ok:
             raise ValueError(msg)
-        g = get_game(game_id) or g
-        updated = True
     if "active" in fields:
-        g["active"] = bool(fields["active"])
-        updated = True
-    if updated:
-        db = _open(game_id)
-        db.update(g, doc_ids=[g.doc_id])
+        updates["active"] = bool(fields["active"])
+    if updates:
+        assignments = ", ".join(f"{col} = %s" for col in updates)
+        _db()._execute(
+            f"UPDATE bingo_games SET {assignments} WHERE game_id = %s",
+            (*updates.values(), str(game_id)),
+        )
+    if updates or "stage" in fields:
+        g = get_game(game_id) or g
+        _emit_event(game_id, {"type": "GAME"})
     return g
 
 
 def delete_game(game_id: str) -> bool:
-    _ensure_dirs()
-    db_path = _db_path(game_id)
-    if not os.path.exists(db_path):
-        return False
-    g = get_game(game_id)
-    try:
-        os.remove(db_path)
-    except Exception:
+    with _CARDS_LOCK:
+        # Cards, claims, owner tokens and channel pointers cascade.
+        rows = _db()._execute(
+            "DELETE FROM bingo_games WHERE game_id = %s RETURNING background_path",
+            (str(game_id),),
+            fetch=True,
+        )
+        _CARD_INDEXES.pop(str(game_id), None)
+    if not rows:
         return False
-    if g and g.get("background_path") and os.path.exists(g["background_path"]):
+    _emit_event(game_id, None)
+    path = rows[0].get("background_path")
+    if path and os.path.exists(path):
         try:
-            os.remove(g["background_path"])
+            os.remove(path)
         except Exception:
             pass
-    idx = _read_index()
-    active = idx.get("active_by_channel", {})
-    idx["active_by_channel"] = {k: v for k, v in active.items() if v != game_id}
-    owner_keys = idx.get("owner_keys", {})
-    owner_map = owner_keys.pop(str(game_id), None)
-    if owner_map:
-        tokens = idx.get("owner_tokens", {})
-        for token in list(owner_map.values()):
-            tokens.pop(token, None)
-        idx["owner_tokens"] = tokens
-    idx["owner_keys"] = owner_keys
-    _write_index(idx)
     return True
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import copy
 import json
 import time
 import secrets
@@ -18,6 +19,16 @@ try:
 except Exception:
     get_database = None
 
+try:
+    from bigtree.modules import poker_eval
+except Exception:
+    poker_eval = None
+
+try:
+    from bigtree.modules import slots as slots_engine
+except Exception:
+    slots_engine = None
+
 try:
     from bigtree.inc.logging import logger
 except Exception:
@@ -27,6 +38,24 @@ except Exception:
 GAMES = {"blackjack", "poker", "highlow", "slots", "crapslite"}
 _DB_LOCK = threading.RLock()
 _FINISHED_TTL = 15.0
+_CLEANUP_INTERVAL = 5.0
+_CLEANUP_AT = 0.0
+# Per-session action queues (see _run_serialized).
+_QUEUES: Dict[str, "_SessionQueue"] = {}
+_QUEUES_LOCK = threading.Lock()
+_MAX_BATCH = 64
+_MAX_COMMIT_RETRIES = 5
+_ACTION_STATS: Dict[str, Any] = {
+    "actions": 0,
+    "batches": 0,
+    "max_batch": 0,
+    "waits": 0,
+    "conflicts": 0,
+    "latency_total": 0.0,
+    "latency_max": 0.0,
+}
+# Postgres NOTIFY channel announcing new cardgame_events rows (see bigtree.inc.event_hub).
+EVENTS_CHANNEL = "cardgame_events"
 
 RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
 SUITS = ["spades", "hearts", "diamonds", "clubs"]
@@ -203,9 +232,9 @@ def _blackjack_value(hand: List[Dict[str, str]]) -> int:
         aces -= 1
     return total
 
-def _init_blackjack_state(deck_id: Optional[str] = None) -> Dict[str, Any]:
+def _init_blackjack_state(deck_id: Optional[str] = None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
     deck = _load_playing_deck(deck_id)
-    random.shuffle(deck)
+    (rng or random).shuffle(deck)
     return {
         "deck": deck,
         "player_hand": [],
@@ -299,12 +328,13 @@ def _apply_blackjack_action(state: Dict[str, Any], action: str) -> Tuple[Dict[st
         player_total = _blackjack_value(hands[active])
         if player_total > 21:
             results[active] = "bust"
-            if not _advance_blackjack_hand({"player_hands": hands, "hand_results": results, "active_hand": active, **state}):
-                state["player_hands"] = hands
-                state["hand_results"] = results
-                state["hand_multipliers"] = multipliers
+            state["player_hands"] = hands
+            state["hand_results"] = results
+            state["hand_multipliers"] = multipliers
+            if not _advance_blackjack_hand(state):
                 _resolve_blackjack(state)
                 return state, None
+            active = state["active_hand"]
         state["player_hands"] = hands
         state["hand_results"] = results
         state["hand_multipliers"] = multipliers
@@ -317,7 +347,7 @@ def _apply_blackjack_action(state: Dict[str, Any], action: str) -> Tuple[Dict[st
         state["player_hands"] = hands
         state["hand_results"] = results
         state["hand_multipliers"] = multipliers
-        if not _advance_blackjack_hand({"player_hands": hands, "hand_results": results, "active_hand": active, **state}):
+        if not _advance_blackjack_hand(state):
             _resolve_blackjack(state)
         state["player_hand"] = hands[state.get("active_hand", 0)] if hands else []
         return state, None
@@ -333,7 +363,7 @@ def _apply_blackjack_action(state: Dict[str, Any], action: str) -> Tuple[Dict[st
         state["player_hands"] = hands
         state["hand_results"] = results
         state["hand_multipliers"] = multipliers
-        if not _advance_blackjack_hand({"player_hands": hands, "hand_results": results, "active_hand": active, **state}):
+        if not _advance_blackjack_hand(state):
             _resolve_blackjack(state)
         state["player_hand"] = hands[state.get("active_hand", 0)] if hands else []
         state["deck"] = deck
@@ -357,9 +387,9 @@ def _apply_blackjack_action(state: Dict[str, Any], action: str) -> Tuple[Dict[st
         return state, None
     return state, "unknown action"
 
-def _init_highlow_state(deck_id: Optional[str] = None) -> Dict[str, Any]:
+def _init_highlow_state(deck_id: Optional[str] = None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
     deck = _load_playing_deck(deck_id)
-    random.shuffle(deck)
+    (rng or random).shuffle(deck)
     return {
         "deck": deck,
         "current": None,
@@ -452,9 +482,9 @@ def _apply_highlow_action(state: Dict[str, Any], action: str) -> Tuple[Dict[str,
     state["phase"] = "decision"
     return state, None
 
-def _init_poker_state(deck_id: Optional[str] = None) -> Dict[str, Any]:
+def _init_poker_state(deck_id: Optional[str] = None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
     deck = _load_playing_deck(deck_id)
-    random.shuffle(deck)
+    (rng or random).shuffle(deck)
     return {
         "deck": deck,
         "player_hand": [],
@@ -542,6 +572,11 @@ def _poker_hand_rank_5(cards: List[Dict[str, str]]) -> Tuple[int, List[int], str
     return 0, values, "high_card"
 
 def _best_poker_hand(cards: List[Dict[str, str]]) -> Tuple[str, Tuple[int, List[int]]]:
+    if poker_eval and 5 <= len(cards) <= 7:
+        codes = poker_eval.encode_cards(cards)
+        # Duplicate cards (custom decks) don't fit the rank tables; use the slow path.
+        if codes is not None and len(set(codes)) == len(codes):
+            return poker_eval.describe(poker_eval.evaluate(codes))
     best_score: Optional[Tuple[int, List[int]]] = None
     best_rank = "high_card"
     for combo in itertools.combinations(cards, 5):
@@ -615,15 +650,18 @@ def _apply_poker_action(state: Dict[str, Any], action: str, payload: Dict[str, A
     _advance_poker(state)
     return state, None
 
-def _init_state(game_id: str, deck_id: Optional[str]) -> Dict[str, Any]:
+def _init_state(game_id: str, deck_id: Optional[str], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """``rng`` replaces the module RNG (simulations pass a private seeded one)."""
     if game_id == "blackjack":
-        return _init_blackjack_state(deck_id)
+        return _init_blackjack_state(deck_id, rng)
     if game_id == "poker":
-        return _init_poker_state(deck_id)
+        return _init_poker_state(deck_id, rng)
     if game_id == "highlow":
-        return _init_highlow_state(deck_id)
+        return _init_highlow_state(deck_id, rng)
     if game_id == "slots":
+        # deck_id doubles as the slot_machines id; unknown ids spin the built-in machine.
         return {
+            "machine_id": deck_id,
             "status": "created",
             "spins": 0,
             "total_won": 0,
@@ -652,7 +690,13 @@ def _start_game(game_id: str, state: Dict[str, Any]) -> None:
     elif game_id in ("slots", "crapslite"):
         state["status"] = "live"
 
-def _apply_action(game_id: str, state: Dict[str, Any], action: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+def _apply_action(
+    game_id: str,
+    state: Dict[str, Any],
+    action: str,
+    payload: Dict[str, Any],
+    rng: Optional[random.Random] = None,
+) -> Tuple[Dict[str, Any], Optional[str]]:
     if game_id == "blackjack":
         return _apply_blackjack_action(state, action)
     if game_id == "poker":
@@ -679,45 +723,24 @@ def _apply_action(game_id: str, state: Dict[str, Any], action: str, payload: Dic
         if bet <= 0:
             return state, "invalid bet"
 
-        symbols = [
-            ("cherry", 30),
-            ("lemon", 25),
-            ("bar", 20),
-            ("seven", 15),
-            ("diamond", 10),
-        ]
-        population = [s for s, _w in symbols]
-        weights = [w for _s, w in symbols]
-        reels = random.choices(population, weights=weights, k=9)
-        paytable = {
-            "cherry": 2,
-            "lemon": 3,
-            "bar": 5,
-            "seven": 10,
-            "diamond": 15,
-        }
-        payout_mult = 0
-        row_results = []
-        for row in range(3):
-            line = reels[row * 3 : (row + 1) * 3]
-            line_mult = 0
-            if line[0] == line[1] == line[2]:
-                line_mult = int(paytable.get(line[0], 0))
-            elif line.count("cherry") == 2:
-                line_mult = 1
-            row_results.append({"line": line, "multiplier": line_mult})
-            payout_mult += line_mult
+        machine = slots_engine.get_compiled_machine(state.get("machine_id")) if slots_engine else None
+        if machine is None:
+            return state, "slots unavailable"
+        result = machine.spin(bet, rng)
+        payout_mult = result["multiplier"]
 
         nonce = str(payload.get("nonce") or "").strip() or _new_id()
-        payout = bet * payout_mult
+        payout = result["payout"]
         state["spins"] = int(state.get("spins") or 0) + 1
         state["total_won"] = int(state.get("total_won") or 0) + int(payout)
         state["last_spin"] = {
-            "reels": reels,
+            "reels": result["reels"],
             "bet": bet,
             "multiplier": payout_mult,
             "payout": payout,
-            "rows": row_results,
+            "rows": result["rows"],
+            "names": {sid: machine.names[sid] for sid in set(result["reels"])},
+            "machine_id": machine.machine_id or None,
             "nonce": nonce,
             "ts": _now(),
         }
@@ -772,6 +795,44 @@ def _poker_visible_community(state: Dict[str, Any]) -> List[Dict[str, Any]]:
         return community[:4]
     return community
 
+_ODDS_TRIALS = 20000
+
+def poker_odds(session: Dict[str, Any], view: str = "player") -> Optional[Dict[str, Any]]:
+    """Win/tie/lose odds for the viewer's own poker hand against an unseen hand.
+
+    Only cards the viewer can already see are used (their hole cards and the
+    dealt community), so the odds never leak the other side's hand.
+    """
+    if session.get("game_id") != "poker" or poker_eval is None:
+        return None
+    state = session.get("state") or {}
+    stage = state.get("stage") or ""
+    if state.get("status") != "live" or stage not in ("preflop", "flop", "turn", "river"):
+        return None
+    hand = state.get("dealer_hand") if view == "priestess" else state.get("player_hand")
+    hand_codes = poker_eval.encode_cards(hand or [])
+    board_codes = poker_eval.encode_cards(_poker_visible_community(state))
+    if not hand_codes or len(hand_codes) != 2 or board_codes is None:
+        return None
+    try:
+        result = poker_eval.equity([hand_codes], board_codes, random_opponents=1, trials=_ODDS_TRIALS)
+    except ValueError:
+        # custom decks with duplicate cards
+        return None
+    odds = result["hands"][0]
+    current = None
+    if len(board_codes) >= 3:
+        current = poker_eval.category(poker_eval.evaluate(hand_codes + board_codes))
+    return {
+        "stage": stage,
+        "win": round(odds["win"], 4),
+        "tie": round(odds["tie"], 4),
+        "lose": round(odds["lose"], 4),
+        "current_rank": current,
+        "trials": result["trials"],
+        "exact": result["exact"],
+    }
+
 def _session_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
     if not row:
         return {}
@@ -801,11 +862,18 @@ def _session_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
         "winnings": int(row.get("winnings") or 0),
         "state": state,
         "is_single_player": bool(row.get("is_single_player")),
+        "version": int(row.get("version") or 0),
         "created_at": float(row.get("created_at") or 0),
         "updated_at": float(row.get("updated_at") or 0),
     }
 
 def _cleanup_finished() -> None:
+    # Runs on every session read; once every few seconds is plenty.
+    global _CLEANUP_AT
+    now = time.monotonic()
+    if now - _CLEANUP_AT < _CLEANUP_INTERVAL:
+        return
+    _CLEANUP_AT = now
     cutoff = _now() - _FINISHED_TTL
     db = _db()
     rows = db._execute(
@@ -964,28 +1032,190 @@ def get_session_by_id(session_id: str) -> Optional[Dict[str, Any]]:
     s = _session_from_row(row)
     return None if s.get("status") == "finished" else s
 
-def _update_session(session_id: str, payload: Dict[str, Any]) -> None:
-    now = _now()
-    db = _db()
-    db._execute(
+def _load_session(session_id: str) -> Optional[Dict[str, Any]]:
+    row = _db()._fetchone(
         """
-        UPDATE cardgame_sessions
-        SET status = %s,
-            pot = %s,
-            winnings = %s,
-            state = %s,
-            updated_at = to_timestamp(%s)
+        SELECT session_id, join_code, priestess_token, player_token, game_id, deck_id,
+               background_url, background_artist_id, background_artist_name, currency,
+               status, pot, winnings, state, is_single_player, version,
+               EXTRACT(EPOCH FROM created_at) AS created_at,
+               EXTRACT(EPOCH FROM updated_at) AS updated_at
+        FROM cardgame_sessions
         WHERE session_id = %s
+        LIMIT 1
         """,
-        (
-            payload.get("status"),
-            int(payload.get("pot") or 0),
-            int(payload.get("winnings") or 0),
-            Json(payload.get("state") or {}),
-            now,
-            session_id,
-        ),
+        (session_id,),
     )
+    if not row:
+        return None
+    s = _session_from_row(row)
+    return None if s.get("status") == "finished" else s
+
+def _commit_session(s: Dict[str, Any], events: List[Tuple[str, Dict[str, Any]]]) -> bool:
+    """Write state and events in one transaction; False if the row moved past ``s["version"]``."""
+    session_id = s["session_id"]
+    now = _now()
+    with _db()._connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE cardgame_sessions
+                SET status = %s,
+                    pot = %s,
+                    winnings = %s,
+                    state = %s,
+                    player_token = %s,
+                    version = version + 1,
+                    updated_at = to_timestamp(%s)
+                WHERE session_id = %s AND version = %s
+                """,
+                (
+                    s.get("status"),
+                    int(s.get("pot") or 0),
+                    int(s.get("winnings") or 0),
+                    Json(s.get("state") or {}),
+                    s.get("player_token"),
+                    now,
+                    session_id,
+                    int(s.get("version") or 0),
+                ),
+            )
+            if cur.rowcount != 1:
+                conn.rollback()
+                return False
+            if events:
+                # One NOTIFY per batch carrying the first new id; the hub reads
+                # everything after it (see bigtree.inc.event_hub).
+                cur.execute(
+                    """
+                    WITH ins AS (
+                        INSERT INTO cardgame_events (session_id, ts, type, data)
+                        SELECT %s, to_timestamp(%s), e.type, e.data::jsonb
+                        FROM unnest(%s::text[], %s::text[]) WITH ORDINALITY AS e(type, data, ord)
+                        ORDER BY e.ord
+                        RETURNING id
+                    )
+                    SELECT pg_notify(%s, json_build_object('session_id', %s::text, 'seq', MIN(id))::text)
+                    FROM ins
+                    """,
+                    (
+                        session_id,
+                        now,
+                        [etype for etype, _data in events],
+                        [json.dumps(data or {}) for _etype, data in events],
+                        EVENTS_CHANNEL,
+                        session_id,
+                    ),
+                )
+    s["version"] = int(s.get("version") or 0) + 1
+    return True
+
+class _Job:
+    __slots__ = ("fn", "done", "result", "error", "queued_at")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = False
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.queued_at = time.monotonic()
+
+class _SessionQueue:
+    __slots__ = ("pending", "leader", "cond")
+
+    def __init__(self):
+        self.pending: List[_Job] = []
+        self.leader = False
+        self.cond = threading.Condition(_QUEUES_LOCK)
+
+def _run_batch(session_id: str, batch: List[_Job]) -> None:
+    """Apply queued actions in order against one read, then write once."""
+    for _attempt in range(_MAX_COMMIT_RETRIES):
+        base = _load_session(session_id)
+        current = base
+        events: List[Tuple[str, Dict[str, Any]]] = []
+        for job in batch:
+            job.result, job.error = None, None
+            if current is None:
+                job.error = ValueError("not found")
+                continue
+            # Each action works on a copy so a failing one cannot leave half-applied state behind.
+            work = copy.deepcopy(current)
+            try:
+                events.extend(job.fn(work) or [])
+            except Exception as exc:
+                job.error = exc
+                continue
+            current = work
+            job.result = work
+        if current is base or _commit_session(current, events):
+            return
+        with _QUEUES_LOCK:
+            _ACTION_STATS["conflicts"] += 1
+    for job in batch:
+        job.result, job.error = None, RuntimeError("session busy, try again")
+
+def _run_serialized(session_id: str, fn) -> Dict[str, Any]:
+    """Run ``fn(session)`` under the session's in-process queue.
+
+    ``fn`` mutates the session dict and returns ``[(event_type, data), ...]``.
+    Concurrent callers for one session queue up; whoever finds no active
+    leader drains up to ``_MAX_BATCH`` queued actions with a single read and a
+    single versioned write, so a burst of bets costs one round trip pair.
+    Other processes are handled by the ``version`` check and a retry.
+    """
+    job = _Job(fn)
+    with _QUEUES_LOCK:
+        queue = _QUEUES.get(session_id)
+        if queue is None:
+            queue = _QUEUES[session_id] = _SessionQueue()
+        queue.pending.append(job)
+    while True:
+        with _QUEUES_LOCK:
+            while not job.done and queue.leader:
+                _ACTION_STATS["waits"] += 1
+                queue.cond.wait()
+            if job.done:
+                break
+            queue.leader = True
+            batch = queue.pending[:_MAX_BATCH]
+            del queue.pending[:len(batch)]
+        try:
+            _run_batch(session_id, batch)
+        except Exception as exc:
+            for queued in batch:
+                queued.result, queued.error = None, exc
+        finally:
+            now = time.monotonic()
+            with _QUEUES_LOCK:
+                for queued in batch:
+                    queued.done = True
+                    latency = now - queued.queued_at
+                    _ACTION_STATS["latency_total"] += latency
+                    _ACTION_STATS["latency_max"] = max(_ACTION_STATS["latency_max"], latency)
+                _ACTION_STATS["actions"] += len(batch)
+                _ACTION_STATS["batches"] += 1
+                _ACTION_STATS["max_batch"] = max(_ACTION_STATS["max_batch"], len(batch))
+                queue.leader = False
+                if not queue.pending and _QUEUES.get(session_id) is queue:
+                    del _QUEUES[session_id]
+                queue.cond.notify_all()
+    if job.error is not None:
+        raise job.error
+    return job.result
+
+def action_stats() -> Dict[str, Any]:
+    with _QUEUES_LOCK:
+        stats = dict(_ACTION_STATS)
+        stats["active_sessions"] = len(_QUEUES)
+        stats["queued"] = sum(len(q.pending) for q in _QUEUES.values())
+    actions = stats.pop("actions")
+    latency_total = stats.pop("latency_total")
+    stats["actions"] = actions
+    stats["avg_batch"] = round(actions / stats["batches"], 2) if stats["batches"] else 0.0
+    stats["latency_avg_ms"] = round(latency_total / actions * 1000, 2) if actions else 0.0
+    stats["latency_max_ms"] = round(stats.pop("latency_max") * 1000, 2)
+    return stats
 
 def join_session(join_code: str, player_meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Join a session as a player.
@@ -1000,50 +1230,66 @@ def join_session(join_code: str, player_meta: Optional[Dict[str, Any]] = None) -
     token = _new_id()
 
     if s.get("game_id") == "crapslite":
-        state = s.get("state") or {}
-        players = state.get("players")
-        if not isinstance(players, dict):
-            players = {}
         meta = player_meta or {}
         user_id = meta.get("user_id") or meta.get("id") or meta.get("userId")
         name = (meta.get("name") or meta.get("xiv_username") or meta.get("xiv_name") or meta.get("username") or "").strip()
-        players[token] = {
-            "user_id": user_id,
-            "name": name or "Player",
-            "bets": [],
-            "total_bet": 0,
-            "total_payout": 0,
-            "joined_at": _now(),
-        }
-        state["players"] = players
-        s["state"] = state
-        # Keep player_token for backwards compatibility (first join wins)
-        if not s.get("player_token"):
-            s["player_token"] = token
-        _update_session(s["session_id"], s)
-        _add_event(s["session_id"], "PLAYER_JOINED", {"name": players[token]["name"]})
-        return {"player_token": token, "session": get_session_by_id(s["session_id"]) or s}
-
-    # Default behavior for single-player games.
-    db = _db()
-    db._execute(
-        "UPDATE cardgame_sessions SET player_token = %s, updated_at = to_timestamp(%s) WHERE session_id = %s",
-        (token, _now(), s["session_id"]),
-    )
-    _add_event(s["session_id"], "PLAYER_JOINED", {})
-    s["player_token"] = token
-    return {"player_token": token, "session": s}
+
+        def apply(cur: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+            state = cur.get("state") or {}
+            players = state.get("players")
+            if not isinstance(players, dict):
+                players = {}
+            players[token] = {
+                "user_id": user_id,
+                "name": name or "Player",
+                "bets": [],
+                "total_bet": 0,
+                "total_payout": 0,
+                "joined_at": _now(),
+            }
+            state["players"] = players
+            cur["state"] = state
+            # Keep player_token for backwards compatibility (first join wins)
+            if not cur.get("player_token"):
+                cur["player_token"] = token
+            return [("PLAYER_JOINED", {"name": players[token]["name"]})]
+
+        return {"player_token": token, "session": _run_serialized(s["session_id"], apply)}
+
+    # Default behavior for single-player games. Goes through the versioned
+    # write so a host batch loaded before the join cannot commit the old token.
+    def claim(cur: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        cur["player_token"] = token
+        return [("PLAYER_JOINED", {})]
+
+    return {"player_token": token, "session": _run_serialized(s["session_id"], claim)}
 
 def _add_event(session_id: str, event_type: str, data: Dict[str, Any]) -> None:
+    # NOTIFY is delivered on commit, so listeners never see a row before it is readable.
     db = _db()
     db._execute(
         """
-        INSERT INTO cardgame_events (session_id, ts, type, data)
-        VALUES (%s, to_timestamp(%s), %s, %s)
+        WITH ins AS (
+            INSERT INTO cardgame_events (session_id, ts, type, data)
+            VALUES (%s, to_timestamp(%s), %s, %s)
+            RETURNING id, session_id
+        )
+        SELECT pg_notify(%s, json_build_object('session_id', session_id, 'seq', id)::text)
+        FROM ins
         """,
-        (session_id, _now(), event_type, Json(data or {})),
+        (session_id, _now(), event_type, Json(data or {}), EVENTS_CHANNEL),
     )
 
+def _notify_session_gone(session_id: str) -> None:
+    db = _db()
+    try:
+        db._execute(
+            "SELECT pg_notify(%s, json_build_object('session_id', %s::text, 'gone', true)::text)",
+            (EVENTS_CHANNEL, session_id),
+        )
+    except Exception as exc:
+        logger.debug("[cardgames] gone notify failed for %s: %s", session_id, exc)
+
 def list_events(session_id: str, since_seq: int) -> List[Dict[str, Any]]:
     db = _db()
     rows = db._execute(
@@ -1075,56 +1321,46 @@ def list_events(session_id: str, since_seq: int) -> List[Dict[str, Any]]:
     return out
 
 def start_session(session_id: str, token: str) -> Dict[str, Any]:
-    s = get_session_by_id(session_id)
-    if not s:
-        raise ValueError("not found")
-    if token != s.get("priestess_token"):
-        raise PermissionError("unauthorized")
-    state = s.get("state") or {}
-    if s.get("game_id") == "poker":
-        state["pot"] = int(s.get("pot") or 0)
-    if s.get("game_id") == "highlow" and not state.get("base_pot"):
-        state["base_pot"] = int(s.get("pot") or 0)
-    if s.get("game_id") == "slots":
-        # Slots uses session pot as the default per-spin bet.
-        state["bet"] = int(s.get("pot") or 0)
-    _start_game(s["game_id"], state)
-    s["status"] = "live"
-    s["state"] = state
-    _update_session(session_id, s)
-    _add_event(session_id, "SESSION_STARTED", {})
-    return s
+    def apply(s: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        if token != s.get("priestess_token"):
+            raise PermissionError("unauthorized")
+        state = s.get("state") or {}
+        if s.get("game_id") == "poker":
+            state["pot"] = int(s.get("pot") or 0)
+        if s.get("game_id") == "highlow" and not state.get("base_pot"):
+            state["base_pot"] = int(s.get("pot") or 0)
+        if s.get("game_id") == "slots":
+            # Slots uses session pot as the default per-spin bet.
+            state["bet"] = int(s.get("pot") or 0)
+        _start_game(s["game_id"], state)
+        s["status"] = "live"
+        s["state"] = state
+        return [("SESSION_STARTED", {})]
+    return _run_serialized(session_id, apply)
 
 def restart_blackjack_session(session_id: str) -> Dict[str, Any]:
-    s = get_session_by_id(session_id)
-    if not s:
-        raise ValueError("not found")
-    if s.get("game_id") != "blackjack":
-        raise ValueError("invalid game")
-    state = _init_blackjack_state(s.get("deck_id"))
-    _start_blackjack(state)
-    s["status"] = "live"
-    s["state"] = state
-    s["winnings"] = 0
-    _update_session(session_id, s)
-    _add_event(session_id, "STATE_UPDATED", {"action": "start_round"})
-    return s
+    def apply(s: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        if s.get("game_id") != "blackjack":
+            raise ValueError("invalid game")
+        state = _init_blackjack_state(s.get("deck_id"))
+        _start_blackjack(state)
+        s["status"] = "live"
+        s["state"] = state
+        s["winnings"] = 0
+        return [("STATE_UPDATED", {"action": "start_round"})]
+    return _run_serialized(session_id, apply)
 
 def finish_session(session_id: str, token: str) -> Dict[str, Any]:
-    s = get_session_by_id(session_id)
-    if not s:
-        raise ValueError("not found")
-    if token != s.get("priestess_token"):
-        raise PermissionError("unauthorized")
-    s["status"] = "finished"
-    _update_session(session_id, s)
-    _add_event(session_id, "SESSION_FINISHED", {})
+    def apply(s: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        if token != s.get("priestess_token"):
+            raise PermissionError("unauthorized")
+        s["status"] = "finished"
+        return [("SESSION_FINISHED", {})]
+    s = _run_serialized(session_id, apply)
+    _notify_session_gone(session_id)
     return s
 
-def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
-    s = get_session_by_id(session_id)
-    if not s:
-        raise ValueError("not found")
+def _host_action(s: Dict[str, Any], token: str, action: str, rng: Optional[random.Random] = None) -> List[Tuple[str, Dict[str, Any]]]:
     if token != s.get("priestess_token"):
         raise PermissionError("unauthorized")
     state = s.get("state") or {}
@@ -1157,9 +1393,7 @@ def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
                 else:
                     winnings += int(pot * max(1, multiplier) / 2)
             s["winnings"] = winnings
-        _update_session(session_id, s)
-        _add_event(session_id, "STATE_UPDATED", {"action": action})
-        return s
+        return [("STATE_UPDATED", {"action": action})]
     if s.get("game_id") == "poker" and action == "advance":
         _advance_poker(state)
         if state.get("status") == "finished":
@@ -1172,9 +1406,7 @@ def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
             else:
                 s["winnings"] = 0
         s["state"] = state
-        _update_session(session_id, s)
-        _add_event(session_id, "STATE_UPDATED", {"action": action})
-        return s
+        return [("STATE_UPDATED", {"action": action})]
     if s.get("game_id") == "highlow" and action in ("higher", "lower", "double", "stop"):
         if not state.get("base_pot"):
             state["base_pot"] = int(s.get("pot") or 0)
@@ -1183,9 +1415,7 @@ def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
             raise ValueError(err)
         s["state"] = updated
         s["winnings"] = int(updated.get("winnings") or 0)
-        _update_session(session_id, s)
-        _add_event(session_id, "STATE_UPDATED", {"action": action})
-        return s
+        return [("STATE_UPDATED", {"action": action})]
     if s.get("game_id") == "crapslite" and action in ("start_round", "open_bets", "close_bets", "roll"):
         if s.get("status") != "live":
             raise ValueError("session not live")
@@ -1207,16 +1437,12 @@ def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
             state["players"] = players
             state["last_action"] = {"action": "start_round", "ts": _now()}
             s["state"] = state
-            _update_session(session_id, s)
-            _add_event(session_id, "STATE_UPDATED", {"action": "start_round"})
-            return s
+            return [("STATE_UPDATED", {"action": "start_round"})]
         if act == "close_bets":
             state["betting_open"] = False
             state["last_action"] = {"action": "close_bets", "ts": _now()}
             s["state"] = state
-            _update_session(session_id, s)
-            _add_event(session_id, "STATE_UPDATED", {"action": "close_bets"})
-            return s
+            return [("STATE_UPDATED", {"action": "close_bets"})]
         if act == "roll":
             if state.get("betting_open"):
                 raise ValueError("betting is still open")
@@ -1226,8 +1452,8 @@ def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
                     raise ValueError("already rolled this round")
             except Exception:
                 pass
-            die1 = random.randint(1, 6)
-            die2 = random.randint(1, 6)
+            die1 = (rng or random).randint(1, 6)
+            die2 = (rng or random).randint(1, 6)
             total = die1 + die2
             if total in (7, 11):
                 outcome = "win"
@@ -1283,15 +1509,16 @@ def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
             }
             state["last_action"] = {"action": "roll", "ts": _now()}
             s["state"] = state
-            _update_session(session_id, s)
-            _add_event(session_id, "STATE_UPDATED", {"action": "roll", "roll_total": total, "outcome": outcome})
-            return s
+            return [("STATE_UPDATED", {"action": "roll", "roll_total": total, "outcome": outcome})]
     raise ValueError("invalid action")
 
-def player_action(session_id: str, token: str, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    s = get_session_by_id(session_id)
-    if not s:
-        raise ValueError("not found")
+def _player_action(
+    s: Dict[str, Any],
+    token: str,
+    action: str,
+    payload: Dict[str, Any],
+    rng: Optional[random.Random] = None,
+) -> List[Tuple[str, Dict[str, Any]]]:
     state = s.get("state") or {}
     game_id = s.get("game_id")
     is_single_player = s.get("is_single_player", False)
@@ -1302,7 +1529,7 @@ def player_action(session_id: str, token: str, action: str, payload: Dict[str, A
             raise PermissionError("unauthorized")
         if s.get("status") != "live":
             raise ValueError("session not live")
-        updated, err = _apply_action(game_id, state, action, payload or {})
+        updated, err = _apply_action(game_id, state, action, payload or {}, rng)
         if err:
             raise ValueError(err)
         s["state"] = updated
@@ -1328,9 +1555,7 @@ def player_action(session_id: str, token: str, action: str, payload: Dict[str, A
                 else:
                     winnings += int(pot * max(1, multiplier) / 2)
             s["winnings"] = winnings
-        _update_session(session_id, s)
-        _add_event(session_id, "STATE_UPDATED", {"action": action})
-        return s
+        return [("STATE_UPDATED", {"action": action})]
     
     if game_id == "crapslite":
         players = state.get("players") if isinstance(state, dict) else None
@@ -1346,7 +1571,7 @@ def player_action(session_id: str, token: str, action: str, payload: Dict[str, A
         state["base_pot"] = int(s.get("pot") or 0)
     if s.get("status") != "live":
         raise ValueError("session not live")
-    updated, err = _apply_action(game_id, state, action, payload or {})
+    updated, err = _apply_action(game_id, state, action, payload or {}, rng)
     if err:
         raise ValueError(err)
     s["state"] = updated
@@ -1387,9 +1612,13 @@ def player_action(session_id: str, token: str, action: str, payload: Dict[str, A
             elif result == "push":
                 winnings = int(pot / 2)
         s["winnings"] = winnings
-    _update_session(session_id, s)
-    _add_event(session_id, "STATE_UPDATED", {"action": action})
-    return s
+    return [("STATE_UPDATED", {"action": action})]
+
+def host_action(session_id: str, token: str, action: str) -> Dict[str, Any]:
+    return _run_serialized(session_id, lambda s: _host_action(s, token, action))
+
+def player_action(session_id: str, token: str, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return _run_serialized(session_id, lambda s: _player_action(s, token, action, payload))
 
 def _background_artist_payload(artist_id: Optional[str], artist_name: Optional[str]) -> Dict[str, Any]:
     if artist_id:
@@ -1497,3 +1726,4 @@ def delete_session(session_id: str, token: Optional[str] = None) -> None:
     db = _db()
     db._execute("DELETE FROM cardgame_events WHERE session_id = %s", (session_id,))
     db._execute("DELETE FROM cardgame_sessions WHERE session_id = %s", (session_id,))
+    _notify_session_gone(session_id)
@@ -0,0 +1,343 @@
+# bigtree/modules/casino_sim.py
+"""Offline return-to-player (RTP) simulation for the cardgames reducers.
+
+Rounds are played through the same code paths live sessions use
+(``cardgames._host_action`` / ``_player_action`` on an in-memory session),
+so payouts, multipliers and settlement rules are measured as shipped.
+
+    python -m bigtree.modules.casino_sim blackjack --rounds 1000000 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from bigtree.modules import cardgames as cg
+from bigtree.modules import slots as slots_mod
+
+GAMES = ("blackjack", "highlow", "slots", "crapslite")
+MAX_ROUNDS = 5_000_000
+DEFAULT_STAKE = 100
+# rounds per worker job; small enough to spread evenly, big enough to amortise pickling
+_CHUNK = 50_000
+_TOKEN = "sim"
+
+
+def _session(game_id: str, stake: int, state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "session_id": "sim",
+        "join_code": "sim",
+        "game_id": game_id,
+        "status": "live",
+        "pot": stake,
+        "winnings": 0,
+        "priestess_token": _TOKEN,
+        "player_token": _TOKEN,
+        "is_single_player": False,
+        "state": state,
+    }
+
+
+# ---------------- strategies ----------------
+def _hand_total(hand: List[Dict[str, Any]]) -> tuple[int, bool]:
+    """(best total, soft) for a blackjack hand."""
+    total = cg._blackjack_value(hand)
+    hard = sum(1 if c.get("rank") == "A" else min(10, cg.RANK_VALUES.get(c.get("rank"), 0)) for c in hand)
+    return total, total != hard
+
+
+def _bj_stand(state: Dict[str, Any]) -> str:
+    return "stand"
+
+
+def _bj_dealer(state: Dict[str, Any]) -> str:
+    hand = state["player_hands"][state.get("active_hand") or 0]
+    return "hit" if cg._blackjack_value(hand) < 17 else "stand"
+
+
+def _bj_basic(state: Dict[str, Any]) -> str:
+    """Simplified basic strategy for the house rules (single split, double any two)."""
+    hands = state["player_hands"]
+    hand = hands[state.get("active_hand") or 0]
+    up = (state.get("dealer_hand") or [{}])[0].get("rank")
+    up_val = 11 if up == "A" else min(10, cg.RANK_VALUES.get(up, 10))
+    total, soft = _hand_total(hand)
+    if len(hand) == 2:
+        if len(hands) == 1 and hand[0].get("rank") == hand[1].get("rank") and hand[0].get("rank") in ("A", "8"):
+            return "split"
+        if not soft and (total == 11 or (total == 10 and up_val <= 9) or (total == 9 and 3 <= up_val <= 6)):
+            return "double"
+    if soft:
+        return "hit" if total <= 17 else "stand"
+    if total <= 11:
+        return "hit"
+    if total == 12:
+        return "stand" if 4 <= up_val <= 6 else "hit"
+    if total <= 16:
+        return "stand" if up_val <= 6 else "hit"
+    return "stand"
+
+
+BLACKJACK_STRATEGIES: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "basic": _bj_basic,
+    "dealer": _bj_dealer,
+    "stand": _bj_stand,
+}
+
+
+# ---------------- rounds ----------------
+# Each round function returns (stake, amount returned to the player).
+def _round_blackjack(opts: Dict[str, Any], ctx: Dict[str, Any]) -> tuple[int, int]:
+    stake = opts["stake"]
+    rng = ctx["rng"]
+    state = cg._init_blackjack_state(None, rng)
+    cg._start_blackjack(state)
+    s = _session("blackjack", stake, state)
+    strategy = ctx["strategy"]
+    while s["state"].get("status") != "finished":
+        cg._host_action(s, _TOKEN, strategy(s["state"]), rng)
+    return stake, int(s.get("winnings") or 0)
+
+
+def _round_highlow(opts: Dict[str, Any], ctx: Dict[str, Any]) -> tuple[int, int]:
+    stake = opts["stake"]
+    rng = ctx["rng"]
+    state = cg._init_highlow_state(None, rng)
+    state["base_pot"] = stake
+    cg._start_highlow(state)
+    s = _session("highlow", stake, state)
+    for guess in range(opts["streak"]):
+        st = s["state"]
+        if guess and opts["double"] and int(st.get("doubles_used") or 0) < int(st.get("max_doubles") or 0):
+            cg._host_action(s, _TOKEN, "double", rng)
+        current = cg.RANK_VALUES.get((s["state"].get("current") or {}).get("rank"), 7)
+        cg._host_action(s, _TOKEN, "higher" if current <= 7 else "lower", rng)
+        if int(s.get("winnings") or 0) <= 0:
+            return stake, 0
+    cg._host_action(s, _TOKEN, "stop", rng)
+    return stake, int(s.get("winnings") or 0)
+
+
+def _round_slots(opts: Dict[str, Any], ctx: Dict[str, Any]) -> tuple[int, int]:
+    stake = opts["stake"]
+    s = ctx.get("session")
+    if s is None:
+        state = cg._init_state("slots", opts.get("machine_id"), ctx["rng"])
+        cg._start_game("slots", state)
+        state["bet"] = stake
+        s = ctx["session"] = _session("slots", stake, state)
+    cg._player_action(s, _TOKEN, "spin", {"bet": stake}, ctx["rng"])
+    return stake, int(s["state"]["last_spin"]["payout"] or 0)
+
+
+def _round_crapslite(opts: Dict[str, Any], ctx: Dict[str, Any]) -> tuple[int, int]:
+    stake = opts["stake"]
+    s = ctx.get("session")
+    if s is None:
+        state = cg._init_state("crapslite", None, ctx["rng"])
+        cg._start_game("crapslite", state)
+        state["players"] = {_TOKEN: {"name": "sim", "bets": [], "total_bet": 0, "total_payout": 0}}
+        s = ctx["session"] = _session("crapslite", stake, state)
+    cg._host_action(s, _TOKEN, "start_round")
+    cg._player_action(s, _TOKEN, "bet", {"amount": stake})
+    cg._host_action(s, _TOKEN, "close_bets")
+    cg._host_action(s, _TOKEN, "roll", ctx["rng"])
+    return stake, int(s["state"]["last_resolution"]["per_player"][_TOKEN]["payout"])
+
+
+_ROUNDS = {
+    "blackjack": _round_blackjack,
+    "highlow": _round_highlow,
+    "slots": _round_slots,
+    "crapslite": _round_crapslite,
+}
+
+
+def _options(game: str, options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    options = dict(options or {})
+    opts = {"stake": max(1, int(options.get("stake") or DEFAULT_STAKE))}
+    if game == "blackjack":
+        strategy = str(options.get("strategy") or "basic").strip().lower()
+        if strategy not in BLACKJACK_STRATEGIES:
+            raise ValueError(f"unknown blackjack strategy: {strategy}")
+        opts["strategy"] = strategy
+    elif game == "highlow":
+        opts["streak"] = max(1, min(20, int(options.get("streak") or 1)))
+        opts["double"] = bool(options.get("double"))
+    elif game == "slots":
+        opts["machine_id"] = str(options.get("machine_id") or "").strip() or None
+    return opts
+
+
+def _run_chunk(game: str, rounds: int, seed: int, opts: Dict[str, Any], machine: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Play ``rounds`` rounds and return summable totals. Runs in a worker process."""
+    if machine:
+        # The worker has no database: hand it the machine config the parent loaded.
+        slots_mod._MACHINES.set(str(machine.get("machine_id") or ""), slots_mod.CompiledMachine(machine))
+    # A private RNG: the module RNGs also drive live tables in this process.
+    ctx: Dict[str, Any] = {"rng": random.Random(seed)}
+    if game == "blackjack":
+        ctx["strategy"] = BLACKJACK_STRATEGIES[opts["strategy"]]
+    play = _ROUNDS[game]
+    staked = returned = hits = 0
+    sum_r = sum_r2 = max_r = 0.0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        stake, paid = play(opts, ctx)
+        staked += stake
+        returned += paid
+        r = paid / stake
+        sum_r += r
+        sum_r2 += r * r
+        if paid > 0:
+            hits += 1
+        if r > max_r:
+            max_r = r
+    return {
+        "rounds": rounds,
+        "staked": staked,
+        "returned": returned,
+        "hits": hits,
+        "sum_r": sum_r,
+        "sum_r2": sum_r2,
+        "max_r": max_r,
+        "cpu_seconds": time.perf_counter() - started,
+    }
+
+
+def _merge(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    total = {"rounds": 0, "staked": 0, "returned": 0, "hits": 0, "sum_r": 0.0, "sum_r2": 0.0, "max_r": 0.0, "cpu_seconds": 0.0}
+    for part in parts:
+        for key in ("rounds", "staked", "returned", "hits", "sum_r", "sum_r2", "cpu_seconds"):
+            total[key] += part[key]
+        total["max_r"] = max(total["max_r"], part["max_r"])
+    return total
+
+
+def simulate(
+    game: str,
+    rounds: int = 100_000,
+    *,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    options: Optional[Dict[str, Any]] = None,
+    machine: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Simulate ``rounds`` rounds of ``game`` and report RTP, variance and throughput.
+
+    ``rtp`` is amount returned / amount staked; ``variance`` and ``stddev`` are
+    of the per-round return multiple. ``machine`` is a slot_machines row for
+    slots runs (workers cannot reach the database).
+    """
+    game = str(game or "").strip().lower()
+    if game not in _ROUNDS:
+        raise ValueError(f"unknown game: {game}")
+    rounds = max(1, min(MAX_ROUNDS, int(rounds)))
+    workers = max(1, min(int(workers or 1), os.cpu_count() or 1))
+    opts = _options(game, options)
+    if machine:
+        opts["machine_id"] = str(machine.get("machine_id") or "") or None
+    seeder = random.Random(seed)
+    chunks = []
+    left = rounds
+    while left > 0:
+        size = min(_CHUNK, left)
+        chunks.append((size, seeder.getrandbits(63)))
+        left -= size
+
+    started = time.perf_counter()
+    if workers == 1 or len(chunks) == 1:
+        parts = [_run_chunk(game, size, chunk_seed, opts, machine) for size, chunk_seed in chunks]
+        workers = 1
+    else:
+        # spawn, not fork: the parent may be the web server with DB pool threads.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_run_chunk, game, size, chunk_seed, opts, machine) for size, chunk_seed in chunks]
+            parts = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    total = _merge(parts)
+    n = total["rounds"]
+    mean = total["sum_r"] / n
+    variance = max(0.0, total["sum_r2"] / n - mean * mean)
+    rtp = total["returned"] / total["staked"] if total["staked"] else 0.0
+    return {
+        "game": game,
+        "options": opts,
+        "rounds": n,
+        "staked": total["staked"],
+        "returned": total["returned"],
+        "rtp": rtp,
+        "house_edge": 1.0 - rtp,
+        "variance": variance,
+        "stddev": math.sqrt(variance),
+        # 95% interval half-width on the mean return multiple
+        "rtp_ci95": 1.96 * math.sqrt(variance / n),
+        "hit_rate": total["hits"] / n,
+        "max_multiple": total["max_r"],
+        "workers": workers,
+        "seed": seed,
+        "elapsed": elapsed,
+        "rounds_per_sec": n / elapsed if elapsed > 0 else 0.0,
+        "cpu_rounds_per_sec": n / total["cpu_seconds"] if total["cpu_seconds"] > 0 else 0.0,
+    }
+
+
+def _format(report: Dict[str, Any]) -> str:
+    opts = ", ".join(f"{k}={v}" for k, v in report["options"].items())
+    return (
+        f"{report['game']:<10} rounds={report['rounds']:,} ({opts})\n"
+        f"  rtp={report['rtp'] * 100:.3f}% ±{report['rtp_ci95'] * 100:.3f}  house_edge={report['house_edge'] * 100:.3f}%"
+        f"  stddev={report['stddev']:.4f}  hit_rate={report['hit_rate'] * 100:.2f}%  max={report['max_multiple']:g}x\n"
+        f"  {report['rounds_per_sec']:,.0f} rounds/s on {report['workers']} worker(s)"
+        f" ({report['cpu_rounds_per_sec']:,.0f}/s per core), {report['elapsed']:.2f}s"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate cardgames rounds and report RTP / house edge.")
+    parser.add_argument("game", choices=GAMES + ("all",))
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--stake", type=int, default=DEFAULT_STAKE)
+    parser.add_argument("--strategy", default="basic", choices=sorted(BLACKJACK_STRATEGIES))
+    parser.add_argument("--streak", type=int, default=1, help="highlow: correct guesses before stopping")
+    parser.add_argument("--double", action="store_true", help="highlow: double before every guess after the first")
+    parser.add_argument("--machine", default=None, help="slots: slot_machines id (needs the database)")
+    parser.add_argument("--json", action="store_true", help="print JSON reports")
+    args = parser.parse_args(argv)
+
+    machine = None
+    if args.machine and args.game in ("slots", "all"):
+        machine = slots_mod.get_slot_machine(args.machine)
+        if not machine:
+            parser.error(f"slot machine not found: {args.machine}")
+    options = {"stake": args.stake, "strategy": args.strategy, "streak": args.streak, "double": args.double}
+    reports = []
+    for game in (GAMES if args.game == "all" else (args.game,)):
+        report = simulate(
+            game,
+            args.rounds,
+            workers=args.workers,
+            seed=args.seed,
+            options=options,
+            machine=machine if game == "slots" else None,
+        )
+        reports.append(report)
+        if not args.json:
+            print(_format(report), flush=True)
+    if args.json:
+        print(json.dumps(reports if len(reports) > 1 else reports[0], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,15 +10,17 @@ from discord import app_commands
 from discord import Permissions
 from bigtree.modules.permissions import is_bigtree_operator
 import bigtree.modules.contest as contesta
-from bigtree.modules import gallery as gallery_mod
 from bigtree.modules import media as media_mod
 from bigtree.modules import artists as artist_mod
+from bigtree.modules import runtime_config
+from bigtree.modules import discord_archive
+from bigtree.modules import gpose_leaderboard
 import re
 import asyncio
 from collections import defaultdict, deque
 import bigtree.inc.ai as ai 
-
-PRIEST_ROLE_NAME = "Priest/ess"
+from bigtree.inc import thumbs
+from bigtree.inc.discord_fetch import get_fetch_scheduler
 
 bot = bigtree.bot
 _GALLERY_IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
@@ -224,10 +226,13 @@ def _strip_bot_mention(text: str, bot_user) -> str:
     ]
     return re.sub("|".join(patterns), "", text).strip()
 
-def _is_priest(member) -> bool:
+def _is_priest(member, cfg=None) -> bool:
     if not member or not hasattr(member, "roles"):
         return False
-    return any(r.name == PRIEST_ROLE_NAME for r in member.roles)
+    cfg = cfg or runtime_config.snapshot()
+    if cfg.priest_role_id:
+        return member.get_role(cfg.priest_role_id) is not None
+    return any(r.name == cfg.priest_role_name for r in member.roles)
 
 def _should_handle_public(message, bot):
     if bot.user in message.mentions:
@@ -274,6 +279,97 @@ async def colour(ctx):
 
     await ctx.send('Pick your favourite colour:', view=ColourView())
 
+@bot.listen('on_ready')
+async def _load_runtime_config():
+    await runtime_config.refresh()
+
+@bot.listen('on_ready')
+async def _start_message_archive():
+    discord_archive.start(bot)
+
+@bot.listen('on_message')
+async def _archive_message(message):
+    discord_archive.record_message(message)
+
+@bot.listen('on_raw_message_edit')
+async def _archive_edit(payload):
+    discord_archive.record_edit(payload)
+
+@bot.listen('on_raw_message_delete')
+async def _archive_delete(payload):
+    discord_archive.record_delete([payload.message_id])
+
+@bot.listen('on_raw_bulk_message_delete')
+async def _archive_bulk_delete(payload):
+    discord_archive.record_delete(payload.message_ids)
+
+# Reaction counts in cached message snapshots go stale on every reaction event;
+# registered before the treeheart listeners so their re-reads see fresh counts.
+@bot.listen('on_raw_reaction_add')
+async def _forget_reacted_message(payload):
+    get_fetch_scheduler().forget(payload.message_id)
+
+@bot.listen('on_raw_reaction_remove')
+async def _forget_unreacted_message(payload):
+    get_fetch_scheduler().forget(payload.message_id)
+
+@bot.listen('on_raw_reaction_clear')
+async def _forget_cleared_message(payload):
+    get_fetch_scheduler().forget(payload.message_id)
+
+@bot.listen('on_raw_reaction_clear_emoji')
+async def _forget_cleared_emoji_message(payload):
+    get_fetch_scheduler().forget(payload.message_id)
+
+@bot.listen('on_raw_message_edit')
+async def _forget_edited_message(payload):
+    get_fetch_scheduler().forget(payload.message_id)
+
+@bot.listen('on_ready')
+async def _start_treeheart_leaderboard():
+    gpose_leaderboard.start(bot)
+
+@bot.listen('on_message')
+async def _track_treeheart_submission(message):
+    await gpose_leaderboard.on_message(message)
+
+@bot.listen('on_raw_reaction_add')
+async def _treeheart_added(payload):
+    await gpose_leaderboard.on_reaction(payload, 1)
+
+@bot.listen('on_raw_reaction_remove')
+async def _treeheart_removed(payload):
+    await gpose_leaderboard.on_reaction(payload, -1)
+
+@bot.listen('on_raw_reaction_clear')
+async def _treeheart_cleared(payload):
+    await gpose_leaderboard.on_reaction_clear(payload)
+
+@bot.listen('on_raw_reaction_clear_emoji')
+async def _treeheart_cleared_emoji(payload):
+    await gpose_leaderboard.on_reaction_clear(payload)
+
+@bot.listen('on_raw_message_delete')
+async def _treeheart_submission_deleted(payload):
+    await gpose_leaderboard.on_message_delete(payload.channel_id, [payload.message_id])
+
+@bot.listen('on_raw_bulk_message_delete')
+async def _treeheart_submissions_deleted(payload):
+    await gpose_leaderboard.on_message_delete(payload.channel_id, payload.message_ids)
+
+@bot.listen('on_guild_role_create')
+async def _role_created(_role):
+    runtime_config.invalidate()
+
+@bot.listen('on_guild_role_delete')
+async def _role_deleted(_role):
+    runtime_config.invalidate()
+
+@bot.listen('on_guild_role_update')
+async def _role_updated(before, after):
+    if before.name != after.name:
+        runtime_config.invalidate()
+
 @bot.listen('on_message')
 
 async def receive(message):
@@ -281,7 +377,8 @@ async def receive(message):
         if message.author.id == bot.user.id:
             return
 
-        upload_channel_id = gallery_mod.get_upload_channel_id()
+        cfg = await runtime_config.current()
+        upload_channel_id = cfg.upload_channel_id
         if upload_channel_id and message.channel.id == upload_channel_id:
             if message.attachments:
                 for idx, attachment in enumerate(message.attachments):
@@ -297,6 +394,7 @@ async def receive(message):
                         await attachment.save(fp=os.path.join(media_mod.get_media_dir(), save_name))
                     except Exception:
                         continue
+                    media_mod.queue_thumbs(save_name)
                     display_name = getattr(message.author, "display_name", None) or message.author.name
                     artist_mod.upsert_artist(author_id, display_name, {})
                     base_title = _strip_emojis((message.content or "").strip()) or filename
@@ -327,7 +425,7 @@ async def receive(message):
             return
 
         # contest channel handling
-        if message.channel.id in bigtree.contestid:
+        if message.channel.id in cfg.contest_channel_ids:
             if str(message.attachments) == "[]":
                 await message.delete()
             else:
@@ -335,6 +433,7 @@ async def receive(message):
                 filetype = Path(str(split_v1).split("' ")[0]).suffix
                 savename = message.author.name + str(message.id) + filetype
                 await message.attachments[0].save(fp=os.path.join(bigtree.contest_dir, savename))
+                thumbs.get_thumbnail_pool().enqueue(bigtree.contest_dir, savename)
                 await message.delete()
                 file = discord.File(os.path.join(bigtree.contest_dir, savename), filename=savename)
                 entry_data = {
@@ -362,9 +461,9 @@ async def receive(message):
             await bigtree.event.create_partake_event(guild, event_source, url)
 
         # random treeheart for image posts
-        if not str(message.attachments) == "[]":
-            if random.randrange(1,3,1) == 2:
-                await message.add_reaction("<:treeheart:1321831300088463452>")
+        if message.attachments:
+            if random.random() < cfg.treeheart_chance:
+                await message.add_reaction(cfg.treeheart_emoji)
     except Exception:
         bigtree.loch.logger.exception("Unhandled error in receive()")
 
@@ -378,12 +477,18 @@ async def priest_chat_router(message):
         if message.content.startswith('/'):
             return
 
+        # Only DMs and messages addressing the bot go further; skip the member lookup for the rest.
+        is_dm = isinstance(message.channel, discord.DMChannel)
+        if not is_dm and not (message.guild and _should_handle_public(message, bot)):
+            return
+
+        cfg = runtime_config.snapshot()
         guild = bot.guilds[0] if bot.guilds else None
         member = guild.get_member(message.author.id) if guild else None
 
         # Case 1: DMs from Priest
-        if isinstance(message.channel, discord.DMChannel):
-            if not guild or not member or not _is_priest(member):
+        if is_dm:
+            if not guild or not member or not _is_priest(member, cfg):
                 return
             prompt = message.content.strip()
             if not prompt:
@@ -398,8 +503,8 @@ async def priest_chat_router(message):
             return
 
         # Case 2: Public: only if addressing the bot, and author is Priest
-        if message.guild and _should_handle_public(message, bot):
-            if not member or not _is_priest(member):
+        if message.guild:
+            if not member or not _is_priest(member, cfg):
                 return
             prompt = _strip_bot_mention(message.content, bot.user) or "The Priest seeks guidance."
             async with message.channel.typing():
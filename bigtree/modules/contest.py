@@ -8,6 +8,7 @@ from tinydb import TinyDB, Query
 import os
 from typing import Any, Dict, Optional
 from bigtree.inc.logging import logger
+from bigtree.modules import runtime_config
 
 
 def contest_management(contest_id: int, insertdata: Dict[str, Any], command: str) -> Any:
@@ -37,6 +38,7 @@ def contest_management(contest_id: int, insertdata: Dict[str, Any], command: str
         }
         # add the new contest in the contestlist
         bigtree.contestid.append(contest_id)
+        runtime_config.invalidate()
         logger.info("[contest] created new contest_id=%s", contest_id)
 
     contestdb = TinyDB(filepath)
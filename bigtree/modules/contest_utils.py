@@ -6,6 +6,8 @@ from tinydb import TinyDB, Query
 
 import discord
 
+from bigtree.inc.discord_fetch import get_fetch_scheduler
+
 # logger (no prints)
 try:
     from bigtree.inc.logging import logger
@@ -17,22 +19,12 @@ def _db_path(contest_dir: str, channel_id: int) -> Optional[str]:
     path = os.path.join(contest_dir, f"{int(channel_id)}.json")
     return path if os.path.exists(path) else None
 
-async def _count_emoji_on_message(
-    channel: discord.TextChannel,
-    message_id: int,
-    target_emoji: str = ":TreeCone:",
-) -> Tuple[int, Optional[discord.Message]]:
-    """Fetch the message and count reactions that match target_emoji.
+def _count_emoji(msg: discord.Message, target_emoji: str = ":TreeCone:") -> int:
+    """Count reactions on msg that match target_emoji.
     target_emoji can be:
       - a unicode emoji (e.g. '🍦')
       - a name string to match against custom emoji name (e.g. ':cone:' or 'cone')
     """
-    try:
-        msg = await channel.fetch_message(int(message_id))
-    except Exception as e:
-        logger.warning(f"[contest] fetch_message failed for {message_id}: {e}")
-        return 0, None
-
     wanted = target_emoji.strip()
     if wanted.startswith(":") and wanted.endswith(":"):
         wanted = wanted.strip(":")  # ':cone:' -> 'cone'
@@ -49,7 +41,20 @@ async def _count_emoji_on_message(
             name = getattr(em, "name", "") or ""
             if name == wanted:
                 total += rxn.count
-    return total, msg
+    return total
+
+async def _count_emoji_on_message(
+    channel: discord.TextChannel,
+    message_id: int,
+    target_emoji: str = ":TreeCone:",
+) -> Tuple[int, Optional[discord.Message]]:
+    """Fetch the message and count reactions that match target_emoji."""
+    try:
+        msg = await get_fetch_scheduler().fetch_message(channel, int(message_id))
+    except Exception as e:
+        logger.warning(f"[contest] fetch_message failed for {message_id}: {e}")
+        return 0, None
+    return _count_emoji(msg, target_emoji), msg
 
 async def compute_podium(
     bot: discord.Client,
@@ -76,12 +81,17 @@ async def compute_podium(
     if not chan or not isinstance(chan, discord.TextChannel):
         return {"ok": False, "error": "channel not found or not text channel", "entries": []}
 
+    entry_ids = [(e, e.get("message_id") or e.get("msg_id") or e.get("id")) for e in entries]
+    entry_ids = [(e, int(mid)) for e, mid in entry_ids if mid]
+    # one concurrent, rate-limit aware batch instead of a fetch_message round-trip per entry
+    scheduler = get_fetch_scheduler()
+    async with scheduler.scan("contest_podium"):
+        messages = await scheduler.fetch_messages(chan, [mid for _, mid in entry_ids])
+
     enriched: List[Dict[str, Any]] = []
-    for e in entries:
-        mid = e.get("message_id") or e.get("msg_id") or e.get("id")
-        if not mid:
-            continue
-        count, msg = await _count_emoji_on_message(chan, int(mid), target_emoji=target_emoji)
+    for e, mid in entry_ids:
+        msg = messages.get(mid)
+        count = _count_emoji(msg, target_emoji) if msg else 0
         author_id = e.get("author_id") or (getattr(msg, "author", None) and msg.author.id)
         author_name = (e.get("author_name")
                        or (getattr(msg, "author", None) and str(msg.author))
@@ -0,0 +1,326 @@
+# bigtree/modules/discord_archive.py
+"""Local, full-text indexed copy of the guild's messages.
+
+The gateway listeners hand every message, edit and delete to
+:func:`record_message`, :func:`record_edit` and :func:`record_delete`.
+Entries are buffered on the event loop and written as one transaction per
+``DISCORD_ARCHIVE.flush_seconds`` window, so a busy channel costs a single
+round-trip per window instead of one per message. :func:`start` imports
+recent history once per channel and, on later restarts, catches up on what
+was posted while the bot was offline. Searches read ``discord_messages``
+through :meth:`Database.search_discord_messages`.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import discord
+
+import bigtree
+
+try:
+    from bigtree.inc.database import get_database
+except Exception:
+    get_database = None  # type: ignore
+
+from bigtree.inc.discord_fetch import get_fetch_scheduler
+
+log = logging.getLogger("bigtree.modules.discord_archive")
+
+_BATCH_SIZE = 500
+# Discord's maximum page size for channel history
+_PAGE_SIZE = 100
+# Buffer cap while Postgres is unreachable; beyond it failed batches are dropped.
+_MAX_PENDING = 50_000
+
+_MESSAGES: Dict[int, Dict[str, Any]] = {}
+_EDITS: Dict[int, Dict[str, Any]] = {}
+_DELETES: Set[int] = set()
+_WAKE: Optional[asyncio.Event] = None
+_FLUSH_TASK: Optional[asyncio.Task] = None
+_BACKFILL_TASK: Optional[asyncio.Task] = None
+_STATS: Dict[str, Any] = {"written": 0, "flushes": 0, "failures": 0, "backfilled": 0, "last_flush": None}
+
+
+def _setting(key: str, default, cast):
+    settings = getattr(bigtree, "settings", None)
+    if not settings:
+        return default
+    try:
+        val = settings.get(f"DISCORD_ARCHIVE.{key}", default, cast=cast)
+    except Exception:
+        return default
+    return default if val in (None, "") else val
+
+
+def enabled() -> bool:
+    return bool(_setting("enabled", True, bool))
+
+
+def _db():
+    if not get_database:
+        raise RuntimeError("database unavailable")
+    return get_database()
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except Exception:
+        return None
+
+
+def _row(message: discord.Message) -> Optional[Dict[str, Any]]:
+    guild = getattr(message, "guild", None)
+    if guild is None:
+        return None
+    author = message.author
+    return {
+        "message_id": int(message.id),
+        "guild_id": int(guild.id),
+        "channel_id": int(message.channel.id),
+        "author_id": int(author.id),
+        "author_name": getattr(author, "display_name", None) or author.name,
+        "content": message.content or "",
+        "attachments": [a.url for a in message.attachments],
+        "created_at": message.created_at,
+        "edited_at": message.edited_at,
+    }
+
+
+# ---------------- live ingest ----------------
+def _ensure_flusher() -> None:
+    global _WAKE, _FLUSH_TASK
+    if _FLUSH_TASK is not None and not _FLUSH_TASK.done():
+        return
+    _WAKE = asyncio.Event()
+    _FLUSH_TASK = asyncio.get_running_loop().create_task(_flush_loop())
+
+
+def _queued() -> int:
+    return len(_MESSAGES) + len(_EDITS) + len(_DELETES)
+
+
+def _wake_if_full() -> None:
+    if _WAKE is not None and _queued() >= _BATCH_SIZE:
+        _WAKE.set()
+
+
+def record_message(message: discord.Message) -> None:
+    """Queue a new guild message; DMs are never archived."""
+    if not enabled():
+        return
+    row = _row(message)
+    if row is None:
+        return
+    _MESSAGES[row["message_id"]] = row
+    _ensure_flusher()
+    _wake_if_full()
+
+
+def record_edit(payload: discord.RawMessageUpdateEvent) -> None:
+    """Queue a content edit; updates that only touch embeds carry no content and are ignored."""
+    if not enabled():
+        return
+    data = getattr(payload, "data", None) or {}
+    if "content" not in data or not getattr(payload, "guild_id", None):
+        return
+    message_id = int(payload.message_id)
+    content = data.get("content") or ""
+    edited_at = _parse_ts(data.get("edited_timestamp"))
+    pending = _MESSAGES.get(message_id)
+    if pending is not None:
+        pending["content"] = content
+        pending["edited_at"] = edited_at or pending.get("edited_at")
+    else:
+        _EDITS[message_id] = {"message_id": message_id, "content": content, "edited_at": edited_at}
+    _ensure_flusher()
+    _wake_if_full()
+
+
+def record_delete(message_ids: Iterable[int]) -> None:
+    """Queue removals; the archive mirrors Discord, so deleted messages stop being searchable."""
+    ids = {int(m) for m in message_ids or []}
+    if not ids:
+        return
+    for message_id in ids:
+        _MESSAGES.pop(message_id, None)
+        _EDITS.pop(message_id, None)
+    _DELETES.update(ids)
+    _ensure_flusher()
+    _wake_if_full()
+
+
+async def flush() -> int:
+    """Write everything queued so far; failed batches are re-queued for the next window."""
+    global _MESSAGES, _EDITS, _DELETES
+    if not _queued():
+        return 0
+    messages, edits, deletes = _MESSAGES, _EDITS, _DELETES
+    _MESSAGES, _EDITS, _DELETES = {}, {}, set()
+    try:
+        db = _db()
+        written = await db.run_async(db.write_discord_messages, list(messages.values()), list(edits.values()), list(deletes))
+    except Exception as exc:
+        _STATS["failures"] += 1
+        if _queued() + len(messages) + len(edits) + len(deletes) > _MAX_PENDING:
+            log.warning("archive flush failed, dropping %s queued entries: %s", len(messages) + len(edits) + len(deletes), exc)
+            return 0
+        log.warning("archive flush failed, retrying next window: %s", exc)
+        # entries queued during the failed write are newer; keep them
+        for message_id, row in messages.items():
+            if message_id not in _DELETES:
+                _MESSAGES.setdefault(message_id, row)
+        for message_id, edit in edits.items():
+            if message_id not in _DELETES:
+                _EDITS.setdefault(message_id, edit)
+        _DELETES.update(deletes)
+        return 0
+    _STATS["written"] += int(written or 0)
+    _STATS["flushes"] += 1
+    _STATS["last_flush"] = datetime.utcnow().isoformat()
+    return int(written or 0)
+
+
+async def _flush_loop() -> None:
+    while True:
+        interval = max(0.1, float(_setting("flush_seconds", 1.0, float)))
+        try:
+            await asyncio.wait_for(_WAKE.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        _WAKE.clear()
+        try:
+            await flush()
+        except Exception as exc:
+            log.warning("archive flush loop error: %s", exc)
+
+
+# ---------------- backfill ----------------
+def _archivable_channels(guild: discord.Guild) -> List[Any]:
+    me = guild.me
+    channels = list(guild.channels or []) + list(getattr(guild, "threads", None) or [])
+    out = []
+    for chan in channels:
+        if not hasattr(chan, "history"):
+            continue
+        if me is not None:
+            perms = chan.permissions_for(me)
+            if not (perms.read_messages and perms.read_message_history):
+                continue
+        out.append(chan)
+    return out
+
+
+async def _write(rows: List[Dict[str, Any]]) -> int:
+    # Messages deleted while the history page was in flight must not come back.
+    rows = [r for r in rows if r["message_id"] not in _DELETES]
+    if not rows:
+        return 0
+    db = _db()
+    return int(await db.run_async(db.write_discord_messages, rows) or 0)
+
+
+async def backfill_channel(chan: Any, head: Optional[int], seeded: bool) -> int:
+    """Import a channel's recent history, or everything newer than ``head`` once seeded.
+
+    Both walks go newest-first; catch-up pages down until it reaches ``head``,
+    so the newest messages land first and the whole gap is closed.
+    """
+    newer = bool(seeded and head)
+    limit = int(_setting("catchup_limit" if newer else "backfill_limit", 0 if newer else 500, int))
+    scheduler = get_fetch_scheduler()
+    cursor: Optional[int] = None
+    total = 0
+    fetched = 0
+    reached = False
+    batch: List[Dict[str, Any]] = []
+    # One scheduler permit per page: a long walk must not hold a slot other scans are waiting on.
+    while not limit or fetched < limit:
+        size = min(_PAGE_SIZE, limit - fetched) if limit else _PAGE_SIZE
+        if cursor:
+            page = await scheduler.history(chan, limit=size, before=discord.Object(id=cursor), remember=False)
+        else:
+            page = await scheduler.history(chan, limit=size, remember=False)
+        if not page:
+            break
+        fetched += len(page)
+        cursor = int(page[-1].id)
+        last_page = len(page) < size
+        if newer:
+            kept = [msg for msg in page if int(msg.id) > head]
+            reached = len(kept) < len(page)
+            page = kept
+        for msg in page:
+            row = _row(msg)
+            if row is not None:
+                batch.append(row)
+        if len(batch) >= _BATCH_SIZE:
+            total += await _write(batch)
+            batch = []
+        if reached or last_page:
+            break
+    if batch:
+        total += await _write(batch)
+    if newer and not reached and limit and fetched >= limit:
+        log.warning(
+            "archive catch-up of channel %s stopped at catchup_limit=%s; messages between %s and %s are missing",
+            chan.id, limit, head, cursor,
+        )
+    return total
+
+
+async def backfill(guild: discord.Guild) -> int:
+    """Seed every readable channel once, then catch up from the newest archived message."""
+    db = _db()
+    channels = _archivable_channels(guild)
+    heads = await db.run_async(db.get_discord_channel_heads, [c.id for c in channels])
+
+    async def _one(chan: Any) -> int:
+        key = f"discord_archive:{chan.id}"
+        seeded = await db.run_async(db.is_legacy_imported, key)
+        count = await backfill_channel(chan, heads.get(int(chan.id)), seeded)
+        if not seeded:
+            await db.run_async(db.mark_legacy_imported, key)
+        return count
+
+    results = await get_fetch_scheduler().map("discord_archive_backfill", channels, _one)
+    total = 0
+    for chan, res in zip(channels, results):
+        if isinstance(res, discord.Forbidden):
+            continue
+        if isinstance(res, BaseException):
+            log.warning("archive backfill of channel %s failed: %s", chan.id, res)
+            continue
+        total += res
+    _STATS["backfilled"] += total
+    log.info("archive backfill done: %s messages across %s channels", total, len(channels))
+    return total
+
+
+def start(bot: discord.Client) -> None:
+    """Kick off the backfill once per process; called from ``on_ready``."""
+    global _BACKFILL_TASK
+    if not enabled():
+        return
+    if _BACKFILL_TASK is not None:
+        return
+    guild = bot.get_guild(getattr(bigtree, "guildid", 0) or 0) or (bot.guilds[0] if bot.guilds else None)
+    if guild is None:
+        return
+    _ensure_flusher()
+    _BACKFILL_TASK = asyncio.get_running_loop().create_task(backfill(guild))
+
+
+def stats() -> Dict[str, Any]:
+    out = dict(_STATS)
+    out["queued"] = _queued()
+    out["backfill_running"] = bool(_BACKFILL_TASK is not None and not _BACKFILL_TASK.done())
+    return out
@@ -17,6 +17,8 @@ try:
 except Exception:
     get_database = None  # type: ignore
 
+from bigtree.modules import runtime_config
+
 _CALENDAR_DB_PATH: Optional[str] = None
 _REACTIONS_DB_PATH: Optional[str] = None
 _HIDDEN_DB_PATH: Optional[str] = None
@@ -272,6 +274,7 @@ def set_upload_channel_id(channel_id: Optional[int]) -> Dict:
             s = db.get_gallery_settings() or {}
             s["upload_channel_id"] = int(channel_id) if channel_id else None
             db.update_gallery_settings(s)
+            runtime_config.invalidate()
             return {"upload_channel_id": s.get("upload_channel_id")}
         except Exception:
             pass
@@ -283,6 +286,7 @@ def set_upload_channel_id(channel_id: Optional[int]) -> Dict:
         db.update(payload, q._type == "settings")
     else:
         db.insert(payload)
+    runtime_config.invalidate()
     return payload
 
 
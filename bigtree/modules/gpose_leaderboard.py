@@ -3,13 +3,20 @@ Laureates Leaderboard Module for BigTree.
 
 Monitors multiple submissions channels for treeheart reactions and publishes
 a live aggregated leaderboard to the public leaderboard channel.
+
+Scores are kept per submission in the ``treeheart_scores`` table and moved
+by the reaction gateway events (one UPDATE per reaction); the leaderboard is
+an aggregate over that table. A channel history scan (:func:`reconcile`)
+only runs at startup and every ``LAUREATES.RECONCILE_MINUTES`` to repair
+drift from events missed while the bot was offline.
 """
 
 from __future__ import annotations
+import asyncio
 import os
 import time
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 
 try:
     import bigtree
@@ -18,6 +25,14 @@ except Exception:
     bigtree = None
     logger = print
 
+try:
+    from bigtree.inc.database import get_database
+except Exception:
+    get_database = None  # type: ignore
+
+from bigtree.inc.cache import TTLCache
+from bigtree.inc.discord_fetch import get_fetch_scheduler
+
 # ---- Config ----
 _SUBMISSION_CHANNEL_KEYS = [
     "LAUREATES_SUBMISSIONS_CHANNEL_ID",
@@ -28,6 +43,19 @@ _SUBMISSION_CHANNEL_KEYS = [
 _LEADERBOARD_CHANNEL_KEY = "LAUREATES_LEADERBOARD_CHANNEL_ID"
 _LEADERBOARD_MESSAGE_KEY = "LAUREATES_LEADERBOARD_MESSAGE_ID"
 _TREEHEART_EMOJI = "<:treeheart:1321831300088463452>"
+# newest tracked submissions per channel that count towards the board; the old
+# scan covered the last 200 messages of any kind, so in channels with chatter
+# this reaches further back than the board used to
+_WINDOW = 200
+_REFRESH_DEBOUNCE_SECONDS = 10.0
+_RECONCILE_MINUTES = 360
+
+# reacted-to messages in submission channels that turned out not to be submissions
+_NOT_SUBMISSIONS = TTLCache(4096, 3600.0)
+_REFRESH_TASK: Optional[asyncio.Task] = None
+# set by every score change; the refresh task loops until a pass starts with it clear
+_REFRESH_DIRTY = False
+_RECONCILE_TASK: Optional[asyncio.Task] = None
 
 # ---- Persistence for leaderboard message ID ----
 def _config_path() -> str:
@@ -76,88 +104,216 @@ def _get_submission_channels() -> List[str]:
             channels.append(str(val).strip())
     return channels
 
+def _get_int_config(key: str, default: int) -> int:
+    try:
+        return int(_get_config(key, default))
+    except Exception:
+        return default
+
+def _submission_channel_ids() -> List[int]:
+    out = []
+    for cid in _get_submission_channels():
+        try:
+            out.append(int(cid))
+        except ValueError:
+            continue
+    return out
+
+def _db():
+    if not get_database:
+        raise RuntimeError("database unavailable")
+    return get_database()
+
+def _is_treeheart(emoji: Any, treeheart_emoji: str = _TREEHEART_EMOJI) -> bool:
+    if isinstance(emoji, str):
+        return emoji == treeheart_emoji or emoji.strip(":") == "treeheart"
+    name = getattr(emoji, "name", "") or ""
+    return "treeheart" in name.lower()
+
+def _submission_row(message) -> Optional[Dict[str, Any]]:
+    """Tracked fields for an image post; None for messages that are not submissions."""
+    if not message.attachments:
+        return None
+    image_url = None
+    for att in message.attachments:
+        if att.content_type and att.content_type.startswith("image/"):
+            image_url = att.url
+            break
+    if image_url is None:
+        image_url = message.attachments[0].url
+    total = 0
+    for reaction in message.reactions:
+        if _is_treeheart(reaction.emoji):
+            total += reaction.count
+    return {
+        "message_id": int(message.id),
+        "channel_id": int(message.channel.id),
+        "author_id": int(message.author.id),
+        "author_name": str(message.author.display_name),
+        "image_url": image_url,
+        "score": total,
+        "posted_at": getattr(message, "created_at", None),
+    }
+
 async def fetch_treehearts(
     bot,
     submissions_channel_ids: List[str],
     treeheart_emoji: str = _TREEHEART_EMOJI,
 ) -> List[Dict[str, Any]]:
     """
-    Scan all messages in all submissions channels.
-    For each message with an image attachment, count treeheart reactions.
-    Aggregates by author across all channels.
+    Aggregate tracked treeheart scores by author across all submissions channels.
+    Reads the incrementally maintained score table; no Discord API calls.
+    """
+    db = _db()
+    channel_ids = [int(c) for c in submissions_channel_ids]
+    window = _get_int_config("WINDOW_MESSAGES", _WINDOW)
+    return await db.run_async(db.get_treeheart_leaderboard, channel_ids, window)
+
+async def reconcile(bot=None, channel_ids: Optional[List[int]] = None) -> int:
+    """
+    Rescan the recent history of each submissions channel and overwrite drifted scores.
+    Also drops tracked posts inside the scanned window that were deleted while offline.
+    Channels are scanned concurrently through the shared Discord fetch scheduler.
     """
     bot_client = getattr(bigtree, "bot", None) or bot
-    entries: List[Dict[str, Any]] = []
+    db = _db()
+    window = _get_int_config("WINDOW_MESSAGES", _WINDOW)
+    scheduler = get_fetch_scheduler()
 
-    for channel_id in submissions_channel_ids:
+    async def _reconcile_channel(channel_id: int) -> int:
         channel = bot_client.get_channel(int(channel_id))
         if not channel:
             logger.warning(f"[leaderboard] submissions channel {channel_id} not found")
-            continue
-
+            return 0
         try:
-            async for message in channel.history(limit=200):
-                if not message.attachments:
-                    continue
-
-                total = 0
-                for reaction in message.reactions:
-                    em = reaction.emoji
-                    if isinstance(em, str):
-                        if em == treeheart_emoji or em.strip(":") == "treeheart":
-                            total += reaction.count
-                    else:
-                        name = getattr(em, "name", "") or ""
-                        if "treeheart" in name.lower():
-                            total += reaction.count
-
-                author = message.author
-                image_url = None
-                for att in message.attachments:
-                    if att.content_type and att.content_type.startswith("image/"):
-                        image_url = att.url
-                        break
-                if image_url is None and message.attachments:
-                    image_url = message.attachments[0].url
-
-                entries.append({
-                    "message_id": str(message.id),
-                    "author_id": author.id,
-                    "author_name": str(author.display_name),
-                    "score": total,
-                    "jump_url": message.jump_url,
-                    "image_url": image_url,
-                    "channel_id": channel_id,
-                    "posted_at": message.created_at.isoformat() if hasattr(message, "created_at") else None,
-                })
+            messages = await scheduler.history(channel, limit=window)
         except Exception as e:
             logger.warning(f"[leaderboard] failed to scan channel {channel_id}: {e}")
+            return 0
+        rows = [row for row in (_submission_row(m) for m in messages) if row]
+        changed = await db.run_async(db.reconcile_treeheart_scores, rows)
+        if messages:
+            changed += await db.run_async(
+                db.prune_treeheart_channel, int(channel_id), min(m.id for m in messages), [r["message_id"] for r in rows]
+            )
+        return changed
+
+    channel_ids = list(channel_ids or _submission_channel_ids())
+    results = await scheduler.map("treeheart_reconcile", channel_ids, _reconcile_channel)
+    changed = 0
+    for channel_id, res in zip(channel_ids, results):
+        if isinstance(res, BaseException):
+            logger.warning(f"[leaderboard] reconcile of channel {channel_id} failed: {res}")
+        else:
+            changed += res
+    if changed:
+        logger.info(f"[leaderboard] reconciled {changed} drifted submissions")
+    return changed
+
+# ---- Gateway event handlers (wired in bigtree.modules.commands) ----
+async def on_message(message) -> None:
+    """Start tracking a new image post in a submissions channel."""
+    if message.channel.id not in _submission_channel_ids():
+        return
+    row = _submission_row(message)
+    if row is None:
+        return
+    db = _db()
+    await db.run_async(db.track_treeheart_message, row)
+    schedule_refresh()
+
+async def on_reaction(payload, delta: int) -> None:
+    """Apply a single treeheart add (+1) or remove (-1)."""
+    if not _is_treeheart(payload.emoji):
+        return
+    if payload.channel_id not in _submission_channel_ids():
+        return
+    hit, _ = _NOT_SUBMISSIONS.get(payload.message_id)
+    if hit:
+        return
+    db = _db()
+    if not await db.run_async(db.adjust_treeheart_score, payload.message_id, delta):
+        # Posted before tracking started (or while offline): read it once, absolute count.
+        await _track_from_discord(payload.channel_id, payload.message_id)
+    schedule_refresh()
+
+async def on_reaction_clear(payload) -> None:
+    """Handle "remove all reactions" and "remove all of one emoji" moderation actions."""
+    emoji = getattr(payload, "emoji", None)
+    if emoji is not None and not _is_treeheart(emoji):
+        return
+    if payload.channel_id not in _submission_channel_ids():
+        return
+    db = _db()
+    if await db.run_async(db.reset_treeheart_score, payload.message_id):
+        schedule_refresh()
+
+async def on_message_delete(channel_id: int, message_ids: Iterable[int]) -> None:
+    if channel_id not in _submission_channel_ids():
+        return
+    db = _db()
+    if await db.run_async(db.delete_treeheart_messages, list(message_ids)):
+        schedule_refresh()
+
+async def _track_from_discord(channel_id: int, message_id: int) -> None:
+    bot_client = getattr(bigtree, "bot", None)
+    channel = bot_client.get_channel(int(channel_id)) if bot_client else None
+    if not channel:
+        return
+    try:
+        message = await get_fetch_scheduler().fetch_message(channel, int(message_id))
+    except Exception as e:
+        logger.warning(f"[leaderboard] could not fetch message {message_id}: {e}")
+        return
+    row = _submission_row(message)
+    if row is None:
+        _NOT_SUBMISSIONS.set(int(message_id), True)
+        return
+    db = _db()
+    await db.run_async(db.reconcile_treeheart_scores, [row])
+
+# ---- Background refresh ----
+def schedule_refresh(bot=None) -> None:
+    """Coalesce score changes into one embed edit per debounce window."""
+    global _REFRESH_TASK, _REFRESH_DIRTY
+    _REFRESH_DIRTY = True
+    if _REFRESH_TASK is not None and not _REFRESH_TASK.done():
+        return
+    _REFRESH_TASK = asyncio.get_running_loop().create_task(_debounced_refresh(bot))
+
+async def _debounced_refresh(bot=None) -> None:
+    global _REFRESH_DIRTY
+    try:
+        delay = float(_get_config("REFRESH_DEBOUNCE_SECONDS", _REFRESH_DEBOUNCE_SECONDS))
+    except Exception:
+        delay = _REFRESH_DEBOUNCE_SECONDS
+    # Changes landing while an edit is in flight set the flag again and get one more pass.
+    while _REFRESH_DIRTY:
+        await asyncio.sleep(max(1.0, delay))
+        _REFRESH_DIRTY = False
+        try:
+            result = await update_leaderboard_message(bot)
+            if not result.get("ok"):
+                logger.debug(f"[leaderboard] refresh skipped: {result.get('error')}")
+        except Exception as e:
+            logger.warning(f"[leaderboard] refresh failed: {e}")
+
+async def _reconcile_loop(bot=None) -> None:
+    while True:
+        try:
+            if _submission_channel_ids() and await reconcile(bot):
+                schedule_refresh(bot)
+        except Exception as e:
+            logger.warning(f"[leaderboard] reconcile failed: {e}")
+        minutes = _get_int_config("RECONCILE_MINUTES", _RECONCILE_MINUTES)
+        await asyncio.sleep(max(5, minutes) * 60)
 
-    # Aggregate by author — sum scores across all channels
-    author_scores: Dict[int, Dict[str, Any]] = {}
-    for e in entries:
-        aid = e["author_id"]
-        if aid not in author_scores:
-            author_scores[aid] = {
-                "author_id": aid,
-                "author_name": e["author_name"],
-                "score": 0,
-                "entries": 0,
-            }
-        author_scores[aid]["score"] += e["score"]
-        author_scores[aid]["entries"] += 1
-
-    sorted_authors = sorted(author_scores.values(), key=lambda x: (-x["score"], x.get("posted_at", "")))
-
-    result = []
-    for a in sorted_authors:
-        result.append({
-            "author_id": a["author_id"],
-            "author_name": a["author_name"],
-            "score": a["score"],
-            "entries": a["entries"],
-        })
-    return result
+def start(bot=None) -> None:
+    """Run the startup reconcile and schedule periodic ones; called from ``on_ready``."""
+    global _RECONCILE_TASK
+    if _RECONCILE_TASK is not None and not _RECONCILE_TASK.done():
+        return
+    _RECONCILE_TASK = asyncio.get_running_loop().create_task(_reconcile_loop(bot))
 
 def _make_leaderboard_embed(entries: List[Dict[str, Any]], total_channels: int, limit: int = 30) -> Dict[str, Any]:
     """Build a rich embed showing the current leaderboard."""
@@ -244,20 +400,20 @@ async def update_leaderboard_message(bot) -> Dict[str, Any]:
     msg_id = lb_cfg.get("leaderboard_message_id")
     prev_entries = lb_cfg.get("last_entries", [])
 
+    if msg_id and not _scores_changed(prev_entries, entries):
+        logger.info(f"[leaderboard] scores unchanged, skipping edit of message {msg_id}")
+        return {
+            "ok": True,
+            "entries": len(entries),
+            "message_id": msg_id,
+            "updated": False,
+            "top_score": entries[0]["score"] if entries else 0,
+        }
+
     edited = False
     if msg_id:
         try:
-            msg = await lb_channel.fetch_message(int(msg_id))
-            if not _scores_changed(prev_entries, entries):
-                logger.info(f"[leaderboard] scores unchanged, skipping edit of message {msg_id}")
-                return {
-                    "ok": True,
-                    "entries": len(entries),
-                    "message_id": msg_id,
-                    "updated": False,
-                    "top_score": entries[0]["score"] if entries else 0,
-                }
-            await msg.edit(embed=embed)
+            await lb_channel.get_partial_message(int(msg_id)).edit(embed=embed)
             edited = True
             logger.info(f"[leaderboard] updated existing message {msg_id}")
         except Exception:
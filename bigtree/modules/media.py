@@ -3,6 +3,7 @@ import os
 import time
 from typing import Dict, List, Optional
 from tinydb import TinyDB, Query
+from bigtree.inc import thumbs
 
 try:
     import bigtree
@@ -46,46 +47,40 @@ def get_media_thumbs_dir() -> str:
     os.makedirs(path, exist_ok=True)
     return path
 
-def ensure_thumb(filename: str, size: tuple[int, int] = (480, 672)) -> bool:
+def thumb_path(filename: str, variant: str = "") -> str:
+    return thumbs.thumb_path(get_media_dir(), filename, variant)
+
+def queue_thumbs(filename: str) -> None:
+    """Queue every thumb variant for a stored upload; returns immediately."""
+    if filename:
+        thumbs.get_thumbnail_pool().enqueue(get_media_dir(), filename)
+
+def ensure_thumb(filename: str, size: tuple[int, int] = thumbs.DEFAULT_SIZE) -> bool:
+    """Blocking: render the default thumb in the worker pool and wait for it.
+
+    Only for callers already off the event loop; request handlers use
+    ``aensure_thumb``.
+    """
     if not filename:
         return False
     ext = os.path.splitext(filename)[1].lower()
     if ext not in _IMG_EXTS:
         return False
-    thumb_path = os.path.join(get_media_thumbs_dir(), filename)
-    if os.path.exists(thumb_path):
-        return True
+    dest = thumb_path(filename)
     source = os.path.join(get_media_dir(), filename)
+    if thumbs.is_fresh(source, dest):
+        return True
     if not os.path.exists(source):
         return False
     try:
-        from PIL import Image
+        return bool(thumbs.get_thumbnail_pool().submit(source, dest, size).result(timeout=30))
     except Exception:
         return False
-    try:
-        with Image.open(source) as img:
-            try:
-                img.seek(0)
-            except Exception:
-                pass
-            img.thumbnail(size)
-            fmt = {
-                ".jpg": "JPEG",
-                ".jpeg": "JPEG",
-                ".png": "PNG",
-                ".gif": "GIF",
-                ".bmp": "BMP",
-                ".webp": "WEBP",
-            }.get(ext, "PNG")
-            save_kwargs = {}
-            if fmt == "JPEG":
-                if img.mode not in ("RGB", "L"):
-                    img = img.convert("RGB")
-                save_kwargs = {"quality": 82, "optimize": True, "progressive": True}
-            img.save(thumb_path, fmt, **save_kwargs)
-    except Exception:
+
+async def aensure_thumb(filename: str, variant: str = "") -> bool:
+    if not filename:
         return False
-    return True
+    return await thumbs.get_thumbnail_pool().aensure(get_media_dir(), filename, variant)
 
 def _get_db_path() -> str:
     global _MEDIA_DB_PATH
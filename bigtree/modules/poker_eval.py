@@ -0,0 +1,293 @@
+# bigtree/modules/poker_eval.py
+"""Table-driven poker hand evaluation and equity (win odds) calculation.
+
+Cards are small ints: ``rank_index * 4 + suit_index`` with ranks 2..A as
+0..12. A hand of up to seven cards is reduced to
+
+* a rank-multiset key (sum of ``5 ** rank``), looked up in a memoised
+  non-flush table, and
+* one 13-bit rank mask per suit, looked up in a flush table when a suit
+  holds five or more cards (with at most seven cards a flush can never be
+  beaten by quads or a full house, so the flush table answer is final).
+
+Scores are plain ints that compare like hands: the category sits in the
+top bits and the tie-break values (2..14) in 4-bit slots below it.
+"""
+from __future__ import annotations
+
+import itertools
+import random
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+RANKS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A")
+SUITS = ("spades", "hearts", "diamonds", "clubs")
+CATEGORIES = (
+    "high_card",
+    "pair",
+    "two_pair",
+    "three_kind",
+    "straight",
+    "flush",
+    "full_house",
+    "four_kind",
+    "straight_flush",
+)
+# tie-break values carried per category (matches the historic (score, tie) tuples)
+_TIE_LEN = (5, 4, 3, 3, 1, 5, 2, 2, 1)
+
+_RANK_INDEX = {r: i for i, r in enumerate(RANKS)}
+_RANK_INDEX.update({"T": 8, "1": 12, "14": 12, "11": 9, "12": 10, "13": 11})
+_SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+_SUIT_INDEX.update({s[0]: i for i, s in enumerate(SUITS)})
+_SUIT_INDEX.update({s[0].upper(): i for i, s in enumerate(SUITS)})
+
+DECK: Tuple[int, ...] = tuple(range(52))
+_KEY = tuple(5 ** (c >> 2) for c in DECK)
+_BIT = tuple(1 << (c >> 2) for c in DECK)
+
+
+def _pack(category: int, values: Sequence[int]) -> int:
+    score = category << 20
+    for i, v in enumerate(values):
+        score |= v << (16 - 4 * i)
+    return score
+
+
+def _build_straights() -> List[int]:
+    table = [0] * 8192
+    windows = [(0b11111 << (hi - 4), hi + 2) for hi in range(12, 3, -1)]
+    windows.append(((1 << 12) | 0b1111, 5))  # wheel: A-2-3-4-5
+    for mask in range(8192):
+        for window, high in windows:
+            if mask & window == window:
+                table[mask] = high
+                break
+    return table
+
+
+_STRAIGHT_HIGH = _build_straights()
+_POPCOUNT = bytes(bin(m).count("1") for m in range(8192))
+
+
+def _build_flushes() -> List[int]:
+    table = [0] * 8192
+    for mask in range(8192):
+        if _POPCOUNT[mask] < 5:
+            continue
+        high = _STRAIGHT_HIGH[mask]
+        if high:
+            table[mask] = _pack(8, (high,))
+        else:
+            top = [r + 2 for r in range(12, -1, -1) if mask & (1 << r)][:5]
+            table[mask] = _pack(5, top)
+    return table
+
+
+_FLUSH = _build_flushes()
+# rank-multiset key -> score, filled on first sight (at most ~50k distinct 7-card keys)
+_NOFLUSH: Dict[int, int] = {}
+
+
+def _noflush_score(key: int) -> int:
+    counts = []
+    for _ in range(13):
+        key, c = divmod(key, 5)
+        counts.append(c)
+    present = [r for r in range(12, -1, -1) if counts[r]]
+    quads = [r for r in present if counts[r] == 4]
+    trips = [r for r in present if counts[r] == 3]
+    pairs = [r for r in present if counts[r] == 2]
+    if quads:
+        q = quads[0]
+        return _pack(7, (q + 2, next(r for r in present if r != q) + 2))
+    if trips and (len(trips) > 1 or pairs):
+        t = trips[0]
+        return _pack(6, (t + 2, max(trips[1:] + pairs) + 2))
+    high = _STRAIGHT_HIGH[sum(1 << r for r in present)]
+    if high:
+        return _pack(4, (high,))
+    if trips:
+        t = trips[0]
+        return _pack(3, [t + 2] + [r + 2 for r in present if r != t][:2])
+    if len(pairs) >= 2:
+        p1, p2 = pairs[0], pairs[1]
+        kicker = next(r for r in present if r not in (p1, p2))
+        return _pack(2, (p1 + 2, p2 + 2, kicker + 2))
+    if pairs:
+        p = pairs[0]
+        return _pack(1, [p + 2] + [r + 2 for r in present if r != p][:3])
+    return _pack(0, [r + 2 for r in present[:5]])
+
+
+def _score(key: int, m0: int, m1: int, m2: int, m3: int) -> int:
+    pop = _POPCOUNT
+    if pop[m0] >= 5:
+        return _FLUSH[m0]
+    if pop[m1] >= 5:
+        return _FLUSH[m1]
+    if pop[m2] >= 5:
+        return _FLUSH[m2]
+    if pop[m3] >= 5:
+        return _FLUSH[m3]
+    score = _NOFLUSH.get(key)
+    if score is None:
+        score = _NOFLUSH[key] = _noflush_score(key)
+    return score
+
+
+def _fold(cards: Iterable[int]) -> Tuple[int, List[int]]:
+    key = 0
+    masks = [0, 0, 0, 0]
+    for c in cards:
+        key += _KEY[c]
+        masks[c & 3] |= _BIT[c]
+    return key, masks
+
+
+# ---------------- public API ----------------
+def encode_card(card: Any) -> Optional[int]:
+    """Int code for a card dict (``rank``/``suit``) or a short code like ``"10H"``; None if unknown."""
+    if isinstance(card, int):
+        return card if 0 <= card < 52 else None
+    if isinstance(card, dict):
+        rank, suit = str(card.get("rank") or ""), str(card.get("suit") or "")
+    else:
+        text = str(card or "").strip()
+        rank, suit = text[:-1], text[-1:]
+    r = _RANK_INDEX.get(rank.upper() if len(rank) == 1 else rank)
+    s = _SUIT_INDEX.get(suit) if suit in _SUIT_INDEX else _SUIT_INDEX.get(suit.lower())
+    if r is None or s is None:
+        return None
+    return r * 4 + s
+
+
+def encode_cards(cards: Iterable[Any]) -> Optional[List[int]]:
+    out: List[int] = []
+    for card in cards:
+        code = encode_card(card)
+        if code is None:
+            return None
+        out.append(code)
+    return out
+
+
+def evaluate(cards: Sequence[int]) -> int:
+    """Score of the best five-card hand within 5..7 encoded cards."""
+    key, masks = _fold(cards)
+    return _score(key, *masks)
+
+
+def category(score: int) -> str:
+    return CATEGORIES[score >> 20]
+
+
+def describe(score: int) -> Tuple[str, Tuple[int, List[int]]]:
+    """``(category name, (category index, tie-break values))`` for a score."""
+    cat = score >> 20
+    ties = [(score >> (16 - 4 * i)) & 0xF for i in range(_TIE_LEN[cat])]
+    return CATEGORIES[cat], (cat, ties)
+
+
+def equity(
+    hands: Sequence[Sequence[int]],
+    board: Sequence[int] = (),
+    *,
+    random_opponents: int = 0,
+    trials: int = 20000,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Win/tie probability for each known two-card hand.
+
+    ``board`` holds the community cards dealt so far. ``random_opponents``
+    unseen hands are dealt from the remaining deck each trial and count as
+    rivals. When at most two unknown cards are in play (turn/river heads-up,
+    or one random opponent on the river) every deal is enumerated and the
+    result is exact; otherwise it is a Monte Carlo estimate over ``trials``
+    deals.
+    """
+    hands = [list(h) for h in hands]
+    board = list(board)
+    used = set(board)
+    for h in hands:
+        used.update(h)
+    if len(used) != len(board) + sum(len(h) for h in hands):
+        raise ValueError("duplicate cards")
+    deck = [c for c in DECK if c not in used]
+    missing = 5 - len(board)
+    if missing < 0:
+        raise ValueError("board has more than five cards")
+    draw = missing + 2 * max(0, int(random_opponents))
+    if draw > len(deck):
+        raise ValueError("not enough cards left")
+
+    bases = []
+    board_key, board_masks = _fold(board)
+    for h in hands:
+        key, masks = _fold(h)
+        bases.append((key + board_key, [masks[i] | board_masks[i] for i in range(4)]))
+    n = len(hands)
+    wins = [0] * n
+    ties = [0.0] * n
+    KEY, BIT, score_of = _KEY, _BIT, _score
+
+    # With two or fewer cards to draw the board/opponent split is unambiguous.
+    exact = draw <= 2
+    if exact:
+        deals: Iterable[Sequence[int]] = itertools.combinations(deck, draw)
+    else:
+        rng = random.Random(seed)
+        sample = rng.sample
+        deals = (sample(deck, draw) for _ in range(max(1, int(trials))))
+
+    total = 0
+    for dealt in deals:
+        total += 1
+        dk = 0
+        d0 = d1 = d2 = d3 = 0
+        for c in dealt[:missing]:
+            dk += KEY[c]
+            s = c & 3
+            if s == 0:
+                d0 |= BIT[c]
+            elif s == 1:
+                d1 |= BIT[c]
+            elif s == 2:
+                d2 |= BIT[c]
+            else:
+                d3 |= BIT[c]
+        scores = [
+            score_of(key + dk, m[0] | d0, m[1] | d1, m[2] | d2, m[3] | d3)
+            for key, m in bases
+        ]
+        best = max(scores)
+        # unseen opponents: two random cards each plus the full board
+        opp_best = opp_count = 0
+        for i in range(missing, draw, 2):
+            a, b = dealt[i], dealt[i + 1]
+            masks = [board_masks[0] | d0, board_masks[1] | d1, board_masks[2] | d2, board_masks[3] | d3]
+            masks[a & 3] |= BIT[a]
+            masks[b & 3] |= BIT[b]
+            opp = score_of(board_key + dk + KEY[a] + KEY[b], *masks)
+            if opp > opp_best:
+                opp_best, opp_count = opp, 1
+            elif opp == opp_best:
+                opp_count += 1
+        if opp_best > best:
+            continue
+        top = [i for i, s in enumerate(scores) if s == best]
+        sharers = len(top) + (opp_count if opp_best == best else 0)
+        if sharers == 1:
+            wins[top[0]] += 1
+        else:
+            for i in top:
+                ties[i] += 1.0 / sharers
+
+    total = max(1, total)
+    return {
+        "hands": [
+            {"win": wins[i] / total, "tie": ties[i] / total, "lose": 1.0 - (wins[i] + ties[i]) / total}
+            for i in range(n)
+        ],
+        "trials": total,
+        "exact": exact,
+    }
@@ -0,0 +1,161 @@
+# bigtree/modules/runtime_config.py
+"""In-memory snapshot of the settings the per-message Discord listeners read.
+
+``on_message`` handlers run for every guild message on the gateway loop, so
+they read a frozen :class:`RuntimeConfig` instead of the settings stores.
+Writers call :func:`invalidate`; the snapshot is then rebuilt off the hot
+path (store reads run in a worker thread) and swapped in with a new
+``version``. A periodic refresh picks up changes made by other processes.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
+
+import bigtree
+
+log = logging.getLogger("bigtree.modules.runtime_config")
+
+PRIEST_ROLE_NAME = "Priest/ess"
+TREEHEART_EMOJI = "<:treeheart:1321831300088463452>"
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    version: int = 0
+    upload_channel_id: Optional[int] = None
+    contest_channel_ids: FrozenSet[int] = field(default_factory=frozenset)
+    priest_role_name: str = PRIEST_ROLE_NAME
+    # resolved from the guild's roles; None falls back to matching by name
+    priest_role_id: Optional[int] = None
+    treeheart_emoji: str = TREEHEART_EMOJI
+    treeheart_chance: float = 0.5
+
+
+_CURRENT = RuntimeConfig()
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_REFRESH_TASK: Optional[asyncio.Task] = None
+_PERIODIC_TASK: Optional[asyncio.Task] = None
+_DIRTY = False
+
+
+def _setting(key: str, default, cast):
+    settings = getattr(bigtree, "settings", None)
+    if not settings:
+        return default
+    try:
+        val = settings.get(f"BOT.{key}", default, cast=cast)
+    except Exception:
+        return default
+    return default if val in (None, "") else val
+
+
+def _read_upload_channel_id() -> Optional[int]:
+    from bigtree.modules import gallery as gallery_mod
+
+    return gallery_mod.get_upload_channel_id()
+
+
+def _resolve_priest_role_id(name: str) -> Optional[int]:
+    bot = getattr(bigtree, "bot", None)
+    guilds = getattr(bot, "guilds", None) or []
+    if not guilds:
+        return None
+    for role in getattr(guilds[0], "roles", []) or []:
+        if role.name == name:
+            return int(role.id)
+    return None
+
+
+async def _build(version: int) -> RuntimeConfig:
+    try:
+        upload_channel_id = await asyncio.to_thread(_read_upload_channel_id)
+    except Exception as exc:
+        log.warning("upload channel lookup failed, keeping %s: %s", _CURRENT.upload_channel_id, exc)
+        upload_channel_id = _CURRENT.upload_channel_id
+    contest_ids = frozenset(int(c) for c in (getattr(bigtree, "contestid", None) or []))
+    priest_role_name = str(_setting("priest_role_name", PRIEST_ROLE_NAME, str))
+    try:
+        chance = float(_setting("treeheart_chance", 0.5, float))
+    except Exception:
+        chance = 0.5
+    return RuntimeConfig(
+        version=version,
+        upload_channel_id=upload_channel_id,
+        contest_channel_ids=contest_ids,
+        priest_role_name=priest_role_name,
+        priest_role_id=_resolve_priest_role_id(priest_role_name),
+        treeheart_emoji=str(_setting("treeheart_emoji", TREEHEART_EMOJI, str)),
+        treeheart_chance=min(1.0, max(0.0, chance)),
+    )
+
+
+async def refresh() -> RuntimeConfig:
+    """Rebuild the snapshot now and return it."""
+    global _CURRENT, _DIRTY, _LOOP
+    _LOOP = asyncio.get_running_loop()
+    _DIRTY = False
+    snap = await _build(_CURRENT.version + 1)
+    _CURRENT = snap
+    log.debug("runtime config v%s: upload=%s contests=%s", snap.version, snap.upload_channel_id, len(snap.contest_channel_ids))
+    _ensure_periodic()
+    return snap
+
+
+def _schedule_refresh() -> None:
+    global _REFRESH_TASK
+    if _REFRESH_TASK is not None and not _REFRESH_TASK.done():
+        # A refresh in flight may have read the old values; run once more after it.
+        _REFRESH_TASK.add_done_callback(lambda _t: _DIRTY and _schedule_refresh())
+        return
+    _REFRESH_TASK = asyncio.get_running_loop().create_task(refresh())
+
+
+def invalidate() -> None:
+    """Mark the snapshot stale after a settings change; safe from any thread."""
+    global _DIRTY
+    _DIRTY = True
+    loop = _LOOP
+    if loop is None or loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        _schedule_refresh()
+    else:
+        loop.call_soon_threadsafe(_schedule_refresh)
+
+
+def snapshot() -> RuntimeConfig:
+    """The current snapshot; never does I/O (may be the defaults before the first refresh)."""
+    return _CURRENT
+
+
+async def current() -> RuntimeConfig:
+    """The current snapshot, loading it first if it was never built."""
+    if _CURRENT.version == 0:
+        if _REFRESH_TASK is None or _REFRESH_TASK.done():
+            _schedule_refresh()
+        return await asyncio.shield(_REFRESH_TASK)
+    return _CURRENT
+
+
+def _ensure_periodic() -> None:
+    global _PERIODIC_TASK
+    if _PERIODIC_TASK is not None and not _PERIODIC_TASK.done():
+        return
+    _PERIODIC_TASK = asyncio.get_running_loop().create_task(_periodic())
+
+
+async def _periodic() -> None:
+    while True:
+        interval = _setting("config_refresh_seconds", 60, int)
+        await asyncio.sleep(max(5, int(interval)))
+        try:
+            await refresh()
+        except Exception as exc:
+            log.warning("runtime config refresh failed: %s", exc)
@@ -2,7 +2,9 @@
 """Slot machine management module."""
 from __future__ import annotations
 import logging
+import random
 from psycopg2.extras import Json
+from bigtree.inc.cache import TTLCache
 from bigtree.inc.database import get_database
 
 log = logging.getLogger("bigtree.modules.slots")
@@ -33,6 +35,7 @@ def create_slot_machine(machine_id: str, name: str = None, reel_count: int = 3,
         RETURNING machine_id, name, reel_count, metadata, payload
     """
     row = db._fetchone(query, (machine_id, name or machine_id, reel_count, Json(metadata), Json(payload)))
+    invalidate_machine(machine_id)
     if not row:
         return None
     return {
@@ -99,6 +102,7 @@ def update_slot_machine(machine_id: str, name: str = None, reel_count: int = Non
         RETURNING machine_id, name, reel_count, metadata, payload
     """
     row = db._fetchone(query, (current["name"], current["reel_count"], Json(current["metadata"]), Json(current["payload"]), machine_id))
+    invalidate_machine(machine_id)
     if not row:
         return None
     return {
@@ -115,6 +119,7 @@ def delete_slot_machine(machine_id: str) -> bool:
     db = get_database()
     query = "DELETE FROM slot_machines WHERE machine_id = %s"
     db._execute(query, (machine_id,))
+    invalidate_machine(machine_id)
     return True
 
 
@@ -158,3 +163,253 @@ def update_paylines(machine_id: str, paylines: list[dict]) -> dict | None:
     payload["paylines"] = paylines
     
     return update_slot_machine(machine_id, payload=payload)
+
+
+# ---------------- spin engine ----------------
+# Built-in machine used by slots sessions that don't name a configured machine.
+DEFAULT_MACHINE = {
+    "machine_id": "",
+    "name": "Classic",
+    "reel_count": 3,
+    "metadata": {"rows": 3},
+    "payload": {
+        "symbols": [
+            {"symbol_id": "cherry", "name": "Cherry", "weight": 30, "payout": 2, "pays": {"2": 1}},
+            {"symbol_id": "lemon", "name": "Lemon", "weight": 25, "payout": 3},
+            {"symbol_id": "bar", "name": "Bar", "weight": 20, "payout": 5},
+            {"symbol_id": "seven", "name": "Seven", "weight": 15, "payout": 10},
+            {"symbol_id": "diamond", "name": "Diamond", "weight": 10, "payout": 15},
+        ],
+        "paylines": [],
+    },
+}
+# Symbol weight when a symbol only carries a rarity.
+RARITY_WEIGHTS = {"common": 40, "uncommon": 25, "rare": 10, "epic": 5, "legendary": 3}
+MACHINE_CACHE_TTL = 300.0
+
+_MACHINES = TTLCache(maxsize=64, ttl=MACHINE_CACHE_TTL)
+_RNG = random.Random()
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(1) weighted sampling after O(n) setup."""
+
+    __slots__ = ("n", "prob", "alias")
+
+    def __init__(self, weights: list[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("weights must contain a positive value")
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng: random.Random) -> int:
+        u = rng.random() * self.n
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+
+class CompiledMachine:
+    """A slot machine config flattened into index tables for fast spins.
+
+    The grid is ``rows x reels`` in row-major order; symbols are referred to
+    by index and paylines are tuples of grid cells.
+    """
+
+    def __init__(self, machine: dict):
+        metadata = machine.get("metadata") or {}
+        payload = machine.get("payload") or {}
+        self.machine_id = str(machine.get("machine_id") or "")
+        self.name = machine.get("name") or self.machine_id
+        self.reels = max(1, int(machine.get("reel_count") or 3))
+        self.rows = max(1, int(metadata.get("rows") or 3))
+        ids, names, weights, full, partial = [], [], [], [], []
+        for sym in payload.get("symbols") or []:
+            if not isinstance(sym, dict):
+                continue
+            weight = _symbol_weight(sym)
+            if weight <= 0:
+                continue
+            ids.append(str(sym.get("symbol_id") or sym.get("name") or len(ids)))
+            names.append(str(sym.get("name") or ids[-1]))
+            weights.append(weight)
+            full.append(_as_number(sym.get("payout")))
+            pays = {}
+            for count, mult in (sym.get("pays") or {}).items():
+                try:
+                    pays[int(count)] = _as_number(mult)
+                except (TypeError, ValueError):
+                    continue
+            partial.append(pays)
+        if not ids:
+            raise ValueError("slot machine has no symbols")
+        self.symbol_ids = tuple(ids)
+        self.names = dict(zip(ids, names))
+        self.weights = tuple(weights)
+        self.full_pay = tuple(full)
+        # (symbol index, count on a line, multiplier) for partial-line pays like "two cherries"
+        self.partial_rules = tuple(
+            sorted(
+                ((idx, count, mult) for idx, pays in enumerate(partial) for count, mult in pays.items() if mult > 0),
+                key=lambda rule: -rule[2],
+            )
+        )
+        self._cells = range(self.rows * self.reels)
+        self.table = AliasTable(weights)
+        self.paylines = tuple(self._compile_paylines(payload.get("paylines") or []))
+
+    def _compile_paylines(self, paylines: list) -> list[tuple[str, tuple[int, ...], float]]:
+        out = []
+        for idx, line in enumerate(paylines):
+            try:
+                cells = _payline_cells(line, self.rows, self.reels)
+            except (TypeError, ValueError):
+                cells = None
+            if not cells:
+                log.warning("[slots] skipping invalid payline %s on %s", idx, self.machine_id or "default")
+                continue
+            name = str(line.get("name") or line.get("payline_id") or f"line {idx + 1}") if isinstance(line, dict) else f"line {idx + 1}"
+            mult = _as_number(line.get("multiplier"), 1) if isinstance(line, dict) else 1
+            out.append((name, cells, mult))
+        if not out:
+            for row in range(self.rows):
+                out.append((f"row {row + 1}", tuple(row * self.reels + col for col in range(self.reels)), 1))
+        return out
+
+    def roll(self, rng: random.Random | None = None) -> tuple[list[int], float, list[float]]:
+        """Raw spin: ``(grid of symbol indexes, total multiplier, per-line multipliers)``."""
+        rnd = (rng or _RNG).random
+        n, prob, alias = self.table.n, self.table.prob, self.table.alias
+        grid = [
+            i if u - i < prob[i] else alias[i]
+            for u in [rnd() * n for _ in self._cells]
+            for i in (int(u),)
+        ]
+        full, rules = self.full_pay, self.partial_rules
+        total = 0
+        line_mults = []
+        for _name, cells, line_mult in self.paylines:
+            line = [grid[c] for c in cells]
+            if line.count(line[0]) == len(line):
+                mult = full[line[0]] * line_mult
+            else:
+                mult = 0
+                for sym, count, pay in rules:
+                    if pay > mult and line.count(sym) == count:
+                        mult = pay
+                mult *= line_mult
+            line_mults.append(mult)
+            total += mult
+        return grid, total, line_mults
+
+    def spin(self, bet: int, rng: random.Random | None = None) -> dict:
+        """Spin once; returns the reel grid, per-line results and the payout."""
+        grid, total, line_mults = self.roll(rng)
+        ids = self.symbol_ids
+        results = [
+            {"name": name, "line": [ids[grid[c]] for c in cells], "multiplier": mult}
+            for (name, cells, _m), mult in zip(self.paylines, line_mults)
+        ]
+        return {
+            "reels": [ids[s] for s in grid],
+            "rows": results,
+            "multiplier": total,
+            "payout": int(bet * total),
+        }
+
+
+def _as_number(value, default: float = 0) -> float:
+    try:
+        num = float(value)
+    except (TypeError, ValueError):
+        return default
+    return int(num) if num.is_integer() else num
+
+
+def _symbol_weight(sym: dict) -> float:
+    weight = _as_number(sym.get("weight"), 0)
+    if weight > 0:
+        return weight
+    return RARITY_WEIGHTS.get(str(sym.get("rarity") or "common").strip().lower(), RARITY_WEIGHTS["common"])
+
+
+def _payline_cells(line, rows: int, reels: int) -> tuple[int, ...] | None:
+    """Grid cells for a payline given as ``cells`` ([row, col] pairs or flat
+    indexes) or as ``rows`` / a ``"0,1,2"`` pattern (row index per reel)."""
+    if isinstance(line, dict):
+        spec = line.get("cells") or line.get("positions")
+        if spec is None:
+            spec = line.get("rows") or line.get("pattern")
+            line = spec
+        else:
+            cells = []
+            for cell in spec:
+                if isinstance(cell, (list, tuple)) and len(cell) == 2:
+                    row, col = int(cell[0]), int(cell[1])
+                    if not (0 <= row < rows and 0 <= col < reels):
+                        return None
+                    cells.append(row * reels + col)
+                else:
+                    idx = int(cell)
+                    if not 0 <= idx < rows * reels:
+                        return None
+                    cells.append(idx)
+            return tuple(cells) or None
+    if isinstance(line, str):
+        line = [p for p in line.replace(" ", "").split(",") if p]
+    if not isinstance(line, (list, tuple)) or len(line) != reels:
+        return None
+    try:
+        row_per_reel = [int(r) for r in line]
+    except (TypeError, ValueError):
+        return None
+    if any(not 0 <= r < rows for r in row_per_reel):
+        return None
+    return tuple(r * reels + col for col, r in enumerate(row_per_reel))
+
+
+def get_compiled_machine(machine_id: str | None = None) -> CompiledMachine:
+    """Compiled machine for ``machine_id`` (cached), or the built-in default."""
+    key = str(machine_id or "").strip()
+    hit, compiled = _MACHINES.get(key)
+    if hit:
+        return compiled
+    compiled = None
+    if key:
+        try:
+            machine = get_slot_machine(key)
+            if machine:
+                compiled = CompiledMachine(machine)
+        except Exception as exc:
+            log.warning("[slots] failed to compile machine %s: %s", key, exc)
+    if compiled is None:
+        # Only the default itself is cached: a machine that failed to load
+        # (or is not configured yet) is looked up again on the next spin.
+        hit, compiled = _MACHINES.get("")
+        if not hit:
+            compiled = CompiledMachine(DEFAULT_MACHINE)
+            _MACHINES.set("", compiled)
+        return compiled
+    _MACHINES.set(key, compiled)
+    return compiled
+
+
+def invalidate_machine(machine_id: str | None = None) -> None:
+    """Drop a compiled machine (or all of them) after its config changed."""
+    if machine_id is None:
+        _MACHINES.clear()
+    else:
+        _MACHINES.pop(str(machine_id).strip())
@@ -16,6 +16,13 @@ try:
 except Exception:
     bigtree = None
 
+try:
+    from psycopg2.extras import Json
+    from bigtree.inc.database import get_database
+except Exception:
+    Json = None
+    get_database = None
+
 try:
     from bigtree.inc.logging import logger
 except Exception:
@@ -32,6 +39,9 @@ _PLAYING_TEMPLATE_DECK_ID = "playing-template"
 _DECK_PURPOSES = {"tarot", "playing"}
 _DEFAULT_CARD_LIMIT = 2
 _SEED_CACHE: Optional[Dict[str, Any]] = None
+# Bumped on every deck file write/delete in this process; public deck
+# responses are cached against it.
+_DECKS_VERSION = 0
 
 def _now() -> float:
     return time.time()
@@ -167,13 +177,18 @@ def _read_deck_file(path: str) -> Optional[Dict[str, Any]]:
         return None
     return None
 
+def decks_version() -> int:
+    return _DECKS_VERSION
+
 def _write_deck_file(path: str, payload: Dict[str, Any]) -> None:
+    global _DECKS_VERSION
     os.makedirs(os.path.dirname(path), exist_ok=True)
     tmp = f"{path}.tmp"
     text = _json.dumps(payload, ensure_ascii=True, indent=2)
     with open(tmp, "w", encoding="utf-8") as fh:
         fh.write(text)
     os.replace(tmp, path)
+    _DECKS_VERSION += 1
 
 def _normalize_deck_file_data(data: Any) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
     if not isinstance(data, dict):
@@ -299,9 +314,12 @@ def _migrate_decks_to_files() -> None:
             return
     _DECKS_MIGRATED = True
 
-def _db_sessions() -> TinyDB:
-    _migrate_if_needed()
-    return TinyDB(_get_session_db_path())
+def _db():
+    # Sessions live in Postgres (tarot_sessions + tarot_session_events); the
+    # legacy tarot_sessions.json file is imported once by Database.initialize().
+    if not get_database:
+        raise RuntimeError("database unavailable")
+    return get_database()
 
 def _new_id() -> str:
     return secrets.token_urlsafe(10)
@@ -820,6 +838,7 @@ def get_deck_bundle(deck_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[s
     return deck, cards or []
 
 def delete_deck(deck_id: str) -> bool:
+    global _DECKS_VERSION
     deck_id = (deck_id or "").strip()
     if not deck_id:
         return False
@@ -830,6 +849,7 @@ def delete_deck(deck_id: str) -> bool:
         os.remove(path)
     except Exception:
         return False
+    _DECKS_VERSION += 1
     return True
 
 def update_deck(
@@ -1140,14 +1160,48 @@ def mark_card_done(deck_id: str, card_id: str, user_id: int, user_name: str, for
     return True, "Card marked done."
 
 # -------- Sessions --------
+_SESSION_COLUMNS = """
+    session_id, join_code, priestess_id, priestess_token, deck_id, spread_id, status, state, event_seq,
+    EXTRACT(EPOCH FROM created_at) AS created_at
+"""
+_STATE_KEYS = ("spread_positions", "participants", "draw", "narration")
+
+def _session_from_row(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    state = row.get("state")
+    if isinstance(state, str):
+        try:
+            state = _json.loads(state)
+        except Exception:
+            state = {}
+    if not isinstance(state, dict):
+        state = {}
+    session = {
+        "_type": "session",
+        "session_id": row.get("session_id"),
+        "join_code": row.get("join_code"),
+        "priestess_id": row.get("priestess_id"),
+        "priestess_token": row.get("priestess_token"),
+        "deck_id": row.get("deck_id"),
+        "spread_id": row.get("spread_id"),
+        "status": row.get("status"),
+        "event_seq": int(row.get("event_seq") or 0),
+        "created_at": float(row.get("created_at") or 0),
+    }
+    for key in _STATE_KEYS:
+        value = state.get(key)
+        session[key] = value if isinstance(value, list) else []
+    return session
+
+def _session_state(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: session.get(key) or [] for key in _STATE_KEYS}
+
 def list_sessions() -> List[Dict[str, Any]]:
-    db = _db_sessions(); q = Query()
-    sessions = db.search(q._type == "session")
-    sessions.sort(key=lambda s: float(s.get("created_at") or 0), reverse=True)
-    return sessions
+    rows = _db()._fetchall(f"SELECT {_SESSION_COLUMNS} FROM tarot_sessions ORDER BY created_at DESC")
+    return [_session_from_row(r) for r in rows]
 
 def create_session(priestess_id: int, deck_id: str, spread_id: str) -> Dict[str, Any]:
-    db = _db_sessions()
     session_id = _new_id()
     join_code = _new_code()
     priestess_token = _new_id()
@@ -1166,17 +1220,36 @@ def create_session(priestess_id: int, deck_id: str, spread_id: str) -> Dict[str,
         "draw": [],
         "narration": [],
         "event_seq": 0,
-        "events": [],
         "created_at": _now(),
     }
-    db.insert(session)
+    _db()._execute(
+        """
+        INSERT INTO tarot_sessions (session_id, join_code, priestess_id, priestess_token, deck_id, spread_id,
+                                    status, state, event_seq, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0, to_timestamp(%s), to_timestamp(%s))
+        """,
+        (
+            session_id,
+            join_code,
+            session["priestess_id"],
+            priestess_token,
+            session["deck_id"],
+            session["spread_id"],
+            session["status"],
+            Json(_session_state(session)),
+            session["created_at"],
+            session["created_at"],
+        ),
+    )
     _add_event(session, "SESSION_CREATED", {"session_id": session_id})
     logger.info(f"[tarot] Session created {session_id} join={join_code}")
     return session
 
 def _get_session_by(field: str, value: str) -> Optional[Dict[str, Any]]:
-    db = _db_sessions(); q = Query()
-    return db.get((q._type == "session") & (getattr(q, field) == value))
+    if field not in ("session_id", "join_code") or not value:
+        return None
+    row = _db()._fetchone(f"SELECT {_SESSION_COLUMNS} FROM tarot_sessions WHERE {field} = %s LIMIT 1", (value,))
+    return _session_from_row(row)
 
 def get_session_by_id(session_id: str) -> Optional[Dict[str, Any]]:
     return _get_session_by("session_id", session_id)
@@ -1185,21 +1258,79 @@ def get_session_by_join_code(join_code: str) -> Optional[Dict[str, Any]]:
     return _get_session_by("join_code", join_code)
 
 def _update_session(session_id: str, session: Dict[str, Any]) -> None:
-    db = _db_sessions(); q = Query()
-    db.update(session, (q._type == "session") & (q.session_id == session_id))
-
-def _add_event(session: Dict[str, Any], event_type: str, data: Dict[str, Any]) -> None:
-    seq = int(session.get("event_seq", 0)) + 1
+    # event_seq is owned by _add_event and deliberately not written here.
+    _db()._execute(
+        """
+        UPDATE tarot_sessions
+        SET status = %s, deck_id = %s, spread_id = %s, state = %s, updated_at = CURRENT_TIMESTAMP
+        WHERE session_id = %s
+        """,
+        (session.get("status"), session.get("deck_id"), session.get("spread_id"), Json(_session_state(session)), session_id),
+    )
+
+# Callbacks invoked as fn(session_id, event) after an event row is written;
+# event is None when the session was deleted. Used by the web layer to push
+# events to live streams without polling.
+_EVENT_LISTENERS: List[Callable[[str, Optional[Dict[str, Any]]], None]] = []
+
+def add_event_listener(fn: Callable[[str, Optional[Dict[str, Any]]], None]) -> None:
+    if fn not in _EVENT_LISTENERS:
+        _EVENT_LISTENERS.append(fn)
+
+def _emit_event(session_id: str, event: Optional[Dict[str, Any]]) -> None:
+    for fn in list(_EVENT_LISTENERS):
+        try:
+            fn(session_id, event)
+        except Exception as exc:
+            logger.debug("[tarot] event listener failed: %s", exc)
+
+def _add_event(session: Dict[str, Any], event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    ts = _now()
+    row = _db()._fetchone(
+        """
+        WITH bump AS (
+            UPDATE tarot_sessions
+            SET event_seq = event_seq + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE session_id = %s
+            RETURNING session_id, event_seq
+        )
+        INSERT INTO tarot_session_events (session_id, seq, ts, type, data)
+        SELECT session_id, event_seq, to_timestamp(%s), %s, %s FROM bump
+        RETURNING seq
+        """,
+        (session["session_id"], ts, event_type, Json(data or {})),
+    )
+    seq = int(row.get("seq") or 0) if row else int(session.get("event_seq", 0)) + 1
     session["event_seq"] = seq
-    ev = {"seq": seq, "ts": _now(), "type": event_type, "data": data}
-    session.setdefault("events", []).append(ev)
-    _update_session(session["session_id"], session)
+    event = {"seq": seq, "ts": ts, "type": event_type, "data": data}
+    _emit_event(session["session_id"], event)
+    return event
 
 def list_events(session_id: str, since_seq: int) -> List[Dict[str, Any]]:
-    s = get_session_by_id(session_id)
-    if not s:
-        return []
-    return [e for e in s.get("events", []) if int(e.get("seq", 0)) > since_seq]
+    rows = _db()._fetchall(
+        """
+        SELECT seq, EXTRACT(EPOCH FROM ts) AS ts, type, data
+        FROM tarot_session_events
+        WHERE session_id = %s AND seq > %s
+        ORDER BY seq ASC
+        """,
+        (session_id, int(since_seq or 0)),
+    )
+    out = []
+    for r in rows:
+        payload = r.get("data")
+        if isinstance(payload, str):
+            try:
+                payload = _json.loads(payload)
+            except Exception:
+                payload = {}
+        out.append({
+            "seq": int(r.get("seq") or 0),
+            "ts": float(r.get("ts") or 0),
+            "type": r.get("type"),
+            "data": payload if isinstance(payload, dict) else {},
+        })
+    return out
 
 def join_session(join_code: str, viewer_id: Optional[int] = None) -> Dict[str, Any]:
     s = get_session_by_join_code(join_code)
@@ -1271,6 +1402,7 @@ def draw_cards(session_id: str, token: str, count: int = 1, position_id: Optiona
     random.shuffle(remaining)
     to_draw = remaining[:count]
 
+    drawn = []
     for idx, card in enumerate(to_draw):
         pos = open_positions[idx]
         entry = {
@@ -1281,9 +1413,12 @@ def draw_cards(session_id: str, token: str, count: int = 1, position_id: Optiona
             "revealed_at": None,
         }
         s.setdefault("draw", []).append(entry)
-        _add_event(s, "CARD_DRAWN", {"position_id": pos, "card_id": entry["card_id"], "reversed": entry["reversed"]})
+        drawn.append(entry)
 
+    # Persist the draw before announcing it so listeners re-reading state see the cards.
     _update_session(session_id, s)
+    for entry in drawn:
+        _add_event(s, "CARD_DRAWN", {"position_id": entry["position_id"], "card_id": entry["card_id"], "reversed": entry["reversed"]})
     return s
 
 def reveal(session_id: str, token: str, mode: str = "next", position_id: Optional[str] = None) -> Dict[str, Any]:
@@ -1292,13 +1427,14 @@ def reveal(session_id: str, token: str, mode: str = "next", position_id: Optiona
         raise ValueError("not found")
     _require_priestess(s, token)
     draw = s.get("draw", [])
+    revealed: List[str] = []
 
     def _reveal_entry(entry: Dict[str, Any]) -> None:
         if entry.get("revealed"):
             return
         entry["revealed"] = True
         entry["revealed_at"] = _now()
-        _add_event(s, "CARD_REVEALED", {"position_id": entry["position_id"]})
+        revealed.append(entry["position_id"])
 
     if mode == "all":
         for entry in draw:
@@ -1315,6 +1451,8 @@ def reveal(session_id: str, token: str, mode: str = "next", position_id: Optiona
                 break
 
     _update_session(session_id, s)
+    for pos in revealed:
+        _add_event(s, "CARD_REVEALED", {"position_id": pos})
     return s
 
 def add_narration(session_id: str, token: str, text: str, style: Optional[str] = None) -> Dict[str, Any]:
@@ -1412,8 +1550,8 @@ def delete_session(session_id: str, token: str) -> bool:
     if not s:
         return False
     _require_priestess(s, token)
-    db = _db_sessions(); q = Query()
-    db.remove((q._type == "session") & (q.session_id == session_id))
+    _db()._execute("DELETE FROM tarot_sessions WHERE session_id = %s", (session_id,))
+    _emit_event(session_id, None)
     return True
 
 def draw_cards_legacy(sid: str, count: int = 1) -> List[Dict[str, Any]]:
@@ -82,12 +82,56 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
 
+  let lastCard = null;
+  let lastState = null;
   async function tick(){
     const [card, state] = await Promise.all([fetchCard(), fetchState()]);
+    lastCard = card;
+    lastState = state;
     render(card, state);
   }
-  setInterval(tick, 1500);
-  tick();
+
+  // Fold a pushed event into the last state; only the called numbers and
+  // the game's end matter on this page, everything else is ignored.
+  function applyEvent(ev){
+    if (ev.type === 'STATE'){
+      lastState = ev.state;
+      return true;
+    }
+    const g = lastState && lastState.game;
+    if (!g) return false;
+    if (ev.type === 'CALL'){
+      g.called = ev.called || g.called;
+      g.last_called = ev.number;
+    } else if (ev.type === 'ENDED' || ev.type === 'GAME_GONE'){
+      g.active = false;
+    } else {
+      return false;
+    }
+    return true;
+  }
+
+  // Live updates: the stream pushes every call/claim/stage/pot change, so
+  // polling only remains as a slow fallback while it is connected.
+  let stream = null;
+  function startStream(){
+    if (stream || !game || !window.EventSource) return;
+    stream = new EventSource(`/bingo/${encodeURIComponent(game)}/stream`);
+    stream.onmessage = (msg) => {
+      let ev = null;
+      try { ev = JSON.parse(msg.data); } catch (e) { return; }
+      if (ev && applyEvent(ev) && lastCard) render(lastCard, lastState);
+    };
+  }
+  function pollDelay(){
+    return stream && stream.readyState !== EventSource.CLOSED ? 30000 : 1500;
+  }
+  async function loop(){
+    try { await tick(); } catch (e) {}
+    setTimeout(loop, pollDelay());
+  }
+  startStream();
+  loop();
 
   function applyTheme(color){
     if (!color) return;
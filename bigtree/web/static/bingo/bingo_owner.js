@@ -337,16 +337,92 @@ document.addEventListener("DOMContentLoaded", () => {
     root.style.setProperty("--line", dark);
     root.style.setProperty("--panel", darker);
   }
+  let lastData = null;
+  let lastState = null;
   async function tick(){
     const [data, state] = await Promise.all([fetchOwnerCards(), fetchState()]);
-    if (token && data && data.game){
-      render(data, {game: data.game});
-    }else{
-      render(data, state);
+    lastData = data;
+    lastState = token && data && data.game ? {game: data.game} : state;
+    render(lastData, lastState);
+    startStream(game || (data && data.game && data.game.game_id));
+  }
+
+  function settleClaim(cardId, denied){
+    const claims = (lastState.game.claims || []);
+    const claim = claims.find(c => c.card_id === cardId && c.pending);
+    if (claim){
+      claim.pending = false;
+      claim.denied = denied;
+    }
+  }
+
+  // Fold a pushed event into the last state instead of refetching it; the
+  // cards themselves never change while a game runs.
+  function applyEvent(ev){
+    if (ev.type === 'STATE'){
+      lastState = {game: (ev.state && ev.state.game) || {}};
+      return true;
     }
+    const g = lastState && lastState.game;
+    if (!g) return false;
+    const addClaims = (list) => { g.claims = (g.claims || []).concat(list || []); };
+    switch (ev.type){
+      case 'CALL':
+        g.called = ev.called || g.called;
+        g.last_called = ev.number;
+        g.started = true;
+        addClaims(ev.claims);
+        break;
+      case 'STAGE':
+        g.stage = ev.stage;
+        addClaims(ev.claims);
+        break;
+      case 'CLAIM':
+        addClaims([ev.claim]);
+        break;
+      case 'CLAIM_APPROVED':
+        settleClaim(ev.card_id, false);
+        break;
+      case 'CLAIM_DENIED':
+        settleClaim(ev.card_id, true);
+        break;
+      case 'POT':
+        g.pot = ev.pot;
+        if (ev.payouts) g.payouts = ev.payouts;
+        break;
+      case 'STARTED':
+        g.started = true;
+        break;
+      case 'ENDED':
+      case 'GAME_GONE':
+        g.active = false;
+        break;
+      default:
+        return false;
+    }
+    return true;
+  }
+
+  // Live updates: the stream pushes every call/claim/stage/pot change, so
+  // polling only remains as a slow fallback while it is connected.
+  let stream = null;
+  function startStream(gameId){
+    if (stream || !gameId || !window.EventSource) return;
+    stream = new EventSource(`/bingo/${encodeURIComponent(gameId)}/stream`);
+    stream.onmessage = (msg) => {
+      let ev = null;
+      try { ev = JSON.parse(msg.data); } catch (e) { return; }
+      if (ev && applyEvent(ev) && lastData) render(lastData, lastState);
+    };
+  }
+  function pollDelay(){
+    return stream && stream.readyState !== EventSource.CLOSED ? 30000 : 2000;
+  }
+  async function loop(){
+    try { await tick(); } catch (e) {}
+    setTimeout(loop, pollDelay());
   }
-  setInterval(tick, 2000);
-  tick();
+  loop();
 
   function formatGil(value){
     const raw = Number(value);
@@ -140,7 +140,7 @@ async def auth_me(req: web.Request):
             meta = doc.get("metadata") or {}
             raw_id = meta.get("discord_id") or doc.get("user_id")
         if raw_id is not None:
-            venue = db.get_discord_venue(int(raw_id))
+            venue = await db.run_async(db.get_discord_venue, int(raw_id))
     except Exception:
         venue = None
     if venue:
@@ -159,7 +159,7 @@ async def auth_me(req: web.Request):
 @route("GET", "/admin/venues/list", scopes=_admin_venue_scopes())
 async def admin_venues_list_scoped(_req: web.Request) -> web.Response:
     db = get_database()
-    return web.json_response({"ok": True, "venues": db.list_venues()})
+    return web.json_response({"ok": True, "venues": await db.run_async(db.list_venues)})
 
 
 @route("GET", "/admin/venue/me", scopes=_admin_venue_scopes())
@@ -174,14 +174,14 @@ async def admin_venue_me(req: web.Request) -> web.Response:
     if not raw_id:
         return web.json_response({"ok": False, "error": "user_id required"}, status=400)
     db = get_database()
-    membership = db.get_discord_venue(int(raw_id))
+    membership = await db.run_async(db.get_discord_venue, int(raw_id))
     if not membership:
         try:
-            venue_id = db._find_venue_for_discord_admin(int(raw_id))
+            venue_id = await db.run_async(db._find_venue_for_discord_admin, int(raw_id))
         except Exception:
             venue_id = None
         if venue_id:
-            venue = db.get_venue(int(venue_id))
+            venue = await db.run_async(db.get_venue, int(venue_id))
             if venue:
                 membership = {
                     "venue_id": int(venue.get("id")),
@@ -223,11 +223,11 @@ async def admin_venue_assign(req: web.Request) -> web.Response:
     if not venue_id:
         return web.json_response({"ok": False, "error": "venue_id required"}, status=400)
     db = get_database()
-    venue = db.get_venue(venue_id)
+    venue = await db.run_async(db.get_venue, venue_id)
     if not venue:
         return web.json_response({"ok": False, "error": "venue not found"}, status=404)
-    db.set_discord_venue(int(raw_id), venue_id, role="admin")
-    membership = db.get_discord_venue(int(raw_id))
+    await db.run_async(db.set_discord_venue, int(raw_id), venue_id, role="admin")
+    membership = await db.run_async(db.get_discord_venue, int(raw_id))
     if membership:
         membership = to_jsonable(membership)
     return web.json_response({"ok": True, "membership": membership})
@@ -248,11 +248,11 @@ async def admin_venues_create(req: web.Request) -> web.Response:
         return web.json_response({"ok": False, "error": "name required"}, status=400)
     db = get_database()
     metadata = {"admin_discord_ids": [str(doc.get("user_id"))]}
-    venue = db.upsert_venue(name, metadata=metadata)
+    venue = await db.run_async(db.upsert_venue, name, metadata=metadata)
     if not venue:
         return web.json_response({"ok": False, "error": "save failed"}, status=500)
-    db.set_discord_venue(int(doc.get("user_id")), int(venue.get("id")), role="admin")
-    membership = db.get_discord_venue(int(doc.get("user_id")))
+    await db.run_async(db.set_discord_venue, int(doc.get("user_id")), int(venue.get("id")), role="admin")
+    membership = await db.run_async(db.get_discord_venue, int(doc.get("user_id")))
     if membership:
         membership = to_jsonable(membership)
     return web.json_response({"ok": True, "venue": venue, "membership": membership})
@@ -853,9 +853,9 @@ async def send_message(req: web.Request):
 async def admin_system_config(_req: web.Request):
     db = get_database()
     configs = {
-        "xivauth": db.get_system_config("xivauth"),
-        "openai": db.get_system_config("openai"),
-        "overlay": db.get_system_config("overlay"),
+        "xivauth": await db.run_async(db.get_system_config, "xivauth"),
+        "openai": await db.run_async(db.get_system_config, "openai"),
+        "overlay": await db.run_async(db.get_system_config, "overlay"),
     }
     return web.json_response({"ok": True, "configs": configs})
 
@@ -873,9 +873,9 @@ async def admin_system_config_update(req: web.Request):
     if not isinstance(data, dict):
         data = {}
     db = get_database()
-    if not db.update_system_config(name, data):
+    if not await db.run_async(db.update_system_config, name, data):
         return web.json_response({"ok": False, "error": "save failed"}, status=500)
-    return web.json_response({"ok": True, "config": db.get_system_config(name)})
+    return web.json_response({"ok": True, "config": await db.run_async(db.get_system_config, name)})
 
 
 @route("GET", "/admin/logs", scopes=["admin:web"])
@@ -903,8 +903,8 @@ async def admin_logs(req: web.Request) -> web.Response:
 @route("GET", "/admin/overlay/stats", scopes=["admin:web"])
 async def admin_overlay_stats(_req: web.Request):
     db = get_database()
-    def _count(sql):
-        row = db._fetchone(sql)
+    async def _count(sql):
+        row = await db._afetchone(sql)
         return int(row.get("value") if row and row.get("value") is not None else 0)
     try:
         guilds = (getattr(bigtree.bot, "guilds") or []) if hasattr(bigtree, "bot") else []
@@ -913,10 +913,10 @@ async def admin_overlay_stats(_req: web.Request):
     discord_members = sum((getattr(g, "member_count", 0) or 0) for g in guilds)
     stats = {
         "discord_members": discord_members,
-        "players_engaged": _count("SELECT COUNT(DISTINCT user_id) AS value FROM user_games"),
-        "registered_users": _count("SELECT COUNT(*) AS value FROM users"),
-        "api_games": _count("SELECT COUNT(*) AS value FROM games"),
-        "venues": _count("SELECT COUNT(*) AS value FROM venues"),
+        "players_engaged": await _count("SELECT COUNT(DISTINCT user_id) AS value FROM user_games"),
+        "registered_users": await _count("SELECT COUNT(*) AS value FROM users"),
+        "api_games": await _count("SELECT COUNT(*) AS value FROM games"),
+        "venues": await _count("SELECT COUNT(*) AS value FROM venues"),
     }
     return web.json_response({"ok": True, "stats": stats})
 
@@ -1016,7 +1016,8 @@ async def admin_games_list(req: web.Request) -> web.Response:
     except Exception:
         page_size = 50
 
-    result = db.list_games(
+    result = await db.run_async(
+        db.list_games,
         q=q,
         module=module,
         player=player,
@@ -1415,7 +1416,7 @@ async def gpose_monthly_candidates(req: web.Request):
 async def admin_list_discord_users(_req: web.Request):
     """List all Discord users that have ever used /auth (or were observed) for use in UI pickers."""
     db = get_database()
-    users = db.list_discord_users(limit=5000)
+    users = await db.run_async(db.list_discord_users, limit=5000)
     return web.json_response({"ok": True, "users": users})
 
 
@@ -1552,155 +1553,130 @@ async def discord_channel_messages(req: web.Request) -> web.Response:
         return web.json_response({"ok": False, "error": str(e)}, status=500)
 
 
+def _archive_message(bot, row: Dict[str, Any]) -> Dict[str, Any]:
+    channel_id = int(row["channel_id"])
+    chan = bot.get_channel(channel_id) if bot else None
+    guild_id = row.get("guild_id")
+    return {
+        "id": str(row["message_id"]),
+        "author_id": str(row["author_id"]),
+        "author_name": row.get("author_name"),
+        "content": (row.get("content") or "")[:500],  # truncate long messages
+        "timestamp": row["created_at"].isoformat() if row.get("created_at") else None,
+        "channel_id": str(channel_id),
+        "channel_name": getattr(chan, "name", None),
+        "jump_url": f"https://discord.com/channels/{guild_id}/{channel_id}/{row['message_id']}",
+    }
+
+
+def _archive_page_args(req: web.Request, default: int, maximum: int):
+    try:
+        limit = min(maximum, max(1, int(req.query.get("limit", default))))
+    except Exception:
+        limit = default
+    try:
+        before = int(req.query.get("before") or 0) or None
+    except Exception:
+        before = None
+    try:
+        channel_id = int(req.query.get("channel_id") or 0) or None
+    except Exception:
+        channel_id = None
+    return limit, before, channel_id
+
+
 @route("GET", "/discord/search", scopes=["discord:search", "bingo:admin"])
 async def discord_search(req: web.Request) -> web.Response:
     """
-    Search messages across channels.
+    Search the local message archive (see bigtree.modules.discord_archive).
     
     Query params:
-      q: search query (required)
+      q: search query (required; websearch syntax: words, "phrases", -exclude, or)
       channel_id: limit to specific channel (optional)
       user_id: filter by author (optional)
       limit: max results (default 50)
+      before: message id cursor; pass next_before from the previous page
     """
-    bot = getattr(bigtree, "bot", None)
-    if not bot:
-        return web.json_response({"ok": False, "error": "bot not ready"}, status=503)
-
     query = (req.query.get("q") or "").strip()
     if not query:
         return web.json_response({"ok": False, "error": "q (search query) is required"}, status=400)
 
-    channel_id = req.query.get("channel_id")
-    user_id = req.query.get("user_id")
+    limit, before, channel_id = _archive_page_args(req, 50, 200)
     try:
-        limit = min(200, max(1, int(req.query.get("limit", 50))))
+        user_id = int(req.query.get("user_id") or 0) or None
     except Exception:
-        limit = 50
-
-    results = []
-
-    # Determine which channels to search
-    guild = bot.guilds[0] if bot.guilds else None
-    if not guild:
-        return web.json_response({"ok": False, "error": "no guild found"}, status=500)
-
-    target_channels = []
-    if channel_id:
-        try:
-            ch = bot.get_channel(int(channel_id))
-            if ch:
-                target_channels = [ch]
-        except Exception:
-            pass
-    else:
-        for ch in guild.channels or []:
-            if hasattr(ch, "history"):
-                target_channels.append(ch)
+        return web.json_response({"ok": False, "error": "user_id must be an integer"}, status=400)
 
-    for chan in target_channels:
-        try:
-            # Search last N messages in channel
-            count = 0
-            async for msg in chan.history(limit=500):
-                if count >= limit:
-                    break
-                # Filter by query
-                if query.lower() not in msg.content.lower():
-                    continue
-                # Filter by user
-                if user_id and str(msg.author.id) != str(user_id):
-                    continue
-                results.append({
-                    "id": str(msg.id),
-                    "author_id": str(msg.author.id),
-                    "author_name": msg.author.display_name,
-                    "content": msg.content[:500],  # truncate long messages
-                    "timestamp": msg.created_at.isoformat(),
-                    "channel_id": str(chan.id),
-                    "channel_name": chan.name,
-                    "jump_url": msg.jump_url,
-                })
-                count += 1
-                if len(results) >= limit:
-                    break
-        except Exception as e:
-            bigtree.logger.warning(f"[discord] search channel {chan.id} failed: {e}")
-            continue
+    db = get_database()
+    try:
+        rows = await db.run_async(
+            db.search_discord_messages,
+            query,
+            channel_id=channel_id,
+            author_id=user_id,
+            before=before,
+            limit=limit,
+        )
+    except Exception as e:
+        bigtree.logger.warning(f"[discord] archive search failed: {e}")
+        return web.json_response({"ok": False, "error": str(e)}, status=500)
 
-    results.sort(key=lambda x: x["timestamp"], reverse=True)
-    return web.json_response({"ok": True, "results": results, "count": len(results), "query": query})
+    bot = getattr(bigtree, "bot", None)
+    results = [_archive_message(bot, r) for r in rows]
+    next_before = results[-1]["id"] if len(results) >= limit else None
+    return web.json_response({
+        "ok": True,
+        "results": results,
+        "count": len(results),
+        "query": query,
+        "next_before": next_before,
+    })
 
 
 @route("GET", "/discord/users/{user_id}/messages", scopes=["discord:search", "bingo:admin"])
 async def discord_user_messages(req: web.Request) -> web.Response:
     """
-    Get recent messages by a specific user across all accessible channels.
+    Get recent messages by a specific user from the local message archive.
     
     Query params:
-      limit: max messages per channel (default 20, max 100)
+      limit: max messages (default 20, max 100)
       channel_id: limit to specific channel (optional)
+      before: message id cursor; pass next_before from the previous page
     """
-    bot = getattr(bigtree, "bot", None)
-    if not bot:
-        return web.json_response({"ok": False, "error": "bot not ready"}, status=503)
-
     user_id_str = req.match_info.get("user_id", "")
     try:
         user_id = int(user_id_str)
     except Exception:
         return web.json_response({"ok": False, "error": "user_id must be an integer"}, status=400)
 
+    limit, before, channel_id = _archive_page_args(req, 20, 100)
+    db = get_database()
     try:
-        limit = min(100, max(1, int(req.query.get("limit", 20))))
-    except Exception:
-        limit = 20
-
-    channel_id = req.query.get("channel_id")
-
-    guild = bot.guilds[0] if bot.guilds else None
-    if not guild:
-        return web.json_response({"ok": False, "error": "no guild found"}, status=500)
-
-    target_channels = []
-    if channel_id:
-        try:
-            ch = bot.get_channel(int(channel_id))
-            if ch:
-                target_channels = [ch]
-        except Exception:
-            pass
-    else:
-        for ch in guild.channels or []:
-            if hasattr(ch, "history"):
-                target_channels.append(ch)
-
-    all_messages = []
-    for chan in target_channels:
-        try:
-            channel_msgs = []
-            async for msg in chan.history(limit=limit * 2):
-                if str(msg.author.id) == str(user_id):
-                    channel_msgs.append({
-                        "id": str(msg.id),
-                        "content": msg.content[:500],
-                        "timestamp": msg.created_at.isoformat(),
-                        "channel_id": str(chan.id),
-                        "channel_name": chan.name,
-                        "jump_url": msg.jump_url,
-                    })
-                    if len(channel_msgs) >= limit:
-                        break
-            all_messages.extend(channel_msgs)
-        except Exception:
-            continue
+        rows = await db.run_async(
+            db.search_discord_messages,
+            None,
+            channel_id=channel_id,
+            author_id=user_id,
+            before=before,
+            limit=limit,
+        )
+    except Exception as e:
+        bigtree.logger.warning(f"[discord] archive user messages failed: {e}")
+        return web.json_response({"ok": False, "error": str(e)}, status=500)
 
-    all_messages.sort(key=lambda x: x["timestamp"], reverse=True)
+    bot = getattr(bigtree, "bot", None)
+    messages = []
+    for r in rows:
+        item = _archive_message(bot, r)
+        item.pop("author_id", None)
+        item.pop("author_name", None)
+        messages.append(item)
     return web.json_response({
         "ok": True,
         "user_id": str(user_id),
-        "messages": all_messages[:limit],
-        "count": len(all_messages[:limit]),
+        "messages": messages,
+        "count": len(messages),
+        "next_before": messages[-1]["id"] if len(messages) >= limit else None,
     })
 
 
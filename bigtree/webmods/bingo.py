@@ -1,6 +1,8 @@
 # bigtree/webmods/bingo.py
 from __future__ import annotations
 from aiohttp import web
+import asyncio
+import json
 import os
 import random
 from typing import Any, Dict, Optional
@@ -9,8 +11,38 @@ import discord
 from bigtree.inc.logging import logger
 from bigtree.inc.webserver import route, frontend_route, get_server, DynamicWebServer
 from bigtree.inc.database import get_database
+from bigtree.inc.cache import TTLCache
+from bigtree.inc.event_hub import SessionEventHub, sse_feed, write_sse
 from bigtree.modules import bingo as bingo
 
+# ---------- Live state ----------
+# Public state snapshots, dropped on every mutation; the TTL only bounds
+# staleness from writers in other processes.
+_STATE_CACHE = TTLCache(maxsize=256, ttl=30.0)
+_STATE_GEN: Dict[str, int] = {}
+_EVENT_HUB = SessionEventHub("bingo")
+_STREAM_PING_SECONDS = 15.0
+_GAME_GONE = {"type": "GAME_GONE"}
+
+def _on_bingo_event(game_id: str, event: Optional[Dict[str, Any]]) -> None:
+    _STATE_GEN[game_id] = _STATE_GEN.get(game_id, 0) + 1
+    _STATE_CACHE.pop(game_id)
+    _EVENT_HUB.dispatch(game_id, None if event is None else [event])
+
+bingo.add_event_listener(_on_bingo_event)
+
+def _public_state(game_id: str) -> Dict[str, Any]:
+    """Cached ``bingo.get_public_state``; the result is shared, treat it as read-only."""
+    hit, state = _STATE_CACHE.get(game_id)
+    if hit:
+        return state
+    gen = _STATE_GEN.get(game_id, 0)
+    state = bingo.get_public_state(game_id)
+    # Don't cache a snapshot a concurrent mutation may already have outdated.
+    if _STATE_GEN.get(game_id, 0) == gen:
+        _STATE_CACHE.set(game_id, state)
+    return state
+
 # ---------- Helpers ----------
 def _supports(func_name: str) -> bool:
     return hasattr(bingo, func_name) and callable(getattr(bingo, func_name))
@@ -115,12 +147,46 @@ async def _announce_call(game: Dict[str, Any], number: Optional[int]):
 @route("GET", "/bingo/{game_id}", allow_public=True)
 async def bingo_state(req: web.Request):
     game_id = req.match_info["game_id"]
-    return web.json_response(bingo.get_public_state(game_id))
+    return web.json_response(await asyncio.to_thread(_public_state, game_id))
+
+def _game_feed(game_id: str):
+    """Stream deltas pushed by the bingo module for ``game_id``; None marks a keep-alive."""
+    async def snapshot():
+        # Fell behind: replace the dropped deltas with a fresh snapshot.
+        return {"type": "STATE", "state": await asyncio.to_thread(_public_state, game_id)}
+
+    return sse_feed(_EVENT_HUB, game_id, keepalive=_STREAM_PING_SECONDS, gone=_GAME_GONE, resync=snapshot)
+
+@route("GET", "/bingo/{game_id}/stream", allow_public=True)
+async def bingo_stream(req: web.Request):
+    game_id = req.match_info["game_id"]
+    state = await asyncio.to_thread(_public_state, game_id)
+    if not state.get("active") and "game" not in state:
+        return web.json_response({"ok": False, "error": "not found"}, status=404)
+
+    resp = web.StreamResponse(
+        status=200,
+        headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
+    await resp.prepare(req)
+    await resp.write(f"data: {json.dumps({'type': 'STATE', 'state': state})}\n\n".encode("utf-8"))
+
+    try:
+        await write_sse(resp, _game_feed(game_id))
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        pass
+    return resp
 
 @route("GET", "/bingo/{game_id}/card/{card_id}", allow_public=True)
 async def bingo_card(req: web.Request):
     g = req.match_info["game_id"]; c = req.match_info["card_id"]
-    card = bingo.get_card(g, c)
+    card = await asyncio.to_thread(bingo.get_card, g, c)
     if not card:
         return web.json_response({"ok": False, "error": "not found"}, status=404)
     return web.json_response({"ok": True, "card": {
@@ -133,8 +199,8 @@ async def bingo_card(req: web.Request):
 @route("GET", "/bingo/{game_id}/owner/{owner}/cards", allow_public=True)
 async def bingo_owner_cards(req: web.Request):
     g = req.match_info["game_id"]; owner = req.match_info["owner"]
-    cards = bingo.get_owner_cards(g, owner_name=owner)
-    st = bingo.get_public_state(g)
+    cards = await asyncio.to_thread(bingo.get_owner_cards, g, owner_name=owner)
+    st = await asyncio.to_thread(_public_state, g)
     return web.json_response({
         "ok": True,
         "game": st.get("game", {"game_id": g, "called": []}),
@@ -145,13 +211,13 @@ async def bingo_owner_cards(req: web.Request):
 @route("GET", "/bingo/owner-token/{token}", allow_public=True)
 async def bingo_owner_token_cards(req: web.Request):
     token = req.match_info["token"]
-    info = bingo.resolve_owner_token(token)
+    info = await asyncio.to_thread(bingo.resolve_owner_token, token)
     if not info:
         return web.json_response({"ok": False, "error": "not found"}, status=404)
     g = info.get("game_id") or ""
     owner = info.get("owner_name") or ""
-    cards = bingo.get_owner_cards(g, owner_name=owner)
-    st = bingo.get_public_state(g)
+    cards = await asyncio.to_thread(bingo.get_owner_cards, g, owner_name=owner)
+    st = await asyncio.to_thread(_public_state, g)
     return web.json_response({
         "ok": True,
         "game": st.get("game", {"game_id": g, "called": []}),
@@ -3,14 +3,37 @@ from aiohttp import web, WSMsgType
 from typing import Dict, Any
 import asyncio
 import json
+from contextlib import aclosing
 from bigtree.inc.webserver import route, frontend_route, get_server
 from bigtree.modules import cardgames as cg
+from bigtree.modules import casino_sim
+from bigtree.modules import slots as slots_mod
 from bigtree.inc.database import get_database
+from bigtree.inc.event_hub import SessionEventHub, sse_feed, write_sse
+from bigtree.inc.cache import TTLCache
 from bigtree.inc import web_tokens
 from bigtree.inc.auth import TOKEN_COOKIE_NAME
 from bigtree.modules import tarot
 from bigtree.webmods.user_area import _resolve_user
 
+# One LISTEN-backed hub per process: new event rows are read once per session and fanned out.
+_STREAM_RESYNC_SECONDS = 15.0
+_EVENT_HUB = SessionEventHub(
+    "cardgames",
+    cg.list_events,
+    channel=cg.EVENTS_CHANNEL,
+    exists=cg.get_session_by_id,
+    resync_seconds=_STREAM_RESYNC_SECONDS,
+)
+_SESSION_GONE = {"type": "SESSION_GONE", "redirect": "/gallery"}
+# Poker odds only change when cards are dealt; key on the visible cards so overlays can poll freely.
+_ODDS_CACHE = TTLCache(maxsize=512, ttl=300.0)
+# One simulation at a time; they pin every worker core for their duration.
+_SIM_LOCK = asyncio.Lock()
+_SIM_MAX_ROUNDS = 2_000_000
+# Wallet context (event, currency, wallet flags) for the per-action paths; pot/winnings readers query fresh.
+_WALLET_CTX_CACHE = TTLCache(maxsize=1024, ttl=15.0)
+
 async def _run_blocking(func, *args):
     return await asyncio.to_thread(func, *args)
 
@@ -40,6 +63,26 @@ async def _send_ws_state(ws: web.WebSocketResponse, session: Dict[str, Any], vie
         pass
     await ws.send_json({"type": "STATE", "state": state})
 
+def _session_feed(session_id: str, last_seq: int = 0):
+    """Stream payloads for a session: backlog since ``last_seq``, then live events from the hub.
+
+    The hub wakes us only when a cardgame_events row is committed; its periodic
+    sweep is the safety net for a dropped LISTEN connection.
+    """
+    async def backlog(since: int):
+        if not await _run_blocking(cg.get_session_by_id, session_id):
+            return None
+        return await _run_blocking(cg.list_events, session_id, since)
+
+    return sse_feed(
+        _EVENT_HUB,
+        session_id,
+        keepalive=_STREAM_RESYNC_SECONDS,
+        gone=_SESSION_GONE,
+        backlog=backlog,
+        since=last_seq,
+    )
+
 @route("GET", "/ws/cardgames/{game_id}/sessions/{join_code}", allow_public=True)
 async def ws_stream(req: web.Request):
     join_code = req.match_info["join_code"]
@@ -49,48 +92,58 @@ async def ws_stream(req: web.Request):
     await ws.prepare(req)
     session = await _run_blocking(cg.get_session_by_join_code, join_code)
     if not session:
-        await ws.send_json({"type": "SESSION_GONE", "redirect": "/gallery"})
+        await ws.send_json(_SESSION_GONE)
         await ws.close()
         return ws
     session_id = session["session_id"]
-    last_seq = 0
-    last_seen = asyncio.get_event_loop().time()
+    loop = asyncio.get_running_loop()
+    last_seen = loop.time()
     await _send_ws_state(ws, session, view, token)
 
-    while not ws.closed:
-        now = asyncio.get_event_loop().time()
-        try:
-            msg = await asyncio.wait_for(ws.receive(), timeout=1.0)
-        except asyncio.TimeoutError:
-            msg = None
-        if msg is not None:
-            if msg.type == WSMsgType.TEXT:
-                last_seen = now
-                try:
-                    payload = json.loads(msg.data or "{}")
-                except Exception:
-                    payload = {}
-                if isinstance(payload, dict):
-                    if payload.get("type") == "auth":
-                        token = str(payload.get("token") or "").strip()
-                        await _send_ws_state(ws, session, view, token)
-                    elif payload.get("type") == "resume":
-                        await _send_ws_state(ws, session, view, token)
-            elif msg.type in (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.ERROR):
+    async def _pump():
+        async with aclosing(_session_feed(session_id)) as feed:
+            async for payload in feed:
+                if ws.closed:
+                    return
+                if payload is None:
+                    continue
+                await ws.send_json(payload)
+                if payload is _SESSION_GONE:
+                    await ws.close()
+                    return
+
+    pump = asyncio.create_task(_pump())
+    try:
+        while not ws.closed and not pump.done():
+            now = loop.time()
+            try:
+                msg = await asyncio.wait_for(ws.receive(), timeout=5.0)
+            except asyncio.TimeoutError:
+                msg = None
+            if msg is not None:
+                if msg.type == WSMsgType.TEXT:
+                    last_seen = now
+                    try:
+                        payload = json.loads(msg.data or "{}")
+                    except Exception:
+                        payload = {}
+                    if isinstance(payload, dict):
+                        if payload.get("type") == "auth":
+                            token = str(payload.get("token") or "").strip()
+                            await _send_ws_state(ws, session, view, token)
+                        elif payload.get("type") == "resume":
+                            await _send_ws_state(ws, session, view, token)
+                elif msg.type in (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED, WSMsgType.ERROR):
+                    break
+            if now - last_seen > 300:
+                await ws.close(message=b"idle")
                 break
-        if now - last_seen > 300:
-            await ws.close(message=b"idle")
-            break
-        current = await _run_blocking(cg.get_session_by_id, session_id)
-        if not current:
-            await ws.send_json({"type": "SESSION_GONE", "redirect": "/gallery"})
-            await ws.close()
-            break
-        events = await _run_blocking(cg.list_events, session_id, last_seq)
-        if events:
-            last_seq = int(events[-1].get("seq", last_seq))
-            for ev in events:
-                await ws.send_json({"type": ev.get("type"), "data": ev.get("data"), "seq": ev.get("seq")})
+    finally:
+        pump.cancel()
+        try:
+            await pump
+        except (asyncio.CancelledError, Exception):
+            pass
     return ws
 
 def _resolve_admin_user_id(req: web.Request) -> int | None:
@@ -162,6 +215,14 @@ def _sync_game_record(db, payload: Dict[str, Any]) -> None:
         run_source=payload.get("run_source") or "api",
     )
 
+def _session_wallet_context(db, session: Dict[str, Any]) -> Dict[str, Any] | None:
+    key = (session.get("session_id"), session.get("join_code"))
+    hit, ctx = _WALLET_CTX_CACHE.get(key)
+    if not hit:
+        ctx = db.get_game_wallet_context(join_code=session.get("join_code"), game_id=session.get("session_id"))
+        _WALLET_CTX_CACHE.set(key, ctx)
+    return ctx
+
 async def _finish_for_zero_balance(db, ctx: Dict[str, Any], user_id: int, session: Dict[str, Any]) -> bool:
     if not ctx or not session:
         return False
@@ -189,6 +250,15 @@ async def _finish_for_zero_balance(db, ctx: Dict[str, Any], user_id: int, sessio
     _sync_game_record(db, dict(updated or session))
     return True
 
+def _wallet_refused(status: str, required: int, balance: int) -> web.Response:
+    if status == "unavailable":
+        return web.json_response({"ok": False, "error": "wallet unavailable, try again shortly"}, status=503)
+    return web.json_response(
+        {"ok": False, "error": "insufficient balance", "required": required, "balance": balance},
+        status=409,
+    )
+
+
 async def _ensure_wallet_balance(req: web.Request, join_code: str, session: Dict[str, Any]) -> web.Response | Dict[str, Any] | None:
     db = get_database()
     ctx = db.get_game_wallet_context(join_code=join_code, game_id=session.get("session_id"))
@@ -219,15 +289,7 @@ async def _ensure_wallet_balance(req: web.Request, join_code: str, session: Dict
         allow_negative=False,
     )
     if not ok:
-        return web.json_response(
-            {
-                "ok": False,
-                "error": "insufficient balance",
-                "required": pot,
-                "balance": balance,
-            },
-            status=409,
-        )
+        return _wallet_refused(status, pot, balance)
     db.add_user_game(int(user["id"]), str(game_id), role="player")
     return {"user": user, "balance": balance}
 
@@ -358,6 +420,39 @@ async def create_session(req: web.Request):
         pass
     return web.json_response({"ok": True, "session": s})
 
+@route("POST", "/api/cardgames/simulate", scopes=["cardgames:admin"])
+async def simulate_rtp(req: web.Request):
+    try:
+        body = await req.json()
+    except Exception:
+        body = {}
+    game = str(body.get("game") or "").strip().lower()
+    if game not in casino_sim.GAMES:
+        return web.json_response({"ok": False, "error": "invalid game"}, status=400)
+    try:
+        rounds = max(1, min(_SIM_MAX_ROUNDS, int(body.get("rounds") or 100_000)))
+        workers = int(body.get("workers") or 1)
+        seed = int(body["seed"]) if body.get("seed") is not None else None
+    except (TypeError, ValueError):
+        return web.json_response({"ok": False, "error": "invalid parameters"}, status=400)
+    options = body.get("options") if isinstance(body.get("options"), dict) else {}
+    machine = None
+    machine_id = str(options.get("machine_id") or "").strip()
+    if game == "slots" and machine_id:
+        machine = await _run_blocking(slots_mod.get_slot_machine, machine_id)
+        if not machine:
+            return web.json_response({"ok": False, "error": "slot machine not found"}, status=404)
+    if _SIM_LOCK.locked():
+        return web.json_response({"ok": False, "error": "simulation already running"}, status=409)
+    async with _SIM_LOCK:
+        try:
+            report = await asyncio.to_thread(
+                casino_sim.simulate, game, rounds, workers=workers, seed=seed, options=options, machine=machine
+            )
+        except ValueError as exc:
+            return web.json_response({"ok": False, "error": str(exc)}, status=400)
+    return web.json_response({"ok": True, "report": report})
+
 @route("GET", "/api/cardgames/{game_id}/sessions", scopes=["tarot:admin", "cardgames:admin"])
 async def list_sessions(req: web.Request):
     game_id = str(req.match_info["game_id"] or "").strip().lower()
@@ -406,7 +501,7 @@ async def get_state(req: web.Request):
         db = get_database()
         state["session"]["event_autoplay"] = _get_event_autoplay(db, s)
         state["session"]["is_single_player"] = s.get("is_single_player", False)
-        ctx = db.get_game_wallet_context(join_code=s.get("join_code"), game_id=s.get("session_id"))
+        ctx = _session_wallet_context(db, s)
         wallet_enabled = bool(ctx and ctx.get("wallet_enabled"))
         wallet_currency = _normalize_currency(ctx.get("currency")) if ctx else ""
         needs_wallet = wallet_enabled and wallet_currency and wallet_currency != "gil"
@@ -422,6 +517,27 @@ async def get_state(req: web.Request):
         pass
     return web.json_response({"ok": True, "state": state})
 
+@route("GET", "/api/cardgames/poker/sessions/{join_code}/odds", allow_public=True)
+async def get_poker_odds(req: web.Request):
+    join_code = req.match_info["join_code"]
+    view = _get_view(req)
+    s = await _run_blocking(cg.get_session_by_join_code, join_code)
+    if not s:
+        return web.json_response({"ok": False, "error": "not found", "redirect": "/gallery"}, status=404)
+    state = s.get("state") or {}
+    hand = state.get("dealer_hand") if view == "priestess" else state.get("player_hand")
+    key = (
+        s.get("session_id"),
+        view,
+        state.get("stage"),
+        tuple(str(c.get("code") or "") for c in (hand or []) + (state.get("community") or [])),
+    )
+    hit, odds = _ODDS_CACHE.get(key)
+    if not hit:
+        odds = await _run_blocking(cg.poker_odds, s, view)
+        _ODDS_CACHE.set(key, odds)
+    return web.json_response({"ok": True, "odds": odds})
+
 @route("GET", "/api/cardgames/{game_id}/sessions/{join_code}/stream", allow_public=True)
 async def stream_events(req: web.Request):
     join_code = req.match_info["join_code"]
@@ -452,19 +568,7 @@ async def stream_events(req: web.Request):
     await resp.write(f"data: {json.dumps(initial)}\n\n".encode("utf-8"))
     session_id = s["session_id"]
     try:
-        while True:
-            await asyncio.sleep(1.0)
-            current = await _run_blocking(cg.get_session_by_id, session_id)
-            if not current:
-                payload = {"type": "SESSION_GONE", "redirect": "/gallery"}
-                await resp.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
-                break
-            events = await _run_blocking(cg.list_events, session_id, last_seq)
-            if events:
-                last_seq = int(events[-1].get("seq", last_seq))
-                for ev in events:
-                    payload = {"type": ev.get("type"), "data": ev.get("data"), "seq": ev.get("seq")}
-                    await resp.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        await write_sse(resp, _session_feed(session_id, last_seq))
     except asyncio.CancelledError:
         pass
     except Exception:
@@ -507,7 +611,7 @@ async def player_action(req: web.Request):
     db = get_database()
     ctx = None
     try:
-        ctx = db.get_game_wallet_context(join_code=s0.get("join_code"), game_id=s0.get("session_id"))
+        ctx = _session_wallet_context(db, s0)
     except Exception:
         ctx = None
     wallet_enabled = bool(ctx and ctx.get("wallet_enabled"))
@@ -585,10 +689,7 @@ async def player_action(req: web.Request):
             allow_negative=False,
         )
         if not ok:
-            return web.json_response(
-                {"ok": False, "error": "insufficient balance", "required": bet_amount, "balance": balance},
-                status=409,
-            )
+            return _wallet_refused(status, bet_amount, balance)
         db.add_user_game(int(user["id"]), str(s0.get("session_id")), role="player")
 
     if needs_wallet and user and game_id == "slots" and action == "spin":
@@ -626,10 +727,7 @@ async def player_action(req: web.Request):
             allow_negative=False,
         )
         if not ok:
-            return web.json_response(
-                {"ok": False, "error": "insufficient balance", "required": bet_amount, "balance": balance},
-                status=409,
-            )
+            return _wallet_refused(status, bet_amount, balance)
         db.add_user_game(int(user["id"]), str(s0.get("session_id")), role="player")
 
     try:
@@ -718,7 +816,7 @@ async def host_action(req: web.Request):
         game_id = str((s or {}).get("game_id") or "").strip().lower()
         if game_id == "crapslite" and action == "roll":
             db = get_database()
-            ctx = db.get_game_wallet_context(join_code=(s or {}).get("join_code"), game_id=(s or {}).get("session_id"))
+            ctx = _session_wallet_context(db, s or {})
             wallet_enabled = bool(ctx and ctx.get("wallet_enabled"))
             wallet_currency = _normalize_currency(ctx.get("currency")) if ctx else ""
             needs_wallet = wallet_enabled and wallet_currency and wallet_currency != "gil"
@@ -9,6 +9,7 @@ import discord
 import os
 import bigtree
 from bigtree.inc.webserver import route
+from bigtree.modules import runtime_config
 
 _IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
 DEFAULT_RULES = (
@@ -268,6 +269,7 @@ async def create_contest(req: web.Request):
     _ensure_contestid_container()
     if channel_id not in bigtree.contestid:
         bigtree.contestid.append(channel_id)
+        runtime_config.invalidate()
 
     return web.json_response({"ok": True, "channel_id": channel_id, "message_id": msg.id})
 
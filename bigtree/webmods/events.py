@@ -3,12 +3,17 @@ from __future__ import annotations
 
 from aiohttp import web
 from datetime import datetime
+from typing import Any, Dict, Optional
+import json
 import secrets
 import asyncio
+import threading
 
 import bigtree
 from bigtree.inc.webserver import route, frontend_route, DynamicWebServer
-from bigtree.inc.database import get_database
+from bigtree.inc.database import add_change_listener, get_database
+from bigtree.inc.cache import TTLCache
+from bigtree.inc.event_hub import SessionEventHub, sse_feed, write_sse
 from bigtree.inc.jsonutil import to_jsonable
 from bigtree.inc import web_tokens
 from bigtree.modules import cardgames as cardgames_mod
@@ -36,16 +41,16 @@ def _extract_user_token(request: web.Request) -> str:
     return request.headers.get(GUEST_TOKEN_HEADER) or ""
 
 
-def _resolve_event_user(request: web.Request, code: str):
+async def _resolve_event_user(request: web.Request, code: str):
     token = _extract_user_token(request)
     db = get_database()
     if token:
-        user = db.get_user_by_session(token)
+        user = await db.run_async(db.get_user_by_session, token)
         if user:
             return user, False
     guest_cookie = request.cookies.get(_event_guest_cookie_name(code)) if code else None
     if guest_cookie:
-        user = db.get_user_by_session(guest_cookie)
+        user = await db.run_async(db.get_user_by_session, guest_cookie)
         if user:
             return user, True
     return None, False
@@ -80,16 +85,7 @@ def _apply_join_wallet_credit(db, ev: dict, user_id: int, is_guest: bool) -> Non
     amount = _join_wallet_amount(ev)
     if amount <= 0:
         return
-    exists = db._fetchone(
-        """
-        SELECT 1 AS ok
-        FROM event_wallet_history
-        WHERE event_id = %s AND user_id = %s AND reason = %s
-        LIMIT 1
-        """,
-        (int(ev["id"]), int(user_id), "join_credit"),
-    )
-    if exists:
+    if db.wallet.has_entry(int(ev["id"]), int(user_id), "join_credit"):
         return
     db.apply_game_wallet_delta(
         event_id=int(ev["id"]),
@@ -101,6 +97,43 @@ def _apply_join_wallet_credit(db, ev: dict, user_id: int, is_guest: bool) -> Non
     )
 
 
+def _start_single_player_session(game_id: str, pot: int, deck_id, background_url, currency):
+    session = cardgames_mod.create_session(
+        game_id,
+        pot=pot,
+        deck_id=deck_id,
+        background_url=background_url,
+        currency=currency,
+        status="created",
+        is_single_player=True,
+    )
+    cardgames_mod.start_session(session.get("session_id"), session.get("priestess_token") or "")
+    return cardgames_mod.get_session_by_id(session.get("session_id")) or session
+
+
+def _record_single_player_game(db, payload: dict, metadata: dict, venue_id, user_id: int, player_name: str) -> None:
+    game_key = str(payload.get("session_id") or payload.get("join_code") or "")
+    db.upsert_game(
+        game_id=game_key,
+        module="cardgames",
+        payload=payload,
+        title=payload.get("game_id"),
+        created_by=None,
+        venue_id=venue_id or None,
+        created_at=db._as_datetime(payload.get("created_at")),
+        ended_at=db._as_datetime(payload.get("updated_at")),
+        status=payload.get("status") or "live",
+        active=True,
+        metadata=metadata,
+        run_source="event",
+    )
+    db.add_user_game(user_id, game_key, role="player")
+    try:
+        db._store_game_player(game_key, player_name, role="player")
+    except Exception:
+        pass
+
+
 # ---------------- public player flow ----------------
 
 
@@ -123,31 +156,23 @@ async def event_join_page(req: web.Request) -> web.Response:
 async def event_info(req: web.Request) -> web.Response:
     code = _sanitize_event_code(req.match_info.get("code") or "")
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
 
-    user, is_guest = _resolve_event_user(req, code)
+    user, is_guest = await _resolve_event_user(req, code)
     user_id = int(user.get("id") or 0) if isinstance(user, dict) else None
 
     joined = False
     wallet_balance = None
     if user_id:
-        row = db._fetchone(
+        row = await db._afetchone(
             "SELECT 1 AS ok FROM event_players WHERE event_id = %s AND user_id = %s LIMIT 1",
             (int(ev["id"]), user_id),
         )
         joined = bool(row)
-        if ev.get("wallet_enabled"):
-            w = db._fetchone(
-                "SELECT balance FROM event_wallets WHERE event_id = %s AND user_id = %s LIMIT 1",
-                (int(ev["id"]), user_id),
-            )
-            if w:
-                try:
-                    wallet_balance = int(w.get("balance") or 0)
-                except Exception:
-                    wallet_balance = 0
+        if joined and ev.get("wallet_enabled"):
+            wallet_balance = await db.run_async(db.get_event_wallet_balance, int(ev["id"]), user_id)
 
     return web.json_response(
         {
@@ -164,18 +189,18 @@ async def event_info(req: web.Request) -> web.Response:
 @route("POST", "/api/events/{code}/join", allow_public=True)
 async def event_join(req: web.Request) -> web.Response:
     code = _sanitize_event_code(req.match_info.get("code") or "")
-    user, is_guest = _resolve_event_user(req, code)
+    user, is_guest = await _resolve_event_user(req, code)
     if not isinstance(user, dict):
         return web.json_response({"ok": False, "error": "login required"}, status=401)
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     if ev.get("status") == "ended":
         return web.json_response({"ok": False, "error": "event ended"}, status=409)
 
-    db.join_event(int(ev["id"]), int(user["id"]))
-    _apply_join_wallet_credit(db, ev, int(user["id"]), bool(is_guest))
+    await db.run_async(db.join_event, int(ev["id"]), int(user["id"]))
+    await db.run_async(_apply_join_wallet_credit, db, ev, int(user["id"]), bool(is_guest))
     return web.json_response({"ok": True, "event": ev})
 
 
@@ -183,10 +208,10 @@ async def event_join(req: web.Request) -> web.Response:
 async def event_games(req: web.Request) -> web.Response:
     code = (req.match_info.get("code") or "").strip()
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
-    games = db.list_event_games(int(ev["id"]), include_inactive=False, limit=500)
+    games = await db.run_async(db.list_event_games, int(ev["id"]), include_inactive=False, limit=500)
     enabled = ev.get("metadata") or {}
     enabled_games = enabled.get("enabled_games") or enabled.get("games") or []
     enabled_set = set()
@@ -237,7 +262,7 @@ async def event_games(req: web.Request) -> web.Response:
 @route("POST", "/api/events/{code}/games/create", allow_public=True)
 async def event_game_create(req: web.Request) -> web.Response:
     code = _sanitize_event_code(req.match_info.get("code") or "")
-    user, is_guest = _resolve_event_user(req, code)
+    user, is_guest = await _resolve_event_user(req, code)
     if not isinstance(user, dict):
         return web.json_response({"ok": False, "error": "login required"}, status=401)
     try:
@@ -249,7 +274,7 @@ async def event_game_create(req: web.Request) -> web.Response:
         return web.json_response({"ok": False, "error": "unsupported game"}, status=400)
 
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     if (ev.get("status") or "active") != "active":
@@ -268,11 +293,11 @@ async def event_game_create(req: web.Request) -> web.Response:
     user_id = int(user.get("id") or 0)
     if not user_id:
         return web.json_response({"ok": False, "error": "invalid user"}, status=401)
-    db.join_event(int(ev["id"]), user_id)
-    _apply_join_wallet_credit(db, ev, user_id, bool(is_guest))
+    await db.run_async(db.join_event, int(ev["id"]), user_id)
+    await db.run_async(_apply_join_wallet_credit, db, ev, user_id, bool(is_guest))
 
     venue_id = ev.get("venue_id")
-    venue = db.get_venue(int(venue_id)) if venue_id else None
+    venue = await db.run_async(db.get_venue, int(venue_id)) if venue_id else None
     currency = ev.get("currency_name") or (venue.get("currency_name") if venue else None)
     try:
         pot = int((venue.get("minimal_spend") if venue else 0) or 0)
@@ -284,17 +309,7 @@ async def event_game_create(req: web.Request) -> web.Response:
     deck_id = (venue.get("deck_id") if venue else None)
 
     try:
-        session = cardgames_mod.create_session(
-            game_id,
-            pot=pot,
-            deck_id=deck_id,
-            background_url=background_url,
-            currency=currency,
-            status="created",
-            is_single_player=True,
-        )
-        cardgames_mod.start_session(session.get("session_id"), session.get("priestess_token") or "")
-        session = cardgames_mod.get_session_by_id(session.get("session_id")) or session
+        session = await db.run_async(_start_single_player_session, game_id, pot, deck_id, background_url, currency)
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=400)
 
@@ -306,25 +321,15 @@ async def event_game_create(req: web.Request) -> web.Response:
         "single_player": True,
         "join_code": payload.get("join_code"),
     }
-    db.upsert_game(
-        game_id=str(payload.get("session_id") or payload.get("join_code") or ""),
-        module="cardgames",
-        payload=payload,
-        title=payload.get("game_id"),
-        created_by=None,
-        venue_id=venue_id or None,
-        created_at=db._as_datetime(payload.get("created_at")),
-        ended_at=db._as_datetime(payload.get("updated_at")),
-        status=payload.get("status") or "live",
-        active=True,
-        metadata=metadata,
-        run_source="event",
+    await db.run_async(
+        _record_single_player_game,
+        db,
+        payload,
+        metadata,
+        venue_id,
+        user_id,
+        user.get("xiv_username") or "Player",
     )
-    db.add_user_game(user_id, str(payload.get("session_id") or payload.get("join_code") or ""), role="player")
-    try:
-        db._store_game_player(str(payload.get("session_id") or payload.get("join_code") or ""), user.get("xiv_username") or "Player", role="player")
-    except Exception:
-        pass
 
     join_code = payload.get("join_code")
     join_url = f"/cardgames/{game_id}/session/{join_code}" if join_code else ""
@@ -337,7 +342,7 @@ async def event_guest_login(req: web.Request) -> web.Response:
     if not code:
         return web.json_response({"ok": False, "error": "event code required"}, status=400)
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     if (ev.get("status") or "active") != "active":
@@ -345,17 +350,17 @@ async def event_guest_login(req: web.Request) -> web.Response:
 
     existing = req.cookies.get(_event_guest_cookie_name(code))
     if existing:
-        user = db.get_user_by_session(existing)
+        user = await db.run_async(db.get_user_by_session, existing)
         if user:
             return web.json_response({"ok": True, "guest": True})
 
     token_seed = secrets.token_hex(4)
     guest_name = f"guest-{code}-{token_seed}"
     meta = {"guest": True, "event_code": code}
-    user = db.upsert_user(guest_name, None, meta)
+    user = await db.run_async(db.upsert_user, guest_name, None, meta)
     if not user:
         return web.json_response({"ok": False, "error": "guest unavailable"}, status=500)
-    session_token = db.create_user_session(int(user["id"]), expires_in=86400)
+    session_token = await db.run_async(db.create_user_session, int(user["id"]), expires_in=86400)
     resp = web.json_response({"ok": True, "guest": True})
     resp.set_cookie(
         _event_guest_cookie_name(code),
@@ -370,7 +375,7 @@ async def event_guest_login(req: web.Request) -> web.Response:
 @route("POST", "/api/events/{code}/wallet/topup", allow_public=True)
 async def event_wallet_topup(req: web.Request) -> web.Response:
     code = _sanitize_event_code(req.match_info.get("code") or "")
-    user, is_guest = _resolve_event_user(req, code)
+    user, is_guest = await _resolve_event_user(req, code)
     if not isinstance(user, dict):
         return web.json_response({"ok": False, "error": "login required"}, status=401)
     try:
@@ -387,7 +392,7 @@ async def event_wallet_topup(req: web.Request) -> web.Response:
         return web.json_response({"ok": False, "error": "amount too large"}, status=400)
 
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     if (ev.get("status") or "active") != "active":
@@ -396,8 +401,9 @@ async def event_wallet_topup(req: web.Request) -> web.Response:
         return web.json_response({"ok": False, "error": "wallet disabled"}, status=409)
 
     user_id = int(user.get("id") or 0)
-    db.join_event(int(ev["id"]), user_id)
-    ok, balance, status = db.apply_game_wallet_delta(
+    await db.run_async(db.join_event, int(ev["id"]), user_id)
+    ok, balance, status = await db.run_async(
+        db.apply_game_wallet_delta,
         event_id=int(ev["id"]),
         user_id=user_id,
         delta=amount,
@@ -406,7 +412,7 @@ async def event_wallet_topup(req: web.Request) -> web.Response:
         allow_negative=True,
     )
     if not ok:
-        return web.json_response({"ok": False, "error": status}, status=409)
+        return web.json_response({"ok": False, "error": status}, status=503 if status == "unavailable" else 409)
     return web.json_response({"ok": True, "balance": balance})
 
 
@@ -576,7 +582,7 @@ async def admin_events_list(req: web.Request) -> web.Response:
     except Exception:
         venue_id = 0
     include_ended = (req.query.get("include_ended") or "1").strip().lower() not in {"0", "false", "no"}
-    events = db.list_events(q=q, venue_id=venue_id or None, include_ended=include_ended, limit=500)
+    events = await db.run_async(db.list_events, q=q, venue_id=venue_id or None, include_ended=include_ended, limit=500)
     return web.json_response({"ok": True, "events": events})
 
 
@@ -614,7 +620,7 @@ async def admin_events_upsert(req: web.Request) -> web.Response:
     created_by = _resolve_admin_user_id(req)
     # Default currency from venue when not explicitly set on the event
     if (not venue_id) and created_by:
-        membership = db.get_discord_venue(int(created_by))
+        membership = await db.run_async(db.get_discord_venue, int(created_by))
         if membership and membership.get("venue_id"):
             try:
                 venue_id = int(membership.get("venue_id") or 0)
@@ -623,7 +629,7 @@ async def admin_events_upsert(req: web.Request) -> web.Response:
     if not venue_id and not event_id and not event_code:
         return web.json_response({"ok": False, "error": "venue required"}, status=400)
     if (not currency_name) and venue_id:
-        v = db.get_venue(int(venue_id))
+        v = await db.run_async(db.get_venue, int(venue_id))
         if v and v.get("currency_name"):
             currency_name = str(v.get("currency_name"))
     try:
@@ -631,7 +637,8 @@ async def admin_events_upsert(req: web.Request) -> web.Response:
     except Exception:
         join_wallet_amount = 0
 
-    ev = db.upsert_event(
+    ev = await db.run_async(
+        db.upsert_event,
         event_id=event_id or None,
         event_code=event_code,
         title=title,
@@ -649,8 +656,8 @@ async def admin_events_upsert(req: web.Request) -> web.Response:
     if not ev:
         return web.json_response({"ok": False, "error": "save failed"}, status=500)
     try:
-        await asyncio.to_thread(_ensure_event_house_session, db, ev, "slots", created_by)
-        await asyncio.to_thread(_ensure_event_house_session, db, ev, "blackjack", created_by)
+        await db.run_async(_ensure_event_house_session, db, ev, "slots", created_by)
+        await db.run_async(_ensure_event_house_session, db, ev, "blackjack", created_by)
     except Exception:
         pass
     return web.json_response({"ok": True, "event": ev})
@@ -669,10 +676,10 @@ async def admin_events_end(req: web.Request) -> web.Response:
     if not event_id:
         return web.json_response({"ok": False, "error": "event_id required"}, status=400)
     db = get_database()
-    if not db.end_event(event_id):
+    if not await db.run_async(db.end_event, event_id):
         return web.json_response({"ok": False, "error": "event not found or already ended"}, status=404)
     try:
-        await asyncio.to_thread(_close_event_house_sessions, db, int(event_id))
+        await db.run_async(_close_event_house_sessions, db, int(event_id))
     except Exception:
         pass
     return web.json_response({"ok": True})
@@ -687,10 +694,10 @@ async def admin_event_players(req: web.Request) -> web.Response:
     if not event_id:
         return web.json_response({"ok": False, "error": "event_id required"}, status=400)
     db = get_database()
-    ev = db._fetchone("SELECT id FROM events WHERE id = %s", (int(event_id),))
+    ev = await db._afetchone("SELECT id FROM events WHERE id = %s", (int(event_id),))
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
-    players = db.get_event_players(int(event_id), limit=5000)
+    players = await db.run_async(db.get_event_players, int(event_id), limit=5000)
     # Only expose minimal fields.
     minimal = []
     wallet_enabled = bool(ev.get("wallet_enabled"))
@@ -702,7 +709,7 @@ async def admin_event_players(req: web.Request) -> web.Response:
         }
         if wallet_enabled and p.get("user_id"):
             try:
-                row["wallet_balance"] = db.get_event_wallet_balance(int(event_id), int(p.get("user_id")))
+                row["wallet_balance"] = await db.run_async(db.get_event_wallet_balance, int(event_id), int(p.get("user_id")))
             except Exception:
                 row["wallet_balance"] = None
         minimal.append(row)
@@ -717,10 +724,10 @@ async def admin_event_summary(req: web.Request) -> web.Response:
     if not event_id:
         return web.json_response({"ok": False, "error": "event_id required"}, status=400)
     db = get_database()
-    ev = db._fetchone("SELECT id, currency_name FROM events WHERE id = %s", (int(event_id),))
+    ev = await db._afetchone("SELECT id, currency_name FROM events WHERE id = %s", (int(event_id),))
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
-    totals = db.get_event_house_total(int(event_id))
+    totals = await db.run_async(db.get_event_house_total, int(event_id))
     return web.json_response(
         {
             "ok": True,
@@ -755,7 +762,7 @@ async def admin_event_wallet_set(req: web.Request) -> web.Response:
         return web.json_response({"ok": False, "error": "comment is required"}, status=400)
 
     db = get_database()
-    ev = db._fetchone("SELECT wallet_enabled FROM events WHERE id = %s", (int(event_id),))
+    ev = await db._afetchone("SELECT wallet_enabled FROM events WHERE id = %s", (int(event_id),))
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     if not bool(ev.get("wallet_enabled")):
@@ -767,11 +774,12 @@ async def admin_event_wallet_set(req: web.Request) -> web.Response:
         except Exception:
             user_id = 0
     if not user_id and xiv_username:
-        user_id = db.find_user_id_by_xiv_username(xiv_username)
+        user_id = await db.run_async(db.find_user_id_by_xiv_username, xiv_username)
     if not user_id:
         return web.json_response({"ok": False, "error": "user not found"}, status=404)
 
-    ok, balance, status = db.add_event_wallet_balance(
+    ok, balance, status = await db.run_async(
+        db.add_event_wallet_balance,
         int(event_id),
         int(user_id),
         int(delta),
@@ -779,7 +787,10 @@ async def admin_event_wallet_set(req: web.Request) -> web.Response:
         comment=comment,
     )
     if not ok:
-        return web.json_response({"ok": False, "error": status or "update failed"}, status=400)
+        return web.json_response(
+            {"ok": False, "error": status or "update failed"},
+            status=503 if status == "unavailable" else 400,
+        )
     return web.json_response(
         {"ok": True, "event_id": event_id, "user_id": int(user_id), "balance": int(balance)}
     )
@@ -816,7 +827,7 @@ async def event_dashboard_page(req: web.Request) -> web.Response:
         return web.Response(text="Invalid event code", status=400)
     
     db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await db.run_async(db.get_event_by_code, code)
     if not ev:
         return web.Response(text="Event not found", status=404)
     
@@ -829,62 +840,171 @@ async def event_dashboard_page(req: web.Request) -> web.Response:
     return web.Response(text=html, content_type="text/html")
 
 
+# ---- Dashboard live stats ----
+# Per-event KPI counters, counted once and then moved by Database change hooks;
+# the TTL bounds drift from writers in other processes.
+_DASH_COUNTS = TTLCache(maxsize=256, ttl=60.0)
+_DASH_LOCK = threading.Lock()
+_DASH_EVENTS = TTLCache(maxsize=256, ttl=30.0)
+_DASH_HUB = SessionEventHub("event_dashboard")
+_DASH_PING_SECONDS = 15.0
+
+
+def _dashboard_counts(db, event_id: int) -> Dict[str, int]:
+    """Current KPI counters for an event (a copy)."""
+    with _DASH_LOCK:
+        hit, counts = _DASH_COUNTS.get(event_id)
+        if hit:
+            return dict(counts)
+    counts = db.get_event_dashboard_counts(event_id)
+    with _DASH_LOCK:
+        _DASH_COUNTS.set(event_id, counts)
+        return dict(counts)
+
+
+def _on_event_change(kind: str, event_id: int, data: Dict[str, Any]) -> None:
+    with _DASH_LOCK:
+        hit, counts = _DASH_COUNTS.get(event_id)
+        if hit:
+            if kind == "player_joined":
+                counts["players_count"] += 1
+            elif kind == "wallet":
+                counts["wallet_total"] += int(data.get("delta") or 0)
+            elif kind == "game":
+                now_active = bool((data.get("game") or {}).get("active")) and not data.get("removed")
+                counts["games_count"] += int(now_active) - int(bool(data.get("was_active")))
+        stats = dict(counts) if hit else None
+    if kind == "player_joined":
+        message = {"type": "PLAYER_JOINED", "user_id": data.get("user_id")}
+    elif kind == "wallet":
+        # aggregate only: the dashboard is public
+        message = {"type": "WALLET", "delta": data.get("delta"), "reason": data.get("reason")}
+    elif kind == "game":
+        message = {"type": "GAME_REMOVED", "game_id": data.get("game_id")} if data.get("removed") else {"type": "GAME", "game": data.get("game")}
+    else:
+        return
+    message["stats"] = stats
+    _DASH_HUB.dispatch(str(event_id), [message])
+
+
+add_change_listener(_on_event_change)
+
+
+async def _dashboard_event(code: str) -> Optional[Dict[str, Any]]:
+    key = code.lower()
+    hit, ev = _DASH_EVENTS.get(key)
+    if not hit:
+        db = get_database()
+        ev = await db.run_async(db.get_event_by_code, code)
+        _DASH_EVENTS.set(key, ev)
+    return ev
+
+
+def _dashboard_feed(event_id: int, stats: Dict[str, int]):
+    """Stream dashboard deltas for ``event_id``; None marks a keep-alive."""
+    db = get_database()
+
+    async def refreshed() -> Dict[str, Any]:
+        nonlocal stats
+        stats = await asyncio.to_thread(_dashboard_counts, db, event_id)
+        return {"type": "STATS", "stats": stats}
+
+    async def on_idle() -> Optional[Dict[str, Any]]:
+        # Counters may have been refreshed with changes made by other processes.
+        previous = stats
+        payload = await refreshed()
+        return payload if stats != previous else None
+
+    async def on_event(msg: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal stats
+        if msg.get("stats") is None:
+            msg = {**msg, "stats": await asyncio.to_thread(_dashboard_counts, db, event_id)}
+        stats = msg["stats"]
+        return msg
+
+    return sse_feed(
+        _DASH_HUB,
+        str(event_id),
+        keepalive=_DASH_PING_SECONDS,
+        resync=refreshed,
+        on_event=on_event,
+        on_idle=on_idle,
+    )
+
+
 @route("GET", "/api/events/{code}/dashboard/stats", allow_public=True)
 async def event_dashboard_stats(req: web.Request) -> web.Response:
     code = _sanitize_event_code(req.match_info.get("code") or "")
     if not code:
         return web.json_response({"ok": False, "error": "invalid event code"}, status=400)
     
-    db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await _dashboard_event(code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     
-    event_id = int(ev["id"])
-    
-    # Count registered players
-    players_count = db._fetchone(
-        "SELECT COUNT(*) as count FROM event_players WHERE event_id = %s",
-        (event_id,)
-    )
-    players_count = players_count.get("count", 0) if players_count else 0
-    
-    # Count active games for this event
-    # Games are linked to events via metadata or can be filtered by join_code pattern
-    games_count = db._fetchone(
-        """
-        SELECT COUNT(*) as count 
-        FROM cardgame_sessions 
-        WHERE join_code LIKE %s 
-        AND status IN ('created', 'active', 'waiting')
-        """,
-        (f"{code}-%",)
-    )
-    games_count = games_count.get("count", 0) if games_count else 0
-    
+    stats = await asyncio.to_thread(_dashboard_counts, get_database(), int(ev["id"]))
     return web.json_response({
         "ok": True,
-        "stats": {
-            "players_count": players_count,
-            "games_count": games_count,
-        }
+        "stats": stats,
     })
 
 
+@route("GET", "/api/events/{code}/dashboard/stream", allow_public=True)
+async def event_dashboard_stream(req: web.Request) -> web.StreamResponse:
+    code = _sanitize_event_code(req.match_info.get("code") or "")
+    if not code:
+        return web.json_response({"ok": False, "error": "invalid event code"}, status=400)
+    ev = await _dashboard_event(code)
+    if not ev:
+        return web.json_response({"ok": False, "error": "event not found"}, status=404)
+    event_id = int(ev["id"])
+    stats = await asyncio.to_thread(_dashboard_counts, get_database(), event_id)
+
+    resp = web.StreamResponse(
+        status=200,
+        headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
+    await resp.prepare(req)
+    snapshot = {
+        "type": "SNAPSHOT",
+        "event": {
+            "title": ev.get("title"),
+            "venue_name": ev.get("venue_name"),
+            "currency_name": ev.get("currency_name"),
+            "status": ev.get("status"),
+            "wallet_enabled": bool(ev.get("wallet_enabled")),
+        },
+        "stats": stats,
+    }
+    await resp.write(f"data: {json.dumps(to_jsonable(snapshot))}\n\n".encode("utf-8"))
+
+    try:
+        await write_sse(resp, _dashboard_feed(event_id, stats), dumps=lambda payload: json.dumps(to_jsonable(payload)))
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        pass
+    return resp
+
+
 @route("GET", "/api/events/{code}/dashboard/players", allow_public=True)
 async def event_dashboard_players(req: web.Request) -> web.Response:
     code = _sanitize_event_code(req.match_info.get("code") or "")
     if not code:
         return web.json_response({"ok": False, "error": "invalid event code"}, status=400)
     
-    db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await _dashboard_event(code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     
+    db = get_database()
     event_id = int(ev["id"])
     
-    players = db._execute(
+    players = await db._aexecute(
         """
         SELECT ep.user_id, ep.role, ep.joined_at, u.xiv_username as name
         FROM event_players ep
@@ -908,44 +1028,13 @@ async def event_dashboard_games(req: web.Request) -> web.Response:
     if not code:
         return web.json_response({"ok": False, "error": "invalid event code"}, status=400)
     
-    db = get_database()
-    ev = db.get_event_by_code(code)
+    ev = await _dashboard_event(code)
     if not ev:
         return web.json_response({"ok": False, "error": "event not found"}, status=404)
     
-    # Find games related to this event by join_code pattern
-    games = db._execute(
-        """
-        SELECT session_id, join_code, game_id, status, created_at, pot, currency
-        FROM cardgame_sessions 
-        WHERE join_code LIKE %s
-        ORDER BY created_at DESC
-        """,
-        (f"{code}-%",),
-        fetch=True
-    )
-    
-    # Format the games data
-    formatted_games = []
-    for game in (games or []):
-        created_at_val = game.get("created_at")
-        created_at_str = None
-        if created_at_val:
-            try:
-                created_at_str = created_at_val.isoformat() if hasattr(created_at_val, 'isoformat') else str(created_at_val)
-            except Exception:
-                created_at_str = None
-        
-        formatted_games.append({
-            "session_id": game.get("session_id"),
-            "join_code": game.get("join_code"),
-            "game_id": game.get("game_id"),
-            "title": f"{game.get('game_id', 'Game')} ({game.get('join_code', 'N/A')})",
-            "status": game.get("status"),
-            "created_at": created_at_str,
-            "pot": game.get("pot"),
-            "currency": game.get("currency"),
-        })
+    db = get_database()
+    games = await db.run_async(db.list_event_games, int(ev["id"]))
+    formatted_games = [db._dashboard_game(game) for game in (games or [])]
     
     return web.json_response({
         "ok": True,
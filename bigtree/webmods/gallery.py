@@ -1,7 +1,7 @@
 # bigtree/webmods/gallery.py
 from __future__ import annotations
 from aiohttp import web
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List
 import unicodedata
 import asyncio
 import os
@@ -10,42 +10,170 @@ import bigtree
 from bigtree.inc.plogon import get_with_leaf_path
 from bigtree.inc.webserver import route
 from bigtree.inc.database import get_database
+from bigtree.inc import thumbs
+from bigtree.inc.cache import TTLCache
+from bigtree.inc.http_cache import ResponseCache
 from bigtree.modules import media as media_mod
 from bigtree.modules import artists as artist_mod
 from bigtree.modules import gallery as gallery_mod
 from bigtree.webmods import contest as contest_mod
-import random
+from bigtree.webmods import uploads as upload_mod
+import hashlib
+import json
+import threading
 import time
+from collections import OrderedDict
 
+# Gallery feed index: {"index": OrderedDict[item_id -> item], "items": [...], "visible": [...]}.
+# Built once, then kept current by the apply_* deltas below; the "items" and
+# "visible" lists are immutable snapshots replaced on every delta, so readers
+# never need a copy. The TTL only reconciles sources without delta hooks
+# (contest entries, files dropped straight into the media dir).
 _GALLERY_CACHE: dict | None = None
 _GALLERY_CACHE_AT = 0.0
-_GALLERY_CACHE_TTL = 600.0
-_GALLERY_SHUFFLES: dict[int, list[int]] = {}
+_GALLERY_CACHE_TTL = 3600.0
+_GALLERY_LOCK = threading.RLock()
+# One rebuild at a time. Deltas applied while it scans are logged in
+# _PENDING_DELTAS and replayed onto the new index before it is published.
+_REBUILD_LOCK = threading.Lock()
+_PENDING_DELTAS: list | None = None
+# Bumped by invalidate_gallery_cache so a rebuild already in flight is not trusted.
+_GALLERY_EPOCH = 0
 _THUMB_WARM_AT = 0.0
 _THUMB_WARM_TTL = 30.0
-_CONTEST_THUMB_DIR = "thumbs"
+_MEDIA_PAGE_SIZE = 500
+# Content versions for the public JSON responses (see _RESPONSES).
+_GALLERY_VERSION = 0
+_CALENDAR_VERSION = 0
+_RESPONSES = ResponseCache(maxsize=512, ttl=300.0)
+_CONFIG_CACHE = TTLCache(maxsize=4, ttl=30.0)
 
 def invalidate_gallery_cache() -> None:
-    global _GALLERY_CACHE, _GALLERY_CACHE_AT, _GALLERY_SHUFFLES
-    _GALLERY_CACHE = None
-    _GALLERY_CACHE_AT = 0.0
-    _GALLERY_SHUFFLES = {}
+    """Drop the index so the next read does a full rebuild (bulk imports, deck visibility changes)."""
+    global _GALLERY_CACHE, _GALLERY_CACHE_AT, _GALLERY_EPOCH
+    with _GALLERY_LOCK:
+        _GALLERY_CACHE = None
+        _GALLERY_CACHE_AT = 0.0
+        _GALLERY_EPOCH += 1
+
+def _publish_index(index: "OrderedDict[str, dict]") -> None:
+    # Caller holds _GALLERY_LOCK.
+    global _GALLERY_CACHE, _GALLERY_VERSION
+    items = list(index.values())
+    _GALLERY_CACHE = {
+        "index": index,
+        "items": items,
+        "visible": [item for item in items if not item.get("hidden")],
+    }
+    _GALLERY_VERSION += 1
+
+def _apply_delta(change: Callable[["OrderedDict[str, dict]"], bool]) -> None:
+    """Apply ``change`` to the live index (and log it for a rebuild in flight); it returns whether it changed anything."""
+    with _GALLERY_LOCK:
+        if _PENDING_DELTAS is not None:
+            _PENDING_DELTAS.append(change)
+        cache = _GALLERY_CACHE
+        if cache is not None and change(cache["index"]):
+            _publish_index(cache["index"])
+
+def _index_tracked() -> bool:
+    return _GALLERY_CACHE is not None or _PENDING_DELTAS is not None
+
+def _gallery_fresh() -> bool:
+    return _GALLERY_CACHE is not None and (time.time() - _GALLERY_CACHE_AT) < _GALLERY_CACHE_TTL
+
+def _rebuild_gallery_index() -> dict:
+    global _GALLERY_CACHE_AT, _PENDING_DELTAS
+    with _REBUILD_LOCK:
+        cache = _GALLERY_CACHE
+        if _gallery_fresh() and cache is not None:
+            # rebuilt by another caller while we waited
+            return cache
+        started = time.time()
+        with _GALLERY_LOCK:
+            epoch = _GALLERY_EPOCH
+            _PENDING_DELTAS = []
+        try:
+            items = _collect_gallery_items(include_hidden=True)
+            index: "OrderedDict[str, dict]" = OrderedDict()
+            for item in items:
+                key = item.get("item_id") or item.get("url") or ""
+                if key and key not in index:
+                    index[key] = item
+            with _GALLERY_LOCK:
+                for change in _PENDING_DELTAS:
+                    change(index)
+                _publish_index(index)
+                # invalidated mid-scan: serve this index but rebuild on the next read
+                _GALLERY_CACHE_AT = started if epoch == _GALLERY_EPOCH else 0.0
+                return _GALLERY_CACHE
+        finally:
+            with _GALLERY_LOCK:
+                _PENDING_DELTAS = None
 
 def _get_gallery_cached(include_hidden: bool) -> list[dict]:
-    global _GALLERY_CACHE, _GALLERY_CACHE_AT, _GALLERY_SHUFFLES
-    now = time.time()
-    if _GALLERY_CACHE is not None and (now - _GALLERY_CACHE_AT) < _GALLERY_CACHE_TTL:
-        cached = _GALLERY_CACHE.get("items", [])
-        if include_hidden:
-            return list(cached)
-        return [item for item in cached if not item.get("hidden")]
-    items = _collect_gallery_items(include_hidden=True)
-    _GALLERY_CACHE = {"items": items}
-    _GALLERY_CACHE_AT = now
-    _GALLERY_SHUFFLES = {}
-    if include_hidden:
-        return list(items)
-    return [item for item in items if not item.get("hidden")]
+    cache = _GALLERY_CACHE
+    if not _gallery_fresh() or cache is None:
+        cache = _rebuild_gallery_index()
+    return cache["items"] if include_hidden else cache["visible"]
+
+async def _aget_gallery_cached(include_hidden: bool) -> list[dict]:
+    # Cache hits stay on the loop; rebuilds (DB + filesystem scan) run on the DB executor.
+    if _gallery_fresh():
+        return _get_gallery_cached(include_hidden)
+    return await get_database().run_async(_get_gallery_cached, include_hidden, timeout=0)
+
+def apply_media_upsert(filename: str) -> None:
+    """Re-read one media row and insert/replace its feed entry (blocking; run off the loop)."""
+    filename = (filename or "").strip()
+    if not filename or not _index_tracked():
+        return
+    item_id = _item_id("media", filename)
+    row = get_database().get_media_item(filename)
+    if not row:
+        apply_item_removed(item_id)
+        return
+    hidden_set = {item_id} if item_id in (gallery_mod.get_hidden_set() or set()) else set()
+    item = _media_row_item(row, hidden_set, {})
+    if item is None:
+        return
+
+    def upsert(index: "OrderedDict[str, dict]") -> bool:
+        existing = index.get(item_id)
+        index[item_id] = {**item, "reactions": existing.get("reactions", {}) if existing else {}}
+        if existing is None:
+            # Feed order is newest first, matching list_media_items.
+            index.move_to_end(item_id, last=False)
+        return True
+
+    _apply_delta(upsert)
+
+def apply_item_removed(item_id: str) -> None:
+    def remove(index: "OrderedDict[str, dict]") -> bool:
+        return index.pop(item_id, None) is not None
+
+    _apply_delta(remove)
+
+def apply_hidden(item_id: str, hidden: bool) -> None:
+    def set_hidden(index: "OrderedDict[str, dict]") -> bool:
+        existing = index.get(item_id)
+        if existing is None or bool(existing.get("hidden")) == bool(hidden):
+            return False
+        # Replace rather than mutate: readers may be serialising the old snapshot.
+        index[item_id] = {**existing, "hidden": bool(hidden)}
+        return True
+
+    _apply_delta(set_hidden)
+
+def apply_reactions(item_id: str, reactions: Dict[str, int]) -> None:
+    def set_reactions(index: "OrderedDict[str, dict]") -> bool:
+        existing = index.get(item_id)
+        if existing is None:
+            return False
+        index[item_id] = {**existing, "reactions": dict(reactions or {})}
+        return True
+
+    _apply_delta(set_reactions)
 
 _IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
 _REACTION_TYPES = set(gallery_mod.reaction_types())
@@ -81,54 +209,15 @@ def _contest_name(meta: Dict[str, Any] | None, channel_id: int) -> str:
 def _contest_media_url(filename: str) -> str:
     return f"/contest/media/{filename}"
 
-def _contest_thumb_dir() -> str:
-    path = os.path.join(contest_mod._contest_dir(), _CONTEST_THUMB_DIR)
-    os.makedirs(path, exist_ok=True)
-    return path
-
-def _contest_thumb_path(filename: str) -> str:
-    return os.path.join(_contest_thumb_dir(), filename)
-
-def _ensure_contest_thumb(filename: str, size: tuple[int, int] = (480, 672)) -> bool:
+def _ensure_contest_thumb(filename: str, variant: str = "") -> bool:
+    """Blocking wait for a contest thumb rendered in the worker pool (off-loop callers only)."""
     if not filename:
         return False
-    ext = os.path.splitext(filename)[1].lower()
-    if ext not in _IMG_EXTS:
-        return False
-    thumb_path = _contest_thumb_path(filename)
-    if os.path.exists(thumb_path):
-        return True
-    source = os.path.join(contest_mod._contest_dir(), filename)
-    if not os.path.exists(source):
-        return False
-    try:
-        from PIL import Image
-    except Exception:
-        return False
-    try:
-        with Image.open(source) as img:
-            try:
-                img.seek(0)
-            except Exception:
-                pass
-            img.thumbnail(size)
-            fmt = {
-                ".jpg": "JPEG",
-                ".jpeg": "JPEG",
-                ".png": "PNG",
-                ".gif": "GIF",
-                ".bmp": "BMP",
-                ".webp": "WEBP",
-            }.get(ext, "PNG")
-            save_kwargs = {}
-            if fmt == "JPEG":
-                if img.mode not in ("RGB", "L"):
-                    img = img.convert("RGB")
-                save_kwargs = {"quality": 82, "optimize": True, "progressive": True}
-            img.save(thumb_path, fmt, **save_kwargs)
-    except Exception:
-        return False
-    return True
+    return thumbs.get_thumbnail_pool().ensure(contest_mod._contest_dir(), filename, variant)
+
+def _queue_contest_thumbs(filename: str) -> None:
+    if filename:
+        thumbs.get_thumbnail_pool().enqueue(contest_mod._contest_dir(), filename)
 
 def _strip_emojis(text: str) -> str:
     if not text:
@@ -152,20 +241,58 @@ def _strip_query(url: str) -> str:
 def _media_path(filename: str) -> str:
     return os.path.join(media_mod.get_media_dir(), filename)
 
-def _media_thumb_url(url: str) -> str:
-    if not url or not url.startswith("/media/"):
-        return ""
-    filename = url.split("/media/", 1)[1]
-    if not filename:
-        return ""
-    if media_mod.ensure_thumb(filename):
-        return f"/media/thumbs/{filename}"
-    return ""
-
 def _item_id(source: str, identifier: str) -> str:
     identifier = (identifier or "").strip()
     return f"{source}:{identifier}" if identifier else ""
 
+def _media_row_item(row: Dict[str, Any], hidden_set: set[str], artists: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Build one feed entry from a media_items row; ``artists`` memoises artist lookups."""
+    filename = (row.get("filename") or row.get("media_id") or "").strip()
+    if not filename:
+        return None
+    item_id = _item_id("media", filename)
+    hidden = bool(row.get("hidden")) or (item_id in hidden_set)
+    metadata = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
+    url = (row.get("url") or "").strip() or f"/media/{filename}"
+    thumb_url = (row.get("thumb_url") or "").strip() or f"/media/thumbs/{filename}"
+    # Queue thumbs for disk-backed images; the thumb route waits for a pending job.
+    try:
+        if url.startswith("/media/"):
+            media_mod.queue_thumbs(filename)
+    except Exception:
+        pass
+    artist_name = (row.get("artist_name") or "").strip()
+    artist_links = row.get("artist_links") if isinstance(row.get("artist_links"), dict) else {}
+    if not artist_name:
+        artist_id = (metadata.get("artist_id") or "").strip()
+        if artist_id:
+            if artist_id not in artists:
+                artists[artist_id] = artist_mod.get_artist(artist_id)
+            artist = artists[artist_id]
+            if artist:
+                artist_name = (artist.get("name") or "").strip()
+                if isinstance(artist.get("links"), dict) and artist.get("links"):
+                    artist_links = artist.get("links") or artist_links
+            if not artist_name:
+                artist_name = artist_id
+    if not artist_name:
+        artist_name = "Forest"
+    return {
+        "item_id": item_id,
+        "filename": filename,
+        "title": row.get("title") or filename,
+        "url": url,
+        "fallback_url": f"/media/{filename}" if url != f"/media/{filename}" else "",
+        "thumb_url": thumb_url,
+        "source": "media",
+        "type": row.get("origin_type") or "Artifact",
+        "origin": row.get("origin_label") or "",
+        "artist": {"artist_id": None, "name": artist_name, "links": artist_links},
+        "reactions": {},
+        "hidden": hidden,
+        "metadata": metadata,
+    }
+
 def _collect_gallery_items(include_hidden: bool) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     seen: set[str] = set()
@@ -181,68 +308,29 @@ def _collect_gallery_items(include_hidden: bool) -> List[Dict[str, Any]]:
     # Pull from Postgres as the source of truth.
     # NOTE: we keep legacy reaction/hidden ids stable by still using the
     # "media:<filename>" item_id shape.
+    # list_media_items caps a page at 500 rows, so walk every page; anything
+    # past the first page would otherwise look "filesystem only" below.
     rows = []
     try:
-        rows = db.list_media_items(limit=5000, offset=0, include_hidden=True)
+        while True:
+            page = db.list_media_items(limit=_MEDIA_PAGE_SIZE, offset=len(rows), include_hidden=True)
+            rows.extend(page)
+            if len(page) < _MEDIA_PAGE_SIZE:
+                break
     except Exception:
-        rows = []
+        pass
 
+    artists: Dict[str, Any] = {}
     for row in rows:
-        filename = (row.get("filename") or row.get("media_id") or "").strip()
-        if not filename:
+        item = _media_row_item(row, hidden_set, artists)
+        if item is None:
             continue
-        item_id = _item_id("media", filename)
-        hidden = bool(row.get("hidden")) or (item_id in hidden_set)
-        
-        # Hide dice and slots media by default in public gallery
-        metadata = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
-        media_type = metadata.get("media_type", "").lower()
-        if not include_hidden and media_type in ("dice", "slots"):
+        if not include_hidden and (item["hidden"] or str(item["metadata"].get("media_type") or "").lower() in ("dice", "slots")):
             continue
-        
-        if not include_hidden and hidden:
+        if item["url"] in seen:
             continue
-        url = (row.get("url") or "").strip() or f"/media/{filename}"
-        thumb_url = (row.get("thumb_url") or "").strip() or f"/media/thumbs/{filename}"
-        if url in seen:
-            continue
-        # Ensure thumb exists for disk-backed images.
-        try:
-            if url.startswith("/media/"):
-                _ = media_mod.ensure_thumb(filename)
-        except Exception:
-            pass
-        artist_name = (row.get("artist_name") or "").strip()
-        artist_links = row.get("artist_links") if isinstance(row.get("artist_links"), dict) else {}
-        if not artist_name:
-            meta = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
-            artist_id = (meta.get("artist_id") or "").strip() if isinstance(meta, dict) else ""
-            if artist_id:
-                artist = artist_mod.get_artist(artist_id)
-                if artist:
-                    artist_name = (artist.get("name") or "").strip()
-                    if isinstance(artist.get("links"), dict) and artist.get("links"):
-                        artist_links = artist.get("links") or artist_links
-                if not artist_name:
-                    artist_name = artist_id
-        if not artist_name:
-            artist_name = "Forest"
-        items.append({
-            "item_id": item_id,
-            "filename": filename,
-            "title": row.get("title") or filename,
-            "url": url,
-            "fallback_url": f"/media/{filename}" if url != f"/media/{filename}" else "",
-            "thumb_url": thumb_url,
-            "source": "media",
-            "type": row.get("origin_type") or "Artifact",
-            "origin": row.get("origin_label") or "",
-            "artist": {"artist_id": None, "name": artist_name, "links": artist_links},
-            "reactions": {},
-            "hidden": hidden,
-            "metadata": metadata,
-        })
-        seen.add(url)
+        items.append(item)
+        seen.add(item["url"])
 
     # Opportunistic: if files exist in the media dir but have not been migrated yet,
     # upsert them into Postgres so the feed remains complete.
@@ -265,7 +353,7 @@ def _collect_gallery_items(include_hidden: bool) -> List[Dict[str, Any]]:
             if url in seen:
                 continue
             try:
-                _ = media_mod.ensure_thumb(name)
+                media_mod.queue_thumbs(name)
             except Exception:
                 pass
             try:
@@ -309,7 +397,8 @@ def _collect_gallery_items(include_hidden: bool) -> List[Dict[str, Any]]:
             if not include_hidden and hidden:
                 continue
             thumb_url = ""
-            if filename and _ensure_contest_thumb(filename):
+            if filename and os.path.splitext(filename)[1].lower() in _IMG_EXTS:
+                _queue_contest_thumbs(filename)
                 thumb_url = f"/contest/media/thumbs/{filename}"
             entry["item_id"] = item_id
             entry["type"] = entry.get("type") or "Contest"
@@ -331,15 +420,46 @@ def _collect_gallery_items(include_hidden: bool) -> List[Dict[str, Any]]:
 
     return items
 
-def _get_shuffle_indices(total: int, seed: int) -> list[int]:
-    indices = _GALLERY_SHUFFLES.get(seed)
-    if indices is not None and len(indices) == total:
-        return indices
-    rng = random.Random(seed)
-    indices = list(range(total))
-    rng.shuffle(indices)
-    _GALLERY_SHUFFLES[seed] = indices
-    return indices
+_MASK64 = (1 << 64) - 1
+
+def _mix64(value: int) -> int:
+    # splitmix64 finaliser
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & _MASK64
+    return value ^ (value >> 31)
+
+def _shuffle_window(total: int, seed: int, offset: int = 0, limit: int = 0) -> list[int]:
+    """Indices ``offset..offset+limit`` of a seeded permutation of ``range(total)``.
+
+    A 4-round Feistel network is a bijection on ``[0, 2**bits)``; cycle-walking
+    folds it onto ``[0, total)``. Each position is computed independently, so a
+    page costs O(limit) and nothing is stored per seed.
+    """
+    if total <= 0:
+        return []
+    end = total if limit <= 0 else min(total, offset + limit)
+    if offset >= end:
+        return []
+    bits = max(2, (total - 1).bit_length())
+    bits += bits & 1
+    half = bits // 2
+    mask = (1 << half) - 1
+    keys = [_mix64((seed & _MASK64) + (r + 1) * 0x9E3779B97F4A7C15 & _MASK64) for r in range(4)]
+
+    def permute(value: int) -> int:
+        left, right = value >> half, value & mask
+        for key in keys:
+            left, right = right, left ^ (_mix64(right ^ key) & mask)
+        return (left << half) | right
+
+    out = []
+    for pos in range(offset, end):
+        idx = permute(pos)
+        # domain is < 4 * total, so this terminates after a few steps on average
+        while idx >= total:
+            idx = permute(idx)
+        out.append(idx)
+    return out
 
 def _schedule_thumb_warm(items: list[dict]) -> None:
     global _THUMB_WARM_AT
@@ -363,29 +483,29 @@ def _contest_filename_from_url(url: str) -> str:
         return ""
     return url.split("/contest/media/", 1)[1]
 
-def _ensure_thumb_for_item(item: dict) -> None:
+def _queue_thumb_for_item(item: dict) -> None:
     url = (item.get("url") or "").strip()
     if url.startswith("/media/"):
         name = _media_filename_from_url(url)
         if name:
-            media_mod.ensure_thumb(name)
+            media_mod.queue_thumbs(name)
         return
     if url.startswith("/contest/media/"):
         name = _contest_filename_from_url(url)
         if name:
-            _ensure_contest_thumb(name)
+            _queue_contest_thumbs(name)
         return
 
 async def _warm_thumbnails(items: list[dict], limit: int = 48) -> None:
     if not items:
         return
     slice_items = items[:limit]
-    await asyncio.to_thread(_ensure_thumbs_for_items, slice_items)
+    await asyncio.to_thread(_queue_thumbs_for_items, slice_items)
 
-def _ensure_thumbs_for_items(items: list[dict]) -> None:
+def _queue_thumbs_for_items(items: list[dict]) -> None:
     for item in items:
         try:
-            _ensure_thumb_for_item(item)
+            _queue_thumb_for_item(item)
         except Exception:
             continue
 
@@ -406,42 +526,20 @@ async def contest_media_thumb(req: web.Request):
     ext = os.path.splitext(filename)[1].lower()
     if ext not in _IMG_EXTS:
         return web.Response(status=404)
-    if not _ensure_contest_thumb(filename):
-        return web.Response(status=404)
-    path = _contest_thumb_path(filename)
-    if not os.path.exists(path):
-        return web.Response(status=404)
-    return web.FileResponse(path)
+    return await upload_mod.thumb_response(req, contest_mod._contest_dir(), filename)
 
-@route("GET", "/api/gallery/images", allow_public=True)
-async def gallery_images(_req: web.Request):
-    items = _get_gallery_cached(include_hidden=False)
-    total = len(items)
-    seed_raw = _req.query.get("seed")
-    try:
-        seed = int(seed_raw) if seed_raw is not None else None
-    except Exception:
-        seed = None
-    if seed is None:
-        seed = int(time.time() * 1000) & 0x7FFFFFFF
-    indices = _get_shuffle_indices(total, seed)
-    _schedule_thumb_warm(items)
-    try:
-        limit = int(_req.query.get("limit") or 0)
-    except Exception:
-        limit = 0
-    try:
-        offset = int(_req.query.get("offset") or 0)
-    except Exception:
-        offset = 0
-    if offset < 0:
-        offset = 0
-    if limit and limit > 0:
-        indices = indices[offset:offset + limit]
-        items = [items[idx] for idx in indices]
-    else:
-        items = [items[idx] for idx in indices]
-    cfg = get_database().get_system_config("gallery") or {}
+async def _gallery_config() -> tuple[dict, str]:
+    """The "gallery" system config plus a digest of it, cached briefly."""
+    hit, cached = _CONFIG_CACHE.get("gallery")
+    if hit:
+        return cached
+    db = get_database()
+    cfg = await db.run_async(db.get_system_config, "gallery") or {}
+    digest = hashlib.blake2b(json.dumps(cfg, sort_keys=True, default=str).encode("utf-8"), digest_size=8).hexdigest()
+    _CONFIG_CACHE.set("gallery", (cfg, digest))
+    return cfg, digest
+
+def _gallery_settings_payload(cfg: dict) -> Dict[str, Any]:
     # Backwards compat: earlier configs used singular keys.
     inspiration_cfg = (
         cfg.get("inspiration_texts")
@@ -450,7 +548,7 @@ async def gallery_images(_req: web.Request):
         or cfg.get("flair_text")
         or ""
     )
-    settings = {
+    return {
         "columns": cfg.get("columns"),
         "inspiration_every": cfg.get("inspiration_every"),
         "inspiration_texts": inspiration_cfg,
@@ -465,21 +563,63 @@ async def gallery_images(_req: web.Request):
         "return_title": cfg.get("return_title") or "",
         "return_body": cfg.get("return_body") or "",
     }
-    resp = web.json_response({
-        "ok": True,
-        "items": items,
-        "total": total,
-        "seed": seed,
-        "offset": offset,
-        "limit": limit,
-        "settings": settings,
-    })
-    resp.headers["Cache-Control"] = "public, max-age=60"
-    return resp
+
+@route("GET", "/api/gallery/images", allow_public=True)
+async def gallery_images(_req: web.Request):
+    # Read the version first: a delta landing mid-request then forces a rebuild
+    # instead of caching a stale body under the newer version.
+    version = _GALLERY_VERSION
+    items = await _aget_gallery_cached(include_hidden=False)
+    total = len(items)
+    seed_raw = _req.query.get("seed")
+    try:
+        seed = int(seed_raw) if seed_raw is not None else None
+    except Exception:
+        seed = None
+    # Only client-chosen seeds repeat, so only those are worth keeping.
+    store = seed is not None
+    if seed is None:
+        seed = int(time.time() * 1000) & 0x7FFFFFFF
+    _schedule_thumb_warm(items)
+    try:
+        limit = int(_req.query.get("limit") or 0)
+    except Exception:
+        limit = 0
+    try:
+        offset = int(_req.query.get("offset") or 0)
+    except Exception:
+        offset = 0
+    if offset < 0:
+        offset = 0
+    cfg, cfg_digest = await _gallery_config()
+
+    def build() -> Dict[str, Any]:
+        if limit and limit > 0:
+            indices = _shuffle_window(total, seed, offset, limit)
+        else:
+            indices = _shuffle_window(total, seed)
+        return {
+            "ok": True,
+            "items": [items[idx] for idx in indices],
+            "total": total,
+            "seed": seed,
+            "offset": offset,
+            "limit": limit,
+            "settings": _gallery_settings_payload(cfg),
+        }
+
+    return await _RESPONSES.respond(
+        _req,
+        ("images", seed, offset, limit),
+        (version, cfg_digest),
+        build,
+        cache_control="public, max-age=60",
+        store=store,
+    )
 
 @route("GET", "/api/gallery/admin/items", scopes=["tarot:admin"])
 async def gallery_admin_items(_req: web.Request):
-    items = _get_gallery_cached(include_hidden=True)
+    items = await _aget_gallery_cached(include_hidden=True)
     return web.json_response({"ok": True, "items": items})
 
 @route("POST", "/api/gallery/hidden", scopes=["tarot:admin"])
@@ -497,8 +637,9 @@ async def gallery_hidden_set(req: web.Request):
     media_id = item_id
     if ":" in item_id:
         media_id = item_id.split(":", 1)[1]
+    db = get_database()
     try:
-        get_database().set_media_hidden(media_id, hidden)
+        await db.run_async(db.set_media_hidden, media_id, hidden)
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=400)
     try:
@@ -507,13 +648,13 @@ async def gallery_hidden_set(req: web.Request):
         gallery_mod.set_hidden(item_id, hidden)
     except Exception:
         pass
-    invalidate_gallery_cache()
+    apply_hidden(item_id, hidden)
     return web.json_response({"ok": True, "item_id": item_id, "hidden": hidden})
 
 @route("GET", "/api/gallery/settings", scopes=["tarot:admin", "admin:web"])
 async def gallery_settings_get(_req: web.Request):
     db = get_database()
-    cfg = db.get_system_config("gallery") or {}
+    cfg = await db.run_async(db.get_system_config, "gallery") or {}
     return web.json_response({
         "ok": True,
         "upload_channel_id": gallery_mod.get_upload_channel_id(),
@@ -592,6 +733,7 @@ async def gallery_settings_set(req: web.Request):
         if message_body_present:
             cfg["message_body"] = str(body.get("message_body") or "").strip()
         db.update_system_config("gallery", cfg)
+    _CONFIG_CACHE.pop("gallery")
 
     return web.json_response({
         "ok": True,
@@ -718,6 +860,7 @@ async def gallery_import_channel(req: web.Request):
                 except Exception:
                     skipped += 1
                     continue
+                media_mod.queue_thumbs(save_name)
                 title = base_title or filename
                 if idx > 0 and base_title:
                     title = f"{base_title} ({idx + 1})"
@@ -754,7 +897,8 @@ async def gallery_reactions(req: web.Request):
     item_id = (req.query.get("item_id") or "").strip()
     if not item_id:
         return web.json_response({"ok": False, "error": "item_id required"}, status=400)
-    return web.json_response({"ok": True, "item_id": item_id, "reactions": gallery_mod.get_reactions(item_id)})
+    reactions = await get_database().run_async(gallery_mod.get_reactions, item_id)
+    return web.json_response({"ok": True, "item_id": item_id, "reactions": reactions})
 
 @route("POST", "/api/gallery/reactions", allow_public=True)
 async def gallery_react(req: web.Request):
@@ -769,9 +913,10 @@ async def gallery_react(req: web.Request):
     if reaction_id not in _REACTION_TYPES:
         return web.json_response({"ok": False, "error": "invalid reaction"}, status=400)
     try:
-        counts = gallery_mod.increment_reaction(item_id, reaction_id)
+        counts = await get_database().run_async(gallery_mod.increment_reaction, item_id, reaction_id)
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=400)
+    apply_reactions(item_id, counts)
     return web.json_response({"ok": True, "item_id": item_id, "reactions": counts})
 
 @route("POST", "/api/gallery/media/update", scopes=["tarot:admin"])
@@ -817,7 +962,8 @@ async def gallery_media_update(req: web.Request):
             metadata["media_type"] = media_type
         if venue_id is not None:
             metadata["venue_id"] = venue_id
-        db.upsert_media_item(
+        await db.run_async(
+            db.upsert_media_item,
             media_id=filename,
             filename=filename,
             title=title or None,
@@ -831,24 +977,31 @@ async def gallery_media_update(req: web.Request):
         )
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=400)
-    invalidate_gallery_cache()
+    try:
+        await db.run_async(apply_media_upsert, filename)
+    except Exception:
+        invalidate_gallery_cache()
     return web.json_response({"ok": True, "filename": filename})
 
 @route("GET", "/api/gallery/calendar", allow_public=True)
 async def gallery_calendar(_req: web.Request):
-    months = []
-    for entry in gallery_mod.list_calendar():
-        months.append({
-            "month": entry.get("month"),
-            "month_name": entry.get("month_name"),
-            "image": entry.get("image"),
-            "title": entry.get("title") or "",
-            "artist": _artist_payload(entry.get("artist_id")),
-        })
-    return web.json_response({"ok": True, "months": months})
+    async def build() -> Dict[str, Any]:
+        months = []
+        for entry in await get_database().run_async(gallery_mod.list_calendar):
+            months.append({
+                "month": entry.get("month"),
+                "month_name": entry.get("month_name"),
+                "image": entry.get("image"),
+                "title": entry.get("title") or "",
+                "artist": _artist_payload(entry.get("artist_id")),
+            })
+        return {"ok": True, "months": months}
+
+    return await _RESPONSES.respond(_req, "calendar", _CALENDAR_VERSION, build)
 
 @route("POST", "/api/gallery/calendar", scopes=["tarot:admin"])
 async def gallery_calendar_set(req: web.Request):
+    global _CALENDAR_VERSION
     try:
         body = await req.json()
     except Exception:
@@ -861,11 +1014,13 @@ async def gallery_calendar_set(req: web.Request):
         return web.json_response({"ok": False, "error": "month must be 1-12"}, status=400)
     if not image:
         gallery_mod.clear_month(month)
+        _CALENDAR_VERSION += 1
         return web.json_response({"ok": True, "cleared": month})
     try:
         entry = gallery_mod.set_month(month, image, title=title, artist_id=artist_id)
     except Exception as ex:
         return web.json_response({"ok": False, "error": str(ex)}, status=400)
+    _CALENDAR_VERSION += 1
     return web.json_response({"ok": True, "month": entry})
 
 
@@ -23,3 +23,29 @@ async def bot_info(_req: web.Request):
             },
         }
     )
+
+@route("GET", "/api/health/database", scopes=["admin:web"])
+async def database_health(_req: web.Request):
+    from bigtree.inc.database import get_database
+    db = get_database()
+    return web.json_response({"ok": True, "pool": db.pool_stats(), "wallet": db.wallet_stats()})
+
+@route("GET", "/api/health/thumbs", scopes=["admin:web"])
+async def thumbs_health(_req: web.Request):
+    from bigtree.inc.thumbs import get_thumbnail_pool
+    return web.json_response({"ok": True, "pool": get_thumbnail_pool().stats()})
+
+@route("GET", "/api/health/cardgames", scopes=["admin:web"])
+async def cardgames_health(_req: web.Request):
+    from bigtree.modules.cardgames import action_stats
+    return web.json_response({"ok": True, "actions": action_stats()})
+
+@route("GET", "/api/health/discord-archive", scopes=["admin:web"])
+async def discord_archive_health(_req: web.Request):
+    from bigtree.modules import discord_archive
+    return web.json_response({"ok": True, "archive": discord_archive.stats()})
+
+@route("GET", "/api/health/discord-fetch", scopes=["admin:web"])
+async def discord_fetch_health(_req: web.Request):
+    from bigtree.inc.discord_fetch import get_fetch_scheduler
+    return web.json_response({"ok": True, "scheduler": get_fetch_scheduler().stats()})
@@ -18,6 +18,9 @@ from bigtree.inc.webserver import route, frontend_route, get_server, DynamicWebS
 from bigtree.inc.database import get_database
 from bigtree.inc import web_tokens
 from bigtree.inc.auth import TOKEN_COOKIE_NAME
+from bigtree.inc.event_hub import SessionEventHub, sse_feed, write_sse
+from bigtree.inc import thumbs
+from bigtree.inc.http_cache import ResponseCache
 from bigtree.modules import tarot as tar
 from bigtree.modules import artists
 from bigtree.webmods import uploads as upload_mod
@@ -25,6 +28,21 @@ from bigtree.cmds import tarot_claims as tarot_claims_cmd
 
 log = getattr(bigtree, "logger", logging.getLogger("bigtree"))
 
+# In-process pub/sub: tarot._add_event hands every new event to the hub, which
+# fans it out to the open streams for that session.
+_STREAM_RESYNC_SECONDS = 15.0
+_EVENT_HUB = SessionEventHub(
+    "tarot",
+    tar.list_events,
+    exists=tar.get_session_by_id,
+    resync_seconds=_STREAM_RESYNC_SECONDS,
+)
+tar.add_event_listener(lambda session_id, event: _EVENT_HUB.dispatch(session_id, None if event is None else [event]))
+_SESSION_GONE = {"type": "SESSION_GONE"}
+# Public deck JSON, keyed by tar.decks_version(); the TTL covers artist edits
+# and decks synced by other processes, which do not bump the version here.
+_PUBLIC_RESPONSES = ResponseCache(maxsize=128, ttl=60.0)
+
 def _json_error(message: str, status: int = 400) -> web.Response:
     return web.json_response({"ok": False, "error": message}, status=status)
 
@@ -97,6 +115,29 @@ def _backs_dir() -> str:
     os.makedirs(path, exist_ok=True)
     return path
 
+def _save_card_png(data: bytes, dest: str) -> bool:
+    """Crop an upload to the 3:4.2 card ratio and store it as PNG."""
+    try:
+        from PIL import Image
+        from io import BytesIO
+        with Image.open(BytesIO(data)) as img:
+            img = img.convert("RGBA")
+            target_ratio = 3.0 / 4.2
+            w, h = img.size
+            ratio = w / h if h else target_ratio
+            if ratio > target_ratio:
+                new_w = int(h * target_ratio)
+                left = (w - new_w) // 2
+                img = img.crop((left, 0, left + new_w, h))
+            elif ratio < target_ratio:
+                new_h = int(w / target_ratio) if target_ratio else h
+                top = (h - new_h) // 2
+                img = img.crop((0, top, w, top + new_h))
+            img.save(dest, format="PNG")
+            return True
+    except Exception:
+        return False
+
 def _safe_name(name: str) -> str:
     keep = []
     for ch in (name or ""):
@@ -168,6 +209,10 @@ async def tarot_card_file(req: web.Request):
         return web.Response(status=404)
     return web.FileResponse(path)
 
+@route("GET", "/tarot/cards/thumbs/{filename}", allow_public=True)
+async def tarot_card_thumb(req: web.Request):
+    return await upload_mod.thumb_response(req, _cards_dir(), req.match_info["filename"])
+
 @route("GET", "/tarot/backs/{filename}", allow_public=True)
 async def tarot_back_file(req: web.Request):
     filename = req.match_info["filename"]
@@ -177,6 +222,10 @@ async def tarot_back_file(req: web.Request):
         return web.Response(status=404)
     return web.FileResponse(path)
 
+@route("GET", "/tarot/backs/thumbs/{filename}", allow_public=True)
+async def tarot_back_thumb(req: web.Request):
+    return await upload_mod.thumb_response(req, _backs_dir(), req.match_info["filename"])
+
 @route("GET", "/api/tarot/houses", allow_public=True)
 async def tarot_houses(_req: web.Request):
     return web.json_response({"ok": True, "houses": []})
@@ -336,11 +385,31 @@ async def get_state(req: web.Request):
         return _json_error("not found", status=404)
     return web.json_response({"ok": True, "state": tar.get_state(s, view=view)})
 
+def _session_feed(session_id: str, last_seq: int = 0):
+    """Stream payloads for a session: backlog since ``last_seq``, then live events from the hub.
+
+    The hub's periodic sweep only covers a session changed by another
+    process; local writers push through the hub immediately.
+    """
+    async def backlog(since: int):
+        if not await asyncio.to_thread(tar.get_session_by_id, session_id):
+            return None
+        return await asyncio.to_thread(tar.list_events, session_id, since)
+
+    return sse_feed(
+        _EVENT_HUB,
+        session_id,
+        keepalive=_STREAM_RESYNC_SECONDS,
+        gone=_SESSION_GONE,
+        backlog=backlog,
+        since=last_seq,
+    )
+
 @route("GET", "/api/tarot/sessions/{join_code}/stream", allow_public=True)
 async def stream_events(req: web.Request):
     join_code = req.match_info["join_code"]
     view = _get_view(req)
-    s = tar.get_session_by_join_code(join_code)
+    s = await asyncio.to_thread(tar.get_session_by_join_code, join_code)
     if not s:
         return _json_error("not found", status=404)
 
@@ -354,19 +423,11 @@ async def stream_events(req: web.Request):
     )
     await resp.prepare(req)
 
-    last_seq = 0
     initial = {"type": "STATE", "state": tar.get_state(s, view=view)}
     await resp.write(f"data: {json.dumps(initial)}\n\n".encode("utf-8"))
 
     try:
-        while True:
-            await asyncio.sleep(1.0)
-            events = tar.list_events(s["session_id"], last_seq)
-            if events:
-                last_seq = int(events[-1].get("seq", last_seq))
-                for ev in events:
-                    payload = {"type": ev.get("type"), "data": ev.get("data"), "seq": ev.get("seq")}
-                    await resp.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        await write_sse(resp, _session_feed(s["session_id"], int(s.get("event_seq") or 0)))
     except asyncio.CancelledError:
         pass
     except Exception:
@@ -380,7 +441,7 @@ async def start_session(req: web.Request):
     body = await req.json()
     token = _get_token(req, body)
     try:
-        tar.start_session(session_id, token)
+        await asyncio.to_thread(tar.start_session, session_id, token)
     except PermissionError:
         return _json_error("unauthorized", status=403)
     except Exception:
@@ -393,7 +454,7 @@ async def shuffle_session(req: web.Request):
     body = await req.json()
     token = _get_token(req, body)
     try:
-        tar.shuffle_session(session_id, token)
+        await asyncio.to_thread(tar.shuffle_session, session_id, token)
     except PermissionError:
         return _json_error("unauthorized", status=403)
     except Exception:
@@ -406,7 +467,8 @@ async def draw_cards(req: web.Request):
     body = await req.json()
     token = _get_token(req, body)
     try:
-        tar.draw_cards(
+        await asyncio.to_thread(
+            tar.draw_cards,
             session_id,
             token,
             count=int(body.get("count") or 1),
@@ -426,7 +488,7 @@ async def reveal_card(req: web.Request):
     mode = str(body.get("mode") or "next")
     position_id = body.get("position_id")
     try:
-        tar.reveal(session_id, token, mode="position" if position_id else mode, position_id=position_id)
+        await asyncio.to_thread(tar.reveal, session_id, token, mode="position" if position_id else mode, position_id=position_id)
     except PermissionError:
         return _json_error("unauthorized", status=403)
     except Exception as ex:
@@ -441,7 +503,7 @@ async def narrate(req: web.Request):
     text = str(body.get("text") or "")
     style = body.get("style")
     try:
-        tar.add_narration(session_id, token, text=text, style=style)
+        await asyncio.to_thread(tar.add_narration, session_id, token, text=text, style=style)
     except PermissionError:
         return _json_error("unauthorized", status=403)
     except Exception as ex:
@@ -454,7 +516,7 @@ async def finish(req: web.Request):
     body = await req.json()
     token = _get_token(req, body)
     try:
-        tar.finish_session(session_id, token)
+        await asyncio.to_thread(tar.finish_session, session_id, token)
     except PermissionError:
         return _json_error("unauthorized", status=403)
     except Exception:
@@ -470,7 +532,7 @@ async def delete_session(req: web.Request):
         body = {}
     token = _get_token(req, body)
     try:
-        ok = tar.delete_session(session_id, token)
+        ok = await asyncio.to_thread(tar.delete_session, session_id, token)
     except PermissionError:
         return _json_error("unauthorized", status=403)
     if not ok:
@@ -536,12 +598,10 @@ async def update_deck(req: web.Request):
         return _json_error("not found", status=404)
     return web.json_response({"ok": True, "deck": deck})
 
-@route("GET", "/api/tarot/decks/{deck_id}/public", allow_public=True)
-async def get_deck_public(req: web.Request):
-    deck_id = req.match_info["deck_id"]
+def _deck_public_payload(deck_id: str):
     deck = tar.get_deck(deck_id)
     if not deck:
-        return _json_error("not found", status=404)
+        return None
     cards = []
     for c in tar.list_cards(deck_id):
         artist_id = c.get("artist_id")
@@ -560,10 +620,9 @@ async def get_deck_public(req: web.Request):
                 "links": artist.get("links") or {},
             } if artist else None,
         })
-    return web.json_response({"ok": True, "deck": deck, "cards": cards})
+    return {"ok": True, "deck": deck, "cards": cards}
 
-@route("GET", "/api/tarot/decks/public", allow_public=True)
-async def list_decks_public(_req: web.Request):
+def _decks_public_payload():
     decks = []
     for d in tar.list_decks():
         decks.append({
@@ -572,7 +631,31 @@ async def list_decks_public(_req: web.Request):
             "back_image": d.get("back_image"),
             "theme": d.get("theme") or "classic",
         })
-    return web.json_response({"ok": True, "decks": decks})
+    return {"ok": True, "decks": decks}
+
+@route("GET", "/api/tarot/decks/{deck_id}/public", allow_public=True)
+async def get_deck_public(req: web.Request):
+    deck_id = req.match_info["deck_id"]
+
+    async def build():
+        payload = await asyncio.to_thread(_deck_public_payload, deck_id)
+        if payload is None:
+            raise LookupError(deck_id)
+        return payload
+
+    try:
+        return await _PUBLIC_RESPONSES.respond(req, ("deck", deck_id), tar.decks_version(), build)
+    except LookupError:
+        return _json_error("not found", status=404)
+
+@route("GET", "/api/tarot/decks/public", allow_public=True)
+async def list_decks_public(req: web.Request):
+    return await _PUBLIC_RESPONSES.respond(
+        req,
+        "decks",
+        tar.decks_version(),
+        lambda: asyncio.to_thread(_decks_public_payload),
+    )
 
 @route("GET", "/api/tarot/spreads", allow_public=True)
 async def list_spreads(_req: web.Request):
@@ -718,27 +801,8 @@ async def upload_card_image(req: web.Request):
 
     _log_upload_context(req, "card", len(data))
 
-    saved = False
-    try:
-        from PIL import Image
-        from io import BytesIO
-        with Image.open(BytesIO(data)) as img:
-            img = img.convert("RGBA")
-            target_ratio = 3.0 / 4.2
-            w, h = img.size
-            ratio = w / h if h else target_ratio
-            if ratio > target_ratio:
-                new_w = int(h * target_ratio)
-                left = (w - new_w) // 2
-                img = img.crop((left, 0, left + new_w, h))
-            elif ratio < target_ratio:
-                new_h = int(w / target_ratio) if target_ratio else h
-                top = (h - new_h) // 2
-                img = img.crop((0, top, w, top + new_h))
-            img.save(dest, format="PNG")
-            saved = True
-    except Exception:
-        saved = False
+    # Pillow decode/crop is CPU bound; keep it off the event loop.
+    saved = await asyncio.to_thread(_save_card_png, data, dest)
 
     if not saved:
         kind = imghdr.what(None, h=data)
@@ -764,6 +828,7 @@ async def upload_card_image(req: web.Request):
         with open(dest, "wb") as f:
             f.write(data)
 
+    thumbs.get_thumbnail_pool().enqueue(_cards_dir(), filename)
     url = f"/tarot/cards/{filename}"
     if card_id:
         tar.set_card_image(card_id, url, artist_id=artist_id)
@@ -787,27 +852,8 @@ async def upload_back_image(req: web.Request):
 
     _log_upload_context(req, "back", len(data))
 
-    saved = False
-    try:
-        from PIL import Image
-        from io import BytesIO
-        with Image.open(BytesIO(data)) as img:
-            img = img.convert("RGBA")
-            target_ratio = 3.0 / 4.2
-            w, h = img.size
-            ratio = w / h if h else target_ratio
-            if ratio > target_ratio:
-                new_w = int(h * target_ratio)
-                left = (w - new_w) // 2
-                img = img.crop((left, 0, left + new_w, h))
-            elif ratio < target_ratio:
-                new_h = int(w / target_ratio) if target_ratio else h
-                top = (h - new_h) // 2
-                img = img.crop((0, top, w, top + new_h))
-            img.save(dest, format="PNG")
-            saved = True
-    except Exception:
-        saved = False
+    # Pillow decode/crop is CPU bound; keep it off the event loop.
+    saved = await asyncio.to_thread(_save_card_png, data, dest)
 
     if not saved:
         kind = imghdr.what(None, h=data)
@@ -833,6 +879,7 @@ async def upload_back_image(req: web.Request):
         with open(dest, "wb") as f:
             f.write(data)
 
+    thumbs.get_thumbnail_pool().enqueue(_backs_dir(), filename)
     url = f"/tarot/backs/{filename}?v={uuid.uuid4().hex}"
     tar.set_deck_back(deck_id, url, artist_id=artist_id)
     return web.json_response({"ok": True, "url": url})
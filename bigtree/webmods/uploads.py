@@ -3,6 +3,7 @@ import os
 from aiohttp import web
 from bigtree.inc.webserver import route
 from bigtree.inc.database import get_database
+from bigtree.inc import thumbs
 from bigtree.webmods import tarot_api
 from bigtree.modules import bingo as bingo_mod
 from bigtree.modules import tarot as tarot_mod
@@ -20,9 +21,6 @@ _IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
 def _media_dir() -> str:
     return media_mod.get_media_dir()
 
-def _media_thumbs_dir() -> str:
-    return media_mod.get_media_thumbs_dir()
-
 async def read_multipart(req: web.Request, *, file_field: str = "file") -> tuple[dict, str, bytes]:
     reader = await req.multipart()
     fields: dict[str, str] = {}
@@ -242,20 +240,39 @@ async def media_file(req: web.Request):
     resp.headers["Cache-Control"] = "public, max-age=86400, immutable"
     return resp
 
-@route("GET", "/media/thumbs/{filename}", allow_public=True)
-async def media_thumb(req: web.Request):
-    filename = req.match_info["filename"]
+async def thumb_response(req: web.Request, source_dir: str, filename: str) -> web.StreamResponse:
+    """Serve ``source_dir/thumbs/...`` for ``filename``; never decodes on the loop.
+
+    ``?variant=webp|sm`` selects a resized WebP. A missing thumb is rendered in
+    the thumbnail pool; if that does not finish in time the original is served
+    uncached so the page still renders.
+    """
+    filename = os.path.basename(filename)
     ext = os.path.splitext(filename)[1].lower()
     if ext not in _IMG_EXTS:
         return web.Response(status=404)
-    thumb_path = os.path.join(_media_thumbs_dir(), filename)
-    if not os.path.exists(thumb_path):
-        if not media_mod.ensure_thumb(filename):
+    variant = (req.query.get("variant") or "").strip().lower()
+    if variant not in thumbs.VARIANTS:
+        variant = ""
+    path = thumbs.thumb_path(source_dir, filename, variant)
+    source = os.path.join(source_dir, filename)
+    if not thumbs.is_fresh(source, path):
+        if not os.path.exists(source):
             return web.Response(status=404)
-    resp = web.FileResponse(thumb_path)
-    resp.headers["Cache-Control"] = "public, max-age=86400, immutable"
+        if not await thumbs.get_thumbnail_pool().aensure(source_dir, filename, variant):
+            resp = web.FileResponse(source)
+            resp.headers["Cache-Control"] = "no-cache"
+            return resp
+    resp = web.FileResponse(path)
+    # Not immutable: the source can be replaced under the same name, so
+    # clients revalidate (ETag / Last-Modified) and pick up the new thumb.
+    resp.headers["Cache-Control"] = "public, no-cache"
     return resp
 
+@route("GET", "/media/thumbs/{filename}", allow_public=True)
+async def media_thumb(req: web.Request):
+    return await thumb_response(req, _media_dir(), req.match_info["filename"])
+
 @route("POST", "/api/media/upload", scopes=["tarot:admin", "bingo:admin", "admin:web"])
 async def upload_media(req: web.Request):
     fields, filename_hint, data = await read_multipart(req)
@@ -297,6 +314,7 @@ async def upload_media(req: web.Request):
             f.write(data)
     except Exception:
         return web.json_response({"ok": False, "error": "save failed"}, status=500)
+    media_mod.queue_thumbs(filename)
     db = get_database()
     artist_name, artist_links = _artist_payload_for_db(artist_id)
     metadata = {"source": "upload"}
@@ -321,7 +339,7 @@ async def upload_media(req: web.Request):
     )
     try:
         from bigtree.webmods import gallery as gallery_web
-        gallery_web.invalidate_gallery_cache()
+        await db.run_async(gallery_web.apply_media_upsert, filename)
     except Exception:
         pass
     item = _media_item(
@@ -455,7 +473,7 @@ async def delete_media(req: web.Request):
     tarot_mod.clear_image_references(f"/media/{filename}")
     try:
         from bigtree.webmods import gallery as gallery_web
-        gallery_web.invalidate_gallery_cache()
+        gallery_web.apply_item_removed(gallery_web._item_id("media", filename))
     except Exception:
         pass
     return web.json_response({"ok": True})
@@ -471,11 +489,6 @@ async def delete_tarot_card_file(req: web.Request):
     except Exception:
         return web.json_response({"ok": False, "error": "delete failed"}, status=500)
     tarot_mod.clear_image_references(f"/tarot/cards/{filename}")
-    try:
-        from bigtree.webmods import gallery as gallery_web
-        gallery_web.invalidate_gallery_cache()
-    except Exception:
-        pass
     return web.json_response({"ok": True})
 
 @route("DELETE", "/api/uploads/tarot/backs/{filename}", scopes=["tarot:admin"])
@@ -489,11 +502,6 @@ async def delete_tarot_back_file(req: web.Request):
     except Exception:
         return web.json_response({"ok": False, "error": "delete failed"}, status=500)
     tarot_mod.clear_image_references(f"/tarot/backs/{filename}")
-    try:
-        from bigtree.webmods import gallery as gallery_web
-        gallery_web.invalidate_gallery_cache()
-    except Exception:
-        pass
     return web.json_response({"ok": True})
 
 @route("DELETE", "/api/uploads/bingo/backgrounds/{game_id}", scopes=["bingo:admin"])
@@ -7,7 +7,7 @@ import hashlib
 import hmac
 import secrets
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from urllib.parse import urlencode
 
 import aiohttp
@@ -324,7 +324,7 @@ async def _resolve_user(request: web.Request) -> Any:
     if not token:
         return web.json_response({"ok": False, "error": "user token required"}, status=401)
     db = get_database()
-    user = db.get_user_by_session(token)
+    user = await db.run_async(db.get_user_by_session, token)
     if not user:
         return web.json_response({"ok": False, "error": "invalid or expired token"}, status=401)
     return user
@@ -347,7 +347,7 @@ async def login_user(request: web.Request) -> web.Response:
         logger.warning("[user-area] xivauth denied login: %s", exc)
         return web.json_response({"ok": False, "error": str(exc)}, status=401)
     try:
-        session = _create_user_session(auth_data, username, world)
+        session = await get_database().run_async(_create_user_session, auth_data, username, world)
     except ValueError as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=500)
     response = {
@@ -438,7 +438,7 @@ async def xivauth_oauth_callback(request: web.Request) -> web.Response:
         return web.Response(text="XivAuth token missing.", status=502)
     try:
         auth_data = await _call_xivauth(access_token, None, None)
-        session_data = _create_user_session(auth_data, None, None)
+        session_data = await get_database().run_async(_create_user_session, auth_data, None, None)
     except ValueError as exc:
         logger.warning("[user-area] xivauth login failed: %s", exc)
         return web.Response(text="XivAuth login failed.", status=401)
@@ -466,6 +466,11 @@ async def user_games(request: web.Request) -> web.Response:
         return user
     db = get_database()
     include_all = str(request.query.get("all") or "").strip().lower() in {"1", "true", "yes"}
+    games = await db.run_async(_load_user_games, db, user, include_all)
+    return web.json_response({"ok": True, "games": games})
+
+
+def _load_user_games(db, user: Dict[str, Any], include_all: bool) -> List[Dict[str, Any]]:
     games = db.list_user_games(user["id"], only_active=not include_all)
     try:
         from bigtree.modules import bingo as bingo_mod
@@ -511,8 +516,7 @@ async def user_games(request: web.Request) -> web.Response:
                         db.set_game_join_code(game_id, join_code)
                     except Exception:
                         pass
-
-    return web.json_response({"ok": True, "games": games})
+    return games
 
 
 @route("GET", "/user-area/events", allow_public=True)
@@ -526,7 +530,7 @@ async def user_events(request: web.Request) -> web.Response:
         "false",
         "no",
     }
-    events = db.list_user_events(int(user["id"]), include_ended=include_ended, limit=500)
+    events = await db.run_async(db.list_user_events, int(user["id"]), include_ended=include_ended, limit=500)
     return web.json_response({"ok": True, "events": events})
 
 
@@ -539,7 +543,7 @@ async def user_event_detail(request: web.Request) -> web.Response:
     if isinstance(user, web.Response):
         return user
     db = get_database()
-    detail = db.get_user_event_detail(int(user["id"]), code)
+    detail = await db.run_async(db.get_user_event_detail, int(user["id"]), code)
     if not detail:
         return web.json_response({"ok": False, "error": "event not found or not joined"}, status=404)
     return web.json_response({"ok": True, **detail})
@@ -558,7 +562,7 @@ async def claim_game(request: web.Request) -> web.Response:
     if not game_id:
         return web.json_response({"ok": False, "error": "game_id is required"}, status=400)
     db = get_database()
-    if not db.claim_game_for_user(game_id, user["id"]):
+    if not await db.run_async(db.claim_game_for_user, game_id, user["id"]):
         return web.json_response({"ok": False, "error": "game not found or not claimable"}, status=404)
     return web.json_response({"ok": True, "game_id": game_id})
 
@@ -576,7 +580,18 @@ async def claim_game_by_join(request: web.Request) -> web.Response:
     if not join_code:
         return web.json_response({"ok": False, "error": "join_code is required"}, status=400)
     db = get_database()
-    ok, game, status = db.claim_game_by_join_code(join_code, user["id"])
+    ok, game, status = await db.run_async(_claim_by_join_code, db, join_code, user["id"])
+    if not ok:
+        if status == "already claimed":
+            return web.json_response({"ok": False, "error": "already claimed", "game": game}, status=409)
+        if status == "join code not found":
+            return web.json_response({"ok": False, "error": "join code not found"}, status=404)
+        return web.json_response({"ok": False, "error": status or "claim failed"}, status=400)
+    return web.json_response({"ok": True, "status": status, "game": game})
+
+
+def _claim_by_join_code(db, join_code: str, user_id: int):
+    ok, game, status = db.claim_game_by_join_code(join_code, user_id)
     seed_code = join_code
     if not ok and status == "join code not found":
         try:
@@ -586,22 +601,17 @@ async def claim_game_by_join(request: web.Request) -> web.Response:
             info = None
         if info and info.get("game_id"):
             seed_code = str(info.get("game_id"))
-            ok, game, status = db.claim_game_by_join_code(seed_code, user["id"])
+            ok, game, status = db.claim_game_by_join_code(seed_code, user_id)
         if not ok and status == "join code not found":
             if _seed_game_from_join_code(seed_code):
-                ok, game, status = db.claim_game_by_join_code(seed_code, user["id"])
-    if not ok:
-        if status == "already claimed":
-            return web.json_response({"ok": False, "error": "already claimed", "game": game}, status=409)
-        if status == "join code not found":
-            return web.json_response({"ok": False, "error": "join code not found"}, status=404)
-        return web.json_response({"ok": False, "error": status or "claim failed"}, status=400)
-    try:
-        if game and game.get("module") == "bingo":
-            db.set_game_join_code(game.get("game_id") or "", join_code)
-    except Exception:
-        pass
-    return web.json_response({"ok": True, "status": status, "game": game})
+                ok, game, status = db.claim_game_by_join_code(seed_code, user_id)
+    if ok:
+        try:
+            if game and game.get("module") == "bingo":
+                db.set_game_join_code(game.get("game_id") or "", join_code)
+        except Exception:
+            pass
+    return ok, game, status
 
 
 @route("GET", "/user-area/join-status", allow_public=True)
@@ -610,7 +620,7 @@ async def user_join_status(request: web.Request) -> web.Response:
     if not join_code:
         return web.json_response({"ok": False, "error": "join_code is required"}, status=400)
     db = get_database()
-    game = db.get_game_by_join_code(join_code)
+    game = await db.run_async(db.get_game_by_join_code, join_code)
     return web.json_response({"ok": True, "game": game})
 
 
@@ -633,7 +643,7 @@ async def user_area_manage_page(_req: web.Request) -> web.Response:
 @route("GET", "/user-area/manage/games", scopes=["admin:web"])
 async def manage_games(request: web.Request) -> web.Response:
     db = get_database()
-    games = db.list_api_games(include_inactive=True, limit=500)
+    games = await db.run_async(db.list_api_games, include_inactive=True, limit=500)
     return web.json_response({"ok": True, "games": games})
 
 
@@ -645,5 +655,5 @@ async def manage_claims(request: web.Request) -> web.Response:
         limit = int(request.query.get("limit") or 2000)
     except Exception:
         limit = 2000
-    users = db.list_users(limit=limit)
+    users = await db.run_async(db.list_users, limit=limit)
     return web.json_response({"ok": True, "users": users})
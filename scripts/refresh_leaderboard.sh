@@ -1,5 +1,6 @@
 #!/bin/bash
-# Refresh the G-Pose leaderboard by calling the bot API
+# Force a G-Pose leaderboard embed refresh by calling the bot API.
+# Not needed on a schedule: the bot updates the board from reaction events.
 curl -s -X POST http://192.168.0.132:8443/gpose/leaderboard \
   -H "X-API-Key: elfbingo" \
   -H "Content-Type: application/json" \
@@ -0,0 +1,46 @@
+# tests/test_bingo_card_index.py
+from bigtree.modules.bingo import GRID, _CardIndex
+
+CELLS = list(range(1, GRID * GRID + 1))  # row-major: row r holds r*4+1 .. r*4+4
+
+
+def _index(stage_called=()):
+    index = _CardIndex()
+    index.add({"card_id": "c1", "owner_name": "Elf", "cells": CELLS}, set(stage_called))
+    return index
+
+
+def _call_all(index, numbers, stage):
+    winners = []
+    for n in numbers:
+        _, won = index.daub(n, stage)
+        winners.extend(won)
+    return winners
+
+
+def test_single_line_winner_detected_on_completing_call():
+    index = _index()
+    assert _call_all(index, [1, 2, 3], "single") == []
+    _, won = index.daub(4, "single")
+    assert won == [0]
+
+
+def test_double_line_winner_detected_on_second_line():
+    index = _index()
+    assert _call_all(index, [1, 2, 3, 4, 5, 6, 7], "double") == []
+    _, won = index.daub(8, "double")
+    assert won == [0]
+
+
+def test_full_card_winner_detected_on_last_number():
+    index = _index()
+    assert _call_all(index, CELLS[:-1], "full") == []
+    _, won = index.daub(CELLS[-1], "full")
+    assert won == [0]
+
+
+def test_already_qualifying_card_is_not_reported_again():
+    index = _index()
+    assert _call_all(index, [1, 2, 3, 4], "single") == [0]
+    _, won = index.daub(5, "single")
+    assert won == []